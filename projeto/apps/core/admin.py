@@ -8,10 +8,9 @@ from .models import (
     RelatorioGratificacoes, RelatorioOrgaosCentrais, RelatorioEfetivo,
     RelatorioGratificacoesPlan1, Decreto, SolicitacaoRealocacao,
     SolicitacaoPermuta, ConfiguracaoRelatorio, TipoUsuario,
-    SolicitacaoSimulacao, NotificacaoSimulacao
+    SolicitacaoSimulacao, NotificacaoSimulacao, VigenciaCargoSIORG, VersaoDataset
 )
 from .utils import processa_planilhas
-from .siorg_scraper import scrape_siorg
 import os
 import json
 from decimal import Decimal
@@ -24,6 +23,11 @@ from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils import timezone
 from django.conf import settings
+import logging
+from .logs import AmostradorErros
+from .importacao import ativar_versao, houve_mudanca, importar
+
+logger = logging.getLogger(__name__)
 
 # Customização do Admin
 admin.site.site_header = "Administração do Nexo"
@@ -38,10 +42,10 @@ def atualizar_dados_organograma():
     try:
         # Não é mais necessário copiar o arquivo, já que
         # o organograma agora acessa o dados.json diretamente via API
-        print("Organograma será atualizado via API ao ser carregado")
+        logger.info("Organograma será atualizado via API ao ser carregado")
         return True
     except Exception as e:
-        print(f"Erro ao atualizar organograma: {str(e)}")
+        logger.error("Erro ao atualizar organograma: %s", e)
         return False
 
 # Função para gerar o arquivo dados.json
@@ -64,7 +68,7 @@ def gerar_dados_json():
         caminho_do_diretorio = os.path.dirname(ORGANOGRAMA_JSON_PATH)  # <<< CORREÇÃO
         os.makedirs(caminho_do_diretorio, exist_ok=True)  # <<< CORREÇÃO
         # --- FIM DA CORREÇÃO ---
-        print("Iniciando geração do arquivo organograma.json...")
+        logger.info("Iniciando geração do arquivo organograma.json...")
 
         # Função auxiliar para converter Decimal em float para serialização JSON
         def decimal_para_float(obj):
@@ -81,7 +85,7 @@ def gerar_dados_json():
 
         # Obter todos os registros de UnidadeCargo
         unidades_cargo = UnidadeCargo.objects.all()
-        print(f"Processando {unidades_cargo.count()} registros de UnidadeCargo")
+        logger.info("Processando %s registros de UnidadeCargo", unidades_cargo.count())
 
         # Adicionar cada unidade de cargo ao resultado
         for unidade in unidades_cargo:
@@ -101,7 +105,7 @@ def gerar_dados_json():
 
         # Obter todos os registros de CargoSIORG
         cargos_siorg = CargoSIORG.objects.all()
-        print(f"Processando {cargos_siorg.count()} registros de CargoSIORG")
+        logger.info("Processando %s registros de CargoSIORG", cargos_siorg.count())
 
         # Adicionar cada cargo ao resultado
         for cargo in cargos_siorg:
@@ -116,8 +120,8 @@ def gerar_dados_json():
         with open(ORGANOGRAMA_JSON_PATH, 'w', encoding='utf-8') as f:
             json.dump(resultado, f, ensure_ascii=False, indent=2, default=decimal_para_float)
 
-        print(f"Arquivo organograma.json gerado com sucesso em: {ORGANOGRAMA_JSON_PATH}")
-        print(f"Total de registros: {len(resultado['core_unidadecargo'])} unidades e {len(resultado['core_cargosiorg'])} cargos")
+        logger.info("Arquivo organograma.json gerado com sucesso em: %s", ORGANOGRAMA_JSON_PATH)
+        logger.info("Total de registros: %s unidades e %s cargos", len(resultado['core_unidadecargo']), len(resultado['core_cargosiorg']))
 
         return True
 
@@ -251,10 +255,20 @@ class UnidadeCargoAdmin(admin.ModelAdmin):
                 file_estrutura_viva = form.cleaned_data['file_estrutura_viva']
 
                 try:
-                    resultado = processa_planilhas(file_hierarquia, file_estrutura_viva)
+                    resultado = processa_planilhas(file_hierarquia, file_estrutura_viva, usuario=request.user)
+                    resumo = resultado.attrs.get('resumo_importacao')
 
                     # Contar quantos registros foram importados
                     total_registros = UnidadeCargo.objects.count()
+
+                    if resumo and not houve_mudanca(resumo):
+                        # Mesma planilha: nada foi gravado, os arquivos derivados continuam válidos
+                        self.message_user(
+                            request,
+                            f'Planilhas sem alterações em relação ao banco ({total_registros} registros).',
+                            messages.INFO
+                        )
+                        return redirect('..')
                     
                     # Gerar arquivo dados.json após a importação
                     try:
@@ -273,11 +287,14 @@ class UnidadeCargoAdmin(admin.ModelAdmin):
                             messages.WARNING
                         )
 
-                    self.message_user(
-                        request,
-                        f'Importação concluída! Total de registros no banco: {total_registros}',
-                        messages.INFO
-                    )
+                    if resumo:
+                        self.message_user(
+                            request,
+                            f'Importação concluída! {resumo["criados"]} cargos novos, {resumo["alterados"]} alterados, '
+                            f'{resumo["removidos"]} removidos e {resumo["inalterados"]} sem alteração. '
+                            f'Total de registros no banco: {total_registros}',
+                            messages.INFO
+                        )
 
                 except Exception as e:
                     self.message_user(
@@ -343,7 +360,8 @@ class CargoSIORGAdmin(admin.ModelAdmin):
     list_display = ('cargo', 'nivel', 'quantidade', 'valor', 'unitario', 'data_atualizacao')
     search_fields = ('cargo', 'nivel')
     list_filter = ('nivel', 'data_atualizacao')
-    readonly_fields = ('data_atualizacao',)
+    # Derivados de cargo/valor ao salvar
+    readonly_fields = ('data_atualizacao', 'valor_decimal', 'tipo_cargo', 'categoria', 'nivel_cargo')
 
     def get_urls(self):
         urls = super().get_urls()
@@ -355,7 +373,12 @@ class CargoSIORGAdmin(admin.ModelAdmin):
     def scrape_siorg_view(self, request):
         if request.method == 'POST':
             try:
-                resultado = scrape_siorg()
+                from .siorg_scraper import scrape_siorg
+                vigente_desde = request.POST.get('vigente_desde')
+                resultado = scrape_siorg(
+                    arquivo=request.FILES.get('arquivo'),
+                    vigente_desde=forms.DateField().clean(vigente_desde) if vigente_desde else None,
+                )
                 
                 if resultado.get('success'):
                     self.message_user(request, resultado['message'], messages.SUCCESS)
@@ -374,6 +397,50 @@ class CargoSIORGAdmin(admin.ModelAdmin):
         return render(request, 'admin/scrape_siorg.html', context)
 
 
+@admin.register(VigenciaCargoSIORG)
+class VigenciaCargoSIORGAdmin(admin.ModelAdmin):
+    list_display = ('cargo', 'valor', 'unitario', 'vigente_desde', 'vigente_ate', 'fonte', 'importado_em')
+    search_fields = ('cargo',)
+    list_filter = ('vigente_desde', 'fonte')
+    readonly_fields = ('cargo', 'valor', 'unitario', 'vigente_desde', 'vigente_ate', 'fonte', 'importado_em')
+
+    def has_add_permission(self, request):
+        # O histórico é mantido pela importação da tabela
+        return False
+
+
+@admin.register(VersaoDataset)
+class VersaoDatasetAdmin(admin.ModelAdmin):
+    list_display = ('conjunto', 'numero', 'ativa', 'total_registros', 'origem', 'criado_em', 'usuario')
+    list_filter = ('conjunto', 'ativa', 'criado_em')
+    search_fields = ('origem',)
+    readonly_fields = ('conjunto', 'numero', 'ativa', 'origem', 'total_registros', 'resumo', 'criado_em', 'usuario')
+    actions = ['ativar_versao_selecionada']
+
+    def has_add_permission(self, request):
+        # As versões são criadas pela importação das planilhas
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Versões antigas são removidas pela importação (VERSOES_DATASET_MANTIDAS)
+        return False
+
+    def ativar_versao_selecionada(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, 'Selecione uma única versão para ativar.', messages.WARNING)
+            return
+        versao = queryset.get()
+        try:
+            ativar_versao(versao.conjunto, versao.numero)
+        except Exception as e:
+            logger.exception("Erro ao ativar %s", versao)
+            self.message_user(request, f'Erro ao ativar {versao}: {str(e)}', messages.ERROR)
+            return
+        logger.info("%s ativada por %s", versao, request.user)
+        self.message_user(request, f'{versao} ativada ({versao.total_registros} registros).', messages.SUCCESS)
+    ativar_versao_selecionada.short_description = 'Ativar versão selecionada'
+
+
 # Registrar o admin customizado para User
 class CustomUserAdmin(BaseUserAdmin):
     """Admin customizado para User que lida com caracteres especiais"""
@@ -603,11 +670,12 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
 
     def limpar_todos_registros(self, request, queryset):
         """Ação para limpar todos os registros da tabela"""
-        total = RelatorioGratificacoes.objects.count()
-        RelatorioGratificacoes.objects.all().delete()
+        # Uma versão vazia: os servidores saem da versão ativa e é possível voltar
+        # à anterior (ativar_versao_dados)
+        resumo = importar('servidores', [], origem='Limpeza pelo admin', usuario=request.user)
         self.message_user(
             request,
-            f'✅ Todos os {total} registros de gratificações foram removidos com sucesso!',
+            f'✅ Todos os {resumo["removidos"]} registros de gratificações foram removidos com sucesso!',
             messages.SUCCESS
         )
 
@@ -628,20 +696,20 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
                     # Processar arquivo e salvar dados - APENAS aba Planilha1
                     arquivo = form.cleaned_data['arquivo']
 
-                    print(f"=== INICIANDO PROCESSAMENTO DO ARQUIVO: {arquivo.name} ===")
-                    print("=== Importando APENAS aba 'Planilha1' (dados de servidores/lotações) ===")
-
-                    # Limpar dados anteriores antes de importar
-                    registros_anteriores = RelatorioGratificacoes.objects.count()
-                    if registros_anteriores > 0:
-                        RelatorioGratificacoes.objects.all().delete()
-                        print(f"🗑️ Removidos {registros_anteriores} registros anteriores para evitar duplicatas")
-                        self.message_user(request, f'🗑️ Removidos {registros_anteriores} registros anteriores para evitar duplicatas.', messages.INFO)
+                    logger.info("=== INICIANDO PROCESSAMENTO DO ARQUIVO: %s ===", arquivo.name)
+                    logger.info("=== Importando APENAS aba 'Planilha1' (dados de servidores/lotações) ===")
 
-                    resultado = self.processar_planilha_gratificacoes(arquivo, "Planilha1")
+                    resultado = self.processar_planilha_gratificacoes(arquivo, "Planilha1", usuario=request.user)
+                    resumo = resultado.get("resumo")
 
-                    if resultado["inseridos"] > 0:
-                        self.message_user(request, f'✅ Importação concluída! {resultado["inseridos"]} registros de servidores inseridos da aba "Planilha1".', messages.SUCCESS)
+                    if resumo:
+                        self.message_user(
+                            request,
+                            f'✅ Importação concluída (aba "Planilha1"): {resumo["criados"]} servidores novos, '
+                            f'{resumo["alterados"]} alterados, {resumo["removidos"]} removidos e '
+                            f'{resumo["inalterados"]} sem alteração.',
+                            messages.SUCCESS
+                        )
                     else:
                         self.message_user(request, f'⚠️ Nenhum registro foi inserido da aba "Planilha1". Verifique se a planilha tem essa aba com dados de servidores.', messages.WARNING)
 
@@ -650,9 +718,7 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
 
                 except Exception as e:
                     error_msg = f'Erro ao processar arquivo: {str(e)}'
-                    print(f"ERRO CRÍTICO: {error_msg}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("ERRO CRÍTICO: %s", error_msg)
                     self.message_user(request, error_msg, messages.ERROR)
 
                 return redirect('..')
@@ -666,23 +732,24 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
         }
         return render(request, 'admin/importar_gratificacoes.html', context)
 
-    def processar_planilha_gratificacoes(self, arquivo, nome_aba=None):
+    def processar_planilha_gratificacoes(self, arquivo, nome_aba=None, usuario=None):
         import pandas as pd
         from datetime import datetime
 
         try:
             # Ler o arquivo Excel
-            print(f"Lendo arquivo Excel: {arquivo.name}")
+            logger.info("Lendo arquivo Excel: %s", arquivo.name)
             if nome_aba:
-                print(f"Aba especificada: {nome_aba}")
+                logger.info("Aba especificada: %s", nome_aba)
                 df = pd.read_excel(arquivo, sheet_name=nome_aba)
             else:
                 df = pd.read_excel(arquivo)
-            print(f"Arquivo lido com sucesso. Shape: {df.shape}")
+            logger.info("Arquivo lido com sucesso. Shape: %s", df.shape)
 
             # Log das colunas para debug
-            print(f"Colunas encontradas na planilha: {list(df.columns)}")
-            print(f"Primeira linha de dados: {df.iloc[0].to_dict() if len(df) > 0 else 'VAZIA'}")
+            logger.info("Colunas encontradas na planilha: %s", list(df.columns))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Primeira linha de dados: %s", df.iloc[0].to_dict() if len(df) > 0 else 'VAZIA')
 
             if df.empty:
                 return {"inseridos": 0, "erros": ["A planilha está vazia"]}
@@ -696,15 +763,16 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
                             return valor
                 return ''
 
-            inseridos = 0
+            registros = []
             erros = []
+            amostrador = AmostradorErros(logger)
             linhas_processadas = 0
 
-            print(f"Iniciando processamento de {len(df)} linhas...")
+            logger.info("Iniciando processamento de %s linhas...", len(df))
 
             for index, row in df.iterrows():
                 linhas_processadas += 1
-                print(f"Processando linha {index + 1}...")
+                logger.debug("Processando linha %s...", index + 1)
 
                 try:
                     # Processar data de nascimento
@@ -727,13 +795,17 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
 
                     # Extrair valores principais para debug
                     nome = obter_valor(row, ['Nome do Servidor'])
-                    matricula = obter_valor(row, ['Matrícula SIAPE'])
+                    # Uma célula vazia faz o pandas ler a coluna como float ("1234567.0")
+                    matricula = obter_valor(row, ['Matrícula SIAPE']).removesuffix('.0')
                     cargo = obter_valor(row, ['Cargo'])
 
-                    print(f"Linha {index + 1}: Nome={nome}, Matricula={matricula}, Cargo={cargo}")
+                    logger.debug("Linha %s: Nome=%s, Matricula=%s, Cargo=%s", index + 1, nome, matricula, cargo)
 
-                    # Criar o registro
-                    registro = RelatorioGratificacoes.objects.create(
+                    # A matrícula é a chave do servidor na importação
+                    if not matricula:
+                        raise ValueError("Matrícula SIAPE vazia")
+
+                    registros.append(dict(
                         nome_servidor=nome,
                         matricula_siape=matricula,
                         situacao_funcional=obter_valor(row, ['Situação Funcional']),
@@ -757,23 +829,25 @@ class RelatorioGratificacoesAdmin(admin.ModelAdmin):
                         email_institucional=obter_valor(row, ['e-Mail Institucional']),
                         siape_titular_chefe=obter_valor(row, ['Siape do Titular Chefe']),
                         siape_substituto=obter_valor(row, ['Siape do Substituto']),
-                    )
-                    inseridos += 1
-                    print(f"Registro {inseridos} criado com sucesso (ID: {registro.id})")
+                    ))
 
                 except Exception as e:
                     erro_msg = f"Linha {index + 2}: {str(e)}"
                     erros.append(erro_msg)
-                    print(f"ERRO na linha {index + 2}: {str(e)}")
-                    print(f"Dados da linha: {dict(row)}")
+                    if amostrador.registrar("ERRO na linha %s: %s", index + 2, e) and logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Dados da linha: %s", dict(row))
 
-            print(f"Processamento concluído. {inseridos} inseridos de {linhas_processadas} processadas.")
-            return {"inseridos": inseridos, "erros": erros}
+            logger.info("Processamento concluído. %s registros válidos de %s processadas.", len(registros), linhas_processadas)
+            amostrador.resumir(f"Importação de {arquivo.name}")
+            if not registros:
+                return {"inseridos": 0, "erros": erros}
+
+            # Só as diferenças em relação ao banco são gravadas (upsert pela matrícula)
+            resumo = importar('servidores', registros, origem=arquivo.name, usuario=usuario)
+            return {"inseridos": resumo["criados"], "erros": erros, "resumo": resumo}
 
         except Exception as e:
-            print(f"ERRO ao ler arquivo: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("ERRO ao ler arquivo: %s", e)
             return {"inseridos": 0, "erros": [f"Erro ao ler arquivo: {str(e)}"]}
 
     def changelist_view(self, request, extra_context=None):
@@ -892,14 +966,14 @@ class RelatorioEfetivoAdmin(admin.ModelAdmin):
                     # Processar arquivo e salvar dados
                     arquivo = form.cleaned_data['arquivo']
 
-                    print(f"=== INICIANDO PROCESSAMENTO DO ARQUIVO: {arquivo.name} ===")
-                    print("=== Importando dados de efetivo ===")
+                    logger.info("=== INICIANDO PROCESSAMENTO DO ARQUIVO: %s ===", arquivo.name)
+                    logger.info("=== Importando dados de efetivo ===")
 
                     # Limpar dados anteriores antes de importar
                     registros_anteriores = RelatorioEfetivo.objects.count()
                     if registros_anteriores > 0:
                         RelatorioEfetivo.objects.all().delete()
-                        print(f"🗑️ Removidos {registros_anteriores} registros anteriores para evitar duplicatas")
+                        logger.info("Removidos %s registros anteriores para evitar duplicatas", registros_anteriores)
                         self.message_user(request, f'🗑️ Removidos {registros_anteriores} registros anteriores para evitar duplicatas.', messages.INFO)
 
                     resultado = self.processar_planilha_efetivo(arquivo)
@@ -914,9 +988,7 @@ class RelatorioEfetivoAdmin(admin.ModelAdmin):
 
                 except Exception as e:
                     error_msg = f'Erro ao processar arquivo: {str(e)}'
-                    print(f"ERRO CRÍTICO: {error_msg}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("ERRO CRÍTICO: %s", error_msg)
                     self.message_user(request, error_msg, messages.ERROR)
 
                 return redirect('..')
@@ -936,17 +1008,18 @@ class RelatorioEfetivoAdmin(admin.ModelAdmin):
 
         try:
             # Ler o arquivo Excel
-            print(f"Lendo arquivo Excel: {arquivo.name}")
+            logger.info("Lendo arquivo Excel: %s", arquivo.name)
             df = pd.read_excel(arquivo)
-            print(f"Arquivo lido com sucesso. Shape: {df.shape}")
-            print(f"Colunas encontradas: {list(df.columns)}")
+            logger.info("Arquivo lido com sucesso. Shape: %s", df.shape)
+            logger.info("Colunas encontradas: %s", list(df.columns))
 
             inseridos = 0
             erros = []
+            amostrador = AmostradorErros(logger)
 
             for index, row in df.iterrows():
                 try:
-                    print(f"Processando linha {index + 1} da planilha...")
+                    logger.debug("Processando linha %s da planilha...", index + 1)
 
                     # Ler dados EXATAMENTE como estão na planilha, sem modificar nada
                     qt_original = row.iloc[0] if len(row) > 0 else ""
@@ -964,16 +1037,16 @@ class RelatorioEfetivoAdmin(admin.ModelAdmin):
                     horario_str = str(horario_original).strip() if pd.notna(horario_original) else ""
                     bloco_str = str(bloco_original).strip() if pd.notna(bloco_original) else ""
 
-                    print(f"📋 Linha {index + 1} da planilha - Coluna A (QT): '{qt_str}' | Nome: '{nome_str}' | Função: '{funcao_str}'")
+                    logger.debug("Linha %s da planilha - Coluna A (QT): '%s' | Nome: '%s' | Função: '%s'", index + 1, qt_str, nome_str, funcao_str)
 
                     # Pular apenas linhas que são claramente cabeçalhos
                     if nome_str.upper() in ['NOME COMPLETO', 'NOME']:
-                        print(f"Linha {index + 1}: Cabeçalho detectado, pulando...")
+                        logger.debug("Linha %s: Cabeçalho detectado, pulando...", index + 1)
                         continue
 
                     # Pular linhas completamente vazias
                     if not any([qt_str, nome_str, funcao_str, unidade_str, horario_str, bloco_str]):
-                        print(f"Linha {index + 1}: Linha vazia, pulando...")
+                        logger.debug("Linha %s: Linha vazia, pulando...", index + 1)
                         continue
 
                     # Usar o valor QT EXATAMENTE como está na planilha
@@ -998,20 +1071,19 @@ class RelatorioEfetivoAdmin(admin.ModelAdmin):
                     )
 
                     inseridos += 1
-                    print(f"✅ Registro {inseridos} salvo: QT={qt_final} (valor literal da coluna A) | Nome: {nome_str} | Função: {funcao_str}")
+                    logger.debug("Registro %s salvo: QT=%s (valor literal da coluna A) | Nome: %s | Função: %s", inseridos, qt_final, nome_str, funcao_str)
 
                 except Exception as e:
                     erro_msg = f"Linha {index + 1}: {str(e)}"
                     erros.append(erro_msg)
-                    print(f"ERRO na linha {index + 1}: {str(e)}")
+                    amostrador.registrar("ERRO na linha %s: %s", index + 1, e)
 
-            print(f"Processamento concluído. {inseridos} inseridos.")
+            logger.info("Processamento concluído. %s inseridos.", inseridos)
+            amostrador.resumir(f"Importação de {arquivo.name}")
             return {"inseridos": inseridos, "erros": erros}
 
         except Exception as e:
-            print(f"ERRO ao ler arquivo: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("ERRO ao ler arquivo: %s", e)
             return {"inseridos": 0, "erros": [f"Erro ao ler arquivo: {str(e)}"]}
 
     def changelist_view(self, request, extra_context=None):
@@ -1056,14 +1128,14 @@ class RelatorioGratificacoesPlan1Admin(admin.ModelAdmin):
                     # Processar arquivo e salvar dados - APENAS aba Plan1
                     arquivo = form.cleaned_data['arquivo']
 
-                    print(f"=== INICIANDO PROCESSAMENTO DO ARQUIVO: {arquivo.name} ===")
-                    print("=== Importando APENAS aba 'Plan1' (dados de gratificações por órgão) ===")
+                    logger.info("=== INICIANDO PROCESSAMENTO DO ARQUIVO: %s ===", arquivo.name)
+                    logger.info("=== Importando APENAS aba 'Plan1' (dados de gratificações por órgão) ===")
 
                     # Limpar dados anteriores antes de importar
                     registros_anteriores = RelatorioGratificacoesPlan1.objects.count()
                     if registros_anteriores > 0:
                         RelatorioGratificacoesPlan1.objects.all().delete()
-                        print(f"🗑️ Removidos {registros_anteriores} registros anteriores para evitar duplicatas")
+                        logger.info("Removidos %s registros anteriores para evitar duplicatas", registros_anteriores)
                         self.message_user(request, f'🗑️ Removidos {registros_anteriores} registros anteriores para evitar duplicatas.', messages.INFO)
 
                     resultado = self.processar_planilha_plan1(arquivo)
@@ -1078,9 +1150,7 @@ class RelatorioGratificacoesPlan1Admin(admin.ModelAdmin):
 
                 except Exception as e:
                     error_msg = f'Erro ao processar arquivo: {str(e)}'
-                    print(f"ERRO CRÍTICO: {error_msg}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("ERRO CRÍTICO: %s", error_msg)
                     self.message_user(request, error_msg, messages.ERROR)
 
                 return redirect('..')
@@ -1101,38 +1171,39 @@ class RelatorioGratificacoesPlan1Admin(admin.ModelAdmin):
 
         try:
             # Ler o arquivo Excel - aba Plan1
-            print(f"Lendo arquivo Excel: {arquivo.name} - Aba: Plan1")
+            logger.info("Lendo arquivo Excel: %s - Aba: Plan1", arquivo.name)
             df = pd.read_excel(arquivo, sheet_name="Plan1")
-            print(f"Arquivo lido com sucesso. Shape: {df.shape}")
-            print(f"Colunas encontradas na planilha: {list(df.columns)}")
+            logger.info("Arquivo lido com sucesso. Shape: %s", df.shape)
+            logger.info("Colunas encontradas na planilha: %s", list(df.columns))
 
             if df.empty:
                 return {"inseridos": 0, "erros": ["A aba Plan1 está vazia"]}
 
             inseridos = 0
             erros = []
+            amostrador = AmostradorErros(logger)
 
             # Detectar tipo de órgão atual
             tipo_atual = None
 
             for index, row in df.iterrows():
                 try:
-                    print(f"Processando linha {index + 1}...")
+                    logger.debug("Processando linha %s...", index + 1)
 
                     # Detectar se é cabeçalho de seção
                     primeira_coluna = str(row.iloc[0]).strip().upper() if not pd.isna(row.iloc[0]) else ""
 
                     if "ÓRGÃOS CENTRAIS" in primeira_coluna:
                         tipo_atual = "central"
-                        print(f"Linha {index + 1}: Detectado seção ÓRGÃOS CENTRAIS")
+                        logger.debug("Linha %s: Detectado seção ÓRGÃOS CENTRAIS", index + 1)
                         continue
                     elif "ÓRGÃOS SETORIAIS" in primeira_coluna:
                         tipo_atual = "setorial"
-                        print(f"Linha {index + 1}: Detectado seção ÓRGÃOS SETORIAIS")
+                        logger.debug("Linha %s: Detectado seção ÓRGÃOS SETORIAIS", index + 1)
                         continue
                     elif "LIMITES GSISTE" in primeira_coluna:
                         tipo_atual = "limites"
-                        print(f"Linha {index + 1}: Detectado seção LIMITES GSISTE")
+                        logger.debug("Linha %s: Detectado seção LIMITES GSISTE", index + 1)
                         continue
 
                     # Pular linhas de cabeçalho, informativas ou vazias
@@ -1169,9 +1240,9 @@ class RelatorioGratificacoesPlan1Admin(admin.ModelAdmin):
                             valor_final = valor_limpo
 
                         valor_maximo = Decimal(valor_final)
-                        print(f"Valor convertido: '{valor_str}' -> '{valor_final}' -> {valor_maximo}")
+                        logger.debug("Valor convertido: '%s' -> '%s' -> %s", valor_str, valor_final, valor_maximo)
                     except Exception as e:
-                        print(f"Erro ao converter valor '{valor_str}': {e}")
+                        logger.error("Erro ao converter valor '%s': %s", valor_str, e)
                         valor_maximo = Decimal("0.00")
 
                     # Criar registro
@@ -1184,20 +1255,19 @@ class RelatorioGratificacoesPlan1Admin(admin.ModelAdmin):
                     )
 
                     inseridos += 1
-                    print(f"Registro {inseridos} criado: {tipo_atual} - {nivel_cargo} - R$ {valor_maximo}")
+                    logger.debug("Registro %s criado: %s - %s - R$ %s", inseridos, tipo_atual, nivel_cargo, valor_maximo)
 
                 except Exception as e:
                     erro_msg = f"Linha {index + 1}: {str(e)}"
                     erros.append(erro_msg)
-                    print(f"ERRO na linha {index + 1}: {str(e)}")
+                    amostrador.registrar("ERRO na linha %s: %s", index + 1, e)
 
-            print(f"Processamento concluído. {inseridos} inseridos.")
+            logger.info("Processamento concluído. %s inseridos.", inseridos)
+            amostrador.resumir(f"Importação de {arquivo.name}")
             return {"inseridos": inseridos, "erros": erros}
 
         except Exception as e:
-            print(f"ERRO ao ler arquivo: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("ERRO ao ler arquivo: %s", e)
             return {"inseridos": 0, "erros": [f"Erro ao ler arquivo: {str(e)}"]}
 
     def changelist_view(self, request, extra_context=None):
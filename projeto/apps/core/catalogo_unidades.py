@@ -0,0 +1,159 @@
+"""
+Catálogo compacto de unidades (siglário / unidades disponíveis).
+
+UnidadeCargo tem uma linha por cargo; o catálogo mantém uma linha por unidade
+(sigla, denominação, categoria e código) em memória, ordenada por sigla, com um
+índice de prefixos insensível a acentos para buscas do tipo typeahead.
+É reconstruído (um único SELECT DISTINCT) quando a versão dos dados muda.
+"""
+
+import bisect
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import namedtuple
+
+from . import versao_dados
+
+Unidade = namedtuple('Unidade', ['sigla', 'denominacao', 'categoria', 'codigo'])
+
+_SEPARADORES = re.compile(r'[^0-9a-z]+')
+_FIM_PREFIXO = '\uffff'
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos, para comparação insensível a acentos."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def _termos(texto):
+    return [t for t in _SEPARADORES.split(normalizar(texto)) if t]
+
+
+class CatalogoUnidades:
+    """
+    Lista de unidades ordenada por sigla e índice de prefixos.
+    O índice é um array ordenado de (termo, posição): todos os termos que começam
+    com um prefixo ocupam uma faixa contígua, encontrada com bisect (equivalente
+    a percorrer uma trie).
+    """
+
+    def __init__(self, unidades, versao=None):
+        self.versao = versao
+        self.unidades = sorted(unidades, key=lambda u: (normalizar(u.sigla), u.codigo))
+        # Posições ordenadas por denominação (para a lista de unidades disponíveis)
+        self.ordem_denominacao = sorted(
+            range(len(self.unidades)),
+            key=lambda i: (normalizar(self.unidades[i].denominacao), i)
+        )
+
+        indice = set()
+        for posicao, unidade in enumerate(self.unidades):
+            sigla = normalizar(unidade.sigla)
+            if sigla:
+                indice.add((sigla, posicao))
+            for termo in _termos(unidade.sigla) + _termos(unidade.denominacao):
+                indice.add((termo, posicao))
+        indice = sorted(indice)
+        self._termos = [termo for termo, _ in indice]
+        self._posicoes = [posicao for _, posicao in indice]
+        # Listagens sem consulta, por (ordem, campo obrigatório), montadas no primeiro uso
+        self._listagens = {}
+
+        conteudo = '\n'.join('\t'.join(u) for u in self.unidades)
+        self.etag = 'W/"unidades-%s"' % hashlib.sha1(conteudo.encode('utf-8')).hexdigest()[:16]
+
+    def __len__(self):
+        return len(self.unidades)
+
+    def _posicoes_com_prefixo(self, prefixo):
+        inicio = bisect.bisect_left(self._termos, prefixo)
+        fim = bisect.bisect_right(self._termos, prefixo + _FIM_PREFIXO, lo=inicio)
+        return set(self._posicoes[inicio:fim])
+
+    def _listagem(self, ordem, preenchido):
+        chave = (ordem, preenchido)
+        posicoes = self._listagens.get(chave)
+        if posicoes is None:
+            ordenadas = self.ordem_denominacao if ordem == 'denominacao' else range(len(self.unidades))
+            posicoes = [i for i in ordenadas if not preenchido or getattr(self.unidades[i], preenchido)]
+            self._listagens[chave] = posicoes
+        return posicoes
+
+    def buscar(self, consulta='', ordem='sigla', limit=None, offset=0, preenchido=None):
+        """
+        Busca unidades cujos termos (sigla ou palavras da denominação) começam
+        com cada palavra da consulta; com `preenchido` ('sigla' ou
+        'denominacao'), só as que têm esse campo. Retorna (total, lista de
+        Unidade), o total já sem as descartadas.
+        """
+        termos = _termos(consulta)
+        if termos:
+            encontrados = None
+            for termo in termos:
+                posicoes = self._posicoes_com_prefixo(termo)
+                encontrados = posicoes if encontrados is None else encontrados & posicoes
+                if not encontrados:
+                    break
+            if ordem == 'denominacao':
+                posicoes = [i for i in self.ordem_denominacao if i in encontrados]
+            else:
+                posicoes = sorted(encontrados)
+            if preenchido:
+                posicoes = [i for i in posicoes if getattr(self.unidades[i], preenchido)]
+        else:
+            posicoes = self._listagem(ordem, preenchido)
+
+        total = len(posicoes)
+        offset = max(offset or 0, 0)
+        fim = total if limit is None else offset + max(limit, 0)
+        return total, [self.unidades[i] for i in posicoes[offset:fim]]
+
+
+_catalogo = None
+_lock = threading.Lock()
+
+
+def construir_catalogo(versao=None):
+    """Monta o catálogo a partir de UnidadeCargo (uma linha por código de unidade)."""
+    from .models import UnidadeCargo
+
+    linhas = UnidadeCargo.objects.values_list(
+        'codigo_unidade', 'sigla_unidade', 'denominacao_unidade', 'categoria_unidade'
+    ).distinct().order_by('codigo_unidade')
+
+    unidades = {}
+    for codigo, sigla, denominacao, categoria in linhas:
+        if codigo in unidades:
+            continue
+        unidades[codigo] = Unidade(sigla or '', denominacao or '', categoria or '', codigo)
+    return CatalogoUnidades(unidades.values(), versao=versao)
+
+
+def obter_catalogo():
+    """Retorna o catálogo do processo, reconstruindo-o se a versão dos dados mudou."""
+    global _catalogo
+    versao = versao_dados.versao_atual()
+    catalogo = _catalogo
+    if catalogo is not None and catalogo.versao == versao:
+        return catalogo
+    with _lock:
+        if _catalogo is None or _catalogo.versao != versao:
+            _catalogo = construir_catalogo(versao)
+        return _catalogo
+
+
+async def aobter_catalogo():
+    """
+    Versão assíncrona de obter_catalogo(). Com o catálogo em dia não sai do event
+    loop; a reconstrução (ORM) roda em thread via sync_to_async.
+    """
+    from asgiref.sync import sync_to_async
+
+    versao = await versao_dados.aversao_atual()
+    catalogo = _catalogo
+    if catalogo is not None and catalogo.versao == versao:
+        return catalogo
+    return await sync_to_async(obter_catalogo)()
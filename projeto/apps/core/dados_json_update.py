@@ -1,29 +1,43 @@
 """
-Módulo para atualização automática do arquivo dados.json quando a base de dados for modificada.
-Para ativar este módulo, adicione 'core.dados_json_update' ao INSTALLED_APPS no settings.py.
+Módulo para atualização automática do arquivo organograma.json quando a base de dados for modificada.
+
+Os sinais marcam a atualização como pendente num arquivo ao lado do JSON
+(visível para todos os workers). O atualizador (thread que consome o marcador)
+é iniciado uma vez por worker pelo hook post_worker_init do gunicorn ou, com
+NEXO_TAREFAS=central, apenas no processo de `manage.py executar_tarefas`.
+Como o marcador é removido atomicamente por quem o consome, cada lote de
+alterações gera o arquivo uma única vez, qualquer que seja o número de workers.
 """
 
 import os
 import json
+import logging
 import threading
 import time
 from datetime import datetime
 from pathlib import Path
 from decimal import Decimal
 
-from django.apps import AppConfig
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+logger = logging.getLogger(__name__)
+
 # Caminho para o arquivo JSON
 ORGANOGRAMA_JSON_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'static', 'data', 'organograma.json'
 )
 
+# Marcador de atualização pendente (compartilhado entre processos)
+MARCADOR_PENDENTE = ORGANOGRAMA_JSON_PATH + '.pendente'
+
+# Intervalo (em segundos) entre verificações do marcador
+INTERVALO_VERIFICACAO = 30
+
 # Variáveis de controle
-atualizacao_pendente = False
 ultima_atualizacao = None
 lock = threading.Lock()
+_atualizador_pid = None
 
 
 def decimal_para_float(obj):
@@ -39,9 +53,9 @@ def gerar_organograma_json():
     """
     Gera um arquivo JSON com dados das tabelas UnidadeCargo e CargoSIORG.
     """
-    from core.models import UnidadeCargo, CargoSIORG
+    from .models import UnidadeCargo, CargoSIORG
     
-    print(f"[{datetime.now()}] Iniciando geração do arquivo organograma.json...")
+    logger.info("Iniciando geração do arquivo organograma.json...")
     
     # Estrutura para armazenar os dados
     resultado = {
@@ -54,7 +68,7 @@ def gerar_organograma_json():
     
     # Obter todos os registros de CargoSIORG
     cargos_siorg = CargoSIORG.objects.all()
-    print(f"[{datetime.now()}] Processando {cargos_siorg.count()} registros de CargoSIORG")
+    logger.info("Processando %s registros de CargoSIORG", cargos_siorg.count())
     
     # Adicionar cada cargo ao resultado e ao dicionário para consulta rápida
     for cargo in cargos_siorg:
@@ -65,40 +79,33 @@ def gerar_organograma_json():
         }
         resultado["core_cargosiorg"].append(cargo_dados)
         
-        # Adicionar ao dicionário para consultas rápidas
-        cargos_dict[cargo.cargo] = {
-            "nivel": cargo.nivel,
-            "valor": cargo.valor
-        }
+        # Dicionário para consultas rápidas pela chave inteira (tipo, categoria, nível)
+        if cargo.categoria is not None:
+            cargos_dict[(cargo.tipo_cargo, cargo.categoria, cargo.nivel_cargo)] = {
+                "pontos": float(cargo.unitario),
+                "valor": float(cargo.valor_decimal)
+            }
     
     # Obter todos os registros de UnidadeCargo
     unidades_cargo = UnidadeCargo.objects.all()
-    print(f"[{datetime.now()}] Processando {unidades_cargo.count()} registros de UnidadeCargo")
+    logger.info("Processando %s registros de UnidadeCargo", unidades_cargo.count())
     
     # Adicionar cada unidade de cargo ao resultado
     for unidade in unidades_cargo:
-        # Formar a string de cargo para busca no dicionário de cargos
-        cargo_string = None
-        if unidade.tipo_cargo and unidade.categoria is not None and unidade.nivel is not None:
-            cargo_string = f"{unidade.tipo_cargo} {unidade.categoria} {unidade.nivel}"
-        
         # Valores padrão
         pontos = 0
         valor_unitario = 0
         gasto_total = 0
         
         # Buscar o valor e pontos no dicionário de cargos
-        if cargo_string and cargo_string in cargos_dict:
-            cargo_info = cargos_dict[cargo_string]
-            pontos = cargo_info["nivel"]
+        cargo_info = cargos_dict.get((unidade.tipo_cargo, unidade.categoria, unidade.nivel))
+        if cargo_info:
+            pontos = cargo_info["pontos"]
             valor_unitario = cargo_info["valor"]
             
             # Calcular o gasto total
-            if unidade.quantidade and valor_unitario:
-                try:
-                    gasto_total = float(valor_unitario) * unidade.quantidade
-                except (ValueError, TypeError):
-                    print(f"[{datetime.now()}] Erro ao calcular gasto para: {unidade.codigo_unidade} - {cargo_string}")
+            if unidade.quantidade:
+                gasto_total = valor_unitario * unidade.quantidade
         
         unidade_dados = {
             "tipo_unidade": unidade.tipo_unidade,
@@ -118,12 +125,15 @@ def gerar_organograma_json():
         }
         resultado["core_unidadecargo"].append(unidade_dados)
     
-    # Salvar o resultado em JSON
-    with open(ORGANOGRAMA_JSON_PATH, 'w', encoding='utf-8') as f:
+    # Salvar o resultado em JSON (arquivo temporário + rename: leitores nunca
+    # veem um arquivo pela metade, mesmo com mais de um processo gerando)
+    temporario = f"{ORGANOGRAMA_JSON_PATH}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
         json.dump(resultado, f, ensure_ascii=False, indent=2, default=decimal_para_float)
+    os.replace(temporario, ORGANOGRAMA_JSON_PATH)
     
-    print(f"[{datetime.now()}] Arquivo organograma.json gerado com sucesso em: {ORGANOGRAMA_JSON_PATH}")
-    print(f"[{datetime.now()}] Total de registros: {len(resultado['core_unidadecargo'])} unidades e {len(resultado['core_cargosiorg'])} cargos")
+    logger.info("Arquivo organograma.json gerado com sucesso em: %s", ORGANOGRAMA_JSON_PATH)
+    logger.info("Total de registros: %s unidades e %s cargos", len(resultado['core_unidadecargo']), len(resultado['core_cargosiorg']))
     
     return resultado
 
@@ -134,50 +144,64 @@ def gerar_organograma_json():
 @receiver(post_delete, sender='core.CargoSIORG')
 def atualizar_json_ao_modificar_modelo(sender, **kwargs):
     """Sinaliza que uma atualização do arquivo JSON é necessária"""
-    global atualizacao_pendente
-    with lock:
-        atualizacao_pendente = True
-    print(f"[{datetime.now()}] Atualização de organograma.json sinalizada após modificação em {sender}")
+    try:
+        Path(MARCADOR_PENDENTE).touch()
+    except OSError as e:
+        logger.warning("Não foi possível marcar atualização de organograma.json: %s", e)
+        return
+    logger.debug("Atualização de organograma.json sinalizada após modificação em %s", sender)
+
+
+def consumir_pendencia():
+    """
+    Remove o marcador de atualização pendente. Retorna True se havia pendência
+    (apenas um processo consegue remover o marcador).
+    """
+    try:
+        os.remove(MARCADOR_PENDENTE)
+        return True
+    except FileNotFoundError:
+        return False
 
 
-def verificar_e_atualizar_json():
+def verificar_e_atualizar_json(intervalo=INTERVALO_VERIFICACAO):
     """Verifica periodicamente se é necessário atualizar o arquivo organograma.json"""
-    global atualizacao_pendente, ultima_atualizacao
+    global ultima_atualizacao
     
     while True:
-        with lock:
-            pendente = atualizacao_pendente
-            if pendente:
-                atualizacao_pendente = False
-        
-        if pendente:
+        if consumir_pendencia():
             try:
                 gerar_organograma_json()
                 with lock:
                     ultima_atualizacao = datetime.now()
             except Exception as e:
-                print(f"[{datetime.now()}] Erro ao atualizar organograma.json: {str(e)}")
+                logger.exception("Erro ao atualizar organograma.json: %s", e)
+            finally:
+                # A thread não atende requisições: devolve a conexão ao banco
+                from django.db import connection
+                connection.close()
         
-        # Verificar a cada 30 segundos
-        time.sleep(30)
+        time.sleep(intervalo)
 
 
-class DadosJsonConfig(AppConfig):
-    name = 'core.dados_json_update'
-    verbose_name = 'Atualizador de Organograma JSON'
+def iniciar_atualizador():
+    """
+    Inicia a thread de atualização no processo atual, uma única vez por processo.
+    Deve ser chamada depois do fork (post_worker_init do gunicorn): uma thread
+    iniciada no master com preload_app não sobrevive ao fork.
+    Retorna False se o atualizador já estava rodando neste processo.
+    """
+    global _atualizador_pid
+    with lock:
+        if _atualizador_pid == os.getpid():
+            return False
+        _atualizador_pid = os.getpid()
     
-    def ready(self):
-        """Inicializa o atualizador quando o Django estiver pronto"""
-        # Evitar execução dupla em modo de desenvolvimento
-        if os.environ.get('RUN_MAIN') != 'true':
-            # Gerar o arquivo JSON inicial se não existir
-            if not Path(ORGANOGRAMA_JSON_PATH).exists():
-                print(f"[{datetime.now()}] Arquivo {ORGANOGRAMA_JSON_PATH} não encontrado. Gerando...")
-                gerar_organograma_json()
-                global ultima_atualizacao
-                ultima_atualizacao = datetime.now()
-            
-            # Iniciar thread de atualização
-            thread = threading.Thread(target=verificar_e_atualizar_json, daemon=True)
-            thread.start()
-            print(f"[{datetime.now()}] Thread de atualização de organograma.json iniciada") 
\ No newline at end of file
+    # Gerar o arquivo JSON inicial se não existir
+    if not Path(ORGANOGRAMA_JSON_PATH).exists():
+        Path(MARCADOR_PENDENTE).touch()
+    
+    thread = threading.Thread(target=verificar_e_atualizar_json, name='organograma-json', daemon=True)
+    thread.start()
+    logger.info("Thread de atualização de organograma.json iniciada (pid %s)", os.getpid())
+    return True
@@ -0,0 +1,291 @@
+"""
+Instrumentação de desempenho por requisição (usada por DesempenhoMiddleware).
+
+Para cada requisição mede tempo total, quantidade e tempo de queries (por um
+execute wrapper instalado em cada conexão), leituras de cache com acerto/falha
+e o RSS máximo do processo (ru_maxrss, desde o início do processo). As métricas
+viram um cabeçalho Server-Timing e uma linha JSON no log de desempenho, lida
+pelo comando `resumo_desempenho`. Uma amostra das requisições é perfilada
+(cProfile ou pyinstrument, e tracemalloc para o pico de memória alocada pela
+própria requisição) e o perfil é gravado quando a requisição passa do limite.
+
+As métricas da requisição ficam numa ContextVar, então queries e leituras de
+cache feitas em threads de sync_to_async (views async) também são contadas.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+logger_metricas = logging.getLogger('nexo.desempenho')
+
+_metricas_atuais = contextvars.ContextVar('metricas_desempenho', default=None)
+
+_SEM_VALOR = object()
+_lock = threading.Lock()
+_instrumentado = False
+
+# Apenas um perfil por processo de cada vez (cProfile não aceita perfis simultâneos)
+_perfil_lock = threading.Lock()
+
+
+class Metricas:
+    """Contadores de uma requisição."""
+
+    __slots__ = (
+        'inicio', 'queries', 'db_ms', 'cache_acertos', 'cache_falhas', 'queries_lentas', 'pico_memoria_mb'
+    )
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.cache_acertos = 0
+        self.cache_falhas = 0
+        self.queries_lentas = []
+        # Só nas requisições perfiladas (tracemalloc, ver Perfil)
+        self.pico_memoria_mb = None
+
+
+def iniciar_metricas():
+    """Abre as métricas da requisição atual. Retorna (metricas, token)."""
+    metricas = Metricas()
+    return metricas, _metricas_atuais.set(metricas)
+
+
+def encerrar_metricas(token):
+    _metricas_atuais.reset(token)
+
+
+def _registrar_query(execute, sql, params, many, context):
+    metricas = _metricas_atuais.get()
+    if metricas is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        decorrido = (time.perf_counter() - inicio) * 1000
+        metricas.queries += 1
+        metricas.db_ms += decorrido
+        if decorrido >= getattr(settings, 'DESEMPENHO_QUERY_LENTA_MS', 100):
+            metricas.queries_lentas.append((round(decorrido, 1), sql[:500]))
+
+
+def _instalar_execute_wrapper(connection, **kwargs):
+    if _registrar_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_registrar_query)
+
+
+def _instrumentar_cache(backend):
+    """
+    Envolve backend.get para contar acertos e falhas da requisição atual. Os
+    demais argumentos (version, e os próprios do backend, como o client= do
+    django-redis) seguem para o get original.
+    """
+    get_original = backend.get
+
+    def get(self, key, default=None, *args, **kwargs):
+        valor = get_original(self, key, _SEM_VALOR, *args, **kwargs)
+        metricas = _metricas_atuais.get()
+        if valor is _SEM_VALOR:
+            if metricas is not None:
+                metricas.cache_falhas += 1
+            return default
+        if metricas is not None:
+            metricas.cache_acertos += 1
+        return valor
+
+    backend.get = get
+
+
+def instrumentar():
+    """
+    Instala os ganchos uma vez por processo: execute wrapper em toda conexão
+    (as já abertas e as criadas depois, inclusive em threads de sync_to_async)
+    e contagem de acertos/falhas nos backends de cache configurados.
+    """
+    global _instrumentado
+    with _lock:
+        if _instrumentado:
+            return
+        from django.core.cache import caches
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(_instalar_execute_wrapper, weak=False)
+        for connection in connections.all():
+            _instalar_execute_wrapper(connection)
+
+        classes = {type(caches[alias]) for alias in settings.CACHES}
+        for backend in classes:
+            _instrumentar_cache(backend)
+        _instrumentado = True
+
+
+def _configurar_log():
+    """Grava as linhas JSON em DESEMPENHO_LOG (se configurado) sem depender de LOGGING."""
+    caminho = getattr(settings, 'DESEMPENHO_LOG', None)
+    if not caminho or logger_metricas.handlers:
+        return
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    handler = logging.FileHandler(caminho, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger_metricas.addHandler(handler)
+    logger_metricas.setLevel(logging.INFO)
+    logger_metricas.propagate = False
+
+
+def configurar():
+    instrumentar()
+    _configurar_log()
+
+
+def rss_maximo_mb():
+    """
+    RSS máximo do processo em MB desde o seu início (ru_maxrss; None onde
+    resource não existe). Não é da requisição: só cresce quando ela passa do
+    máximo anterior.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(pico / (1024 * 1024 if os.uname().sysname == 'Darwin' else 1024), 1)
+
+
+def rota_da_requisicao(request):
+    """Rota da URL (padrão, não o caminho concreto), para agrupar os endpoints."""
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.route or match.view_name
+    return request.path
+
+
+def server_timing(metricas, total_ms):
+    """Valor do cabeçalho Server-Timing."""
+    return (
+        f'app;dur={total_ms:.1f}, '
+        f'db;dur={metricas.db_ms:.1f};desc="{metricas.queries} queries", '
+        f'cache;desc="{metricas.cache_acertos} hits {metricas.cache_falhas} misses"'
+    )
+
+
+def registrar_requisicao(request, response, metricas, total_ms, memoria_antes):
+    """Escreve a linha JSON da requisição e as queries lentas no log."""
+    memoria = rss_maximo_mb()
+    registro = {
+        'ts': round(time.time(), 3),
+        'pid': os.getpid(),
+        'metodo': request.method,
+        'rota': rota_da_requisicao(request),
+        'caminho': request.path,
+        'status': response.status_code,
+        'ms': round(total_ms, 1),
+        'queries': metricas.queries,
+        'db_ms': round(metricas.db_ms, 1),
+        'cache_acertos': metricas.cache_acertos,
+        'cache_falhas': metricas.cache_falhas,
+        'rss_max_processo_mb': memoria,
+        'rss_max_cresceu_mb': round(memoria - memoria_antes, 1) if memoria is not None and memoria_antes is not None else None,
+        'pico_memoria_mb': metricas.pico_memoria_mb,
+    }
+    if metricas.queries_lentas:
+        registro['queries_lentas'] = metricas.queries_lentas
+    logger_metricas.info(json.dumps(registro, ensure_ascii=False))
+
+
+def deve_perfilar():
+    amostragem = getattr(settings, 'DESEMPENHO_PERFIL_AMOSTRAGEM', 0)
+    return amostragem > 0 and random.random() < amostragem
+
+
+class Perfil:
+    """
+    Perfil de uma requisição. Usa pyinstrument se DESEMPENHO_PERFILADOR for
+    'pyinstrument' e ele estiver instalado; senão, cProfile. Mede também, com
+    tracemalloc, o pico de memória alocada durante a requisição (pico_memoria_mb);
+    com várias requisições simultâneas no processo (gthread, asgi) entram as
+    alocações das outras.
+    """
+
+    def __init__(self):
+        self.perfilador = None
+        self.tipo = None
+        self.pico_memoria_mb = None
+        self._parar_tracemalloc = False
+        self._memoria_inicial = 0
+
+    def iniciar(self):
+        if not _perfil_lock.acquire(blocking=False):
+            return False
+        try:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._parar_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+            if getattr(settings, 'DESEMPENHO_PERFILADOR', 'cprofile') == 'pyinstrument':
+                try:
+                    from pyinstrument import Profiler
+                    self.perfilador, self.tipo = Profiler(async_mode='disabled'), 'pyinstrument'
+                except ImportError:
+                    pass
+            if self.perfilador is None:
+                import cProfile
+                self.perfilador, self.tipo = cProfile.Profile(), 'cprofile'
+            if self.tipo == 'pyinstrument':
+                self.perfilador.start()
+            else:
+                self.perfilador.enable()
+            return True
+        except Exception:
+            self._parar_memoria()
+            _perfil_lock.release()
+            logger.exception("Não foi possível iniciar o perfil da requisição")
+            return False
+
+    def _parar_memoria(self):
+        if tracemalloc.is_tracing():
+            pico = tracemalloc.get_traced_memory()[1] - self._memoria_inicial
+            self.pico_memoria_mb = round(pico / (1024 * 1024), 1)
+        if self._parar_tracemalloc:
+            tracemalloc.stop()
+            self._parar_tracemalloc = False
+
+    def encerrar(self, request, total_ms):
+        """Para o perfil e grava o arquivo se a requisição passou do limite."""
+        try:
+            if self.tipo == 'pyinstrument':
+                self.perfilador.stop()
+            else:
+                self.perfilador.disable()
+        finally:
+            self._parar_memoria()
+            _perfil_lock.release()
+
+        if total_ms < getattr(settings, 'DESEMPENHO_PERFIL_LIMITE_MS', 1000):
+            return None
+        diretorio = getattr(settings, 'DESEMPENHO_PERFIS_DIR')
+        os.makedirs(diretorio, exist_ok=True)
+        rota = re.sub(r'[^0-9A-Za-z]+', '_', rota_da_requisicao(request)).strip('_') or 'raiz'
+        base = os.path.join(diretorio, f"{time.strftime('%Y%m%d-%H%M%S')}_{rota[:60]}_{total_ms:.0f}ms")
+        if self.tipo == 'pyinstrument':
+            caminho = base + '.html'
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(self.perfilador.output_html())
+        else:
+            caminho = base + '.prof'
+            self.perfilador.dump_stats(caminho)
+        return caminho
@@ -0,0 +1,274 @@
+"""
+Importação versionada das planilhas.
+
+Cada conjunto de dados importado (estrutura de cargos, servidores) tem
+versões (VersaoDataset), e cada linha importada guarda o intervalo de versões
+em que vale (versao_inicial até antes de versao_final). Os gerenciadores
+padrão dos modelos só enxergam as linhas da versão ativa, então:
+
+- importar() compara a planilha com a versão ativa pela chave natural (hash
+  dos campos importados): sem diferenças não grava nada; com diferenças cria
+  uma versão nova e a ativa, na mesma transação. Só as diferenças são
+  gravadas: as linhas inalteradas passam a valer também na versão nova, as
+  alteradas e removidas são fechadas (versao_final) e as alteradas e novas
+  inseridas. Quem lê durante a importação continua vendo a versão anterior,
+  completa;
+- ativar_versao() volta a uma versão anterior trocando só a versão ativa (duas
+  linhas de VersaoDataset), sem regravar os dados.
+
+Nos dois casos os caches são invalidados uma única vez, após o commit
+(versao_dados, compartilhada pelos workers). Ficam guardadas as últimas
+VERSOES_DATASET_MANTIDAS versões e a ativa, com as linhas que valem nelas.
+"""
+
+import hashlib
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from . import versao_dados
+from .models import RelatorioGratificacoes, UnidadeCargo, VersaoDataset, excluir_em_lote, visivel_na_versao
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 500
+
+# Chaves naturais das tabelas importadas
+CHAVE_UNIDADE_CARGO = ('codigo_unidade', 'tipo_cargo', 'categoria', 'nivel')
+CHAVE_SERVIDOR = ('matricula_siape',)
+
+# Conjuntos de dados importados por planilha e versionados (ver importar())
+CONJUNTOS = {
+    'unidades': {
+        'modelo': UnidadeCargo,
+        'chave': CHAVE_UNIDADE_CARGO,
+        'campos': (
+            'nivel_hierarquico', 'tipo_unidade', 'denominacao_unidade', 'sigla_unidade',
+            'categoria_unidade', 'orgao_entidade', 'denominacao', 'complemento_denominacao',
+            'quantidade', 'grafo', 'sigla',
+        ),
+        # Cargos criados manualmente (com usuário) não vêm da planilha
+        'filtro': {'usuario__isnull': True},
+    },
+    'servidores': {
+        'modelo': RelatorioGratificacoes,
+        'chave': CHAVE_SERVIDOR,
+        'campos': (
+            'nome_servidor', 'situacao_funcional', 'cargo', 'nivel', 'gsiste', 'gsiste_nivel',
+            'funcao', 'nivel_funcao', 'atividade_funcao', 'jornada_trabalho', 'unidade_lotacao',
+            'secretaria_lotacao', 'uf', 'uorg_exercicio', 'unidade_exercicio', 'coordenacao',
+            'diretoria', 'secretaria', 'orgao_origem', 'email_institucional',
+            'siape_titular_chefe', 'siape_substituto',
+        ),
+        'filtro': {},
+    },
+}
+
+
+def _normalizar(campo, valor):
+    """Valor do campo na forma em que volta do banco, para comparação."""
+    try:
+        valor = campo.to_python(valor)
+    except ValidationError:
+        pass
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, Decimal):
+        return f"{valor:.{campo.decimal_places}f}"
+    return str(valor)
+
+
+def houve_mudanca(resumo):
+    return bool(resumo['criados'] or resumo['alterados'] or resumo['removidos'])
+
+
+def comparar(modelo, registros, chave, campos, existentes):
+    """
+    Compara `registros` (dicts campo -> valor) com as linhas de `existentes`
+    pela chave natural (`chave`) e pelo conteúdo dos demais `campos`.
+    Registros repetidos na planilha: vale o último.
+
+    Retorna o resumo {'criados', 'alterados', 'removidos', 'inalterados',
+    'repetidos'}, os registros novos ou alterados, as linhas inalteradas
+    ({pk: registro}) e as pks das linhas alteradas ou removidas.
+    """
+    chave, campos = list(chave), list(campos)
+    definicoes = {nome: modelo._meta.get_field(nome) for nome in chave + campos}
+
+    def chave_de(valores):
+        return tuple(_normalizar(definicoes[nome], valores[nome]) for nome in chave)
+
+    def assinatura(valores):
+        conteudo = tuple(_normalizar(definicoes[nome], valores[nome]) for nome in campos)
+        return hashlib.sha1(repr(conteudo).encode()).digest()
+
+    resumo = {'criados': 0, 'alterados': 0, 'removidos': 0, 'inalterados': 0, 'repetidos': 0}
+    novos = {}
+    for registro in registros:
+        identificador = chave_de(registro)
+        if identificador in novos:
+            resumo['repetidos'] += 1
+        novos[identificador] = registro
+
+    atuais = {}
+    for linha in existentes.order_by().values('pk', *chave, *campos).iterator(chunk_size=2000):
+        atuais[chave_de(linha)] = (linha['pk'], assinatura(linha))
+
+    gravar, inalteradas, substituidas = [], {}, []
+    for identificador, registro in novos.items():
+        atual = atuais.get(identificador)
+        if atual is None:
+            gravar.append(registro)
+            resumo['criados'] += 1
+        elif atual[1] != assinatura(registro):
+            gravar.append(registro)
+            substituidas.append(atual[0])
+            resumo['alterados'] += 1
+        else:
+            inalteradas[atual[0]] = registro
+            resumo['inalterados'] += 1
+    removidas = [pk for identificador, (pk, _) in atuais.items() if identificador not in novos]
+    resumo['removidos'] = len(removidas)
+    return resumo, gravar, inalteradas, substituidas + removidas
+
+
+def versao_ativa(conjunto):
+    """Número da versão ativa do conjunto, ou None se nunca foi importado."""
+    return VersaoDataset.objects.filter(conjunto=conjunto, ativa=True).values_list('numero', flat=True).first()
+
+
+def _invalidar_caches(conjunto):
+    versao_dados.nova_versao()
+    if conjunto == 'unidades':
+        from .dados_json_update import atualizar_json_ao_modificar_modelo
+        atualizar_json_ao_modificar_modelo(sender=UnidadeCargo)
+
+
+def _ativar(versao):
+    """Troca a versão ativa do conjunto (dentro da transação de quem chama)."""
+    VersaoDataset.objects.filter(conjunto=versao.conjunto, ativa=True).exclude(pk=versao.pk).update(ativa=False)
+    VersaoDataset.objects.filter(pk=versao.pk).update(ativa=True)
+    versao.ativa = True
+    transaction.on_commit(lambda: _invalidar_caches(versao.conjunto))
+
+
+def _remover_versoes_antigas(conjunto):
+    """
+    Mantém as últimas VERSOES_DATASET_MANTIDAS versões e a ativa, e as linhas
+    que valem em alguma delas.
+    """
+    mantidas = getattr(settings, 'VERSOES_DATASET_MANTIDAS', 3)
+    versoes = VersaoDataset.objects.filter(conjunto=conjunto)
+    numeros = list(versoes.order_by('-numero').values_list('numero', 'ativa'))
+    guardadas = [numero for posicao, (numero, ativa) in enumerate(numeros) if posicao < mantidas or ativa]
+    if len(guardadas) == len(numeros):
+        return
+    em_uso = Q()
+    for numero in guardadas:
+        em_uso |= visivel_na_versao(numero)
+    # Sem sinais por linha: linhas que não valem em nenhuma versão guardada
+    # não estão em nenhum cache
+    excluir_em_lote(CONJUNTOS[conjunto]['modelo'].todas_versoes.filter(versao_final__isnull=False).exclude(em_uso))
+    versoes.exclude(numero__in=guardadas).delete()
+
+
+def adotar_dados_sem_versao(conjunto):
+    """
+    Conjunto ainda sem versão ativa: as linhas gravadas fora da importação
+    (sem versão, invisíveis aos gerenciadores padrão) viram a primeira versão,
+    ativa, para que a importação seja comparada com elas e seja possível
+    voltar a elas. Retorna a VersaoDataset criada, ou None sem essas linhas.
+    """
+    config = CONJUNTOS[conjunto]
+    anteriores = config['modelo'].todas_versoes.filter(versao_inicial__isnull=True, **config['filtro'])
+    if not anteriores.exists():
+        return None
+    ultima = VersaoDataset.objects.filter(conjunto=conjunto).order_by('-numero').values_list('numero', flat=True).first()
+    versao = VersaoDataset.objects.create(
+        conjunto=conjunto, numero=(ultima or 0) + 1, ativa=True, origem='Dados anteriores ao versionamento'
+    )
+    versao.total_registros = anteriores.update(versao_inicial=versao.numero, versao_final=None)
+    versao.save(update_fields=['total_registros'])
+    return versao
+
+
+def importar(conjunto, registros, origem='', usuario=None):
+    """
+    Importa `registros` no conjunto ('unidades' ou 'servidores'). Se diferem
+    da versão ativa, são gravados como uma versão nova, que passa a ser a
+    ativa ao fim da transação; só as linhas alteradas, novas e removidas são
+    escritas. Retorna o resumo de comparar().
+    """
+    config = CONJUNTOS[conjunto]
+    modelo = config['modelo']
+    campos = config['chave'] + config['campos']
+    registros = [{campo: registro[campo] for campo in campos} for registro in registros]
+
+    with transaction.atomic():
+        # Trava as versões do conjunto: importações simultâneas ficam em fila
+        versoes = list(VersaoDataset.objects.select_for_update().filter(conjunto=conjunto))
+        ativa = next((versao for versao in versoes if versao.ativa), None)
+        if ativa is None:
+            ativa = adotar_dados_sem_versao(conjunto)
+            if ativa is not None:
+                versoes.append(ativa)
+        linhas = modelo.todas_versoes.filter(**config['filtro'])
+        existentes = linhas.na_versao(ativa.numero) if ativa else linhas.none()
+
+        resumo, gravar, inalteradas, fechar = comparar(
+            modelo, registros, config['chave'], config['campos'], existentes
+        )
+        logger.info(
+            "Importação de %s: %s criados, %s alterados, %s removidos, %s inalterados, %s repetidos na planilha",
+            conjunto, resumo['criados'], resumo['alterados'], resumo['removidos'],
+            resumo['inalterados'], resumo['repetidos']
+        )
+        if not houve_mudanca(resumo):
+            return resumo
+
+        ultima = max((versao.numero for versao in versoes), default=0)
+        if ativa and ativa.numero != ultima:
+            # Depois de voltar a uma versão anterior, as linhas abertas são as da
+            # última versão: fecha as que a planilha não mantém e regrava as
+            # inalteradas que já tinham sido fechadas
+            abertas = set(linhas.filter(versao_final__isnull=True).values_list('pk', flat=True))
+            fechar = list(abertas.difference(inalteradas))
+            gravar += [registro for pk, registro in inalteradas.items() if pk not in abertas]
+
+        versao = VersaoDataset.objects.create(
+            conjunto=conjunto,
+            numero=ultima + 1,
+            origem=origem[:255],
+            total_registros=resumo['criados'] + resumo['alterados'] + resumo['inalterados'],
+            resumo=resumo,
+            usuario=usuario,
+        )
+        for inicio in range(0, len(fechar), TAMANHO_LOTE):
+            modelo.todas_versoes.filter(pk__in=fechar[inicio:inicio + TAMANHO_LOTE]).update(versao_final=versao.numero)
+        modelo.todas_versoes.bulk_create(
+            (modelo(versao_inicial=versao.numero, **registro) for registro in gravar), batch_size=TAMANHO_LOTE
+        )
+        _ativar(versao)
+        _remover_versoes_antigas(conjunto)
+        logger.info("Versão %s de %s ativada (%s)", versao.numero, conjunto, origem)
+    return resumo
+
+
+def ativar_versao(conjunto, numero):
+    """
+    Volta o conjunto para a versão `numero`: só a versão ativa muda, os dados
+    já estão gravados. Retorna a VersaoDataset ativada.
+    """
+    with transaction.atomic():
+        try:
+            versao = VersaoDataset.objects.select_for_update().get(conjunto=conjunto, numero=numero)
+        except VersaoDataset.DoesNotExist:
+            raise ValueError(f"Versão {numero} de '{conjunto}' não encontrada")
+        if not versao.ativa:
+            _ativar(versao)
+    logger.info("Versão %s de %s ativada", numero, conjunto)
+    return versao
@@ -0,0 +1,210 @@
+"""
+Índice em memória do organograma (páginas organograma e comparador).
+
+As linhas de estrutura_json_organograma() e a tabela de CargoSIORG são montadas
+uma vez por versão dos dados e ficam no processo, junto com o JSON completo já
+serializado e a profundidade de cada unidade no grafo ("raiz-...-codigo").
+O endpoint de dados responde a partir daqui com ETag, e o modo sob demanda
+devolve apenas os primeiros níveis ou a subárvore de um código.
+
+O índice também guarda a árvore de unidades (nó por código, filhos diretos e
+totais da subárvore pré-calculados), usada pela expansão sob demanda.
+"""
+
+import json
+import threading
+
+from . import versao_dados
+
+
+def _segmentos(grafo):
+    return [s for s in (grafo or '').split('-') if s]
+
+
+class IndiceOrganograma:
+    """Linhas do organograma agrupadas por unidade, com a posição de cada uma no grafo."""
+
+    def __init__(self, linhas, cargos, versao=None):
+        self.versao = versao
+        self.linhas = linhas
+        self.cargos = cargos
+        self.etag = 'W/"organograma-%s"' % versao
+
+        # Segmentos do grafo de cada linha (códigos da raiz até a unidade)
+        self._grafos = [_segmentos(linha['grafo']) for linha in linhas]
+        self._montar_arvore()
+
+        self._json_completo = None
+        self._lock = threading.Lock()
+
+    def json_completo(self):
+        """Payload completo (todas as linhas + cargos SIORG), serializado uma única vez."""
+        if self._json_completo is None:
+            with self._lock:
+                if self._json_completo is None:
+                    self._json_completo = json.dumps({
+                        'core_unidadecargo': self.linhas,
+                        'core_cargosiorg': self.cargos,
+                        'versao': self.versao,
+                    }).encode('utf-8')
+        return self._json_completo
+
+    async def ajson_completo(self):
+        """
+        json_completo() para views async: a primeira serialização de cada versão
+        (CPU) roda numa thread fora do event loop.
+        """
+        if self._json_completo is None:
+            from asgiref.sync import sync_to_async
+            await sync_to_async(self.json_completo, thread_sensitive=False)()
+        return self._json_completo
+
+    def _montar_arvore(self):
+        """
+        Nós por código (busca O(1)), filhos diretos e totais da subárvore,
+        calculados uma vez na montagem do índice.
+        """
+        nos = {}
+        for posicao, (linha, segmentos) in enumerate(zip(self.linhas, self._grafos)):
+            if not segmentos:
+                continue
+            codigo = segmentos[-1]
+            no = nos.get(codigo)
+            if no is None:
+                no = nos[codigo] = {
+                    'codigo': codigo,
+                    'sigla': linha.get('sigla') or '',
+                    'denominacao': linha.get('denominacao_unidade') or '',
+                    'tipo_unidade': linha.get('tipo_unidade') or '',
+                    'pai': segmentos[-2] if len(segmentos) > 1 else None,
+                    'profundidade': len(segmentos),
+                    'linhas': [],
+                    'filhos': [],
+                    'totais': {'quantidade': 0, 'gasto_total': 0.0, 'pontos_total': 0.0},
+                }
+            no['linhas'].append(posicao)
+            totais = no['totais']
+            totais['quantidade'] += linha.get('quantidade') or 0
+            totais['gasto_total'] += linha.get('gasto_total') or 0
+            totais['pontos_total'] += linha.get('pontos_total') or 0
+
+        self.raizes = []
+        for codigo, no in nos.items():
+            pai = nos.get(no['pai']) if no['pai'] else None
+            if pai is None:
+                self.raizes.append(codigo)
+            else:
+                pai['filhos'].append(codigo)
+
+        # Totais da subárvore: das unidades mais profundas para as mais rasas
+        for no in sorted(nos.values(), key=lambda n: n['profundidade'], reverse=True):
+            subarvore = dict(no['totais'])
+            subarvore['unidades'] = 1
+            for filho in no['filhos']:
+                for chave, valor in nos[filho]['totais_subarvore'].items():
+                    subarvore[chave] += valor
+            no['totais_subarvore'] = subarvore
+            no['filhos'].sort(key=lambda c: (nos[c]['sigla'], c))
+        self.raizes.sort(key=lambda c: (nos[c]['sigla'], c))
+
+        self.nos = nos
+        self.total_filhos = {codigo: len(no['filhos']) for codigo, no in nos.items() if no['filhos']}
+
+    def no(self, codigo):
+        """Nó da unidade pelo código, ou None."""
+        return self.nos.get(str(codigo))
+
+    def resumo_no(self, codigo, profundidade=1):
+        """
+        Representação do nó para a API: dados da unidade, totais próprios e da
+        subárvore, quantidade de filhos e, até a profundidade pedida, os filhos.
+        """
+        no = self.nos[codigo]
+        resumo = {
+            'codigo': no['codigo'],
+            'sigla': no['sigla'],
+            'denominacao': no['denominacao'],
+            'tipo_unidade': no['tipo_unidade'],
+            'pai': no['pai'],
+            'totais': no['totais'],
+            'totais_subarvore': no['totais_subarvore'],
+            'total_filhos': len(no['filhos']),
+        }
+        if profundidade > 0:
+            resumo['filhos'] = [self.resumo_no(filho, profundidade - 1) for filho in no['filhos']]
+        return resumo
+
+    def cargos_da_unidade(self, codigo):
+        """Linhas (cargos) da unidade, na ordem de estrutura_json_organograma()."""
+        no = self.nos.get(str(codigo))
+        return [self.linhas[posicao] for posicao in no['linhas']] if no else []
+
+    def linhas_ate_nivel(self, niveis, codigo=None):
+        """
+        Linhas até `niveis` abaixo da raiz ou, com `codigo`, até `niveis` abaixo
+        dessa unidade (sem incluir as linhas da própria unidade).
+        Retorna (linhas, códigos no limite do corte que ainda têm subordinadas).
+        """
+        selecionadas = []
+        expansiveis = set()
+        for linha, segmentos in zip(self.linhas, self._grafos):
+            if codigo is None:
+                inicio = 0
+            else:
+                try:
+                    inicio = segmentos.index(codigo) + 1
+                except ValueError:
+                    continue
+            profundidade = len(segmentos) - inicio
+            if 1 <= profundidade <= niveis:
+                selecionadas.append(linha)
+                if profundidade == niveis and segmentos[-1] in self.total_filhos:
+                    expansiveis.add(segmentos[-1])
+        return selecionadas, sorted(expansiveis)
+
+
+_indice = None
+_lock = threading.Lock()
+
+
+def construir_indice(versao=None):
+    """Monta o índice a partir de UnidadeCargo (unidades com grafo) e CargoSIORG."""
+    from .models import CargoSIORG
+    from .utils import estrutura_json_organograma
+
+    cargos = [
+        {
+            'cargo': f"{cargo.cargo}",
+            'valor': float(cargo.valor_decimal),
+            'unitario': float(cargo.unitario)
+        }
+        for cargo in CargoSIORG.objects.all()
+    ]
+    return IndiceOrganograma(estrutura_json_organograma(), cargos, versao=versao)
+
+
+def obter_indice():
+    """Retorna o índice do processo, reconstruindo-o se a versão dos dados mudou."""
+    global _indice
+    versao = versao_dados.versao_atual()
+    indice = _indice
+    if indice is not None and indice.versao == versao:
+        return indice
+    with _lock:
+        if _indice is None or _indice.versao != versao:
+            _indice = construir_indice(versao)
+        return _indice
+
+
+async def aobter_indice():
+    """
+    Versão assíncrona de obter_indice(). Com o índice em dia não sai do event
+    loop; a reconstrução (ORM) roda em thread via sync_to_async.
+    """
+    from asgiref.sync import sync_to_async
+
+    versao = await versao_dados.aversao_atual()
+    indice = _indice
+    if indice is not None and indice.versao == versao:
+        return indice
+    return await sync_to_async(obter_indice)()
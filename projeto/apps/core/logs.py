@@ -0,0 +1,162 @@
+"""
+Infraestrutura de logging do projeto (usada pelo LOGGING de config/settings.py).
+
+- FilaLogHandler: QueueHandler que só enfileira o registro; um QueueListener
+  (thread própria) formata a saída e escreve no stderr/arquivo. Quem loga numa
+  requisição não espera I/O de arquivo. O listener é recriado no processo
+  filho depois de um fork (workers do gunicorn com preload_app).
+- FormatadorJson: uma linha JSON por registro, com os campos passados em extra.
+- AmostradorErros: limita erros repetitivos (por exemplo, um erro por linha em
+  importações de planilha) e resume os suprimidos no final.
+
+As mensagens usam formatação preguiçosa (logger.debug("... %s", valor)): com o
+nível acima de DEBUG, nada é formatado.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+from logging.handlers import QueueHandler, QueueListener
+
+_handlers_ativos = weakref.WeakSet()
+
+# Atributos padrão de LogRecord (o resto veio de extra=)
+_CAMPOS_PADRAO = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+
+class FilaLogHandler(QueueHandler):
+    """
+    Handler não bloqueante: os registros vão para uma fila limitada e são
+    escritos por uma thread. Com a fila cheia o registro é descartado (e
+    contado) em vez de bloquear a requisição.
+    """
+
+    def __init__(self, arquivo=None, nivel_arquivo='ERROR', stderr=True, capacidade=10000):
+        self.capacidade = capacidade
+        super().__init__(queue.Queue(capacidade))
+        self.descartados = 0
+        self.destinos = []
+        if stderr:
+            self.destinos.append(logging.StreamHandler(sys.stderr))
+        if arquivo:
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            handler_arquivo = logging.FileHandler(arquivo, encoding='utf-8')
+            handler_arquivo.setLevel(nivel_arquivo)
+            self.destinos.append(handler_arquivo)
+        for destino in self.destinos:
+            # A mensagem já chega formatada por prepare()
+            destino.setFormatter(logging.Formatter('%(message)s'))
+        self.listener = None
+        self._iniciar_listener()
+        _handlers_ativos.add(self)
+
+    def _iniciar_listener(self):
+        self.listener = QueueListener(self.queue, *self.destinos, respect_handler_level=True)
+        self.listener.start()
+
+    def reiniciar_apos_fork(self):
+        # A thread do listener não existe no filho e a fila pode ter ficado com
+        # o lock preso no fork: começa com uma fila nova
+        self.queue = queue.Queue(self.capacidade)
+        self.descartados = 0
+        self._iniciar_listener()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def close(self):
+        if self.listener is not None:
+            try:
+                self.listener.stop()
+            except Exception:
+                pass
+            self.listener = None
+        super().close()
+
+
+def _reiniciar_listeners_no_filho():
+    for handler in list(_handlers_ativos):
+        handler.reiniciar_apos_fork()
+
+
+def _encerrar_listeners():
+    # Esvazia as filas antes de o processo terminar
+    for handler in list(_handlers_ativos):
+        if handler.listener is not None:
+            handler.listener.stop()
+            handler.listener = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reiniciar_listeners_no_filho)
+atexit.register(_encerrar_listeners)
+
+
+class FormatadorJson(logging.Formatter):
+    """Uma linha JSON por registro: ts, nivel, logger, pid, msg, campos de extra e exceção."""
+
+    def format(self, record):
+        registro = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'msg': record.getMessage(),
+        }
+        for campo, valor in vars(record).items():
+            if campo not in _CAMPOS_PADRAO:
+                registro[campo] = valor
+        if record.exc_info:
+            registro['exc'] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+class AmostradorErros:
+    """
+    Registra os `primeiros` erros e, depois, no máximo um a cada `intervalo`
+    segundos. resumir() informa quantos ficaram de fora.
+
+        amostrador = AmostradorErros(logger)
+        for linha in linhas:
+            try: ...
+            except Exception as e:
+                amostrador.registrar("Erro na linha %s: %s", numero, e)
+        amostrador.resumir("importação de efetivo")
+    """
+
+    def __init__(self, logger, primeiros=10, intervalo=5.0, nivel=logging.ERROR):
+        self.logger = logger
+        self.primeiros = primeiros
+        self.intervalo = intervalo
+        self.nivel = nivel
+        self.total = 0
+        self.suprimidos = 0
+        self._ultimo = 0.0
+        self._lock = threading.Lock()
+
+    def registrar(self, mensagem, *args, **kwargs):
+        with self._lock:
+            self.total += 1
+            agora = time.monotonic()
+            if self.total > self.primeiros and agora - self._ultimo < self.intervalo:
+                self.suprimidos += 1
+                return False
+            self._ultimo = agora
+        self.logger.log(self.nivel, mensagem, *args, **kwargs)
+        return True
+
+    def resumir(self, contexto):
+        if self.suprimidos:
+            self.logger.warning(
+                "%s: %d erros no total, %d não registrados individualmente",
+                contexto, self.total, self.suprimidos
+            )
@@ -0,0 +1,39 @@
+"""
+Lista ou reativa versões dos dados importados por planilha.
+Uso: python manage.py ativar_versao_dados unidades       (lista as versões)
+     python manage.py ativar_versao_dados unidades 3     (volta para a versão 3)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...importacao import CONJUNTOS, ativar_versao
+from ...models import VersaoDataset
+
+
+class Command(BaseCommand):
+    help = 'Lista as versões de um conjunto de dados importados ou reativa uma delas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('conjunto', choices=sorted(CONJUNTOS), help='Conjunto de dados')
+        parser.add_argument('numero', nargs='?', type=int, help='Versão a ativar (omitida: lista as versões)')
+
+    def handle(self, *args, **options):
+        conjunto = options['conjunto']
+
+        if options['numero'] is None:
+            for versao in VersaoDataset.objects.filter(conjunto=conjunto):
+                marcador = '*' if versao.ativa else ' '
+                self.stdout.write(
+                    f"{marcador} v{versao.numero}  {versao.criado_em:%Y-%m-%d %H:%M}  "
+                    f"{versao.total_registros:>7} registros  {versao.origem}"
+                )
+            return
+
+        try:
+            versao = ativar_versao(conjunto, options['numero'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Versão {versao.numero} de '{conjunto}' ativada ({versao.total_registros} registros)"
+        ))
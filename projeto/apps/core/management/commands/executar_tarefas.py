@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from apps.core import dados_json_update
+
+
+class Command(BaseCommand):
+    help = (
+        'Executa as tarefas em segundo plano (atualização do organograma.json) em um '
+        'processo próprio. Use com NEXO_TAREFAS=central no gunicorn, para que os workers '
+        'não iniciem as próprias threads.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo',
+            type=int,
+            default=dados_json_update.INTERVALO_VERIFICACAO,
+            help='Segundos entre verificações de atualização pendente'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Verificando atualizações do organograma.json a cada {options['intervalo']} s (Ctrl+C para sair)")
+        try:
+            dados_json_update.verificar_e_atualizar_json(intervalo=options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write("Encerrado.")
@@ -1,14 +1,9 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 import os, time, zipfile, shutil
-import pyautogui
 from datetime import datetime
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+# selenium, webdriver_manager, pyautogui e pandas são importados apenas quando o
+# comando roda, para não pesar em outros usos do manage.py
 
 # ---------- parâmetros ----------
 URL_DATASET = (
@@ -36,6 +31,10 @@ def versao_mes():
     return VERSOES_MESES[hoje.month]
 
 def prepara_driver(download_dir):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     chrome_opts = webdriver.ChromeOptions()
     # chrome_opts.add_argument("--headless=new")          # REMOVENDO HEADLESS - PYAUTOGUI PRECISA VER A TELA
     chrome_opts.add_argument("--no-sandbox")
@@ -56,6 +55,8 @@ def prepara_driver(download_dir):
     return driver
 
 def extrair_csv_do_zip(zip_path):
+    import pandas as pd
+
     with zipfile.ZipFile(zip_path) as z:
         csvs = [n for n in z.namelist() if n.lower().endswith(".csv")]
         if not csvs:
@@ -72,20 +73,19 @@ def extrair_csv_do_zip(zip_path):
 class Command(BaseCommand):
     help = 'Baixa, processa e prepara a planilha SIORG para importação.'
 
-    def handle(self, *args, **options):
-        mes, ano = mes_ano()
-        versao = versao_mes()
-        tmp_dir = os.path.abspath("_tmp_siorg_download")
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--arquivo',
+            type=str,
+            help='ZIP do SIORG já baixado (dispensa o navegador)'
+        )
 
-        # Limpa a pasta se ela já existir
-        if os.path.exists(tmp_dir):
-            try:
-                shutil.rmtree(tmp_dir)
-                self.stdout.write(self.style.WARNING(f"[DEBUG] Limpou pasta temporária existente"))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"[DEBUG] Erro ao limpar pasta: {e}"))
-        os.makedirs(tmp_dir, exist_ok=True)
-        self.stdout.write(self.style.SUCCESS(f"[DEBUG] Pasta de download criada: {tmp_dir}"))
+    def baixar_zip(self, tmp_dir, mes, ano):
+        """Baixa o ZIP do mês pelo navegador (Chrome visível, clique por coordenada)."""
+        import pyautogui
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
 
         # Inicia Chrome VISÍVEL
         driver = prepara_driver(tmp_dir)
@@ -114,7 +114,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f"[INFO] Dataset encontrado: {target_header.text}"))
             driver.execute_script("arguments[0].scrollIntoView(true);", target_header)
             time.sleep(2)
-            self.stdout.write(self.style.SUCCESS(f"[INFO] Clicando na posição capturada: x=963, y=191"))
+            self.stdout.write(self.style.SUCCESS("[INFO] Clicando na posição capturada: x=963, y=191"))
             pyautogui.click(963, 191)  # NOVA POSIÇÃO CORRETA
             self.stdout.write(self.style.SUCCESS("[INFO] Aguardando download..."))
             time.sleep(5)
@@ -141,6 +141,30 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f"[OK] Arquivo baixado: {zip_baixado}"))
         finally:
             driver.quit()
+        return zip_baixado
+
+    def handle(self, *args, **options):
+        mes, ano = mes_ano()
+        versao = versao_mes()
+        tmp_dir = os.path.abspath("_tmp_siorg_download")
+
+        # Limpa a pasta se ela já existir
+        if os.path.exists(tmp_dir):
+            try:
+                shutil.rmtree(tmp_dir)
+                self.stdout.write(self.style.WARNING("[DEBUG] Limpou pasta temporária existente"))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"[DEBUG] Erro ao limpar pasta: {e}"))
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.stdout.write(self.style.SUCCESS(f"[DEBUG] Pasta de download criada: {tmp_dir}"))
+
+        if options['arquivo']:
+            # ZIP já baixado: sem navegador
+            zip_baixado = os.path.abspath(options['arquivo'])
+            if not os.path.exists(zip_baixado):
+                raise CommandError(f"Arquivo não encontrado: {zip_baixado}")
+        else:
+            zip_baixado = self.baixar_zip(tmp_dir, mes, ano)
         # 7. ler CSV interno
         df = extrair_csv_do_zip(zip_baixado)
         self.stdout.write(self.style.SUCCESS(f"[OK] CSV: {len(df):,} linhas × {len(df.columns)} colunas"))
@@ -0,0 +1,70 @@
+"""
+Importa a tabela de remuneração dos cargos SIORG de um CSV ou ZIP local.
+Uso: python manage.py importar_tabela_siorg tabela.zip --vigencia 2026-01-01
+"""
+
+import os
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...tabela_siorg import TABELA_PADRAO, aplicar_tabela, ler_tabela
+
+
+class Command(BaseCommand):
+    help = 'Aplica a tabela de remuneração dos cargos SIORG (CSV ou ZIP) gravando só as diferenças'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'arquivo',
+            nargs='?',
+            default=str(TABELA_PADRAO),
+            help='CSV ou ZIP com a tabela (padrão: tabela distribuída com o sistema)'
+        )
+        parser.add_argument(
+            '--vigencia',
+            type=str,
+            help='Início da vigência (AAAA-MM-DD) das linhas sem coluna de vigência (padrão: hoje)'
+        )
+        parser.add_argument(
+            '--manter-ausentes',
+            action='store_true',
+            help='Não remove os cargos que não estão na tabela (tabela parcial)'
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Mostra o que mudaria, sem gravar'
+        )
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+        if not os.path.exists(caminho):
+            raise CommandError(f'Arquivo não encontrado: {caminho}')
+
+        vigente_desde = None
+        if options['vigencia']:
+            try:
+                vigente_desde = date.fromisoformat(options['vigencia'])
+            except ValueError:
+                raise CommandError(f"Data de vigência inválida: {options['vigencia']}")
+
+        try:
+            linhas = ler_tabela(caminho)
+            with transaction.atomic():
+                resumo = aplicar_tabela(
+                    linhas, vigente_desde=vigente_desde, fonte=os.path.basename(caminho),
+                    remover_ausentes=not options['manter_ausentes']
+                )
+                if options['simular']:
+                    transaction.set_rollback(True)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        prefixo = '[SIMULAÇÃO] ' if options['simular'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefixo}{len(linhas)} linhas lidas: {resumo['criados']} cargos criados, "
+            f"{resumo['alterados']} alterados, {resumo['removidos']} removidos, "
+            f"{resumo['inalterados']} inalterados"
+        ))
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Bibliotecas que não devem ser carregadas na inicialização (só quando usadas)
+MODULOS_PESADOS = ['pandas', 'numpy', 'openpyxl', 'reportlab', 'xlsxwriter', 'selenium', 'pyautogui']
+
+SCRIPT_IMPORTACAO = (
+    "import django; django.setup(); "
+    "from django.conf import settings; "
+    "import importlib; importlib.import_module(settings.ROOT_URLCONF)"
+)
+
+
+def medir_importacoes():
+    """
+    Executa um processo novo com -X importtime carregando o Django e as URLs
+    (o mesmo que um worker faz antes de atender a primeira requisição).
+    Retorna [(modulo, proprio_us, acumulado_us, nivel)].
+    """
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT_IMPORTACAO],
+        capture_output=True, text=True, env=env, cwd=str(settings.BASE_DIR)
+    )
+    if processo.returncode != 0:
+        raise CommandError(f"Falha ao importar a aplicação:\n{processo.stderr[-2000:]}")
+
+    resultado = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        # Formato: "import time:   self |   cumulative | <indentação>modulo"
+        proprio, acumulado, nome = linha[len('import time:'):].split('|', 2)
+        proprio = int(proprio)
+        nivel = (len(nome) - len(nome.lstrip(' '))) // 2
+        resultado.append((nome.strip(), proprio, int(acumulado), nivel))
+    return resultado
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o tempo de importação a frio (python -X importtime) do Django com as URLs '
+        'do projeto e falha se passar do orçamento ou se bibliotecas pesadas forem carregadas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--orcamento-ms',
+            type=int,
+            default=getattr(settings, 'TEMPO_INICIALIZACAO_MAXIMO_MS', 1500),
+            help='Tempo máximo de importação, em milissegundos'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Quantidade de módulos mais lentos a exibir'
+        )
+        parser.add_argument(
+            '--permitir-pesados',
+            action='store_true',
+            help='Não falhar se pandas, openpyxl, reportlab etc. forem importados na inicialização'
+        )
+
+    def handle(self, *args, **options):
+        importacoes = medir_importacoes()
+
+        # O tempo total é a soma dos acumulados dos módulos de primeiro nível
+        total_ms = sum(acumulado for _, _, acumulado, nivel in importacoes if nivel == 0) / 1000
+
+        self.stdout.write(f"Módulos importados: {len(importacoes)}")
+        self.stdout.write(f"Tempo total de importação: {total_ms:.0f} ms (orçamento: {options['orcamento_ms']} ms)")
+
+        self.stdout.write("\nMódulos mais lentos (tempo acumulado):")
+        mais_lentos = sorted(importacoes, key=lambda item: item[2], reverse=True)[:options['top']]
+        for nome, proprio, acumulado, _ in mais_lentos:
+            self.stdout.write(f"  {acumulado / 1000:8.1f} ms  {proprio / 1000:7.1f} ms  {nome}")
+
+        erros = []
+        if not options['permitir_pesados']:
+            nomes = {nome for nome, _, _, _ in importacoes}
+            pesados = [modulo for modulo in MODULOS_PESADOS if modulo in nomes]
+            if pesados:
+                erros.append(f"Bibliotecas pesadas carregadas na inicialização: {', '.join(pesados)}")
+        if total_ms > options['orcamento_ms']:
+            erros.append(f"Importação levou {total_ms:.0f} ms, acima do orçamento de {options['orcamento_ms']} ms")
+
+        if erros:
+            raise CommandError('\n'.join(erros))
+        self.stdout.write(self.style.SUCCESS("\nInicialização dentro do orçamento."))
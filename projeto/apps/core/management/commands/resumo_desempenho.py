@@ -0,0 +1,116 @@
+import json
+import os
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ORDENACOES = {
+    'p95': lambda r: r['p95'],
+    'total': lambda r: r['total_ms'],
+    'media': lambda r: r['media_ms'],
+    'queries': lambda r: r['queries_media'],
+}
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p / 100), len(ordenados) - 1)]
+
+
+def ler_registros(caminho, desde=None):
+    """Lê as linhas JSON do log de desempenho (ignorando linhas inválidas)."""
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                continue
+            if desde is None or registro.get('ts', 0) >= desde:
+                yield registro
+
+
+def resumir(registros):
+    """Agrupa os registros por método + rota. Retorna (resumos, queries lentas)."""
+    grupos = defaultdict(list)
+    queries_lentas = []
+    for registro in registros:
+        grupos[(registro['metodo'], registro['rota'])].append(registro)
+        for ms, sql in registro.get('queries_lentas', []):
+            queries_lentas.append((ms, registro['rota'], sql))
+
+    resumos = []
+    for (metodo, rota), itens in grupos.items():
+        tempos = [item['ms'] for item in itens]
+        acertos = sum(item['cache_acertos'] for item in itens)
+        leituras = acertos + sum(item['cache_falhas'] for item in itens)
+        resumos.append({
+            'endpoint': f"{metodo} {rota}",
+            'reqs': len(itens),
+            'p50': percentil(tempos, 50),
+            'p95': percentil(tempos, 95),
+            'max': max(tempos),
+            'media_ms': sum(tempos) / len(itens),
+            'total_ms': sum(tempos),
+            'queries_media': sum(item['queries'] for item in itens) / len(itens),
+            'db_ms_media': sum(item['db_ms'] for item in itens) / len(itens),
+            'cache_acerto': acertos / leituras * 100 if leituras else None,
+            'erros': sum(1 for item in itens if item['status'] >= 500),
+        })
+    return resumos, sorted(queries_lentas, reverse=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Resume o log de desempenho (DESEMPENHO_LOG, gravado pelo DesempenhoMiddleware): '
+        'endpoints mais lentos, queries lentas e perfis gravados.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--arquivo', default=getattr(settings, 'DESEMPENHO_LOG', None), help='Arquivo JSONL de métricas')
+        parser.add_argument('--top', type=int, default=15, help='Quantidade de endpoints a exibir')
+        parser.add_argument('--ordenar', choices=sorted(ORDENACOES), default='p95', help='Critério de ordenação')
+        parser.add_argument('--horas', type=float, help='Considerar apenas as últimas N horas')
+
+    def handle(self, *args, **options):
+        caminho = options['arquivo']
+        if not caminho or not os.path.exists(caminho):
+            raise CommandError(f"Log de desempenho não encontrado: {caminho} (ative com DESEMPENHO_ATIVO=1)")
+
+        desde = time.time() - options['horas'] * 3600 if options['horas'] else None
+        resumos, queries_lentas = resumir(ler_registros(caminho, desde))
+        if not resumos:
+            self.stdout.write("Nenhuma requisição registrada no período.")
+            return
+
+        total = sum(r['reqs'] for r in resumos)
+        self.stdout.write(f"{total} requisições em {len(resumos)} endpoints ({caminho})\n")
+        self.stdout.write(
+            f"{'reqs':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'total s':>8} "
+            f"{'queries':>8} {'db ms':>8} {'cache %':>8} {'5xx':>4}  endpoint"
+        )
+        resumos.sort(key=ORDENACOES[options['ordenar']], reverse=True)
+        for r in resumos[:options['top']]:
+            cache = f"{r['cache_acerto']:.0f}" if r['cache_acerto'] is not None else '-'
+            self.stdout.write(
+                f"{r['reqs']:>6} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['max']:>8.1f} {r['total_ms'] / 1000:>8.1f} "
+                f"{r['queries_media']:>8.1f} {r['db_ms_media']:>8.1f} {cache:>8} {r['erros']:>4}  {r['endpoint']}"
+            )
+
+        if queries_lentas:
+            self.stdout.write(f"\nQueries mais lentas (acima de {settings.DESEMPENHO_QUERY_LENTA_MS:.0f} ms):")
+            for ms, rota, sql in queries_lentas[:10]:
+                self.stdout.write(f"  {ms:8.1f} ms  {rota}\n             {sql[:200]}")
+
+        diretorio = getattr(settings, 'DESEMPENHO_PERFIS_DIR', None)
+        if diretorio and os.path.isdir(diretorio):
+            perfis = sorted(
+                (os.path.join(diretorio, nome) for nome in os.listdir(diretorio)),
+                key=os.path.getmtime, reverse=True
+            )
+            if perfis:
+                self.stdout.write(f"\nPerfis gravados ({len(perfis)}), mais recentes:")
+                for perfil in perfis[:10]:
+                    self.stdout.write(f"  {perfil}")
+                self.stdout.write("Abra os .prof com `python -m pstats <arquivo>` ou snakeviz; os .html no navegador.")
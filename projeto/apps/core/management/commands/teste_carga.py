@@ -0,0 +1,235 @@
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import threading
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Mesmos apps e workers dos perfis de gunicorn_config.py (NEXO_MODO_SERVIDOR)
+MODOS = {
+    'sync': ('config.wsgi:application', 'sync'),
+    'gthread': ('config.wsgi:application', 'gthread'),
+    'asgi': ('config.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+# Endpoints de leitura exercitados pelos clientes "rápidos"
+URLS_PADRAO = [
+    '/api/notificacoes/',
+    '/api/siglario/?q=a&limit=50',
+    '/api/organograma/raiz/children',
+    '/api/organograma/dados/?niveis=2',
+    '/api/relatorio/pontos-gratificacoes/',
+]
+
+URL_LONG_POLL = '/api/notificacoes/aguardar/?timeout={timeout}'
+
+
+def porta_livre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def criar_sessao(username):
+    """Cria uma sessão autenticada para o usuário e retorna o valor do cookie."""
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+
+    try:
+        usuario = get_user_model().objects.get(username=username)
+    except get_user_model().DoesNotExist:
+        raise CommandError(f"Usuário '{username}' não encontrado")
+
+    sessao = import_module(settings.SESSION_ENGINE).SessionStore()
+    sessao[SESSION_KEY] = str(usuario.pk)
+    sessao[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+    sessao[HASH_SESSION_KEY] = usuario.get_session_auth_hash()
+    sessao.create()
+    return sessao.session_key
+
+
+class Servidor:
+    """Gunicorn em um processo filho, no modo pedido, ouvindo em 127.0.0.1."""
+
+    def __init__(self, modo, workers, porta, threads=1):
+        app, worker_class = MODOS[modo]
+        self.porta = porta
+        self.comando = [
+            shutil.which('gunicorn') or 'gunicorn', app,
+            '--worker-class', worker_class,
+            '--workers', str(workers),
+            '--threads', str(threads),
+            '--bind', f'127.0.0.1:{porta}',
+            '--timeout', '120',
+            '--log-level', 'warning',
+        ]
+        self.processo = None
+
+    def __enter__(self):
+        self.processo = subprocess.Popen(
+            self.comando, cwd=str(settings.BASE_DIR), env=dict(os.environ),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if self.processo.poll() is not None:
+                erro = self.processo.stderr.read().decode('utf-8', 'replace')
+                raise CommandError(f"Gunicorn encerrou ao iniciar:\n{erro[-2000:]}")
+            try:
+                socket.create_connection(('127.0.0.1', self.porta), timeout=1).close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise CommandError("Gunicorn não começou a aceitar conexões em 30 s")
+
+    def memoria_workers_mb(self):
+        """RSS (MB) de cada worker, lido de /proc (apenas Linux)."""
+        memorias = []
+        for pid in os.listdir('/proc') if os.path.isdir('/proc') else []:
+            if not pid.isdigit():
+                continue
+            try:
+                with open(f'/proc/{pid}/status') as status:
+                    campos = dict(linha.split(':', 1) for linha in status if ':' in linha)
+            except OSError:
+                continue
+            if int(campos.get('PPid', '0')) == self.processo.pid and 'VmRSS' in campos:
+                memorias.append(int(campos['VmRSS'].split()[0]) / 1024)
+        return memorias
+
+    def __exit__(self, *exc):
+        if self.processo and self.processo.poll() is None:
+            self.processo.terminate()
+            try:
+                self.processo.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.processo.kill()
+
+
+def executar_clientes(porta, cookie, urls, concorrencia, long_poll, timeout_long_poll, duracao):
+    """
+    Dispara `concorrencia` clientes percorrendo as urls em sequência e
+    `long_poll` clientes presos no long-poll de notificações, por `duracao`
+    segundos. Retorna (latências dos clientes rápidos em s, erros).
+    """
+    latencias = []
+    erros = []
+    trava = threading.Lock()
+    fim = time.monotonic() + duracao
+    cabecalhos = {
+        'Host': '127.0.0.1',
+        'Cookie': f'{settings.SESSION_COOKIE_NAME}={cookie}',
+    }
+
+    def cliente(lista_urls, medir):
+        conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=timeout_long_poll + 60)
+        indice = 0
+        while time.monotonic() < fim:
+            url = lista_urls[indice % len(lista_urls)]
+            indice += 1
+            inicio = time.perf_counter()
+            try:
+                conexao.request('GET', url, headers=cabecalhos)
+                resposta = conexao.getresponse()
+                resposta.read()
+                status = resposta.status
+                # Long-poll sob WSGI responde na hora e pede para esperar
+                retry_after = resposta.getheader('Retry-After')
+            except (OSError, http.client.HTTPException) as e:
+                conexao.close()
+                conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=timeout_long_poll + 60)
+                status = type(e).__name__
+                retry_after = None
+            decorrido = time.perf_counter() - inicio
+            with trava:
+                if status not in (200, 304):
+                    erros.append(f"{url}: {status}")
+                elif medir:
+                    latencias.append(decorrido)
+            if retry_after:
+                time.sleep(max(min(float(retry_after), fim - time.monotonic()), 0))
+        conexao.close()
+
+    threads = [threading.Thread(target=cliente, args=(urls, True)) for _ in range(concorrencia)]
+    threads += [
+        threading.Thread(target=cliente, args=([URL_LONG_POLL.format(timeout=timeout_long_poll)], False))
+        for _ in range(long_poll)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencias, erros
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(int(len(ordenados) * p / 100), len(ordenados) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga local comparando os perfis de worker (sync, gthread e asgi/uvicorn): '
+        'sobe o gunicorn em cada modo, dispara clientes nos endpoints de leitura (com clientes '
+        'presos no long-poll de notificações) e compara vazão, latência e memória por worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Usuário usado para autenticar as requisições')
+        parser.add_argument('--modos', nargs='+', choices=sorted(MODOS), default=['sync', 'gthread', 'asgi'])
+        parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn (iguais em todos os modos)')
+        parser.add_argument('--threads', type=int, default=4, help='Threads por worker no modo gthread')
+        parser.add_argument('--concorrencia', type=int, default=10, help='Clientes simultâneos nos endpoints de leitura')
+        parser.add_argument('--long-poll', type=int, default=4, help='Clientes simultâneos no long-poll de notificações')
+        parser.add_argument('--timeout-long-poll', type=int, default=5, help='?timeout= do long-poll, em segundos')
+        parser.add_argument('--duracao', type=int, default=15, help='Duração de cada rodada, em segundos')
+        parser.add_argument('--url', action='append', dest='urls', help='Endpoint a exercitar (repetível); padrão: APIs de leitura')
+
+    def handle(self, *args, **options):
+        if options['concorrencia'] < 1:
+            raise CommandError('--concorrencia deve ser pelo menos 1')
+        if 'asgi' in options['modos']:
+            try:
+                import uvicorn_worker  # noqa: F401
+            except ImportError:
+                raise CommandError('O modo asgi requer o uvicorn-worker (pip install uvicorn-worker)')
+
+        cookie = criar_sessao(options['usuario'])
+        urls = options['urls'] or URLS_PADRAO
+
+        resultados = []
+        for modo in options['modos']:
+            self.stdout.write(f"Modo {modo}: {options['workers']} worker(s), {options['concorrencia']} cliente(s), "
+                              f"{options['long_poll']} no long-poll, {options['duracao']} s...")
+            porta = porta_livre()
+            threads = options['threads'] if modo == 'gthread' else 1
+            with Servidor(modo, options['workers'], porta, threads=threads) as servidor:
+                # Aquece índices e caches antes de medir
+                executar_clientes(porta, cookie, urls, 1, 0, options['timeout_long_poll'], 2)
+                latencias, erros = executar_clientes(
+                    porta, cookie, urls, options['concorrencia'], options['long_poll'],
+                    options['timeout_long_poll'], options['duracao']
+                )
+                memorias = servidor.memoria_workers_mb()
+            resultados.append((modo, latencias, erros, memorias))
+            for erro in sorted(set(erros))[:5]:
+                self.stderr.write(f"  erro: {erro}")
+
+        self.stdout.write(
+            f"\n{'modo':<8} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6} {'MB/worker':>10}"
+        )
+        for modo, latencias, erros, memorias in resultados:
+            memoria = f"{max(memorias):.0f}" if memorias else '-'
+            self.stdout.write(
+                f"{modo:<8} {len(latencias):>7} {len(latencias) / options['duracao']:>8.1f} "
+                f"{percentil(latencias, 50) * 1000:>8.1f} {percentil(latencias, 95) * 1000:>8.1f} "
+                f"{percentil(latencias, 99) * 1000:>8.1f} {len(erros):>6} {memoria:>10}"
+            )
+        self.stdout.write("\nMB/worker é o maior RSS entre os workers; use-o em NEXO_MEMORIA_WORKER_MB.")
@@ -0,0 +1,109 @@
+"""
+Middlewares do app core.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import tipos_usuario
+
+
+class TipoUsuarioCacheMiddleware:
+    """
+    Abre um cache de tipos de usuário que vive apenas durante a requisição,
+    evitando que obter_tipo_usuario consulte o banco várias vezes para o
+    mesmo usuário dentro de uma view.
+    Funciona nos dois modos (WSGI e ASGI): sob ASGI não força a pilha de
+    middlewares a voltar para o modo síncrono.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = tipos_usuario.iniciar_cache_requisicao()
+        try:
+            return self.get_response(request)
+        finally:
+            tipos_usuario.encerrar_cache_requisicao(token)
+
+    async def __acall__(self, request):
+        token = tipos_usuario.iniciar_cache_requisicao()
+        try:
+            return await self.get_response(request)
+        finally:
+            tipos_usuario.encerrar_cache_requisicao(token)
+
+
+class DesempenhoMiddleware:
+    """
+    Instrumentação opcional (DESEMPENHO_ATIVO): tempo total, queries e tempo de
+    banco e acertos/falhas de cache de cada requisição, RSS máximo do processo e,
+    nas requisições perfiladas, o pico de memória alocada.
+    Devolve Server-Timing, grava uma linha JSON em DESEMPENHO_LOG e perfila uma
+    amostra das requisições (DESEMPENHO_PERFIL_AMOSTRAGEM), guardando em
+    DESEMPENHO_PERFIS_DIR os perfis das que passam de DESEMPENHO_PERFIL_LIMITE_MS.
+    Deve ser o primeiro da lista para medir também os outros middlewares.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.conf import settings
+        from django.core.exceptions import MiddlewareNotUsed
+
+        if not getattr(settings, 'DESEMPENHO_ATIVO', False):
+            raise MiddlewareNotUsed
+        from . import desempenho
+        desempenho.configurar()
+
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _iniciar(self):
+        from . import desempenho
+
+        metricas, token = desempenho.iniciar_metricas()
+        perfil = None
+        if desempenho.deve_perfilar():
+            perfil = desempenho.Perfil()
+            if not perfil.iniciar():
+                perfil = None
+        return metricas, token, perfil, desempenho.rss_maximo_mb()
+
+    def _encerrar(self, request, response, metricas, token, perfil, memoria_antes):
+        import time
+        from . import desempenho
+
+        total_ms = (time.perf_counter() - metricas.inicio) * 1000
+        desempenho.encerrar_metricas(token)
+        try:
+            if perfil is not None:
+                perfil.encerrar(request, total_ms)
+                metricas.pico_memoria_mb = perfil.pico_memoria_mb
+            response['Server-Timing'] = desempenho.server_timing(metricas, total_ms)
+            desempenho.registrar_requisicao(request, response, metricas, total_ms, memoria_antes)
+        except Exception:
+            # A instrumentação nunca deve derrubar a resposta
+            desempenho.logger.exception("Erro ao registrar métricas de desempenho")
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metricas, token, perfil, memoria_antes = self._iniciar()
+        response = self.get_response(request)
+        return self._encerrar(request, response, metricas, token, perfil, memoria_antes)
+
+    async def __acall__(self, request):
+        metricas, token, perfil, memoria_antes = self._iniciar()
+        response = await self.get_response(request)
+        return self._encerrar(request, response, metricas, token, perfil, memoria_antes)
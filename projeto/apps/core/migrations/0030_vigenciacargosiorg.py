@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:14
+
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def criar_vigencias_iniciais(apps, schema_editor):
+    """Abre uma vigência para cada CargoSIORG atual, a partir da última atualização."""
+    CargoSIORG = apps.get_model('core', 'CargoSIORG')
+    VigenciaCargoSIORG = apps.get_model('core', 'VigenciaCargoSIORG')
+    vigencias = {}
+    for cargo in CargoSIORG.objects.order_by('id'):
+        texto = re.sub(r'[^\d,.\-]', '', cargo.valor or '')
+        texto = texto.replace('.', '').replace(',', '.') if ',' in texto else texto
+        try:
+            valor = Decimal(texto).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            continue
+        vigencias.setdefault(cargo.cargo, VigenciaCargoSIORG(
+            cargo=cargo.cargo,
+            valor=valor,
+            unitario=cargo.unitario,
+            vigente_desde=timezone.localdate(cargo.data_atualizacao) if cargo.data_atualizacao else timezone.localdate(),
+            fonte='dados existentes',
+        ))
+    VigenciaCargoSIORG.objects.bulk_create(vigencias.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_contadornotificacoes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VigenciaCargoSIORG',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cargo', models.CharField(max_length=255, verbose_name='Cargo')),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Valor')),
+                ('unitario', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Unitário')),
+                ('vigente_desde', models.DateField(verbose_name='Vigente desde')),
+                ('vigente_ate', models.DateField(blank=True, null=True, verbose_name='Vigente até')),
+                ('fonte', models.CharField(blank=True, max_length=255, verbose_name='Fonte')),
+                ('importado_em', models.DateTimeField(auto_now_add=True, verbose_name='Importado em')),
+            ],
+            options={
+                'verbose_name': 'Vigência de Cargo SIORG',
+                'verbose_name_plural': 'Vigências de Cargos SIORG',
+                'ordering': ['cargo', '-vigente_desde'],
+                'indexes': [models.Index(fields=['vigente_desde', 'vigente_ate'], name='vigencia_siorg_periodo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cargo', 'vigente_desde'), name='vigencia_cargo_siorg_unica')],
+            },
+        ),
+        migrations.RunPython(criar_vigencias_iniciais, migrations.RunPython.noop),
+    ]
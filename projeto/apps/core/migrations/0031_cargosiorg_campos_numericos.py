@@ -0,0 +1,103 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:02
+
+import logging
+
+from django.db import migrations, models
+
+from apps.core.tabela_siorg import CENTAVOS, decompor_cargo, normalizar_cargo, valor_para_decimal
+
+logger = logging.getLogger(__name__)
+
+
+def preencher_campos_numericos(apps, schema_editor):
+    """
+    Normaliza o código dos cargos ("CCE 1.18" -> "CCE 1 18"), remove os
+    duplicados de importações antigas (fica o mais antigo) e preenche
+    valor_decimal, tipo_cargo, categoria e nivel_cargo com as mesmas funções
+    da importação da tabela (tabela_siorg). Os duplicados removidos e os valores
+    que não puderam ser lidos (valor_decimal fica vazio, 0) vão para o log.
+    """
+    CargoSIORG = apps.get_model('core', 'CargoSIORG')
+    VigenciaCargoSIORG = apps.get_model('core', 'VigenciaCargoSIORG')
+
+    vistos = {}
+    duplicados = []
+    alterados = []
+    renomeados = {}
+    for cargo in CargoSIORG.objects.order_by('id'):
+        codigo = normalizar_cargo(cargo.cargo)
+        if codigo in vistos:
+            logger.warning(
+                "CargoSIORG %s (%r, valor %r) removido: duplicado de %s (valor %r)",
+                cargo.pk, cargo.cargo, cargo.valor, vistos[codigo].pk, vistos[codigo].valor
+            )
+            duplicados.append(cargo.pk)
+            continue
+        vistos[codigo] = cargo
+        if codigo != cargo.cargo:
+            renomeados[cargo.cargo] = codigo
+            cargo.cargo = codigo
+        cargo.tipo_cargo, cargo.categoria, cargo.nivel_cargo = decompor_cargo(codigo)
+        try:
+            cargo.valor_decimal = valor_para_decimal(cargo.valor).quantize(CENTAVOS)
+        except ValueError:
+            logger.warning("CargoSIORG %s (%s): valor %r não reconhecido, valor_decimal não preenchido",
+                           cargo.pk, codigo, cargo.valor)
+        alterados.append(cargo)
+
+    CargoSIORG.objects.filter(pk__in=duplicados).delete()
+    CargoSIORG.objects.bulk_update(
+        alterados, ['cargo', 'valor_decimal', 'tipo_cargo', 'categoria', 'nivel_cargo'], batch_size=500
+    )
+
+    # O histórico usa o mesmo código do cargo
+    for vigencia in VigenciaCargoSIORG.objects.filter(cargo__in=list(renomeados)):
+        codigo = renomeados[vigencia.cargo]
+        if VigenciaCargoSIORG.objects.filter(cargo=codigo, vigente_desde=vigencia.vigente_desde).exists():
+            logger.warning("Vigência %s de %r removida: duplicada de %s em %s",
+                           vigencia.pk, vigencia.cargo, codigo, vigencia.vigente_desde)
+            vigencia.delete()
+        else:
+            vigencia.cargo = codigo
+            vigencia.save(update_fields=['cargo'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_vigenciacargosiorg'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cargosiorg',
+            name='valor_decimal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Valor (R$)'),
+        ),
+        migrations.AddField(
+            model_name='cargosiorg',
+            name='tipo_cargo',
+            field=models.CharField(blank=True, default='', max_length=10, verbose_name='Tipo do Cargo'),
+        ),
+        migrations.AddField(
+            model_name='cargosiorg',
+            name='categoria',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Categoria'),
+        ),
+        migrations.AddField(
+            model_name='cargosiorg',
+            name='nivel_cargo',
+            field=models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Nível do Cargo'),
+        ),
+        migrations.RunPython(preencher_campos_numericos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cargosiorg',
+            constraint=models.UniqueConstraint(fields=('cargo',), name='cargo_siorg_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='cargosiorg',
+            constraint=models.UniqueConstraint(
+                fields=('tipo_cargo', 'categoria', 'nivel_cargo'), name='cargo_siorg_chave_unica'
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:23
+
+from django.db import migrations
+
+
+def remover_duplicados(apps, schema_editor):
+    """
+    Deixa uma linha por chave natural antes das restrições únicas (0033): cargos
+    repetidos na mesma unidade viram um só, com as quantidades somadas (como
+    na importação); de servidores repetidos fica o importado por último.
+    """
+    UnidadeCargo = apps.get_model('core', 'UnidadeCargo')
+    RelatorioGratificacoes = apps.get_model('core', 'RelatorioGratificacoes')
+
+    primeiros = {}
+    remover = []
+    for cargo in UnidadeCargo.objects.filter(usuario__isnull=True).order_by('id'):
+        chave = (cargo.codigo_unidade, cargo.tipo_cargo, cargo.categoria, cargo.nivel)
+        primeiro = primeiros.get(chave)
+        if primeiro is None:
+            primeiros[chave] = cargo
+        else:
+            primeiro.quantidade += cargo.quantidade
+            primeiro.save(update_fields=['quantidade'])
+            remover.append(cargo.id)
+    UnidadeCargo.objects.filter(id__in=remover).delete()
+
+    # Matrícula na forma gravada pela importação ("1234567.0" -> "1234567");
+    # servidores sem matrícula ficam de fora da restrição e não são removidos
+    ultimos = {}
+    remover = []
+    for servidor_id, matricula in RelatorioGratificacoes.objects.order_by('id').values_list('id', 'matricula_siape'):
+        normalizada = (matricula or '').strip().removesuffix('.0')
+        if not normalizada:
+            continue
+        if normalizada != matricula:
+            RelatorioGratificacoes.objects.filter(id=servidor_id).update(matricula_siape=normalizada)
+        if normalizada in ultimos:
+            remover.append(ultimos[normalizada])
+        ultimos[normalizada] = servidor_id
+    RelatorioGratificacoes.objects.filter(id__in=remover).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_cargosiorg_campos_numericos'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_duplicados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def atribuir_primeira_versao(apps, schema_editor):
+    """Os dados já importados viram a versão 1, ativa, do seu conjunto."""
+    VersaoDataset = apps.get_model('core', 'VersaoDataset')
+    for conjunto, modelo, filtro in (
+        ('unidades', 'UnidadeCargo', {'usuario__isnull': True}),
+        ('servidores', 'RelatorioGratificacoes', {}),
+    ):
+        total = apps.get_model('core', modelo).objects.filter(**filtro).update(versao_inicial=1)
+        if total:
+            VersaoDataset.objects.create(
+                conjunto=conjunto, numero=1, ativa=True, total_registros=total,
+                origem='Dados anteriores ao versionamento',
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_chaves_naturais_importacao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersaoDataset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('conjunto', models.CharField(choices=[('unidades', 'Estrutura de cargos'), ('servidores', 'Servidores (gratificações)')], max_length=20, verbose_name='Conjunto')),
+                ('numero', models.PositiveIntegerField(verbose_name='Versão')),
+                ('ativa', models.BooleanField(default=False, verbose_name='Ativa')),
+                ('origem', models.CharField(blank=True, max_length=255, verbose_name='Origem')),
+                ('total_registros', models.PositiveIntegerField(default=0, verbose_name='Registros')),
+                ('resumo', models.JSONField(blank=True, default=dict, verbose_name='Resumo da Importação')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Versão de Dados Importados',
+                'verbose_name_plural': 'Versões de Dados Importados',
+                'ordering': ['conjunto', '-numero'],
+            },
+        ),
+        migrations.AddField(
+            model_name='versaodataset',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Usuário'),
+        ),
+        migrations.AddField(
+            model_name='relatoriogratificacoes',
+            name='versao_inicial',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Da Versão'),
+        ),
+        migrations.AddField(
+            model_name='relatoriogratificacoes',
+            name='versao_final',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Até a Versão (exclusive)'),
+        ),
+        migrations.AddField(
+            model_name='unidadecargo',
+            name='versao_inicial',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Da Versão'),
+        ),
+        migrations.AddField(
+            model_name='unidadecargo',
+            name='versao_final',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Até a Versão (exclusive)'),
+        ),
+        migrations.RunPython(atribuir_primeira_versao, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='relatoriogratificacoes',
+            constraint=models.UniqueConstraint(condition=models.Q(models.Q(('matricula_siape', ''), _negated=True), ('versao_final__isnull', True)), fields=('matricula_siape',), name='servidor_matricula_siape_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='unidadecargo',
+            constraint=models.UniqueConstraint(condition=models.Q(('usuario__isnull', True), ('versao_final__isnull', True)), fields=('codigo_unidade', 'tipo_cargo', 'categoria', 'nivel'), name='unidade_cargo_chave_natural'),
+        ),
+        migrations.AddConstraint(
+            model_name='versaodataset',
+            constraint=models.UniqueConstraint(fields=('conjunto', 'numero'), name='versao_dataset_unica'),
+        ),
+        migrations.AddConstraint(
+            model_name='versaodataset',
+            constraint=models.UniqueConstraint(condition=models.Q(('ativa', True)), fields=('conjunto',), name='versao_dataset_uma_ativa'),
+        ),
+    ]
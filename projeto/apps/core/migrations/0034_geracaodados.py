@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_versaodataset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeracaoDados',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.BigIntegerField(verbose_name='Versão dos Dados')),
+            ],
+            options={
+                'verbose_name': 'Geração dos Dados',
+                'verbose_name_plural': 'Geração dos Dados',
+            },
+        ),
+    ]
@@ -1,11 +1,111 @@
 # core/models.py
-from django.db import models
+from django.db import connections, models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from allauth.socialaccount.models import SocialAccount
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from decimal import Decimal
 import json
+from . import tipos_usuario as cache_tipos_usuario
+from . import versao_dados
+from .tabela_siorg import CENTAVOS, decompor_cargo, normalizar_cargo, valor_para_decimal
+
+def excluir_em_lote(queryset):
+    """
+    Exclui as linhas do QuerySet com um único DELETE, sem carregar os objetos
+    nem disparar pre_delete/post_delete: quem chama atualiza os caches e
+    contadores que os sinais atualizariam. Só para modelos que nenhum outro
+    referencia (não há cascata a coletar). Retorna o número de linhas excluídas.
+    """
+    modelo = queryset.model
+    if modelo._meta.related_objects:
+        raise ValueError(f"{modelo.__name__} é referenciado por outros modelos: use delete()")
+    conexao = connections[queryset.db]
+    selecao, params = queryset.order_by().values('pk').query.get_compiler(queryset.db).as_sql()
+    tabela = conexao.ops.quote_name(modelo._meta.db_table)
+    pk = conexao.ops.quote_name(modelo._meta.pk.column)
+    # A tabela derivada é necessária no MySQL, que não aceita subconsulta
+    # sobre a própria tabela do DELETE
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {tabela} WHERE {pk} IN (SELECT * FROM ({selecao}) AS excluir)", params
+        )
+        return cursor.rowcount
+
+
+def visivel_na_versao(numero):
+    """
+    Linhas de modelos importados por planilha presentes na versão `numero`
+    (número ou expressão) do conjunto. Cada linha vale da versão
+    `versao_inicial` até antes de `versao_final` (vazia: até a última): uma
+    linha que não muda entre importações é compartilhada pelas versões.
+    """
+    return models.Q(versao_inicial__lte=numero) & (
+        models.Q(versao_final__isnull=True) | models.Q(versao_final__gt=numero)
+    )
+
+
+class VersaoQuerySet(models.QuerySet):
+    def na_versao(self, numero):
+        """Linhas da versão `numero` do conjunto (visivel_na_versao)."""
+        return self.filter(visivel_na_versao(numero))
+
+
+class VersaoAtivaManager(models.Manager.from_queryset(VersaoQuerySet)):
+    """
+    Gerenciador padrão dos modelos importados por planilha: só as linhas da
+    versão ativa do conjunto (VersaoDataset), com o número da versão obtido
+    por uma subconsulta na própria consulta. As demais versões ficam em
+    `todas_versoes`.
+    """
+    conjunto = None
+
+    def get_queryset(self):
+        ativa = VersaoDataset.objects.filter(conjunto=self.conjunto, ativa=True).values('numero')
+        return super().get_queryset().filter(self.visiveis(models.Subquery(ativa)))
+
+    def visiveis(self, numero):
+        return visivel_na_versao(numero)
+
+
+class UnidadeCargoQuerySet(VersaoQuerySet):
+    def com_valores_siorg(self):
+        """
+        Anota valor_siorg e pontos_siorg com o valor e o unitário do CargoSIORG
+        de mesmo tipo/categoria/nível (junção pelas colunas inteiras; 0 sem
+        cargo correspondente).
+        """
+        cargo = CargoSIORG.objects.filter(
+            tipo_cargo=models.OuterRef('tipo_cargo'),
+            categoria=models.OuterRef('categoria'),
+            nivel_cargo=models.OuterRef('nivel'),
+        ).order_by()
+        return self.annotate(
+            valor_siorg=Coalesce(
+                models.Subquery(cargo.values('valor_decimal')[:1]), models.Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
+            pontos_siorg=Coalesce(
+                models.Subquery(cargo.values('unitario')[:1]), models.Value(Decimal('0')),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            ),
+        )
+
+
+class UnidadeCargoManager(VersaoAtivaManager.from_queryset(UnidadeCargoQuerySet)):
+    conjunto = 'unidades'
+
+    def visiveis(self, numero):
+        # Cargos manuais (com usuário) não vêm da planilha: valem em todas as versões
+        return models.Q(usuario__isnull=False) | visivel_na_versao(numero)
+
+
+class ServidorManager(VersaoAtivaManager):
+    conjunto = 'servidores'
+
 
 class UnidadeCargo(models.Model):
     nivel_hierarquico = models.IntegerField(verbose_name="Nível Hierárquico")
@@ -40,6 +140,24 @@ class UnidadeCargo(models.Model):
         verbose_name="Usuário Criador",
         help_text="Deixe em branco para cargos padrão do sistema"
     )
+    # Versões (VersaoDataset.numero) em que o cargo importado vale: de
+    # versao_inicial até antes de versao_final (ver visivel_na_versao)
+    versao_inicial = models.PositiveIntegerField(null=True, blank=True, verbose_name="Da Versão")
+    versao_final = models.PositiveIntegerField(null=True, blank=True, verbose_name="Até a Versão (exclusive)")
+
+    objects = UnidadeCargoManager()
+    todas_versoes = UnidadeCargoQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Chave natural dos cargos importados (importacao.CHAVE_UNIDADE_CARGO)
+            # entre os da última versão; cargos manuais, com usuário, ficam de fora
+            models.UniqueConstraint(
+                fields=['codigo_unidade', 'tipo_cargo', 'categoria', 'nivel'],
+                condition=models.Q(usuario__isnull=True, versao_final__isnull=True),
+                name='unidade_cargo_chave_natural',
+            ),
+        ]
 
     def __str__(self):
         tipo_cargo = self.tipo_cargo if self.tipo_cargo else ""
@@ -56,6 +174,17 @@ class UnidadeCargo(models.Model):
         super().save(*args, **kwargs)
 
 
+@receiver([post_save, post_delete], sender=UnidadeCargo)
+@receiver([post_save, post_delete], sender='core.CargoSIORG')
+@receiver([post_save, post_delete], sender='core.RelatorioGratificacoes')
+def incrementar_versao_dados(sender, **kwargs):
+    """
+    Invalida os caches derivados do organograma (catálogo de unidades, ETags,
+    tabelas dos relatórios e PDFs exportados)
+    """
+    versao_dados.nova_versao()
+
+
 class Perfil(models.Model):
     """
     Modelo para armazenar informações adicionais do usuário.
@@ -142,6 +271,43 @@ def atualizar_simulacoes_usuario(sender, instance, **kwargs):
         tipo_usuario=instance.tipo
     )
 
+
+@receiver([post_save, post_delete], sender='core.TipoUsuario')
+def invalidar_cache_tipo_usuario(sender, instance, **kwargs):
+    """
+    Remove o usuário do cache de tipos quando seu TipoUsuario muda
+    """
+    cache_tipos_usuario.invalidar([instance.usuario_id])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidar_cache_grupos_usuario(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Remove do cache de tipos os usuários cujos grupos mudaram
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # instance é o usuário
+        cache_tipos_usuario.invalidar([instance.pk])
+    elif pk_set:
+        # instance é o grupo e pk_set contém os usuários
+        cache_tipos_usuario.invalidar(pk_set)
+    else:
+        # grupo esvaziado: não sabemos mais quais usuários eram membros
+        cache_tipos_usuario.invalidar()
+
+class CargoSIORGQuerySet(models.QuerySet):
+    def tabela(self):
+        """{(tipo_cargo, categoria, nível): (valor, unitário)} com os valores numéricos."""
+        return {
+            (tipo, categoria, nivel): (valor, unitario)
+            for tipo, categoria, nivel, valor, unitario in self.filter(categoria__isnull=False).values_list(
+                'tipo_cargo', 'categoria', 'nivel_cargo', 'valor_decimal', 'unitario'
+            )
+        }
+
+
 class CargoSIORG(models.Model):
     cargo = models.CharField(max_length=255, verbose_name="Cargo")
     nivel = models.CharField(max_length=50, verbose_name="Nível")
@@ -150,16 +316,84 @@ class CargoSIORG(models.Model):
     unitario = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Unitário", default=0.00)
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Data de Atualização")
 
+    # Derivados de `cargo` e `valor` (preencher_campos_numericos) para os
+    # cálculos e a junção com UnidadeCargo (tipo_cargo, categoria, nivel)
+    valor_decimal = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Valor (R$)")
+    tipo_cargo = models.CharField(max_length=10, blank=True, default='', verbose_name="Tipo do Cargo")
+    categoria = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Categoria")
+    nivel_cargo = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Nível do Cargo")
+
+    objects = CargoSIORGQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Cargo SIORG"
         verbose_name_plural = "Cargos SIORG"
         ordering = ['cargo']
+        constraints = [
+            models.UniqueConstraint(fields=['cargo'], name='cargo_siorg_unico'),
+            models.UniqueConstraint(
+                fields=['tipo_cargo', 'categoria', 'nivel_cargo'], name='cargo_siorg_chave_unica'
+            ),
+        ]
 
     def __str__(self):
         cargo_str = str(self.cargo) if self.cargo else ""
         nivel_str = str(self.nivel) if self.nivel else ""
         return str(cargo_str + " - " + nivel_str).strip()
 
+    def preencher_campos_numericos(self):
+        """Normaliza `cargo` e deriva dele e de `valor` os campos numéricos."""
+        self.cargo = normalizar_cargo(self.cargo)
+        self.tipo_cargo, self.categoria, self.nivel_cargo = decompor_cargo(self.cargo)
+        try:
+            self.valor_decimal = valor_para_decimal(self.valor).quantize(CENTAVOS)
+        except ValueError:
+            self.valor_decimal = Decimal('0.00')
+
+    def save(self, *args, **kwargs):
+        # bulk_create/bulk_update não passam por aqui: quem os usa chama preencher_campos_numericos
+        self.preencher_campos_numericos()
+        super().save(*args, **kwargs)
+
+
+class VigenciaCargoSIORGQuerySet(models.QuerySet):
+    def vigentes_em(self, data):
+        """Valores em vigor na data (no máximo um por cargo)."""
+        return self.filter(vigente_desde__lte=data).filter(
+            models.Q(vigente_ate__isnull=True) | models.Q(vigente_ate__gt=data)
+        )
+
+
+class VigenciaCargoSIORG(models.Model):
+    """
+    Histórico dos valores dos cargos SIORG: o valor de um cargo entre
+    vigente_desde (inclusive) e vigente_ate (exclusive, nulo enquanto vigente).
+    Mantido por tabela_siorg.aplicar_tabela a cada importação da tabela.
+    """
+    cargo = models.CharField(max_length=255, verbose_name="Cargo")
+    valor = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Valor")
+    unitario = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Unitário")
+    vigente_desde = models.DateField(verbose_name="Vigente desde")
+    vigente_ate = models.DateField(null=True, blank=True, verbose_name="Vigente até")
+    fonte = models.CharField(max_length=255, blank=True, verbose_name="Fonte")
+    importado_em = models.DateTimeField(auto_now_add=True, verbose_name="Importado em")
+
+    objects = VigenciaCargoSIORGQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Vigência de Cargo SIORG"
+        verbose_name_plural = "Vigências de Cargos SIORG"
+        ordering = ['cargo', '-vigente_desde']
+        constraints = [
+            models.UniqueConstraint(fields=['cargo', 'vigente_desde'], name='vigencia_cargo_siorg_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['vigente_desde', 'vigente_ate'], name='vigencia_siorg_periodo_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.cargo} - {self.valor} desde {self.vigente_desde:%d/%m/%Y}"
+
 class PlanilhaImportada(models.Model):
     """
     Modelo para armazenar planilhas importadas.
@@ -187,7 +421,17 @@ def obter_tipo_usuario(usuario):
     """
     Função helper para obter o tipo de usuário baseado no modelo TipoUsuario.
     Se não existir, cria um baseado nos grupos do usuário.
+    O resultado é memorizado por requisição e por processo (ver tipos_usuario.py).
     """
+    tipo = cache_tipos_usuario.obter_em_cache(usuario.pk)
+    if tipo is None:
+        tipo = _resolver_tipo_usuario(usuario)
+        cache_tipos_usuario.guardar_em_cache(usuario.pk, tipo)
+    return tipo
+
+
+def _resolver_tipo_usuario(usuario):
+    """Resolve o tipo do usuário no banco, criando o TipoUsuario se necessário."""
     try:
         tipo_usuario_obj = usuario.tipo_usuario_simulacao
         return tipo_usuario_obj.tipo
@@ -211,6 +455,49 @@ def obter_tipo_usuario(usuario):
         )
         return tipo
 
+
+def obter_tipos_usuarios(usuarios):
+    """
+    Resolve o tipo de vários usuários de uma só vez.
+    Usuários em cache ou carregados com select_related('tipo_usuario_simulacao')
+    não geram consultas; os demais são resolvidos em uma única consulta ao
+    TipoUsuario. Apenas usuários sem TipoUsuario caem no fallback de
+    obter_tipo_usuario. Aceita instâncias de User.
+    Retorna um dicionário {usuario_id: tipo}.
+    """
+    tipos = {}
+    pendentes = {}
+    for usuario in usuarios:
+        if usuario.pk in tipos or usuario.pk in pendentes:
+            continue
+        tipo = cache_tipos_usuario.obter_em_cache(usuario.pk)
+        if tipo is not None:
+            tipos[usuario.pk] = tipo
+        elif User.tipo_usuario_simulacao.is_cached(usuario):
+            tipos[usuario.pk] = obter_tipo_usuario(usuario)
+        else:
+            pendentes[usuario.pk] = usuario
+
+    if pendentes:
+        encontrados = dict(
+            TipoUsuario.objects.filter(usuario_id__in=pendentes).values_list('usuario_id', 'tipo')
+        )
+        for usuario_id, usuario in pendentes.items():
+            if usuario_id in encontrados:
+                tipos[usuario_id] = encontrados[usuario_id]
+                cache_tipos_usuario.guardar_em_cache(usuario_id, encontrados[usuario_id])
+            else:
+                tipos[usuario_id] = obter_tipo_usuario(usuario)
+    return tipos
+
+
+TIPO_USUARIO_DISPLAY = {
+    'externo': 'Usuário Externo',
+    'interno': 'Usuário Interno',
+    'gerente': 'Usuário Gerente'
+}
+
+
 class SimulacaoSalva(models.Model):
     """
     Modelo para armazenar simulações salvas pelos usuários.
@@ -229,6 +516,17 @@ class SimulacaoSalva(models.Model):
         ('gerente', 'Usuário Gerente'),
     ]
     
+    STATUS_ANALISE = ['enviada_analise', 'rejeitada', 'rejeitada_editada']
+
+    # Campos carregados nas listagens (dados_estrutura fica de fora)
+    CAMPOS_LISTAGEM = [
+        'id', 'nome', 'descricao', 'unidade_base', 'status', 'visivel_para_gerentes',
+        'criado_em', 'atualizado_em',
+        'usuario__id', 'usuario__username', 'usuario__first_name', 'usuario__last_name',
+        'usuario__email', 'usuario__is_superuser',
+        'usuario__tipo_usuario_simulacao__id', 'usuario__tipo_usuario_simulacao__tipo',
+    ]
+    
     usuario = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="Usuário")
     nome = models.CharField(max_length=255, verbose_name="Nome da Simulação")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
@@ -256,12 +554,29 @@ class SimulacaoSalva(models.Model):
     
     def get_tipo_usuario_display_atual(self):
         """Retorna o display do tipo atual do usuário"""
-        tipo_map = {
-            'externo': 'Usuário Externo',
-            'interno': 'Usuário Interno',
-            'gerente': 'Usuário Gerente'
-        }
-        return tipo_map.get(self.tipo_usuario_atual, 'Usuário Externo')
+        return TIPO_USUARIO_DISPLAY.get(self.tipo_usuario_atual, 'Usuário Externo')
+
+    @classmethod
+    def para_listagem(cls):
+        """
+        QuerySet enxuto para listagens: traz o autor e seu TipoUsuario no mesmo
+        JOIN e carrega apenas os campos exibidos, adiando dados_estrutura.
+        """
+        return cls.objects.select_related('usuario__tipo_usuario_simulacao').only(*cls.CAMPOS_LISTAGEM)
+
+    @classmethod
+    def filtro_visiveis_gerente(cls, gerente):
+        """
+        Regra de visibilidade da listagem do gerente expressa em SQL: simulações
+        em análise só aparecem se o autor for interno (ou ainda não tiver
+        TipoUsuario, caso resolvido depois em Python) ou se forem do próprio gerente.
+        """
+        return (
+            ~models.Q(status='enviada_analise')
+            | models.Q(usuario=gerente)
+            | models.Q(usuario__tipo_usuario_simulacao__tipo='interno')
+            | models.Q(usuario__tipo_usuario_simulacao__isnull=True)
+        )
 
     def save(self, *args, **kwargs):
         # Validar que o usuário não tenha mais de 5 simulações (não se aplica a gerentes)
@@ -375,6 +690,79 @@ class SolicitacaoSimulacao(models.Model):
         return f"{self.titulo} - {self.solicitante.username} → {self.usuario_designado.username}"
 
 
+class NotificacaoSimulacaoQuerySet(models.QuerySet):
+    """
+    Operações em lote sobre notificações, executadas como SQL set-based e
+    mantendo o ContadorNotificacoes com um número constante de consultas.
+    """
+
+    def notificar(self, usuario_ids, **campos):
+        """
+        Cria a mesma notificação para vários usuários com um único bulk_create.
+        Retorna as notificações criadas.
+        """
+        usuario_ids = list(dict.fromkeys(usuario_ids))
+        if not usuario_ids:
+            return []
+        notificacoes = self.bulk_create([
+            self.model(usuario_id=usuario_id, **campos) for usuario_id in usuario_ids
+        ])
+        # bulk_create não dispara post_save: atualizar contadores aqui
+        ContadorNotificacoes.ajustar(usuario_ids, 0 if campos.get('lida') else 1)
+        return notificacoes
+
+    def _nao_lidas_por_usuario(self):
+        """Não lidas por usuário (zero para quem só tem lidas), numa consulta agrupada."""
+        return dict(
+            self.order_by().values('usuario_id')
+            .annotate(total=models.Count('id', filter=models.Q(lida=False)))
+            .values_list('usuario_id', 'total')
+        )
+
+    def _travar_contadores(self):
+        """
+        Trava (SELECT ... FOR UPDATE) os contadores dos usuários do QuerySet:
+        operações concorrentes sobre as mesmas notificações esperam esta
+        transação terminar e só então fazem a sua contagem.
+        """
+        usuarios = self.order_by().values('usuario_id')
+        list(ContadorNotificacoes.objects.select_for_update().filter(usuario_id__in=usuarios).values_list('pk', flat=True))
+
+    def marcar_lidas(self):
+        """
+        Marca as notificações do QuerySet como lidas com um único UPDATE. As
+        não lidas de cada usuário são contadas numa consulta agrupada, na mesma
+        transação e com os contadores travados, e descontadas num único UPDATE
+        dos contadores: duas requisições marcando as mesmas notificações não
+        descontam duas vezes.
+        """
+        nao_lidas = self.filter(lida=False)
+        with transaction.atomic(using=self.db):
+            nao_lidas._travar_contadores()
+            por_usuario = nao_lidas._nao_lidas_por_usuario()
+            if not por_usuario:
+                return 0
+            total = nao_lidas.update(lida=True)
+            ContadorNotificacoes.ajustar({usuario_id: -n for usuario_id, n in por_usuario.items()})
+        return total
+
+    def excluir(self):
+        """
+        Exclui as notificações do QuerySet com um único DELETE (excluir_em_lote),
+        com o ajuste dos contadores no lugar do post_delete por linha: as não
+        lidas de cada usuário são contadas antes, na mesma transação e com os
+        contadores travados.
+        """
+        with transaction.atomic(using=self.db):
+            self._travar_contadores()
+            por_usuario = self._nao_lidas_por_usuario()
+            if not por_usuario:
+                return 0
+            total = excluir_em_lote(self)
+            ContadorNotificacoes.ajustar({usuario_id: -n for usuario_id, n in por_usuario.items()}, criar=False)
+        return total
+
+
 class NotificacaoSimulacao(models.Model):
     """
     Modelo para notificações relacionadas a simulações
@@ -399,6 +787,8 @@ class NotificacaoSimulacao(models.Model):
     lida = models.BooleanField(default=False, verbose_name="Lida")
     criada_em = models.DateTimeField(auto_now_add=True, verbose_name="Criada em")
 
+    objects = NotificacaoSimulacaoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Notificação de Simulação"
         verbose_name_plural = "Notificações de Simulações"
@@ -408,6 +798,115 @@ class NotificacaoSimulacao(models.Model):
         return f"{self.titulo} - {self.usuario.username}"
 
 
+class ContadorNotificacoes(models.Model):
+    """
+    Contador desnormalizado de notificações por usuário.
+    Evita o COUNT(*) de não lidas a cada consulta de notificações; a versão é
+    incrementada a cada criação/leitura/exclusão e serve de ETag para o polling.
+    """
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, related_name='contador_notificacoes', verbose_name="Usuário")
+    nao_lidas = models.IntegerField(default=0, verbose_name="Não Lidas")
+    versao = models.PositiveIntegerField(default=0, verbose_name="Versão")
+    atualizado_em = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    class Meta:
+        verbose_name = "Contador de Notificações"
+        verbose_name_plural = "Contadores de Notificações"
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.nao_lidas} não lidas"
+
+    @property
+    def etag(self):
+        return f'W/"notif-{self.usuario_id}-{self.versao}"'
+
+    @classmethod
+    def obter(cls, usuario_id):
+        """Retorna o contador do usuário, criando-o a partir da tabela se não existir."""
+        try:
+            return cls.objects.get(usuario_id=usuario_id)
+        except cls.DoesNotExist:
+            return cls.recalcular(usuario_id)
+
+    @classmethod
+    async def aobter(cls, usuario_id):
+        """Versão assíncrona de obter(), para as views async de notificações."""
+        from asgiref.sync import sync_to_async
+
+        try:
+            return await cls.objects.aget(usuario_id=usuario_id)
+        except cls.DoesNotExist:
+            return await sync_to_async(cls.recalcular)(usuario_id)
+
+    @classmethod
+    def recalcular(cls, usuario_id):
+        """Recalcula o contador a partir de NotificacaoSimulacao (único caminho com COUNT)."""
+        nao_lidas = NotificacaoSimulacao.objects.filter(usuario_id=usuario_id, lida=False).count()
+        contador, created = cls.objects.get_or_create(
+            usuario_id=usuario_id,
+            defaults={'nao_lidas': nao_lidas, 'versao': 1}
+        )
+        if not created:
+            contador.nao_lidas = nao_lidas
+            contador.versao += 1
+            contador.save(update_fields=['nao_lidas', 'versao', 'atualizado_em'])
+        return contador
+
+    @classmethod
+    def ajustar(cls, usuario_ids, delta=0, criar=True):
+        """
+        Soma delta às não lidas e incrementa a versão com um único UPDATE.
+        usuario_ids também pode ser um dict usuario_id -> delta, para ajustes
+        diferentes por usuário no mesmo UPDATE. Usuários sem contador são
+        recalculados (se criar=True).
+        """
+        if isinstance(usuario_ids, int):
+            usuario_ids = [usuario_ids]
+        if isinstance(usuario_ids, dict):
+            delta = models.Case(
+                *[models.When(usuario_id=usuario_id, then=models.Value(d)) for usuario_id, d in usuario_ids.items()],
+                default=models.Value(0),
+            )
+        usuario_ids = set(usuario_ids)
+        if not usuario_ids:
+            return
+        cls.objects.filter(usuario_id__in=usuario_ids).update(
+            nao_lidas=models.F('nao_lidas') + delta,
+            versao=models.F('versao') + 1,
+            atualizado_em=timezone.now()
+        )
+        if criar:
+            existentes = set(cls.objects.filter(usuario_id__in=usuario_ids).values_list('usuario_id', flat=True))
+            faltantes = usuario_ids - existentes
+            if faltantes:
+                # Contadores novos partem da contagem real (uma consulta agrupada)
+                nao_lidas = NotificacaoSimulacao.objects.filter(usuario_id__in=faltantes)._nao_lidas_por_usuario()
+                cls.objects.bulk_create([
+                    cls(usuario_id=usuario_id, nao_lidas=nao_lidas.get(usuario_id, 0), versao=1)
+                    for usuario_id in faltantes
+                ], ignore_conflicts=True)
+
+
+@receiver(post_save, sender=NotificacaoSimulacao)
+def atualizar_contador_notificacao_salva(sender, instance, created, **kwargs):
+    """
+    Mantém o contador ao criar uma notificação. Edições genéricas (ex.: admin)
+    recalculam, pois o estado anterior de 'lida' não é conhecido.
+    """
+    if created:
+        ContadorNotificacoes.ajustar(instance.usuario_id, 0 if instance.lida else 1)
+    else:
+        ContadorNotificacoes.recalcular(instance.usuario_id)
+
+
+@receiver(post_delete, sender=NotificacaoSimulacao)
+def atualizar_contador_notificacao_excluida(sender, instance, **kwargs):
+    """
+    Mantém o contador ao excluir uma notificação (inclusive em cascata).
+    """
+    ContadorNotificacoes.ajustar(instance.usuario_id, 0 if instance.lida else -1, criar=False)
+
+
 # === NOVOS MODELOS PARA SISTEMA DE RELATÓRIOS ===
 
 
@@ -439,11 +938,25 @@ class RelatorioGratificacoes(models.Model):
     email_institucional = models.EmailField(blank=True, verbose_name="e-Mail Institucional")
     siape_titular_chefe = models.CharField(max_length=50, blank=True, verbose_name="Siape do Titular Chefe")
     siape_substituto = models.CharField(max_length=50, blank=True, verbose_name="Siape do Substituto")
+    # Versões (VersaoDataset.numero) em que o servidor vale (ver visivel_na_versao)
+    versao_inicial = models.PositiveIntegerField(null=True, blank=True, verbose_name="Da Versão")
+    versao_final = models.PositiveIntegerField(null=True, blank=True, verbose_name="Até a Versão (exclusive)")
+
+    objects = ServidorManager()
+    todas_versoes = VersaoQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Dados de Gratificações"
         verbose_name_plural = "Dados de Gratificações"
         ordering = ['nome_servidor']
+        constraints = [
+            # Entre os da última versão; servidores antigos, de antes da importação
+            # exigir a matrícula, podem não tê-la
+            models.UniqueConstraint(
+                fields=['matricula_siape'], condition=~models.Q(matricula_siape='') & models.Q(versao_final__isnull=True),
+                name='servidor_matricula_siape_unica'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.nome_servidor} - {self.cargo}"
@@ -708,3 +1221,62 @@ class ConfiguracaoRelatorio(models.Model):
 
     def __str__(self):
         return f"{self.chave}: {self.valor[:50]}..."
+
+
+class GeracaoDados(models.Model):
+    """
+    Versão (geração) dos dados do organograma, compartilhada por todos os
+    workers. Uma única linha (pk=1), mantida por versao_dados.
+    """
+    numero = models.BigIntegerField(verbose_name="Versão dos Dados")
+
+    class Meta:
+        verbose_name = "Geração dos Dados"
+        verbose_name_plural = "Geração dos Dados"
+
+    def __str__(self):
+        return str(self.numero)
+
+
+class VersaoDataset(models.Model):
+    """
+    Uma importação de um conjunto de dados (estrutura de cargos ou servidores).
+    As linhas importadas guardam as versões em que valem (versao_inicial e
+    versao_final, números de versão) e os gerenciadores padrão de
+    UnidadeCargo/RelatorioGratificacoes só enxergam as da versão ativa: ativar
+    outra versão (importação nova ou volta a uma anterior) é trocar `ativa`.
+    Mantido por importacao.importar() e importacao.ativar_versao().
+    """
+    CONJUNTOS = [
+        ('unidades', 'Estrutura de cargos'),
+        ('servidores', 'Servidores (gratificações)'),
+    ]
+
+    conjunto = models.CharField(max_length=20, choices=CONJUNTOS, verbose_name="Conjunto")
+    numero = models.PositiveIntegerField(verbose_name="Versão")
+    ativa = models.BooleanField(default=False, verbose_name="Ativa")
+    origem = models.CharField(max_length=255, blank=True, verbose_name="Origem")
+    total_registros = models.PositiveIntegerField(default=0, verbose_name="Registros")
+    resumo = models.JSONField(default=dict, blank=True, verbose_name="Resumo da Importação")
+    criado_em = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Usuário"
+    )
+
+    class Meta:
+        verbose_name = "Versão de Dados Importados"
+        verbose_name_plural = "Versões de Dados Importados"
+        ordering = ['conjunto', '-numero']
+        constraints = [
+            models.UniqueConstraint(fields=['conjunto', 'numero'], name='versao_dataset_unica'),
+            models.UniqueConstraint(
+                fields=['conjunto'], condition=models.Q(ativa=True), name='versao_dataset_uma_ativa'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_conjunto_display()} v{self.numero}"
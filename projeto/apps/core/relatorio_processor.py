@@ -6,7 +6,8 @@ import pandas as pd
 import openpyxl
 from datetime import datetime
 from django.utils import timezone
-from .models import Relatorio, RelatorioGratificacoes, RelatorioOrgaosCentrais, RelatorioEfetivo
+from .importacao import importar
+from .models import Relatorio, RelatorioOrgaosCentrais, RelatorioEfetivo
 
 
 def processar_relatorio(relatorio_obj):
@@ -38,10 +39,7 @@ def processar_gratificacoes(relatorio_obj, arquivo_path):
         # Ler o arquivo Excel
         df = pd.read_excel(arquivo_path)
         
-        # Limpar dados existentes para este relatório
-        RelatorioGratificacoes.objects.filter(relatorio=relatorio_obj).delete()
-        
-        registros_criados = 0
+        registros = []
         
         # Mapear colunas da planilha para campos do modelo
         # Ordem das colunas conforme especificado pelo usuário:
@@ -63,22 +61,15 @@ def processar_gratificacoes(relatorio_obj, arquivo_path):
                         return str(row.iloc[index]).strip()
                     return default
                 
-                def get_int_value(index, default=None):
-                    if len(row) > index and not pd.isna(row.iloc[index]):
-                        try:
-                            return int(float(row.iloc[index]))
-                        except:
-                            return default
-                    return default
+                # A matrícula é a chave do servidor na importação
+                matricula = get_value(1).removesuffix('.0')
+                if not matricula:
+                    continue
                 
-                # Criar registro com mapeamento completo
-                dados = {
-                    'relatorio': relatorio_obj,
+                # Mapeamento para os campos importados (importacao.CONJUNTOS)
+                registros.append({
                     'nome_servidor': get_value(0),
-                    'matricula_siape': get_value(1),
-                    'cpf': get_value(2),
-                    'idade': get_int_value(4),
-                    'sexo': get_value(5),
+                    'matricula_siape': matricula,
                     'situacao_funcional': get_value(6),
                     'cargo': get_value(7),
                     'nivel': get_value(8),
@@ -99,32 +90,24 @@ def processar_gratificacoes(relatorio_obj, arquivo_path):
                     'orgao_origem': get_value(23),
                     'email_institucional': get_value(24),
                     'siape_titular_chefe': get_value(25),
-                    'cpf_titular_chefe': get_value(26),
                     'siape_substituto': get_value(27),
-                    'cpf_substituto': get_value(28),
-                }
-                
-                # Processar data de nascimento se disponível
-                if len(row) > 3 and not pd.isna(row.iloc[3]):
-                    try:
-                        # Tentar converter diferentes formatos de data
-                        data_nasc = pd.to_datetime(row.iloc[3])
-                        dados['data_nascimento'] = data_nasc.date()
-                    except:
-                        pass  # Se não conseguir converter, deixa em branco
-                
-                RelatorioGratificacoes.objects.create(**dados)
-                registros_criados += 1
+                })
                 
             except Exception as e:
                 continue  # Pula registros com erro
         
+        # Versão nova do conjunto de servidores, só com as diferenças gravadas
+        resumo = importar('servidores', registros, origem=relatorio_obj.arquivo.name)
+        
         # Marcar como processado
         relatorio_obj.processado = True
         relatorio_obj.data_processamento = timezone.now()
         relatorio_obj.save()
         
-        return True, f"Processamento concluído. {registros_criados} registros criados."
+        return True, (
+            f"Processamento concluído. {resumo['criados']} registros criados, "
+            f"{resumo['alterados']} alterados e {resumo['removidos']} removidos."
+        )
         
     except Exception as e:
         return False, f"Erro ao processar gratificações: {str(e)}"
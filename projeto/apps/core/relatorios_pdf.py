@@ -0,0 +1,643 @@
+"""
+Renderização dos relatórios em PDF (reportlab).
+
+- Estilos de parágrafo e de tabela são construídos uma única vez por processo.
+- Tabelas grandes são divididas em blocos com cabeçalho repetido, do tamanho
+  do espaço livre na página, montados um de cada vez enquanto o PDF é escrito
+  direto no arquivo de destino.
+- Os PDFs gerados ficam em disco (settings.RELATORIOS_PDF_DIR, fora de
+  MEDIA_ROOT), com chave (tipo, filtros, versão dos dados); downloads repetidos
+  do mesmo relatório são servidos direto do arquivo, pela view (ou pelo nginx,
+  via X-Accel-Redirect). Os mais antigos são removidos por idade e tamanho.
+- Relatórios grandes podem ser renderizados em segundo plano (thread pool); o
+  cliente acompanha pelo mesmo endereço até o arquivo ficar pronto. O estado
+  da renderização fica em disco, visível a todos os workers.
+
+O reportlab só é importado quando um PDF é de fato renderizado.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
+
+from django.conf import settings
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+def extrair_sigla_unidade(nome_unidade):
+    """
+    Extrai a sigla da unidade (última palavra entre parênteses ou após hífen)
+    Exemplos:
+    'Assessoria Especial de Assuntos Parlamentares e Federativos - ASPAF' -> 'ASPAF'
+    'Consultoria Jurídica - CONJUR' -> 'CONJUR'
+    'Cerimônial - CERIMONIAL' -> 'CERIMONIAL'
+    """
+    if not nome_unidade or nome_unidade == '-':
+        return nome_unidade
+
+    # Procurar por sigla entre parênteses no final
+    sigla_parenteses = re.search(r'\(([A-Z]+)\)$', nome_unidade.strip())
+    if sigla_parenteses:
+        return sigla_parenteses.group(1)
+
+    # Procurar por sigla após hífen
+    if ' - ' in nome_unidade:
+        partes = nome_unidade.split(' - ')
+        sigla_candidata = partes[-1].strip()
+        # Verificar se é uma sigla (só maiúsculas/números)
+        if re.match(r'^[A-Z0-9]+$', sigla_candidata):
+            return sigla_candidata
+
+    # Se não encontrou sigla específica, pegar a última palavra
+    palavras = nome_unidade.strip().split()
+    if palavras:
+        ultima_palavra = palavras[-1]
+        # Remove pontuação
+        ultima_palavra = re.sub(r'[^\w]', '', ultima_palavra)
+        return ultima_palavra.upper()
+
+    return nome_unidade
+
+
+# === ESTILOS (construídos uma vez por processo) ===
+
+@lru_cache(maxsize=None)
+def estilos_pdf():
+    """Estilos de parágrafo usados nos relatórios."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib import colors
+
+    styles = getSampleStyleSheet()
+    return {
+        'normal': styles['Normal'],
+        'titulo': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            spaceAfter=30,
+            alignment=1,  # Center
+            textColor=colors.HexColor('#2c5282')
+        ),
+        'subtitulo': ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Normal'],
+            fontSize=12,
+            spaceAfter=20,
+            alignment=1,
+            textColor=colors.HexColor('#718096')
+        ),
+        'rodape': ParagraphStyle(
+            'CustomFooter',
+            parent=styles['Normal'],
+            fontSize=9,
+            spaceAfter=10,
+            alignment=1,  # Center
+            textColor=colors.HexColor('#718096')
+        ),
+        # Estilo para células com quebra de linha
+        'celula': ParagraphStyle(
+            'CustomCell',
+            parent=styles['Normal'],
+            fontSize=9,
+            leading=11
+        ),
+    }
+
+
+@lru_cache(maxsize=None)
+def larguras_colunas(tipo):
+    """Larguras das colunas por tipo de relatório."""
+    from reportlab.lib.units import inch
+
+    larguras = {
+        'gratificacoes': [2.5*inch, 1.0*inch, 1.0*inch, 0.8*inch, 0.8*inch],  # Unidade, Pontos, GSISTE/GSISP, NS, NI
+        'iee': [1.3*inch, 1.2*inch, 1.3*inch, 1.0*inch, 1.4*inch],  # Unidade(sigla), Pontos, Colaboradores, IEE, Status
+        'idp': [1.3*inch, 1.2*inch, 1.3*inch, 1.0*inch, 1.4*inch],  # Unidade(sigla), Pontos, Colaboradores, IDP, Classificação
+        'siglario': [1.5*inch, 1.3*inch, 4.7*inch],  # Sigla, Código, Denominação
+    }
+    return larguras.get(tipo)
+
+
+@lru_cache(maxsize=None)
+def estilo_tabela(tipo, num_colunas):
+    """Modelo de estilo da tabela de dados (cabeçalho, grade, zebra e alinhamentos)."""
+    from reportlab.platypus import TableStyle
+    from reportlab.lib import colors
+
+    table_style = TableStyle([
+        # Cabeçalho
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 15),
+        ('TOPPADDING', (0, 0), (-1, 0), 15),
+        ('LEFTPADDING', (0, 0), (-1, 0), 8),
+        ('RIGHTPADDING', (0, 0), (-1, 0), 8),
+
+        # Dados
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e2e8f0')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('LEFTPADDING', (0, 1), (-1, -1), 8),
+        ('RIGHTPADDING', (0, 1), (-1, -1), 8),
+        ('TOPPADDING', (0, 1), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 10),
+
+        # Zebra stripes
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')])
+    ])
+
+    # Alinhamento específico por coluna
+    if tipo in ['gratificacoes', 'iee', 'idp']:
+        # Primeira coluna (Unidade) à esquerda
+        table_style.add('ALIGN', (0, 0), (0, -1), 'LEFT')
+        # Demais colunas (números) à direita
+        for col in range(1, num_colunas):
+            table_style.add('ALIGN', (col, 0), (col, -1), 'RIGHT')
+    elif tipo == 'siglario':
+        # Todas as colunas à esquerda para siglário
+        table_style.add('ALIGN', (0, 0), (-1, -1), 'LEFT')
+        # Código centralizado
+        table_style.add('ALIGN', (1, 0), (1, -1), 'CENTER')
+
+    return table_style
+
+
+# === TABELAS E DOCUMENTO ===
+
+def criar_tabela_dados_reportlab(dados, tipo):
+    """
+    Cria dados da tabela formatados para reportlab com quebra de linha automática:
+    o cabeçalho seguido das linhas, geradas à medida que a TabelaEmBlocos as
+    consome (None para tipos sem tabela)
+    """
+    from reportlab.platypus import Paragraph
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from xml.sax.saxutils import escape
+
+    cell_style = estilos_pdf()['celula']
+
+    if tipo == 'gratificacoes':
+        headers = ['Unidade', 'Pontos', 'GSISTE/GSISP', 'NS', 'NI']
+
+        def linhas():
+            for item in dados:
+                unidade_nome = str(item.get('unidade', '-'))
+                # Extrair só a sigla da unidade
+                sigla_unidade = extrair_sigla_unidade(unidade_nome)
+
+                row = [
+                    sigla_unidade,
+                    f"{item.get('pontos', 0):.2f}",
+                    f"{item.get('gsist', 0) + item.get('gsisp', 0)}",
+                    f"{item.get('ns', 0):.2f}",
+                    f"{item.get('ni', 0):.2f}"
+                ]
+                yield row
+
+    elif tipo == 'iee':
+        headers = ['Unidade', 'Pontos', 'Colaboradores', 'IEE', 'Status']
+
+        def linhas():
+            for item in dados:
+                unidade_nome = str(item.get('unidade', '-'))
+                # Extrair só a sigla da unidade
+                sigla_unidade = extrair_sigla_unidade(unidade_nome)
+
+                # Calcular status baseado no IEE
+                iee_valor = float(item.get('iee', 0))
+                if iee_valor > 1:
+                    status = 'Acima da Média'
+                elif iee_valor == 1:
+                    status = 'Na Média'
+                else:
+                    status = 'Abaixo da Média'
+
+                row = [
+                    sigla_unidade,
+                    f"{item.get('pontos', 0):.2f}",
+                    str(item.get('colaboradores', 0)),
+                    f"{item.get('iee', 0):.2f}",
+                    status
+                ]
+                yield row
+
+    elif tipo == 'idp':
+        headers = ['Unidade', 'Pontos', 'Colaboradores', 'IDP', 'Classificação']
+
+        def linhas():
+            # Ordenar dados por IDP (maior para menor) para classificação
+            dados_ordenados = sorted(dados, key=lambda x: float(x.get('idp', 0)), reverse=True)
+            total_itens = len(dados_ordenados)
+
+            for index, item in enumerate(dados_ordenados):
+                unidade_nome = str(item.get('unidade', '-'))
+                # Extrair só a sigla da unidade
+                sigla_unidade = extrair_sigla_unidade(unidade_nome)
+
+                # Calcular classificação baseada na posição (terços)
+                if index < total_itens / 3:
+                    classificacao = 'Alta Densidade'
+                elif index < (2 * total_itens) / 3:
+                    classificacao = 'Densidade Média'
+                else:
+                    classificacao = 'Baixa Densidade'
+
+                row = [
+                    sigla_unidade,
+                    f"{item.get('pontos', 0):.2f}",
+                    str(item.get('colaboradores', 0)),
+                    f"{item.get('idp', 0):.2f}",
+                    classificacao
+                ]
+                yield row
+
+    elif tipo == 'siglario':
+        headers = ['Sigla', 'Código', 'Denominação']
+        largura_util = larguras_colunas(tipo)[2] - 16  # descontar padding da célula
+
+        def linhas():
+            for item in dados:
+                denominacao_nome = str(item.get('denominacao_unidade', '-'))
+                # Paragraph (quebra automática) só quando o texto não cabe na coluna;
+                # texto simples é bem mais barato de medir e desenhar
+                if stringWidth(denominacao_nome, 'Helvetica', 9) > largura_util:
+                    denominacao_nome = Paragraph(escape(denominacao_nome), cell_style)
+
+                row = [
+                    str(item.get('sigla_unidade', '-')),
+                    str(item.get('codigo_unidade', '-')),
+                    denominacao_nome
+                ]
+                yield row
+
+    else:
+        return None
+
+    return chain([headers], linhas())
+
+
+class TabelaEmBlocos:
+    """
+    Tabela de dados dividida em blocos, todos com o cabeçalho. O documento
+    (_documento_relatorio) pede um bloco de cada vez, do tamanho do espaço que
+    resta no frame: cada bloco ocupa o resto da página e o reportlab mede
+    cada um separadamente, em vez de medir e dividir uma única tabela com
+    milhares de linhas. As linhas vêm de um iterador (criar_tabela_dados_reportlab)
+    e são lidas bloco a bloco: só as do bloco da página atual existem em memória.
+    """
+
+    def __init__(self, table_data, tipo):
+        table_data = iter(table_data)
+        self.cabecalho, self.linhas = next(table_data), table_data
+        self.tipo = tipo
+        self.blocos = 0
+        self._lidas = []  # já lidas do iterador e ainda não desenhadas (amostra de _medir)
+        self._alturas = None
+
+    def _medir(self):
+        """Alturas do cabeçalho e de uma linha de dados (a primeira), com o estilo da tabela."""
+        from reportlab.platypus import Table
+
+        if self._alturas is None:
+            if not self._lidas:
+                self._lidas = list(islice(self.linhas, 1))
+            amostra = Table([self.cabecalho] + self._lidas, colWidths=larguras_colunas(self.tipo))
+            amostra.setStyle(estilo_tabela(self.tipo, len(self.cabecalho)))
+            amostra.wrap(0, 0)
+            self._alturas = (amostra._rowHeights[0], amostra._rowHeights[-1])
+        return self._alturas
+
+    def linhas_que_cabem(self, altura_disponivel, altura_frame):
+        """
+        Linhas de dados que cabem, com o cabeçalho, em altura_disponivel (ou,
+        se nem uma cabe, num frame vazio: o bloco vai para a página seguinte).
+        Linhas com texto quebrado (siglário) são mais altas: o bloco passa do
+        espaço e o reportlab o divide, repetindo o cabeçalho.
+        RELATORIOS_PDF_LINHAS_POR_TABELA, se definido, fixa o valor.
+        """
+        fixo = getattr(settings, 'RELATORIOS_PDF_LINHAS_POR_TABELA', 0)
+        if fixo:
+            return max(fixo, 1)
+        altura_cabecalho, altura_linha = self._medir()
+        linhas = int((altura_disponivel - altura_cabecalho) // altura_linha)
+        if linhas < 1:
+            linhas = int((altura_frame - altura_cabecalho) // altura_linha)
+        return max(linhas, 1)
+
+    def proximo_bloco(self, altura_disponivel, altura_frame):
+        """Table com as próximas linhas, ou None quando acabaram."""
+        from reportlab.platypus import Table
+
+        quantidade = self.linhas_que_cabem(altura_disponivel, altura_frame)
+        linhas = self._lidas + list(islice(self.linhas, quantidade - len(self._lidas)))
+        self._lidas = []
+        # Sem linhas de dados, um único bloco só com o cabeçalho
+        if not linhas and self.blocos:
+            return None
+        self.blocos += 1
+        table = Table([self.cabecalho] + linhas, colWidths=larguras_colunas(self.tipo), repeatRows=1)
+        table.setStyle(estilo_tabela(self.tipo, len(self.cabecalho)))
+        return table
+
+
+@lru_cache(maxsize=None)
+def _documento_relatorio():
+    """
+    SimpleDocTemplate que substitui uma TabelaEmBlocos pelos seus blocos à
+    medida que o documento chega nela (filterFlowables é chamado antes de
+    cada elemento), cada um do tamanho do espaço livre no frame atual.
+    """
+    from reportlab.platypus import SimpleDocTemplate
+
+    class DocumentoRelatorio(SimpleDocTemplate):
+        def filterFlowables(self, flowables):
+            tabela = flowables[0]
+            if not isinstance(tabela, TabelaEmBlocos):
+                return
+            frame = getattr(self, 'frame', None)
+            altura_frame = frame._aH if frame else self.height
+            disponivel = frame._y - frame._y1p if frame else altura_frame
+            bloco = tabela.proximo_bloco(disponivel, altura_frame)
+            # None: o documento descarta o elemento e segue
+            flowables[0:1] = [bloco] if bloco is None else [bloco, tabela]
+
+    return DocumentoRelatorio
+
+
+def renderizar_pdf(tipo, context, destino):
+    """Renderiza o relatório em destino (caminho de arquivo ou buffer)."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import Paragraph, Spacer
+    from reportlab.lib.units import inch
+
+    estilos = estilos_pdf()
+    doc = _documento_relatorio()(destino, pagesize=A4, topMargin=1*inch, bottomMargin=1*inch)
+
+    # Elementos do documento
+    elements = []
+
+    # Título (sem informações de filtro)
+    elements.append(Paragraph(context['titulo'], estilos['titulo']))
+    elements.append(Spacer(1, 30))
+
+    # Tabela de dados, em blocos
+    if context.get('dados'):
+        table_data = criar_tabela_dados_reportlab(context['dados'], tipo)
+
+        if table_data:
+            elements.append(TabelaEmBlocos(table_data, tipo))
+    else:
+        elements.append(Paragraph("Nenhum dado encontrado para os critérios selecionados.", estilos['normal']))
+
+    # Adicionar "Gerado em:" no final com fonte menor
+    elements.append(Spacer(1, 20))
+    data_text = f"Gerado em: {context['data_geracao']}"
+    if context.get('totais', {}).get('total_registros'):
+        data_text += f" | Total de registros: {context['totais']['total_registros']}"
+    elements.append(Paragraph(data_text, estilos['rodape']))
+
+    doc.build(elements)
+
+
+def gerar_pdf_bytes(tipo, context):
+    """Renderiza o relatório e retorna o conteúdo do PDF."""
+    from io import BytesIO
+
+    buffer = BytesIO()
+    renderizar_pdf(tipo, context, buffer)
+    return buffer.getvalue()
+
+
+def nome_arquivo_pdf(tipo, filtro_unidade=''):
+    filtro_str = f"_{filtro_unidade}" if filtro_unidade else ""
+    return f"relatorio_{tipo}{filtro_str}.pdf"
+
+
+def gerar_pdf_com_reportlab(dados, tipo, filtro_unidade, context, chave=None):
+    """
+    Gera PDF usando reportlab (melhor compatibilidade Windows).
+    Se a chave for informada, o PDF é escrito direto no cache em disco e servido
+    a partir do arquivo.
+    """
+    if chave:
+        caminho = renderizar_em_cache(chave, tipo, context)
+        return resposta_pdf(caminho, nome_arquivo_pdf(tipo, filtro_unidade))
+
+    response = HttpResponse(gerar_pdf_bytes(tipo, context), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo_pdf(tipo, filtro_unidade)}"'
+    return response
+
+
+def resposta_pdf(caminho, nome_arquivo):
+    """
+    Resposta de download de um PDF do cache. Com RELATORIOS_PDF_X_ACCEL
+    (location interna do nginx) o arquivo é enviado pelo nginx, depois de a
+    view ter verificado o acesso; sem ele, pelo próprio Django.
+    """
+    from django.http import FileResponse
+
+    prefixo = getattr(settings, 'RELATORIOS_PDF_X_ACCEL', '')
+    if not prefixo:
+        return FileResponse(open(caminho, 'rb'), as_attachment=True, filename=nome_arquivo,
+                            content_type='application/pdf')
+    response = HttpResponse(content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    response['X-Accel-Redirect'] = prefixo.rstrip('/') + '/' + os.path.basename(caminho)
+    return response
+
+
+# === CACHE EM DISCO ===
+#
+# Fica fora de MEDIA_ROOT (que o nginx serve sem autenticação): os PDFs só
+# saem pela view de exportação. Cada chave tem até três arquivos no diretório:
+# <chave>.pdf (pronto), <chave>.processando (renderização em andamento, em
+# qualquer processo) e <chave>.erro (última renderização falhou).
+
+def _diretorio_cache():
+    diretorio = getattr(settings, 'RELATORIOS_PDF_DIR', None) or os.path.join(settings.BASE_DIR, 'cache', 'relatorios_pdf')
+    os.makedirs(diretorio, exist_ok=True)
+    return diretorio
+
+
+def chave_relatorio(tipo, filtros, versao):
+    """Chave do PDF: tipo do relatório, filtros aplicados e versão dos dados."""
+    bruto = json.dumps([tipo, sorted(filtros.items()), versao], ensure_ascii=False)
+    return f"{tipo}-{hashlib.sha1(bruto.encode('utf-8')).hexdigest()}"
+
+
+def caminho_pdf(chave, extensao='.pdf'):
+    return os.path.join(_diretorio_cache(), f"{chave}{extensao}")
+
+
+def obter_pdf_em_cache(chave):
+    """Caminho do PDF já renderizado para a chave, ou None."""
+    caminho = caminho_pdf(chave)
+    return caminho if os.path.exists(caminho) else None
+
+
+def _escrever_atomico(chave, escrever):
+    """Escreve num arquivo temporário do diretório de cache e o renomeia no fim."""
+    diretorio = _diretorio_cache()
+    fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            escrever(arquivo)
+        caminho = caminho_pdf(chave)
+        os.replace(temporario, caminho)
+    except Exception:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    limpar_cache()
+    return caminho
+
+
+def salvar_pdf(chave, conteudo):
+    """Grava o PDF de forma atômica (arquivo temporário + rename)."""
+    return _escrever_atomico(chave, lambda arquivo: arquivo.write(conteudo))
+
+
+def renderizar_em_cache(chave, tipo, context):
+    """Renderiza o PDF direto no arquivo do cache (sem montar o conteúdo em memória)."""
+    return _escrever_atomico(chave, lambda arquivo: renderizar_pdf(tipo, context, arquivo))
+
+
+def limpar_cache():
+    """
+    Remove do cache os PDFs mais antigos que RELATORIOS_PDF_IDADE_MAXIMA e,
+    se o total passar de RELATORIOS_PDF_TAMANHO_MAXIMO_MB, os menos recentes
+    até caber. Marcadores e temporários abandonados (processo que morreu no
+    meio da renderização) também saem. Retorna quantos arquivos removeu.
+    """
+    diretorio = _diretorio_cache()
+    agora = time.time()
+    idade_maxima = getattr(settings, 'RELATORIOS_PDF_IDADE_MAXIMA', 7 * 24 * 3600)
+    limite = getattr(settings, 'RELATORIOS_PDF_TAMANHO_MAXIMO_MB', 500) * 1024 * 1024
+
+    removidos = 0
+    pdfs = []
+    with os.scandir(diretorio) as entradas:
+        for entrada in entradas:
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            idade = agora - info.st_mtime
+            if entrada.name.endswith('.pdf') and idade <= idade_maxima:
+                pdfs.append((info.st_mtime, info.st_size, entrada.path))
+            elif entrada.name.endswith('.pdf') or idade > _tempo_maximo_renderizacao():
+                _remover(entrada.path)
+                removidos += 1
+
+    total = sum(tamanho for _, tamanho, _ in pdfs)
+    for _, tamanho, caminho in sorted(pdfs):
+        if total <= limite:
+            break
+        _remover(caminho)
+        total -= tamanho
+        removidos += 1
+    return removidos
+
+
+def _remover(caminho):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+
+
+# === RENDERIZAÇÃO EM SEGUNDO PLANO ===
+#
+# O estado de cada renderização fica nos arquivos de marcação do cache, não
+# na memória do processo: qualquer worker enxerga um PDF em andamento ou com
+# erro, e dois workers não renderizam a mesma chave.
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _tempo_maximo_renderizacao():
+    """Depois disso um marcador .processando é considerado abandonado."""
+    return getattr(settings, 'RELATORIOS_PDF_TEMPO_MAXIMO', 15 * 60)
+
+
+def _obter_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'RELATORIOS_PDF_WORKERS', 1),
+                thread_name_prefix='relatorios-pdf'
+            )
+        return _executor
+
+
+def _marcar_em_andamento(chave):
+    """Cria o marcador da chave; False se outro processo já a está renderizando."""
+    marcador = caminho_pdf(chave, '.processando')
+    try:
+        if time.time() - os.path.getmtime(marcador) > _tempo_maximo_renderizacao():
+            _remover(marcador)
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(marcador, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, 'w') as arquivo:
+        arquivo.write(str(os.getpid()))
+    return True
+
+
+def _renderizar(chave, tipo, context):
+    try:
+        renderizar_em_cache(chave, tipo, context)
+    except Exception as e:
+        logger.error(f"Erro ao gerar PDF {tipo} em segundo plano: {str(e)}")
+        with open(caminho_pdf(chave, '.erro'), 'w', encoding='utf-8') as arquivo:
+            arquivo.write(str(e))
+    finally:
+        _remover(caminho_pdf(chave, '.processando'))
+
+
+def renderizar_em_segundo_plano(chave, tipo, context):
+    """
+    Agenda a renderização do PDF. Os dados já devem estar em context (nenhum
+    acesso ao banco acontece na thread). Não agenda duas vezes a mesma chave,
+    nem em processos diferentes.
+    """
+    if not _marcar_em_andamento(chave):
+        return
+    _remover(caminho_pdf(chave, '.erro'))
+    try:
+        _obter_executor().submit(_renderizar, chave, tipo, context)
+    except Exception:
+        _remover(caminho_pdf(chave, '.processando'))
+        raise
+
+
+def status_renderizacao(chave):
+    """'pronto', 'processando', 'erro' ou None (nunca solicitado)."""
+    if obter_pdf_em_cache(chave):
+        return 'pronto'
+    try:
+        if time.time() - os.path.getmtime(caminho_pdf(chave, '.processando')) <= _tempo_maximo_renderizacao():
+            return 'processando'
+    except FileNotFoundError:
+        pass
+    if os.path.exists(caminho_pdf(chave, '.erro')):
+        return 'erro'
+    return None
@@ -0,0 +1,74 @@
+"""
+Roteamento de leituras para a réplica do banco (alias 'replica').
+
+Só as views marcadas com @ler_da_replica (relatórios, organograma e siglário,
+que apenas consultam) leem da réplica; todo o resto, inclusive qualquer
+escrita, fica no primário. Dentro de uma transação no primário as leituras
+também ficam nele, para enxergar o que a própria transação gravou.
+
+Sem DB_REPLICA_* configurado o alias não existe e o roteador não muda nada.
+A réplica pode estar alguns instantes atrás do primário: logo após uma
+importação, um relatório pode ser montado com os dados anteriores.
+"""
+
+import contextvars
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+
+# Ligada durante a execução das views marcadas com @ler_da_replica
+_usar_replica = contextvars.ContextVar('usar_replica', default=False)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+def ler_da_replica(view):
+    """Faz as leituras da view (sync ou async) irem para a réplica, se houver."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def _view(*args, **kwargs):
+            token = _usar_replica.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _usar_replica.reset(token)
+    else:
+        @wraps(view)
+        def _view(*args, **kwargs):
+            token = _usar_replica.set(True)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _usar_replica.reset(token)
+    return _view
+
+
+class RoteadorReplica:
+    """DATABASE_ROUTERS: leituras das views @ler_da_replica na réplica, o resto no primário."""
+
+    def db_for_read(self, model, **hints):
+        if (
+            _usar_replica.get()
+            and replica_configurada()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sem isto um objeto lido da réplica seria salvo nela
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # O esquema chega à réplica pela replicação
+        return db == DEFAULT_DB_ALIAS
@@ -9,6 +9,19 @@
  */
 
 document.addEventListener('DOMContentLoaded', function() {
+  // Aguardar os dados do organograma (carregados pelo template) antes de montar a página
+  const dadosPromise = window.carregarDadosOrganograma
+    ? window.carregarDadosOrganograma()
+    : Promise.resolve(window.organogramaData);
+  dadosPromise
+    .catch(err => {
+      console.error('Erro ao carregar dados do comparador:', err);
+      window.organogramaData = { core_unidadecargo: [], core_cargosiorg: [] };
+    })
+    .then(iniciarComparador);
+});
+
+function iniciarComparador() {
   console.log("Inicializando página do comparador");
   
   // Elementos DOM
@@ -1058,6 +1071,8 @@ document.addEventListener('DOMContentLoaded', function() {
    * @returns {number} - Valor numérico
    */
   function converterMoedaParaNumero(valorStr) {
+    // A API do índice já envia o valor numérico
+    if (typeof valorStr === 'number') return valorStr;
     if (!valorStr || typeof valorStr !== 'string') return 0;
     
     // Remove R$, pontos e substitui vírgula por ponto
@@ -3099,7 +3114,7 @@ document.addEventListener('DOMContentLoaded', function() {
   // Configurar funcionalidade após carregar DOM
   setupAdicionarCargo();
 
-});
+}
 
 // Adicionar estilos para os campos editáveis e destacar valores atualizados
 const style = document.createElement('style');
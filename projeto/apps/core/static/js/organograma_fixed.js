@@ -513,19 +513,17 @@ document.addEventListener('DOMContentLoaded', function() {
     const treeLayout = d3.tree().nodeSize([60, 200]).separation((a, b) => (a.parent === b.parent ? 1.2 : 1.8));
     window.treeLayout = treeLayout;
   
-    try {
-      if (window.organogramaData) {
-        console.log("Usando dados embutidos no HTML");
-        const data = window.organogramaData;
-        processarDados(data);
-      } else {
-        console.error("Dados do organograma não encontrados no template!");
-        exibirErro("Não foi possível carregar os dados do organograma. Tente atualizar a página.");
-      }
-    } catch (err) {
-      console.error('Erro ao processar dados do organograma:', err);
-      exibirErro("Ocorreu um erro ao processar os dados: " + err.message);
+    if (!window.carregarDadosOrganograma) {
+      console.error("Carregador dos dados do organograma não encontrado no template!");
+      exibirErro("Não foi possível carregar os dados do organograma. Tente atualizar a página.");
+      return;
     }
+    window.carregarDadosOrganograma()
+      .then(data => processarDados(data))
+      .catch(err => {
+        console.error('Erro ao processar dados do organograma:', err);
+        exibirErro("Ocorreu um erro ao processar os dados: " + err.message);
+      });
 });
 
 /* ============================================================
@@ -260,9 +260,11 @@ function processarDadosOrganograma(data) {
           // siorg.cargo é a chave como "FCE 1 15"
           // siorg.unitario são os pontos (anteriormente)
           // siorg.nivel é agora considerado a fonte dos pontos, conforme solicitado
-          // siorg.valor é a string R$ "XX.XXX,XX"
+          // siorg.valor é a string R$ "XX.XXX,XX" (organograma.json) ou o número (API do índice)
           let valorNumerico = 0;
-          if (siorg.valor && typeof siorg.valor === 'string') {
+          if (typeof siorg.valor === 'number') {
+            valorNumerico = siorg.valor;
+          } else if (siorg.valor && typeof siorg.valor === 'string') {
             valorNumerico = parseFloat(siorg.valor.replace("R$", "").replace(/\./g, "").replace(",", ".").trim());
           }
           // Atualizado para usar siorg.nivel para pontos
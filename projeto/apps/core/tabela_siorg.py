@@ -0,0 +1,333 @@
+"""
+Importação da tabela de remuneração dos cargos SIORG (CCE/FCE).
+
+A tabela oficial (CSV, ou ZIP com CSVs) é lida sem navegador e convertida em
+valores numéricos. aplicar_tabela() compara a tabela com os CargoSIORG atuais
+e grava só as diferenças, com bulk_create/bulk_update numa única transação, e
+registra cada valor em VigenciaCargoSIORG com o período em que vigorou.
+Operações em lote não disparam sinais: a versão dos dados e o organograma.json
+são invalidados uma única vez, após o commit, e só se algo mudou.
+"""
+
+import csv
+import io
+import logging
+import os
+import re
+import unicodedata
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Tabela em vigor distribuída com o sistema (usada pela ação do admin sem arquivo)
+TABELA_PADRAO = Path(__file__).resolve().parent / 'dados' / 'tabela_siorg.csv'
+
+CENTAVOS = Decimal('0.01')
+
+# "CCE 1.18", "CCE-1.18", "CCE 1 18" -> "CCE 1 18"
+PADRAO_CARGO = re.compile(r'^\s*([A-Za-z]{2,4})\s*-?\s*(\d{1,2})\s*[.\-\s]\s*(\d{1,2})\s*$')
+
+
+@dataclass(frozen=True)
+class LinhaTabela:
+    cargo: str
+    valor: Decimal
+    unitario: Optional[Decimal]
+    vigente_desde: Optional[date] = None
+
+
+def normalizar_cargo(texto):
+    """Código do cargo no formato usado em CargoSIORG ("CCE 1 18")."""
+    encontrado = PADRAO_CARGO.match(texto or '')
+    if not encontrado:
+        return ' '.join((texto or '').split())
+    tipo, categoria, nivel = encontrado.groups()
+    return f"{tipo.upper()} {int(categoria)} {int(nivel):02d}"
+
+
+def decompor_cargo(texto):
+    """"CCE 1 18" -> ('CCE', 1, 18); ('', None, None) se o código não segue o padrão."""
+    encontrado = PADRAO_CARGO.match(texto or '')
+    if not encontrado:
+        return '', None, None
+    tipo, categoria, nivel = encontrado.groups()
+    return tipo.upper(), int(categoria), int(nivel)
+
+
+def valor_para_decimal(texto):
+    """'R$ 24.553,28', '24553,28' ou '24553.28' -> Decimal('24553.28')."""
+    if isinstance(texto, (int, float, Decimal)):
+        return Decimal(str(texto))
+    limpo = re.sub(r'[^\d,.\-]', '', texto or '')
+    if ',' in limpo:
+        limpo = limpo.replace('.', '').replace(',', '.')
+    elif limpo.count('.') > 1:
+        limpo = limpo.replace('.', '')
+    try:
+        return Decimal(limpo)
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {texto!r}")
+
+
+def formatar_valor(valor):
+    """Decimal('24553.28') -> 'R$ 24.553,28' (formato de CargoSIORG.valor)."""
+    texto = f"{valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+    return f"R$ {texto}"
+
+
+def _data(texto):
+    texto = texto.strip()
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Data inválida: {texto!r}")
+
+
+def _normalizar_cabecalho(texto):
+    sem_acento = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', sem_acento.lower()).split())
+
+
+def _mapear_colunas(cabecalho):
+    """Índice de cada campo no cabeçalho ({'cargo': 0, 'valor': 1, ...})."""
+    # Ordem importa: "Valor unitário" é unitário, não valor
+    regras = (
+        ('unitario', ('unitario', 'fator')),
+        ('vigencia', ('vigencia', 'vigente')),
+        ('valor', ('valor', 'remuneracao')),
+        ('cargo', ('cargo', 'codigo', 'funcao', 'sigla')),
+    )
+    colunas = {}
+    for indice, titulo in enumerate(cabecalho):
+        palavras = _normalizar_cabecalho(titulo).split()
+        for campo, chaves in regras:
+            if campo not in colunas and any(chave in palavras for chave in chaves):
+                colunas[campo] = indice
+                break
+    return colunas
+
+
+def _decodificar(dados):
+    # Arquivos do governo costumam vir em Latin-1
+    try:
+        return dados.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return dados.decode('latin-1')
+
+
+def _ler_csv(dados, nome):
+    texto = _decodificar(dados)
+    primeira_linha = texto.split('\n', 1)[0]
+    delimitador = ';' if ';' in primeira_linha else '\t' if '\t' in primeira_linha else ','
+    leitor = csv.reader(io.StringIO(texto), delimiter=delimitador)
+    cabecalho = next(leitor, None) or []
+    colunas = _mapear_colunas(cabecalho)
+    if 'cargo' not in colunas or 'valor' not in colunas:
+        raise ValueError(f"{nome}: colunas de cargo e valor não encontradas no cabeçalho {cabecalho}")
+
+    linhas = []
+    for numero, registro in enumerate(leitor, start=2):
+        if not any(campo.strip() for campo in registro):
+            continue
+        try:
+            unitario = registro[colunas['unitario']].strip() if 'unitario' in colunas else ''
+            vigencia = registro[colunas['vigencia']].strip() if 'vigencia' in colunas else ''
+            linhas.append(LinhaTabela(
+                cargo=normalizar_cargo(registro[colunas['cargo']]),
+                valor=valor_para_decimal(registro[colunas['valor']]).quantize(CENTAVOS),
+                unitario=valor_para_decimal(unitario).quantize(CENTAVOS) if unitario else None,
+                vigente_desde=_data(vigencia) if vigencia else None,
+            ))
+        except (ValueError, IndexError) as e:
+            raise ValueError(f"{nome}, linha {numero}: {e}")
+    return linhas
+
+
+def ler_conteudo(dados, nome=''):
+    """Linhas da tabela a partir do conteúdo de um CSV ou de um ZIP com CSVs."""
+    if zipfile.is_zipfile(io.BytesIO(dados)):
+        linhas = []
+        with zipfile.ZipFile(io.BytesIO(dados)) as arquivo_zip:
+            membros = sorted(n for n in arquivo_zip.namelist() if n.lower().endswith('.csv'))
+            if not membros:
+                raise ValueError(f"{nome}: ZIP sem CSV")
+            for membro in membros:
+                linhas.extend(_ler_csv(arquivo_zip.read(membro), f"{nome}:{membro}"))
+        return linhas
+    return _ler_csv(dados, nome)
+
+
+def ler_tabela(caminho):
+    """Linhas da tabela de um arquivo CSV ou ZIP."""
+    with open(caminho, 'rb') as f:
+        return ler_conteudo(f.read(), os.path.basename(caminho))
+
+
+def _nivel(unitario):
+    # CargoSIORG.nivel guarda o valor unitário como texto ("7.65")
+    return f"{unitario:.2f}"
+
+
+def _valor_atual(cargo):
+    try:
+        return valor_para_decimal(cargo.valor)
+    except ValueError:
+        return None
+
+
+def _invalidar_caches():
+    from . import versao_dados
+    from .dados_json_update import atualizar_json_ao_modificar_modelo
+    from .models import CargoSIORG
+
+    versao_dados.nova_versao()
+    atualizar_json_ao_modificar_modelo(sender=CargoSIORG)
+
+
+def aplicar_tabela(linhas, vigente_desde=None, fonte='', remover_ausentes=True):
+    """
+    Atualiza CargoSIORG com a tabela e registra as vigências.
+
+    Cargos novos são criados, os de valor diferente são alterados e, com
+    remover_ausentes, os que não estão na tabela são removidos; cada mudança
+    encerra a vigência anterior do cargo na data de início da nova
+    (vigente_desde da linha ou do argumento; padrão: hoje). Retorna um resumo
+    com as quantidades de cargos criados, alterados, removidos e inalterados.
+    """
+    from .models import CargoSIORG, VigenciaCargoSIORG, excluir_em_lote
+
+    hoje = timezone.localdate()
+    vigente_desde = vigente_desde or hoje
+
+    tabela = {}
+    for linha in linhas:
+        anterior = tabela.get(linha.cargo)
+        if anterior is not None and (anterior.valor, anterior.unitario) != (linha.valor, linha.unitario):
+            raise ValueError(f"Cargo {linha.cargo} repetido na tabela com valores diferentes")
+        if (linha.vigente_desde or vigente_desde) > hoje:
+            raise ValueError(f"Vigência futura para {linha.cargo}: importe a tabela a partir da data de início")
+        tabela[linha.cargo] = linha
+    if not tabela:
+        raise ValueError("Tabela sem cargos")
+    # Cargos fora da tabela deixam de vigorar quando a tabela passa a vigorar
+    inicio_tabela = min(linha.vigente_desde or vigente_desde for linha in tabela.values())
+
+    resumo = {'criados': 0, 'alterados': 0, 'removidos': 0, 'inalterados': 0}
+    agora = timezone.now()
+    with transaction.atomic():
+        atuais = {}
+        remover = []
+        for cargo in CargoSIORG.objects.select_for_update().order_by('id'):
+            if cargo.cargo in atuais:
+                remover.append(cargo.pk)  # duplicado de importações antigas
+            else:
+                atuais[cargo.cargo] = cargo
+        abertas = {
+            vigencia.cargo: vigencia
+            for vigencia in VigenciaCargoSIORG.objects.select_for_update().filter(vigente_ate__isnull=True)
+        }
+
+        criar, alterar = [], []
+        novas_vigencias, encerrar_vigencias, corrigir_vigencias = [], [], []
+
+        def registrar_vigencia(codigo, valor, unitario, inicio):
+            aberta = abertas.get(codigo)
+            if aberta is not None and inicio < aberta.vigente_desde:
+                raise ValueError(
+                    f"Cargo {codigo}: vigência {inicio:%d/%m/%Y} anterior à atual ({aberta.vigente_desde:%d/%m/%Y})"
+                )
+            if aberta is not None and inicio == aberta.vigente_desde:
+                # Correção no mesmo dia: substitui o valor da vigência
+                aberta.valor, aberta.unitario, aberta.fonte = valor, unitario, fonte
+                corrigir_vigencias.append(aberta)
+                return
+            if aberta is not None:
+                aberta.vigente_ate = inicio
+                encerrar_vigencias.append(aberta)
+            novas_vigencias.append(VigenciaCargoSIORG(
+                cargo=codigo, valor=valor, unitario=unitario, vigente_desde=inicio, fonte=fonte,
+            ))
+
+        for codigo, linha in tabela.items():
+            inicio = linha.vigente_desde or vigente_desde
+            atual = atuais.get(codigo)
+            if linha.unitario is not None:
+                unitario = linha.unitario
+            else:
+                unitario = Decimal(atual.unitario).quantize(CENTAVOS) if atual else Decimal('0.00')
+
+            if atual is None:
+                novo = CargoSIORG(
+                    cargo=codigo, nivel=_nivel(unitario), quantidade=1,
+                    valor=formatar_valor(linha.valor), unitario=unitario,
+                )
+                novo.preencher_campos_numericos()
+                criar.append(novo)
+                resumo['criados'] += 1
+            elif (
+                _valor_atual(atual) == linha.valor and Decimal(atual.unitario) == unitario
+                and atual.valor_decimal == linha.valor
+            ):
+                resumo['inalterados'] += 1
+                if codigo not in abertas:
+                    registrar_vigencia(codigo, linha.valor, unitario, inicio)
+                continue
+            else:
+                atual.valor = formatar_valor(linha.valor)
+                atual.unitario = unitario
+                atual.nivel = _nivel(unitario)
+                atual.data_atualizacao = agora
+                atual.preencher_campos_numericos()
+                alterar.append(atual)
+                resumo['alterados'] += 1
+            registrar_vigencia(codigo, linha.valor, unitario, inicio)
+
+        if remover_ausentes:
+            for codigo, atual in atuais.items():
+                if codigo in tabela:
+                    continue
+                remover.append(atual.pk)
+                resumo['removidos'] += 1
+                aberta = abertas.get(codigo)
+                if aberta is not None:
+                    aberta.vigente_ate = max(inicio_tabela, aberta.vigente_desde)
+                    encerrar_vigencias.append(aberta)
+
+        CargoSIORG.objects.bulk_create(criar)
+        CargoSIORG.objects.bulk_update(alterar, [
+            'valor', 'unitario', 'nivel', 'data_atualizacao',
+            'valor_decimal', 'tipo_cargo', 'categoria', 'nivel_cargo',
+        ])
+        if remover:
+            # DELETE direto, sem sinais por linha (caches invalidados abaixo)
+            excluir_em_lote(CargoSIORG.objects.filter(pk__in=remover))
+        VigenciaCargoSIORG.objects.bulk_update(encerrar_vigencias, ['vigente_ate'])
+        VigenciaCargoSIORG.objects.bulk_update(corrigir_vigencias, ['valor', 'unitario', 'fonte'])
+        VigenciaCargoSIORG.objects.bulk_create(novas_vigencias)
+
+        if criar or alterar or remover:
+            transaction.on_commit(_invalidar_caches)
+
+    logger.info(
+        "Tabela SIORG aplicada (%s): %s criados, %s alterados, %s removidos, %s inalterados",
+        fonte or 'sem fonte', resumo['criados'], resumo['alterados'], resumo['removidos'], resumo['inalterados']
+    )
+    return resumo
+
+
+def importar_arquivo(caminho, vigente_desde=None, remover_ausentes=True):
+    """Lê um CSV/ZIP e aplica a tabela; retorna o resumo de aplicar_tabela."""
+    return aplicar_tabela(
+        ler_tabela(caminho), vigente_desde=vigente_desde,
+        fonte=os.path.basename(str(caminho)), remover_ausentes=remover_ausentes
+    )
@@ -1,3 +1,1056 @@
-from django.test import TestCase
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings as settings_projeto
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import (
+    catalogo_unidades, desempenho, importacao, indice_organograma, relatorios_pdf, roteador_banco, tabela_siorg,
+    tipos_usuario, versao_dados,
+)
+from .models import (
+    CargoSIORG, ContadorNotificacoes, GeracaoDados, NotificacaoSimulacao, UnidadeCargo, VersaoDataset,
+    VigenciaCargoSIORG, excluir_em_lote,
+)
+from .roteador_banco import RoteadorReplica, ler_da_replica
+
+
+class VersaoDadosTests(TestCase):
+
+    def setUp(self):
+        versao_dados.descartar_versao_local()
+
+    def tearDown(self):
+        versao_dados.descartar_versao_local()
+
+    @override_settings(VERSAO_DADOS_TTL=0)
+    def test_incremento_de_outro_worker_visivel_com_cache_vazio(self):
+        versao = versao_dados.versao_atual()
+        # Outro worker incrementa a versão; o cache deste processo é perdido
+        GeracaoDados.objects.filter(pk=1).update(numero=F('numero') + 1)
+        cache.clear()
+        self.assertEqual(versao_dados.versao_atual(), versao + 1)
+
+    def test_valor_local_reaproveitado_dentro_do_ttl(self):
+        versao = versao_dados.versao_atual()
+        GeracaoDados.objects.filter(pk=1).update(numero=F('numero') + 1)
+        self.assertEqual(versao_dados.versao_atual(), versao)
+        versao_dados.descartar_versao_local()
+        self.assertEqual(versao_dados.versao_atual(), versao + 1)
+
+    def test_nova_versao_so_apos_o_commit(self):
+        versao = versao_dados.versao_atual()
+        with self.captureOnCommitCallbacks(execute=True):
+            versao_dados.nova_versao()
+            self.assertEqual(GeracaoDados.objects.get(pk=1).numero, versao)
+        self.assertEqual(versao_dados.versao_atual(), versao + 1)
+
+    def test_nova_versao_descartada_no_rollback(self):
+        versao = versao_dados.versao_atual()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    versao_dados.nova_versao()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(versao_dados.versao_atual(), versao)
+
+
+def _cargos(quantidade, unidades=3):
+    return [
+        dict(
+            nivel_hierarquico=1, tipo_unidade='Coordenação', denominacao_unidade=f'Unidade {i}',
+            codigo_unidade=str(1000 + i), sigla_unidade=f'U{i}', categoria_unidade='Unidade',
+            orgao_entidade='Ministério', tipo_cargo='CCE', denominacao='Coordenador',
+            complemento_denominacao='', categoria=1, nivel=10, quantidade=quantidade,
+            grafo=f'1-{1000 + i}', sigla=f'U{i}',
+        )
+        for i in range(unidades)
+    ]
+
+
+class ImportacaoVersionadaTests(TestCase):
+
+    def setUp(self):
+        versao_dados.descartar_versao_local()
+
+    def importar(self, registros, origem='planilha'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return importacao.importar('unidades', registros, origem=origem)
+
+    def test_reimportar_sem_mudanca_nao_grava(self):
+        self.importar(_cargos(1))
+        with self.assertNumQueries(4):
+            resumo = self.importar(_cargos(1))
+        self.assertFalse(importacao.houve_mudanca(resumo))
+        self.assertEqual(resumo['inalterados'], 3)
+        self.assertEqual(VersaoDataset.objects.count(), 1)
+
+    def test_nova_versao_substitui_a_ativa(self):
+        self.importar(_cargos(1))
+        resumo = self.importar(_cargos(2, unidades=2))
+        self.assertEqual((resumo['alterados'], resumo['removidos']), (2, 1))
+        self.assertEqual(importacao.versao_ativa('unidades'), 2)
+        self.assertEqual(sorted(UnidadeCargo.objects.values_list('quantidade', flat=True)), [2, 2])
+        self.assertEqual(UnidadeCargo.todas_versoes.count(), 5)
+
+    def test_ativar_versao_anterior_so_troca_o_ponteiro(self):
+        self.importar(_cargos(1))
+        self.importar(_cargos(2))
+        versao = versao_dados.versao_atual()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(5):
+                importacao.ativar_versao('unidades', 1)
+        self.assertEqual(sorted(UnidadeCargo.objects.values_list('quantidade', flat=True)), [1, 1, 1])
+        self.assertEqual(UnidadeCargo.todas_versoes.count(), 6)
+        self.assertGreater(versao_dados.versao_atual(), versao)
+
+    def test_cargos_manuais_visiveis_em_todas_as_versoes(self):
+        usuario = User.objects.create_user('gestor')
+        self.importar(_cargos(1))
+        UnidadeCargo.objects.create(**{**_cargos(5, unidades=1)[0], 'usuario': usuario})
+        self.importar(_cargos(2))
+        importacao.ativar_versao('unidades', 1)
+        self.assertTrue(UnidadeCargo.objects.filter(usuario=usuario).exists())
+        self.assertEqual(UnidadeCargo.objects.filter(usuario__isnull=True).count(), 3)
+
+    def test_dados_sem_versao_viram_a_primeira_versao(self):
+        UnidadeCargo.objects.bulk_create(UnidadeCargo(**registro) for registro in _cargos(1))
+        resumo = self.importar(_cargos(1))
+        self.assertFalse(importacao.houve_mudanca(resumo))
+        self.assertEqual(importacao.versao_ativa('unidades'), 1)
+        self.assertEqual(UnidadeCargo.objects.count(), 3)
+
+    @override_settings(VERSOES_DATASET_MANTIDAS=2)
+    def test_versoes_antigas_removidas(self):
+        for quantidade in range(1, 5):
+            self.importar(_cargos(quantidade))
+        self.assertEqual(list(VersaoDataset.objects.values_list('numero', flat=True)), [4, 3])
+        self.assertEqual(UnidadeCargo.todas_versoes.count(), 6)
+
+    def estado(self, numero):
+        linhas = UnidadeCargo.todas_versoes.na_versao(numero)
+        return sorted(linhas.values_list('codigo_unidade', 'quantidade'))
+
+    def test_nova_versao_grava_so_as_diferencas(self):
+        self.importar(_cargos(1, unidades=50))
+        registros = _cargos(1, unidades=50)
+        registros[0]['quantidade'] = 7
+        del registros[1]
+        ids = set(UnidadeCargo.objects.values_list('pk', flat=True))
+        resumo = self.importar(registros)
+        self.assertEqual((resumo['alterados'], resumo['removidos'], resumo['inalterados']), (1, 1, 48))
+        # Uma linha nova (a alterada); as 48 inalteradas são as mesmas linhas
+        self.assertEqual(UnidadeCargo.todas_versoes.count(), 51)
+        self.assertEqual(len(ids & set(UnidadeCargo.objects.values_list('pk', flat=True))), 48)
+        self.assertEqual(self.estado(1), sorted((str(1000 + i), 1) for i in range(50)))
+        self.assertEqual(sorted(UnidadeCargo.objects.values_list('codigo_unidade', 'quantidade')), self.estado(2))
+        self.assertIn(('1000', 7), self.estado(2))
+
+    def test_importar_depois_de_voltar_a_versao_anterior(self):
+        self.importar(_cargos(1))
+        self.importar(_cargos(2))
+        importacao.ativar_versao('unidades', 1)
+        registros = _cargos(1)
+        registros[2]['quantidade'] = 3
+        resumo = self.importar(registros)
+        self.assertEqual((resumo['alterados'], resumo['inalterados']), (1, 2))
+        self.assertEqual(importacao.versao_ativa('unidades'), 3)
+        self.assertEqual(self.estado(3), [('1000', 1), ('1001', 1), ('1002', 3)])
+        self.assertEqual(self.estado(2), [('1000', 2), ('1001', 2), ('1002', 2)])
+        self.assertEqual(self.estado(1), [('1000', 1), ('1001', 1), ('1002', 1)])
+
+    def test_limpar_servidores_cria_versao_vazia(self):
+        from django.contrib.admin.sites import AdminSite
+        from django.test import RequestFactory
+        from .admin import RelatorioGratificacoesAdmin
+        from .models import RelatorioGratificacoes
+
+        servidores = [
+            dict({campo: '' for campo in importacao.CONJUNTOS['servidores']['campos']}, matricula_siape=str(i))
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            importacao.importar('servidores', servidores)
+        request = RequestFactory().post('/')
+        request.user = User.objects.create_user('admin')
+        admin = RelatorioGratificacoesAdmin(RelatorioGratificacoes, AdminSite())
+        with mock.patch.object(admin, 'message_user'), self.captureOnCommitCallbacks(execute=True):
+            admin.limpar_todos_registros(request, RelatorioGratificacoes.objects.all())
+        self.assertFalse(RelatorioGratificacoes.objects.exists())
+        importacao.ativar_versao('servidores', 1)
+        self.assertEqual(RelatorioGratificacoes.objects.count(), 3)
+
+    def test_ativar_versao_inexistente(self):
+        with self.assertRaises(ValueError):
+            importacao.ativar_versao('unidades', 99)
+
+
+class RelatoriosPdfCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = diretorio.name
+        configuracao = override_settings(RELATORIOS_PDF_DIR=self.diretorio)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def envelhecer(self, caminho, segundos):
+        instante = time.time() - segundos
+        os.utime(caminho, (instante, instante))
+
+    def test_diretorio_padrao_fora_de_media_root(self):
+        self.assertFalse(
+            os.path.abspath(settings_projeto.RELATORIOS_PDF_DIR).startswith(os.path.abspath(settings_projeto.MEDIA_ROOT))
+        )
+
+    def test_renderizacao_em_andamento_visivel_para_outros_processos(self):
+        self.assertTrue(relatorios_pdf._marcar_em_andamento('chave'))
+        # Outro worker: nenhum estado em memória, só o diretório
+        self.assertFalse(relatorios_pdf._marcar_em_andamento('chave'))
+        self.assertEqual(relatorios_pdf.status_renderizacao('chave'), 'processando')
+
+    @override_settings(RELATORIOS_PDF_TEMPO_MAXIMO=60)
+    def test_marcador_abandonado_nao_bloqueia(self):
+        relatorios_pdf._marcar_em_andamento('chave')
+        self.envelhecer(relatorios_pdf.caminho_pdf('chave', '.processando'), 120)
+        self.assertIsNone(relatorios_pdf.status_renderizacao('chave'))
+        self.assertTrue(relatorios_pdf._marcar_em_andamento('chave'))
+
+    def test_erro_registrado_em_disco(self):
+        relatorios_pdf._marcar_em_andamento('chave')
+        with self.assertLogs('apps.core.relatorios_pdf', 'ERROR'):
+            relatorios_pdf._renderizar('chave', 'gratificacoes', {})
+        self.assertEqual(relatorios_pdf.status_renderizacao('chave'), 'erro')
+        self.assertTrue(relatorios_pdf._marcar_em_andamento('chave'))
+
+    @override_settings(RELATORIOS_PDF_IDADE_MAXIMA=3600)
+    def test_pdfs_antigos_removidos(self):
+        antigo = relatorios_pdf.salvar_pdf('antigo', b'%PDF')
+        self.envelhecer(antigo, 7200)
+        relatorios_pdf.salvar_pdf('novo', b'%PDF')
+        self.assertIsNone(relatorios_pdf.obter_pdf_em_cache('antigo'))
+        self.assertIsNotNone(relatorios_pdf.obter_pdf_em_cache('novo'))
+
+    @override_settings(RELATORIOS_PDF_TAMANHO_MAXIMO_MB=1)
+    def test_cache_limitado_por_tamanho(self):
+        for idade, chave in enumerate(['novo', 'medio', 'antigo']):
+            caminho = relatorios_pdf.caminho_pdf(chave)
+            with open(caminho, 'wb') as arquivo:
+                arquivo.write(b'0' * 400 * 1024)
+            self.envelhecer(caminho, idade * 10)
+        self.assertEqual(relatorios_pdf.limpar_cache(), 1)
+        self.assertEqual(sorted(os.listdir(self.diretorio)), ['medio.pdf', 'novo.pdf'])
+
+    def test_bloco_ocupa_o_espaco_livre_da_pagina(self):
+        from reportlab.lib.pagesizes import A4
+
+        dados = [{'unidade': f'Unidade {i} - U{i}', 'pontos': i} for i in range(200)]
+        table_data = relatorios_pdf.criar_tabela_dados_reportlab(dados, 'gratificacoes')
+        tabela = relatorios_pdf.TabelaEmBlocos(table_data, 'gratificacoes')
+        altura_frame = A4[1] - 2 * 72 - 12
+        for disponivel in (altura_frame, altura_frame / 2):
+            altura_bloco = tabela.proximo_bloco(disponivel, altura_frame).wrap(0, 0)[1]
+            # Cabe no espaço livre e uma linha a mais não caberia
+            self.assertLessEqual(altura_bloco, disponivel)
+            self.assertGreater(altura_bloco + tabela._medir()[1], disponivel)
+        # Sem espaço nem para o cabeçalho e uma linha: bloco de um frame inteiro
+        self.assertEqual(tabela.linhas_que_cabem(10, altura_frame), tabela.linhas_que_cabem(altura_frame, altura_frame))
+
+    def test_linhas_lidas_bloco_a_bloco(self):
+        lidas = []
+
+        def dados():
+            for i in range(200):
+                lidas.append(i)
+                yield {'unidade': f'U{i}', 'pontos': i}
+
+        tabela = relatorios_pdf.TabelaEmBlocos(relatorios_pdf.criar_tabela_dados_reportlab(dados(), 'gratificacoes'), 'gratificacoes')
+        with override_settings(RELATORIOS_PDF_LINHAS_POR_TABELA=30):
+            blocos = [tabela.proximo_bloco(0, 0)]
+            self.assertEqual(len(lidas), 30)
+            while blocos[-1] is not None:
+                blocos.append(tabela.proximo_bloco(0, 0))
+        self.assertEqual([len(bloco._cellvalues) - 1 for bloco in blocos[:-1]], [30] * 6 + [20])
+        vazia = relatorios_pdf.TabelaEmBlocos(relatorios_pdf.criar_tabela_dados_reportlab([], 'iee'), 'iee')
+        self.assertEqual(len(vazia.proximo_bloco(500, 500)._cellvalues), 1)
+        self.assertIsNone(vazia.proximo_bloco(500, 500))
+
+    @override_settings(RELATORIOS_PDF_X_ACCEL='/relatorios_pdf_interno/')
+    def test_download_pelo_nginx(self):
+        caminho = relatorios_pdf.salvar_pdf('chave', b'%PDF')
+        response = relatorios_pdf.resposta_pdf(caminho, 'relatorio.pdf')
+        self.assertEqual(response['X-Accel-Redirect'], '/relatorios_pdf_interno/chave.pdf')
+        self.assertEqual(response.content, b'')
+
+
+class NotificacoesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('servidor')
+        self.client.force_login(self.usuario)
+
+    def criar(self, quantidade):
+        NotificacaoSimulacao.objects.bulk_create(
+            NotificacaoSimulacao(usuario=self.usuario, tipo='nova_solicitacao', titulo=f'N{i}', mensagem='')
+            for i in range(quantidade)
+        )
+
+    def test_cursor_percorre_todas_as_novas(self):
+        self.criar(45)
+        recebidas, cursor, mais = [], 0, True
+        while mais:
+            dados = self.client.get(reverse('minhas_notificacoes'), {'since': cursor}).json()
+            recebidas += [n['id'] for n in dados['notificacoes']]
+            cursor, mais = dados['cursor'], dados['mais']
+        self.assertEqual(recebidas, sorted(NotificacaoSimulacao.objects.values_list('id', flat=True)))
+        self.assertEqual(len(recebidas), 45)
+
+    def nao_lidas(self):
+        return ContadorNotificacoes.objects.get(usuario=self.usuario).nao_lidas
+
+    def test_contador_acompanha_linhas_alteradas(self):
+        self.criar(3)
+        primeira = NotificacaoSimulacao.objects.filter(usuario=self.usuario).order_by('id')[:1]
+        notificacao = NotificacaoSimulacao.objects.filter(pk__in=list(primeira.values_list('pk', flat=True)))
+        self.assertEqual(notificacao.marcar_lidas(), 1)
+        self.assertEqual(notificacao.marcar_lidas(), 0)
+        self.assertEqual(self.nao_lidas(), 2)
+        self.assertEqual(NotificacaoSimulacao.objects.filter(usuario=self.usuario).excluir(), 3)
+        self.assertEqual(self.nao_lidas(), 0)
+        self.assertEqual(NotificacaoSimulacao.objects.filter(usuario=self.usuario).excluir(), 0)
+        self.assertEqual(self.nao_lidas(), 0)
+
+    def test_operacoes_em_lote_nao_crescem_com_os_usuarios(self):
+        def consultas(quantidade_usuarios):
+            usuarios = [User.objects.create_user(f'u{quantidade_usuarios}-{i}') for i in range(quantidade_usuarios)]
+            NotificacaoSimulacao.objects.notificar([u.pk for u in usuarios], tipo='nova_solicitacao', titulo='N', mensagem='')
+            NotificacaoSimulacao.objects.notificar([u.pk for u in usuarios[:1]], tipo='nova_solicitacao', titulo='M', mensagem='')
+            notificacoes = NotificacaoSimulacao.objects.filter(usuario__in=usuarios)
+            with CaptureQueriesContext(connection) as lidas:
+                self.assertEqual(notificacoes.filter(titulo='N').marcar_lidas(), quantidade_usuarios)
+            contadores = ContadorNotificacoes.objects.filter(usuario__in=usuarios).order_by('usuario_id')
+            self.assertEqual([c.nao_lidas for c in contadores], [1] + [0] * (quantidade_usuarios - 1))
+            with CaptureQueriesContext(connection) as excluidas:
+                self.assertEqual(notificacoes.excluir(), quantidade_usuarios + 1)
+            self.assertEqual(sum(c.nao_lidas for c in contadores.all()), 0)
+            return len(lidas), len(excluidas)
+
+        self.assertEqual(consultas(2), consultas(5))
+
+    def test_excluir_em_lote_recusa_modelos_referenciados(self):
+        with self.assertRaises(ValueError):
+            excluir_em_lote(User.objects.all())
+
+    def test_long_poll_sob_wsgi_responde_na_hora(self):
+        inicio = time.monotonic()
+        response = self.client.get(reverse('aguardar_notificacoes'), {'timeout': 5})
+        self.assertLess(time.monotonic() - inicio, 2)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Retry-After'], '5')
+
+    @override_settings(NOTIFICACOES_LONG_POLL_INTERVALO=0.05)
+    async def test_long_poll_sob_asgi_espera(self):
+        await self.async_client.aforce_login(self.usuario)
+        inicio = time.monotonic()
+        response = await self.async_client.get(reverse('aguardar_notificacoes'), {'timeout': 0.3})
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.3)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotIn('Retry-After', response)
+
+
+class RoteadorReplicaTests(SimpleTestCase):
+
+    def setUp(self):
+        self.roteador = RoteadorReplica()
+        configurada = mock.patch.object(roteador_banco, 'replica_configurada', return_value=True)
+        configurada.start()
+        self.addCleanup(configurada.stop)
+
+    def test_leituras_fora_das_views_marcadas_no_primario(self):
+        self.assertEqual(self.roteador.db_for_read(UnidadeCargo), 'default')
+
+    def test_view_marcada_le_da_replica_e_escreve_no_primario(self):
+        @ler_da_replica
+        def view():
+            return self.roteador.db_for_read(UnidadeCargo), self.roteador.db_for_write(UnidadeCargo)
+
+        self.assertEqual(view(), ('replica', 'default'))
+        self.assertEqual(self.roteador.db_for_read(UnidadeCargo), 'default')
+
+    async def test_view_async_marcada_le_da_replica(self):
+        @ler_da_replica
+        async def view():
+            return self.roteador.db_for_read(UnidadeCargo)
+
+        self.assertEqual(await view(), 'replica')
+        self.assertEqual(self.roteador.db_for_read(UnidadeCargo), 'default')
+
+    def test_sem_replica_configurada_tudo_no_primario(self):
+        @ler_da_replica
+        def view():
+            return self.roteador.db_for_read(UnidadeCargo)
+
+        with mock.patch.object(roteador_banco, 'replica_configurada', return_value=False):
+            self.assertEqual(view(), 'default')
+
+    def test_migracoes_so_no_primario(self):
+        self.assertTrue(self.roteador.allow_migrate('default', 'core'))
+        self.assertFalse(self.roteador.allow_migrate('replica', 'core'))
+
+
+class RoteadorReplicaTransacaoTests(TestCase):
+
+    def test_leituras_dentro_de_transacao_ficam_no_primario(self):
+        @ler_da_replica
+        def view():
+            with mock.patch.object(roteador_banco, 'replica_configurada', return_value=True):
+                return RoteadorReplica().db_for_read(UnidadeCargo)
+
+        # TestCase roda cada teste dentro de uma transação
+        self.assertEqual(view(), 'default')
+
+
+def _carregar_settings(**ambiente):
+    """Executa config/settings.py com as variáveis de ambiente dadas (sem DB_* do ambiente atual)."""
+    variaveis = {
+        nome: valor for nome, valor in os.environ.items()
+        if not nome.startswith('DB_') and nome not in ('NEXO_MODO_SERVIDOR', 'DJANGO_ENVIRONMENT')
+    }
+    variaveis.update(ambiente)
+    spec = importlib.util.spec_from_file_location('settings_em_teste', settings_projeto.BASE_DIR / 'config' / 'settings.py')
+    modulo = importlib.util.module_from_spec(spec)
+    with mock.patch.dict(os.environ, variaveis, clear=True), \
+            mock.patch.dict(sys.modules, {'settings_em_teste': modulo}), \
+            contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(modulo)
+    return modulo
+
+
+class ConexoesBancoSettingsTests(SimpleTestCase):
+
+    def test_conexoes_persistentes_por_padrao(self):
+        banco = _carregar_settings().DATABASES['default']
+        self.assertEqual(banco['CONN_MAX_AGE'], 60)
+        self.assertTrue(banco['CONN_HEALTH_CHECKS'])
+
+    def test_asgi_fecha_as_conexoes(self):
+        banco = _carregar_settings(NEXO_MODO_SERVIDOR='asgi').DATABASES['default']
+        self.assertEqual(banco['CONN_MAX_AGE'], 0)
+        self.assertFalse(banco['CONN_HEALTH_CHECKS'])
+
+    def test_pool_do_psycopg_no_postgresql(self):
+        modulo = _carregar_settings(
+            DB_ENGINE='django.db.backends.postgresql', DB_POOL='1', DB_POOL_MAX='20', DB_REPLICA_HOST='replica.local'
+        )
+        for alias in ('default', 'replica'):
+            banco = modulo.DATABASES[alias]
+            self.assertEqual(banco['CONN_MAX_AGE'], 0)
+            self.assertEqual(banco['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10.0})
+        self.assertEqual(modulo.DATABASES['replica']['HOST'], 'replica.local')
+        self.assertEqual(modulo.DATABASES['replica']['TEST'], {'MIRROR': 'default'})
+
+    def test_pool_ignorado_fora_do_postgresql(self):
+        banco = _carregar_settings(DB_ENGINE='django.db.backends.sqlite3', DB_POOL='1').DATABASES['default']
+        self.assertNotIn('pool', banco.get('OPTIONS', {}))
+        self.assertEqual(banco['CONN_MAX_AGE'], 60)
+
+
+def _scripts_de_backup():
+    """backup_store e backup_restore, de scripts/ na raiz do repositório (fora do projeto Django)."""
+    diretorio = str(settings_projeto.BASE_DIR.parent / 'scripts')
+    with mock.patch.object(sys, 'path', [diretorio] + sys.path):
+        return importlib.import_module('backup_store'), importlib.import_module('backup_restore')
+
+
+class RestauracaoSqliteTests(SimpleTestCase):
+
+    def setUp(self):
+        self.backup_store, self.backup_restore = _scripts_de_backup()
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = diretorio.name
+        self.banco = os.path.join(self.diretorio, 'db.sqlite3')
+        with contextlib.closing(sqlite3.connect(self.banco)) as db, db:
+            db.execute('CREATE TABLE unidade (id INTEGER PRIMARY KEY, sigla TEXT)')
+            db.executemany('INSERT INTO unidade (sigla) VALUES (?)', [(f'U{i}',) for i in range(500)])
+
+    def fazer_backup(self, passphrase=None):
+        """Mesmo fluxo de backup_database() para SQLite: o arquivo do banco é o dump."""
+        repositorio = self.backup_store.BackupRepository([os.path.join(self.diretorio, 'backups')], passphrase=passphrase)
+        try:
+            writer = repositorio.writer('database_teste', job='database', engine='django.db.backends.sqlite3')
+            with open(self.banco, 'rb') as arquivo:
+                shutil.copyfileobj(arquivo, writer)
+            return writer.close()
+        finally:
+            repositorio.close()
+
+    def siglas(self, caminho):
+        with contextlib.closing(sqlite3.connect(caminho)) as db:
+            return [sigla for (sigla,) in db.execute('SELECT sigla FROM unidade ORDER BY id')]
+
+    def test_restaura_o_banco(self):
+        receita = self.fazer_backup(passphrase='senha de teste')
+        destino = os.path.join(self.diretorio, 'restaurado.sqlite3')
+        with open(destino, 'wb') as arquivo:
+            arquivo.write(b'banco antigo')
+        with self.assertLogs('backup', 'INFO'):
+            self.backup_restore.restore_database(receita, destino, passphrase='senha de teste')
+        self.assertEqual(self.siglas(destino), self.siglas(self.banco))
+        self.assertFalse(os.path.exists(destino + '.restore.part'))
+
+    def test_backup_adulterado_nao_substitui_o_banco(self):
+        receita = self.fazer_backup()
+        with open(receita) as arquivo:
+            dados = json.load(arquivo)
+        dados['sha256'] = '0' * 64
+        with open(receita, 'w') as arquivo:
+            json.dump(dados, arquivo)
+        destino = os.path.join(self.diretorio, 'restaurado.sqlite3')
+        shutil.copy(self.banco, destino)
+        with contextlib.closing(sqlite3.connect(destino)) as db, db:
+            db.execute("DELETE FROM unidade WHERE sigla <> 'U0'")
+        with self.assertRaises(self.backup_store.BackupStoreError):
+            self.backup_restore.restore_database(receita, destino)
+        self.assertEqual(self.siglas(destino), ['U0'])
+        self.assertFalse(os.path.exists(destino + '.restore.part'))
+
+
+class TabelaSiorgTests(TestCase):
+    TABELA = settings_projeto.BASE_DIR / 'apps' / 'core' / 'dados' / 'tabela_siorg.csv'
+
+    def estado(self):
+        return (
+            list(CargoSIORG.objects.order_by('pk').values()),
+            list(VigenciaCargoSIORG.objects.order_by('pk').values()),
+        )
+
+    def test_reimportar_a_mesma_tabela_nao_muda_nada(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resumo = tabela_siorg.importar_arquivo(self.TABELA)
+        self.assertGreater(resumo['criados'], 100)
+        antes = self.estado()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            resumo = tabela_siorg.importar_arquivo(self.TABELA)
+        self.assertEqual(
+            resumo, {'criados': 0, 'alterados': 0, 'removidos': 0, 'inalterados': len(antes[0])}
+        )
+        self.assertEqual(self.estado(), antes)
+        # Nada mudou: nenhum cache invalidado
+        self.assertEqual(callbacks, [])
+
+
+class ApiSiglarioTests(TestCase):
+
+    def setUp(self):
+        versao_dados.descartar_versao_local()
+        catalogo_unidades._catalogo = None
+        registros = _cargos(1, unidades=4)
+        registros[0]['sigla_unidade'] = ''
+        with self.captureOnCommitCallbacks(execute=True):
+            importacao.importar('unidades', registros)
+        self.client.force_login(User.objects.create_user('leitor'))
+
+    def test_total_desconta_unidades_sem_sigla(self):
+        for parametros in ({}, {'limit': 2}, {'q': 'unidade'}):
+            dados = self.client.get(reverse('api_siglario'), parametros).json()
+            self.assertEqual(dados['total'], 3, parametros)
+        dados = self.client.get(reverse('api_siglario'), {'limit': 2, 'offset': 2}).json()
+        self.assertEqual([item['sigla'] for item in dados['data']], ['U3'])
+
+    def test_pdf_do_siglario_sem_teto_de_linhas(self):
+        from django.test import RequestFactory
+        from .views.relatorios import buscar_dados_siglario
+
+        with self.captureOnCommitCallbacks(execute=True):
+            importacao.importar('unidades', _cargos(1, unidades=1100))
+        catalogo_unidades._catalogo = None
+        dados = buscar_dados_siglario(RequestFactory().get('/', {'filtro': ''}))
+        self.assertEqual(len(dados['data']), 1100)
+        self.assertEqual(dados['totais']['total_registros'], 1100)
+
+
+class DesempenhoInstrumentacaoTests(SimpleTestCase):
+
+    def test_get_do_cache_repassa_argumentos_do_backend(self):
+        class Backend:
+            def get(self, key, default=None, version=None, client=None):
+                self.chamada = (key, version, client)
+                return default
+
+        desempenho._instrumentar_cache(Backend)
+        backend = Backend()
+        self.assertEqual(backend.get('chave', 'padrao', version=2, client='replica'), 'padrao')
+        self.assertEqual(backend.chamada, ('chave', 2, 'replica'))
+
+    def test_pico_de_memoria_da_requisicao_perfilada(self):
+        perfil = desempenho.Perfil()
+        self.assertTrue(perfil.iniciar())
+        bloco = bytearray(8 * 1024 * 1024)
+        del bloco
+        perfil.encerrar(None, 0)
+        self.assertGreaterEqual(perfil.pico_memoria_mb, 8)
+        self.assertFalse(desempenho.tracemalloc.is_tracing())
+
+
+class TravaBackupTests(SimpleTestCase):
+
+    def setUp(self):
+        self.backup_store, _ = _scripts_de_backup()
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.destinos = [os.path.join(diretorio.name, 'local'), os.path.join(diretorio.name, 'externo')]
+
+    def test_segunda_execucao_nao_entra_enquanto_a_primeira_grava(self):
+        with self.backup_store.store_lock(self.destinos):
+            with self.assertRaises(self.backup_store.BackupStoreError):
+                with self.backup_store.store_lock(self.destinos[1:]):
+                    pass
+        with self.backup_store.store_lock(self.destinos):
+            pass
+
+
+class MigracaoCargoSiorgTests(TestCase):
+    """preencher_campos_numericos() da migração 0031, sobre linhas gravadas sem passar por save()."""
+
+    def migrar(self):
+        from django.apps import apps
+        migracao = importlib.import_module('apps.core.migrations.0031_cargosiorg_campos_numericos')
+        with self.assertLogs(migracao.logger, 'WARNING') as logs:
+            migracao.preencher_campos_numericos(apps, None)
+        return logs.output
+
+    def test_valores_lidos_como_na_importacao_e_descartes_no_log(self):
+        CargoSIORG.objects.bulk_create([
+            CargoSIORG(cargo='CCE 1.18', nivel='1', quantidade=1, valor='1.234.567', unitario=1),
+            CargoSIORG(cargo='CCE 1 18', nivel='1', quantidade=1, valor='R$ 9,99', unitario=1),
+            CargoSIORG(cargo='FCE 2 05', nivel='1', quantidade=1, valor='a combinar', unitario=1),
+        ])
+        logs = self.migrar()
+
+        cargo = CargoSIORG.objects.get(cargo='CCE 1 18')
+        self.assertEqual(cargo.valor_decimal, tabela_siorg.valor_para_decimal('1.234.567'))
+        self.assertEqual((cargo.tipo_cargo, cargo.categoria, cargo.nivel_cargo), ('CCE', 1, 18))
+        self.assertEqual(CargoSIORG.objects.count(), 2)
+        self.assertEqual(len(logs), 2)
+        self.assertIn('duplicado', logs[0])
+        self.assertIn("'a combinar'", logs[1])
+
+
+class TiposUsuarioCacheTests(TestCase):
+
+    def setUp(self):
+        tipos_usuario.invalidar()
+        self.usuario = User.objects.create_user('cacheado')
+        self.addCleanup(tipos_usuario.invalidar)
+
+    def test_tipo_memorizado_ate_o_tipo_usuario_mudar(self):
+        from .models import TipoUsuario, obter_tipo_usuario
+
+        self.assertEqual(obter_tipo_usuario(self.usuario), 'externo')
+        with self.assertNumQueries(0):
+            self.assertEqual(obter_tipo_usuario(self.usuario), 'externo')
+
+        tipo = TipoUsuario.objects.get(usuario=self.usuario)
+        tipo.tipo = 'gerente'
+        tipo.save()
+        self.assertIsNone(tipos_usuario.obter_em_cache(self.usuario.pk))
+        self.assertEqual(obter_tipo_usuario(User.objects.get(pk=self.usuario.pk)), 'gerente')
+
+    def test_mudanca_de_grupos_invalida_o_cache(self):
+        from django.contrib.auth.models import Group
+        from .models import obter_tipo_usuario
+
+        grupo = Group.objects.create(name='user_gerente')
+        obter_tipo_usuario(self.usuario)
+        self.usuario.groups.add(grupo)
+        self.assertIsNone(tipos_usuario.obter_em_cache(self.usuario.pk))
+
+        obter_tipo_usuario(self.usuario)
+        grupo.user_set.clear()
+        self.assertIsNone(tipos_usuario.obter_em_cache(self.usuario.pk))
+
+    def test_cache_da_requisicao_e_descartado_ao_encerrar(self):
+        tipos_usuario.invalidar()
+        with override_settings(TIPO_USUARIO_CACHE_TTL=0):
+            token = tipos_usuario.iniciar_cache_requisicao()
+            tipos_usuario.guardar_em_cache(self.usuario.pk, 'interno')
+            self.assertEqual(tipos_usuario.obter_em_cache(self.usuario.pk), 'interno')
+            tipos_usuario.encerrar_cache_requisicao(token)
+            self.assertIsNone(tipos_usuario.obter_em_cache(self.usuario.pk))
+
+
+class CatalogoUnidadesTests(SimpleTestCase):
+
+    def setUp(self):
+        Unidade = catalogo_unidades.Unidade
+        self.catalogo = catalogo_unidades.CatalogoUnidades([
+            Unidade('SEGES', 'Secretaria de Gestão', 'Secretaria', '10'),
+            Unidade('DEGES', 'Departamento de Gestão de Pessoas', 'Departamento', '11'),
+            Unidade('CGTI', 'Coordenação-Geral de Tecnologia', 'Coordenação', '12'),
+            Unidade('GAB', 'Gabinete', 'Gabinete', '13'),
+        ])
+
+    def siglas(self, consulta, **kwargs):
+        total, unidades = self.catalogo.buscar(consulta, **kwargs)
+        return total, [unidade.sigla for unidade in unidades]
+
+    def test_busca_por_prefixo_sem_acentos(self):
+        self.assertEqual(self.siglas('gest'), (2, ['DEGES', 'SEGES']))
+        self.assertEqual(self.siglas('coordenacao tec'), (1, ['CGTI']))
+        self.assertEqual(self.siglas('SE'), (1, ['SEGES']))
+        self.assertEqual(self.siglas('gestao pessoas'), (1, ['DEGES']))
+        self.assertEqual(self.siglas('inexistente'), (0, []))
+
+    def test_ordem_e_paginacao(self):
+        self.assertEqual(self.siglas('', ordem='denominacao'), (4, ['CGTI', 'DEGES', 'GAB', 'SEGES']))
+        self.assertEqual(self.siglas('', limit=2, offset=1), (4, ['DEGES', 'GAB']))
+
+    def test_etag_acompanha_o_conteudo(self):
+        mesmo = catalogo_unidades.CatalogoUnidades(reversed(self.catalogo.unidades))
+        self.assertEqual(mesmo.etag, self.catalogo.etag)
+        outro = catalogo_unidades.CatalogoUnidades(self.catalogo.unidades[1:])
+        self.assertNotEqual(outro.etag, self.catalogo.etag)
+
+
+@override_settings(ROOT_URLCONF='apps.core.urls')
+class SiglarioEtagTests(TestCase):
+    """Rotas do próprio app, sem passar pelo config/urls.py."""
+
+    def setUp(self):
+        catalogo_unidades._catalogo = catalogo_unidades.CatalogoUnidades(
+            [catalogo_unidades.Unidade('SEGES', 'Secretaria de Gestão', '', '10')],
+            versao=versao_dados.versao_atual(),
+        )
+        self.addCleanup(setattr, catalogo_unidades, '_catalogo', None)
+        self.client.force_login(User.objects.create_user('leitor_etag'))
+
+    def test_if_none_match_devolve_304(self):
+        resposta = self.client.get(reverse('api_siglario'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['data'][0]['categoria'], 'Não categorizado')
+        etag = resposta['ETag']
+
+        resposta = self.client.get(reverse('api_siglario'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta['ETag'], etag)
+
+
+def _linhas_organograma():
+    """Raiz 1 com as filhas 2 e 3; a unidade 2 tem a filha 4."""
+    return [
+        {'grafo': '1', 'sigla': 'MGI', 'denominacao_unidade': 'Ministério', 'tipo_unidade': 'Órgão',
+         'quantidade': 1, 'gasto_total': 100.0, 'pontos_total': 10.0},
+        {'grafo': '1-2', 'sigla': 'SEGES', 'denominacao_unidade': 'Secretaria', 'tipo_unidade': 'Secretaria',
+         'quantidade': 2, 'gasto_total': 50.0, 'pontos_total': 5.0},
+        {'grafo': '1-3', 'sigla': 'GAB', 'denominacao_unidade': 'Gabinete', 'tipo_unidade': 'Gabinete',
+         'quantidade': 1, 'gasto_total': 20.0, 'pontos_total': 2.0},
+        {'grafo': '1-2-4', 'sigla': 'DEGES', 'denominacao_unidade': 'Departamento', 'tipo_unidade': 'Departamento',
+         'quantidade': 3, 'gasto_total': 30.0, 'pontos_total': 3.0},
+    ]
+
+
+@override_settings(ROOT_URLCONF='apps.core.urls')
+class OrganogramaDadosTests(TestCase):
+    """api_organograma_dados sobre um índice montado no teste."""
+
+    def setUp(self):
+        indice_organograma._indice = indice_organograma.IndiceOrganograma(
+            _linhas_organograma(), [{'cargo': 'CCE 1.10', 'valor': 1.0, 'unitario': 1.0}],
+            versao=versao_dados.versao_atual(),
+        )
+        self.addCleanup(setattr, indice_organograma, '_indice', None)
+        self.client.force_login(User.objects.create_user('leitor_organograma'))
+
+    def grafos(self, parametros):
+        dados = self.client.get(reverse('api_organograma_dados'), parametros).json()
+        return [linha['grafo'] for linha in dados['core_unidadecargo']], dados['expansiveis']
+
+    def test_niveis_corta_o_grafo(self):
+        self.assertEqual(self.grafos({'niveis': 1}), (['1'], ['1']))
+        self.assertEqual(self.grafos({'niveis': 2}), (['1', '1-2', '1-3'], ['2']))
+        self.assertEqual(self.grafos({'codigo': '1', 'niveis': 1}), (['1-2', '1-3'], ['2']))
+        self.assertEqual(self.grafos({'codigo': '2', 'niveis': 3}), (['1-2-4'], []))
+
+        resposta = self.client.get(reverse('api_organograma_dados'), {'niveis': 'x'})
+        self.assertEqual(resposta.status_code, 400)
+
+    def test_base_completa_com_etag(self):
+        resposta = self.client.get(reverse('api_organograma_dados'))
+        dados = json.loads(resposta.content)
+        self.assertEqual(len(dados['core_unidadecargo']), 4)
+        self.assertEqual(dados['core_cargosiorg'][0]['cargo'], 'CCE 1.10')
+
+        resposta = self.client.get(reverse('api_organograma_dados'), {'niveis': 1},
+                                   HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(resposta.status_code, 304)
+
+
+@override_settings(ROOT_URLCONF='apps.core.urls')
+class OrganogramaFilhosTests(TestCase):
+    """Expansão sob demanda (api_organograma_filhos) sobre o mesmo organograma."""
+
+    def setUp(self):
+        indice_organograma._indice = indice_organograma.IndiceOrganograma(
+            _linhas_organograma(), [], versao=versao_dados.versao_atual(),
+        )
+        self.addCleanup(setattr, indice_organograma, '_indice', None)
+        self.client.force_login(User.objects.create_user('leitor_subarvore'))
+
+    def filhos(self, codigo, **parametros):
+        return self.client.get(reverse('api_organograma_filhos', args=[codigo]), parametros)
+
+    def test_raiz_e_totais_da_subarvore(self):
+        dados = self.filhos('raiz').json()
+        self.assertIsNone(dados['no'])
+        [raiz] = dados['filhos']
+        self.assertEqual((raiz['codigo'], raiz['total_filhos']), ('1', 2))
+        self.assertEqual(raiz['totais_subarvore'],
+                         {'unidades': 4, 'quantidade': 7, 'gasto_total': 200.0, 'pontos_total': 20.0})
+        self.assertNotIn('filhos', raiz)
+
+    def test_filhos_ate_a_profundidade_pedida(self):
+        dados = self.filhos('1').json()
+        self.assertEqual(dados['no']['sigla'], 'MGI')
+        self.assertEqual([filho['sigla'] for filho in dados['filhos']], ['GAB', 'SEGES'])
+        self.assertNotIn('filhos', dados['filhos'][1])
+
+        dados = self.filhos('1', depth=2).json()
+        self.assertEqual([neto['codigo'] for neto in dados['filhos'][1]['filhos']], ['4'])
+        self.assertEqual(self.filhos('99').status_code, 404)
+        self.assertEqual(self.filhos('1', depth='x').status_code, 400)
+
+    def test_etag_segue_a_versao_dos_dados(self):
+        resposta = self.filhos('2')
+        self.assertEqual(self.client.get(reverse('api_organograma_filhos', args=['2']),
+                                         HTTP_IF_NONE_MATCH=resposta['ETag']).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            versao_dados.nova_versao()
+        indice_organograma._indice = indice_organograma.IndiceOrganograma(
+            _linhas_organograma(), [], versao=versao_dados.versao_atual(),
+        )
+        resposta_nova = self.client.get(reverse('api_organograma_filhos', args=['2']),
+                                        HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(resposta_nova.status_code, 200)
+        self.assertNotEqual(resposta_nova['ETag'], resposta['ETag'])
+
+
+class DesempenhoMiddlewareTests(TestCase):
+
+    def middleware(self, get_response):
+        from django.core.exceptions import MiddlewareNotUsed
+        from .middleware import DesempenhoMiddleware
+
+        with override_settings(DESEMPENHO_ATIVO=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                DesempenhoMiddleware(get_response)
+        return DesempenhoMiddleware(get_response)
+
+    @override_settings(DESEMPENHO_ATIVO=True, DESEMPENHO_LOG=None, DESEMPENHO_QUERY_LENTA_MS=0,
+                       DESEMPENHO_PERFIL_AMOSTRAGEM=0)
+    def test_metricas_da_requisicao(self):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        def view(request):
+            User.objects.count()
+            cache.get('desempenho-ausente')
+            cache.set('desempenho-presente', 1)
+            cache.get('desempenho-presente')
+            return HttpResponse('ok')
+
+        with self.assertLogs('nexo.desempenho', 'INFO') as registros:
+            resposta = self.middleware(view)(RequestFactory().get('/medido/'))
+
+        self.assertIn('desc="1 queries"', resposta['Server-Timing'])
+        self.assertIn('desc="1 hits 1 misses"', resposta['Server-Timing'])
+        registro = json.loads(registros.records[0].getMessage())
+        self.assertEqual((registro['caminho'], registro['status'], registro['queries']), ('/medido/', 200, 1))
+        self.assertEqual(len(registro['queries_lentas']), 1)
+
+
+class ArmazenamentoBackupTests(SimpleTestCase):
+    """Blocos definidos pelo conteúdo e deduplicação de scripts/backup_store.py."""
+
+    def setUp(self):
+        scripts = str(settings_projeto.BASE_DIR.parent / 'scripts')
+        with mock.patch.object(sys, 'path', [scripts] + sys.path):
+            self.backup_store = importlib.import_module('backup_store')
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.destinos = [os.path.join(diretorio.name, 'local'), os.path.join(diretorio.name, 'externo')]
+        self.dados = random.Random(43).randbytes(12 * 1024 * 1024)
+        # Os mesmos dados com 100 bytes inseridos no meio
+        self.alterados = self.dados[:6_000_000] + b'x' * 100 + self.dados[6_000_000:]
+
+    def cortar(self, dados, pedaco):
+        chunker = self.backup_store.Chunker()
+        blocos = []
+        for inicio in range(0, len(dados), pedaco):
+            blocos += chunker.feed(dados[inicio:inicio + pedaco])
+        return blocos + chunker.finish()
+
+    def test_cortes_dependem_so_do_conteudo(self):
+        blocos = self.cortar(self.dados, len(self.dados))
+        self.assertEqual(b''.join(blocos), self.dados)
+        self.assertTrue(all(len(bloco) <= self.backup_store.CHUNK_MAX for bloco in blocos))
+        self.assertTrue(all(len(bloco) >= self.backup_store.CHUNK_MIN for bloco in blocos[:-1]))
+        self.assertEqual(self.cortar(self.dados, 1024 * 1024), blocos)
+
+        # Uma inserção só muda os blocos ao redor dela
+        self.assertLessEqual(len(set(self.cortar(self.alterados, len(self.alterados))) - set(blocos)), 2)
+
+    def test_blocos_repetidos_gravados_uma_vez(self):
+        repositorio = self.backup_store.BackupRepository(self.destinos, threads=2)
+        self.addCleanup(repositorio.close)
+        primeiro = repositorio.writer('database_1', job='database')
+        primeiro.write(self.dados)
+        receita = primeiro.close()
+        segundo = repositorio.writer('database_2', job='database')
+        segundo.write(self.alterados)
+        segundo.close()
+
+        self.assertLessEqual(segundo.new_chunks, 2)
+        self.assertEqual(b''.join(self.backup_store.read_backup(repositorio, receita)), self.dados)
+        externo = os.path.join(self.destinos[1], 'database_1' + self.backup_store.RECIPE_SUFFIX)
+        self.assertEqual(self.backup_store.load_recipe(externo)['sha256'], hashlib.sha256(self.dados).hexdigest())
+
+        # Sem a segunda receita, só os blocos exclusivos dela ficam sem uso
+        for destino in self.destinos:
+            os.remove(os.path.join(destino, 'database_2' + self.backup_store.RECIPE_SUFFIX))
+        self.assertEqual(self.backup_store.ChunkStore(self.destinos[0]).collect_garbage(), segundo.new_chunks)
+        self.assertEqual(b''.join(self.backup_store.read_backup(repositorio, receita)), self.dados)
+
+
+class BackupIncrementalTests(SimpleTestCase):
+    """Cadeias de backups de dados de usuário (scripts/backup.py)."""
+
+    def setUp(self):
+        scripts = str(settings_projeto.BASE_DIR.parent / 'scripts')
+        # backup.py configura o log em logs/backup.log ao ser importado
+        with mock.patch.object(sys, 'path', [scripts] + sys.path), \
+                mock.patch('logging.basicConfig'), mock.patch('logging.FileHandler'):
+            self.backup = importlib.import_module('backup')
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.raiz = diretorio.name
+        self.backups = os.path.join(self.raiz, 'backups')
+        os.makedirs(os.path.join(self.raiz, 'media', 'decretos'))
+        os.makedirs(os.path.join(self.raiz, 'staticfiles'))
+        self.gravar('media/decretos/a.pdf', b'a' * 5000)
+        self.gravar('media/decretos/b.pdf', b'b' * 5000)
+
+        numeros = iter(range(1, 100))
+        for nome, valor in (('BASE_DIR', self.raiz), ('USERDATA_FULL_EVERY', 2),
+                            ('get_timestamp', lambda: '20260101_000000_%06d' % next(numeros))):
+            patcher = mock.patch.object(self.backup, nome, valor)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.repositorio = self.backup.BackupRepository([self.backups], threads=2)
+        self.addCleanup(self.repositorio.close)
+
+    def gravar(self, nome, conteudo):
+        with open(os.path.join(self.raiz, nome), 'wb') as arquivo:
+            arquivo.write(conteudo)
+
+    def fazer_backup(self):
+        return self.backup.load_recipe(self.backup.backup_user_data(self.repositorio))
+
+    def test_incrementais_gravam_so_o_que_mudou(self):
+        base = self.fazer_backup()
+        self.gravar('media/decretos/a.pdf', b'A' * 5000)
+        self.gravar('media/decretos/c.pdf', b'c' * 100)
+        os.remove(os.path.join(self.raiz, 'media/decretos/b.pdf'))
+        incremental = self.fazer_backup()
+
+        self.assertEqual((base['kind'], base['archived']), ('full', 2))
+        self.assertEqual((incremental['kind'], incremental['parent'], incremental['base']),
+                         ('incremental', base['name'], base['name']))
+        self.assertEqual((incremental['archived'], incremental['deleted'], incremental['files']), (2, 1, 2))
+
+        destino = os.path.join(self.raiz, 'restaurado')
+        self.backup.restore_backup(os.path.join(self.backups, incremental['name'] + self.backup.RECIPE_SUFFIX), destino)
+        self.assertEqual(sorted(os.listdir(os.path.join(destino, 'media', 'decretos'))), ['a.pdf', 'c.pdf'])
+        with open(os.path.join(destino, 'media', 'decretos', 'a.pdf'), 'rb') as arquivo:
+            self.assertEqual(arquivo.read(), b'A' * 5000)
+
+    def test_rotacao_mantem_a_cadeia_dos_backups_restantes(self):
+        nomes = [self.fazer_backup()['name'] for _ in range(5)]
+        tipos = [self.backup.load_recipe(os.path.join(self.backups, nome + self.backup.RECIPE_SUFFIX))['kind']
+                 for nome in nomes]
+        # Nova base depois de USERDATA_FULL_EVERY incrementais
+        self.assertEqual(tipos, ['full', 'incremental', 'incremental', 'full', 'incremental'])
+
+        self.backup.rotate_backups(self.backups, 1, 'userdata_')
+        restantes = self.backup.ChunkStore(self.backups).recipes('userdata_')
+        self.assertEqual([os.path.basename(caminho) for caminho in restantes],
+                         [nome + self.backup.RECIPE_SUFFIX for nome in nomes[3:]])
+        self.assertEqual(len(self.backup.resolve_chain(restantes[-1])), 2)
+
+
+class CargoSiorgNumericoTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('simulador')
+
+    def unidade(self, tipo_cargo, categoria, nivel):
+        # Cargo manual (com usuário): não depende da versão importada da planilha
+        return UnidadeCargo.objects.create(
+            nivel_hierarquico=1, tipo_unidade='Secretaria', denominacao_unidade='Secretaria',
+            codigo_unidade='10', sigla_unidade='SE', categoria_unidade='Secretaria',
+            orgao_entidade='MGI', tipo_cargo=tipo_cargo, denominacao='Cargo', categoria=categoria,
+            nivel=nivel, quantidade=1, grafo='10', sigla='SE', usuario=self.usuario,
+        )
+
+    def test_save_preenche_os_campos_numericos(self):
+        cargo = CargoSIORG.objects.create(cargo='cce 1.8', nivel='1', quantidade=1, valor='R$ 24.553,28', unitario='3.20')
+        self.assertEqual(cargo.cargo, 'CCE 1 08')
+        self.assertEqual((cargo.tipo_cargo, cargo.categoria, cargo.nivel_cargo), ('CCE', 1, 8))
+        self.assertEqual(cargo.valor_decimal, Decimal('24553.28'))
+        self.assertEqual(CargoSIORG.objects.tabela(), {('CCE', 1, 8): (Decimal('24553.28'), Decimal('3.20'))})
+
+    def test_com_valores_siorg_junta_pela_chave_inteira(self):
+        CargoSIORG.objects.create(cargo='FCE 2 05', nivel='1', quantidade=1, valor='1.000,50', unitario='1.10')
+        com_cargo = self.unidade('FCE', 2, 5)
+        sem_cargo = self.unidade('FCE', 2, 6)
+
+        valores = {
+            unidade.pk: (unidade.valor_siorg, unidade.pontos_siorg)
+            for unidade in UnidadeCargo.objects.com_valores_siorg()
+        }
+        self.assertEqual(valores[com_cargo.pk], (Decimal('1000.50'), Decimal('1.10')))
+        self.assertEqual(valores[sem_cargo.pk], (Decimal('0'), Decimal('0')))
+
+    def test_migracao_0031_preenche_linhas_gravadas_sem_save(self):
+        from django.apps import apps
+        CargoSIORG.objects.bulk_create([
+            CargoSIORG(cargo='CCE 1.18', nivel='1', quantidade=1, valor='R$ 17.000,00', unitario=1),
+        ])
+        migracao = importlib.import_module('apps.core.migrations.0031_cargosiorg_campos_numericos')
+        migracao.preencher_campos_numericos(apps, None)
+
+        cargo = CargoSIORG.objects.get()
+        self.assertEqual((cargo.cargo, cargo.valor_decimal), ('CCE 1 18', Decimal('17000.00')))
+        self.assertEqual((cargo.tipo_cargo, cargo.categoria, cargo.nivel_cargo), ('CCE', 1, 18))
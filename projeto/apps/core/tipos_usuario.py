@@ -0,0 +1,95 @@
+"""
+Cache da resolução de tipos de usuário (externo/interno/gerente).
+
+A resolução passa por três camadas:
+1. cache da requisição atual (preparado pelo TipoUsuarioCacheMiddleware);
+2. cache do processo, com TTL curto (settings.TIPO_USUARIO_CACHE_TTL);
+3. banco de dados (models.obter_tipo_usuario / models.obter_tipos_usuarios).
+
+Os sinais em models.py invalidam as entradas quando o TipoUsuario ou os grupos
+de um usuário mudam. Outros processos (workers do gunicorn) só enxergam a
+mudança após o TTL expirar.
+"""
+
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+
+# Cache por requisição: dicionário {usuario_id: tipo} ou None fora de requisições
+_cache_requisicao = contextvars.ContextVar('tipos_usuario_requisicao', default=None)
+
+# Cache por processo: {usuario_id: (tipo, expira_em)}
+_cache_processo = {}
+_lock = threading.Lock()
+
+
+def _ttl():
+    return getattr(settings, 'TIPO_USUARIO_CACHE_TTL', 30)
+
+
+def iniciar_cache_requisicao():
+    """Abre um cache vazio para a requisição atual. Retorna o token para encerrá-lo."""
+    return _cache_requisicao.set({})
+
+
+def encerrar_cache_requisicao(token):
+    """Descarta o cache da requisição aberto por iniciar_cache_requisicao."""
+    _cache_requisicao.reset(token)
+
+
+def obter_em_cache(usuario_id):
+    """Retorna o tipo em cache para o usuário ou None se não houver entrada válida."""
+    if usuario_id is None:
+        return None
+
+    cache_requisicao = _cache_requisicao.get()
+    if cache_requisicao is not None and usuario_id in cache_requisicao:
+        return cache_requisicao[usuario_id]
+
+    entrada = _cache_processo.get(usuario_id)
+    if entrada is None:
+        return None
+    tipo, expira_em = entrada
+    if expira_em < time.monotonic():
+        with _lock:
+            _cache_processo.pop(usuario_id, None)
+        return None
+
+    if cache_requisicao is not None:
+        cache_requisicao[usuario_id] = tipo
+    return tipo
+
+
+def guardar_em_cache(usuario_id, tipo):
+    """Guarda o tipo resolvido nas duas camadas de cache."""
+    if usuario_id is None:
+        return
+
+    cache_requisicao = _cache_requisicao.get()
+    if cache_requisicao is not None:
+        cache_requisicao[usuario_id] = tipo
+
+    ttl = _ttl()
+    if ttl > 0:
+        with _lock:
+            _cache_processo[usuario_id] = (tipo, time.monotonic() + ttl)
+
+
+def invalidar(usuario_ids=None):
+    """
+    Remove usuários dos caches. Sem argumentos, limpa tudo
+    (usado quando não se sabe quais usuários foram afetados).
+    """
+    cache_requisicao = _cache_requisicao.get()
+    with _lock:
+        if usuario_ids is None:
+            _cache_processo.clear()
+            if cache_requisicao is not None:
+                cache_requisicao.clear()
+            return
+        for usuario_id in usuario_ids:
+            _cache_processo.pop(usuario_id, None)
+            if cache_requisicao is not None:
+                cache_requisicao.pop(usuario_id, None)
@@ -25,10 +25,13 @@ urlpatterns = [
     path('organograma/view/', views.organograma_view, name='organograma_view'),
     path('simular-troca-cargo/', views.simular_troca_cargo, name='simular_troca_cargo'),
     path('api/organograma/', views.api_organograma, name='api_organograma'),
+    path('api/organograma/dados/', views.api_organograma_dados, name='api_organograma_dados'),
     path('api/organograma/teste/', views.teste_api_organograma, name='teste_api_organograma'),
     path('dashboard/', views.index, name='dashboard'),
     path('api/unidade/<str:codigo_unidade>/', views.get_unidade_data, name='api_unidade_data'),
     path('api/organograma/detalhes/<str:codigo>/', views.api_organograma_detalhes, name='api_organograma_detalhes'),
+    path('api/organograma/<str:codigo>/children', views.api_organograma_filhos, name='api_organograma_filhos'),
+    path('organograma/sob-demanda/', views.organograma_ondemand, name='organograma_ondemand'),
     path('atualizar-organograma-json/', views.atualizar_organograma_json, name='atualizar_organograma_json'),
     path('api/organograma-filter/', views.api_organograma_filter, name='api_organograma_filter'),
     path('api/cargos_diretos/', views.api_cargos_diretos, name='api_cargos_diretos'),
@@ -84,6 +87,7 @@ urlpatterns = [
     # URLs para Usuários e Notificações
     path('api/usuarios-internos/', views.listar_usuarios_internos, name='listar_usuarios_internos'),
     path('api/notificacoes/', views.minhas_notificacoes, name='minhas_notificacoes'),
+    path('api/notificacoes/aguardar/', views.aguardar_notificacoes, name='aguardar_notificacoes'),
     path('api/notificacoes/marcar-lida/', views.marcar_notificacao_lida, name='marcar_notificacao_lida'),
     path('api/notificacoes/excluir/', views.excluir_notificacao, name='excluir_notificacao'),
     path('api/notificacoes/excluir-todas/', views.excluir_todas_notificacoes, name='excluir_todas_notificacoes'),
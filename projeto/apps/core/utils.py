@@ -1,28 +1,35 @@
-import pandas as pd
-from .models import UnidadeCargo, CargoSIORG
-from decimal import Decimal
-import openpyxl
-from openpyxl.utils import get_column_letter
+# pandas e openpyxl são importados dentro das funções que os usam: este módulo
+# é carregado pelas views e pelo admin em toda inicialização do Django
+import logging
+from .models import UnidadeCargo
 from io import BytesIO
 from .models import PlanilhaImportada
 from collections import defaultdict
-from openpyxl.styles import Alignment
 
-def salvar_dados_no_banco(df_resultado):
+logger = logging.getLogger(__name__)
+
+def salvar_dados_no_banco(df_resultado, origem='', usuario=None):
     """
     Salva os dados processados da planilha no banco de dados UnidadeCargo.
+
+    Os cargos são casados com os do banco pela chave natural (código da
+    unidade, tipo, categoria e nível) e só as diferenças são gravadas; cargos
+    que saíram da planilha são removidos. Cargos manuais (com usuário) não são
+    tocados. O conteúdo importado vira a versão ativa do conjunto 'unidades'
+    (ver importacao.importar()). Retorna o resumo da importação e a lista de
+    erros.
     """
-    print(f"Iniciando salvamento no banco de dados...")
-    print(f"Total de registros a processar: {len(df_resultado)}")
+    import pandas as pd
+    from .importacao import CHAVE_UNIDADE_CARGO, importar
+    
+    logger.info("Iniciando salvamento no banco de dados...")
+    logger.info("Total de registros a processar: %s", len(df_resultado))
     
-    # Limpar dados existentes antes de importar novos
-    registros_anteriores = UnidadeCargo.objects.count()
-    if registros_anteriores > 0:
-        UnidadeCargo.objects.all().delete()
-        print(f"Removidos {registros_anteriores} registros anteriores")
+    from .logs import AmostradorErros
     
-    registros_criados = 0
+    registros = {}
     erros = []
+    amostrador = AmostradorErros(logger)
     
     for index, row in df_resultado.iterrows():
         try:
@@ -45,15 +52,14 @@ def salvar_dados_no_banco(df_resultado):
             
             # Validar campos obrigatórios
             if not codigo_unidade:
-                print(f"Registro {index + 1} ignorado - código unidade vazio")
+                logger.debug("Registro %s ignorado - código unidade vazio", index + 1)
                 continue
                 
             if not grafo:
-                print(f"Registro {index + 1} ignorado - grafo vazio")
+                logger.debug("Registro %s ignorado - grafo vazio", index + 1)
                 continue
             
-            # Criar o objeto UnidadeCargo
-            unidade_cargo = UnidadeCargo(
+            registro = dict(
                 nivel_hierarquico=nivel_hierarquico,
                 tipo_unidade=tipo_unidade,
                 denominacao_unidade=denominacao_unidade,
@@ -71,31 +77,46 @@ def salvar_dados_no_banco(df_resultado):
                 sigla=sigla
             )
             
-            # Salvar o objeto
-            unidade_cargo.save()
-            registros_criados += 1
-            
-            if registros_criados % 50 == 0:
-                print(f"Processados {registros_criados} registros...")
+            # O mesmo cargo repetido na unidade vira uma linha só, com as quantidades somadas
+            chave = tuple(registro[campo] for campo in CHAVE_UNIDADE_CARGO)
+            if chave in registros:
+                registros[chave]['quantidade'] += quantidade
+            else:
+                registros[chave] = registro
                 
         except Exception as e:
             erro_msg = f"Erro na linha {index + 1}: {str(e)}"
             erros.append(erro_msg)
-            print(f"ERRO: {erro_msg}")
-            print(f"Dados da linha: {dict(row)}")
+            if amostrador.registrar("%s", erro_msg) and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Dados da linha: %s", dict(row))
     
-    print(f"Salvamento concluído! {registros_criados} registros criados.")
     if erros:
-        print(f"Total de erros: {len(erros)}")
-        for erro in erros[:5]:  # Mostrar apenas os primeiros 5 erros
-            print(f"  - {erro}")
+        logger.warning("Total de erros: %s", len(erros))
+        amostrador.resumir("Salvamento de UnidadeCargo")
+    
+    if not registros:
+        # Planilha sem nenhum cargo válido: não apaga a estrutura atual
+        logger.warning("Nenhum registro válido na planilha; dados atuais mantidos")
+        return {'criados': 0, 'alterados': 0, 'removidos': 0, 'inalterados': 0, 'repetidos': 0}, erros
+    
+    resumo = importar('unidades', registros.values(), origem=origem, usuario=usuario)
+    logger.info(
+        "Salvamento concluído! %s criados, %s alterados, %s removidos, %s inalterados.",
+        resumo['criados'], resumo['alterados'], resumo['removidos'], resumo['inalterados']
+    )
+    
+    # Montar o catálogo de unidades (siglário) já com os dados importados
+    from .catalogo_unidades import obter_catalogo
+    obter_catalogo()
     
-    return registros_criados, erros
+    return resumo, erros
 
-def processa_planilhas(file_hierarquia, file_estrutura_viva):
-    print(f"=== INICIANDO PROCESSAMENTO DE PLANILHAS ===")
-    print(f"Arquivo hierarquia: {file_hierarquia.name}")
-    print(f"Arquivo estrutura viva: {file_estrutura_viva.name}")
+def processa_planilhas(file_hierarquia, file_estrutura_viva, usuario=None):
+    import pandas as pd
+    
+    logger.info("=== INICIANDO PROCESSAMENTO DE PLANILHAS ===")
+    logger.info("Arquivo hierarquia: %s", file_hierarquia.name)
+    logger.info("Arquivo estrutura viva: %s", file_estrutura_viva.name)
     
     # Leitura da planilha de hierarquia
     if file_hierarquia.name.endswith('.csv'):
@@ -103,7 +124,7 @@ def processa_planilhas(file_hierarquia, file_estrutura_viva):
     else:
         df_hierarquia = pd.read_excel(file_hierarquia)
     
-    print(f"Planilha hierarquia lida: {df_hierarquia.shape}")
+    logger.info("Planilha hierarquia lida: %s", df_hierarquia.shape)
 
     # Leitura da planilha de estrutura viva
     if file_estrutura_viva.name.endswith('.csv'):
@@ -111,8 +132,8 @@ def processa_planilhas(file_hierarquia, file_estrutura_viva):
     else:
         df_estrutura_viva = pd.read_excel(file_estrutura_viva)
     
-    print(f"Planilha estrutura viva lida: {df_estrutura_viva.shape}")
-    print(f"Colunas estrutura viva: {list(df_estrutura_viva.columns)}")
+    logger.info("Planilha estrutura viva lida: %s", df_estrutura_viva.shape)
+    logger.info("Colunas estrutura viva: %s", list(df_estrutura_viva.columns))
 
     # Processar a planilha de hierarquia: remover metadados e renomear colunas
     df_hierarquia = df_hierarquia.iloc[3:].reset_index(drop=True)
@@ -120,7 +141,7 @@ def processa_planilhas(file_hierarquia, file_estrutura_viva):
     df_hierarquia.dropna(inplace=True)
     df_hierarquia["Código"] = df_hierarquia["Código"].astype(str).str.strip()
     
-    print(f"Hierarquia processada: {df_hierarquia.shape}")
+    logger.info("Hierarquia processada: %s", df_hierarquia.shape)
 
     # Processar a planilha de estrutura viva sem alterar os demais dados
     if "Código Unidade" not in df_estrutura_viva.columns:
@@ -155,7 +176,7 @@ def processa_planilhas(file_hierarquia, file_estrutura_viva):
             "deno_unidade": unidade.strip()
         }
     
-    print(f"Informações de hierarquia processadas: {len(hierarquia_info)} códigos")
+    logger.info("Informações de hierarquia processadas: %s códigos", len(hierarquia_info))
 
     # Cria uma cópia dos dados originais da planilha de estrutura viva
     df_resultado = df_estrutura_viva.copy()
@@ -193,14 +214,20 @@ def processa_planilhas(file_hierarquia, file_estrutura_viva):
     # IMPORTANTE: Filtra apenas os registros que possuem um Grafo válido
     # Esses são os registros que realmente fazem parte da estrutura do ministério
     df_resultado = df_resultado[df_resultado["Grafo"].str.strip() != ""]
-    print(f"Total de registros após filtragem: {len(df_resultado)}")
+    logger.info("Total de registros após filtragem: %s", len(df_resultado))
     
     # Salvar dados no banco
-    registros_criados, erros = salvar_dados_no_banco(df_resultado)
+    resumo, erros = salvar_dados_no_banco(
+        df_resultado, origem=f"{file_hierarquia.name} + {file_estrutura_viva.name}", usuario=usuario
+    )
+    df_resultado.attrs['resumo_importacao'] = resumo
     
-    print(f"=== PROCESSAMENTO CONCLUÍDO ===")
-    print(f"Registros criados no banco: {registros_criados}")
-    print(f"Erros encontrados: {len(erros)}")
+    logger.info("=== PROCESSAMENTO CONCLUÍDO ===")
+    logger.info(
+        "Registros no banco: %s criados, %s alterados, %s removidos, %s inalterados",
+        resumo['criados'], resumo['alterados'], resumo['removidos'], resumo['inalterados']
+    )
+    logger.info("Erros encontrados: %s", len(erros))
             
     return df_resultado
 
@@ -209,19 +236,10 @@ def processa_organograma():
     Processa os dados das unidades e cargos em uma estrutura de grafo organizacional.
     Retorna um dicionário com a estrutura hierárquica e informações financeiras.
     """
-    # Buscar todos os cargos SIORG para referência de valores
-    cargos_siorg = {
-        f"{cargo.cargo}": {
-            'valor': Decimal(cargo.valor.replace('R$ ', '').replace('.', '').replace(',', '.')),
-            'unitario': cargo.unitario
-        }
-        for cargo in CargoSIORG.objects.all()
-    }
-
-    # Buscar todas as unidades - filtrando apenas as que têm grafo válido
-    unidades = UnidadeCargo.objects.exclude(grafo__exact='').exclude(grafo__isnull=True)
+    # Valor e pontos do CargoSIORG de cada unidade, pela junção tipo/categoria/nível
+    unidades = UnidadeCargo.objects.exclude(grafo__exact='').exclude(grafo__isnull=True).com_valores_siorg()
     
-    print(f"Total de unidades com grafo válido: {unidades.count()}")
+    logger.info("Total de unidades com grafo válido: %s", unidades.count())
     
     # Estrutura para armazenar o organograma
     organograma = {}
@@ -255,13 +273,8 @@ def processa_organograma():
         }
         
         # Calcular valor do cargo
-        cargo_key = f"{unidade_principal.tipo_cargo} {unidade_principal.categoria} {unidade_principal.nivel:02d}"
-        if cargo_key in cargos_siorg:
-            cargo_info['valor'] = cargos_siorg[cargo_key]['valor']
-            cargo_info['pontos'] = cargos_siorg[cargo_key]['unitario']
-        else:
-            cargo_info['valor'] = Decimal('0.00')
-            cargo_info['pontos'] = Decimal('0.00')
+        cargo_info['valor'] = unidade_principal.valor_siorg
+        cargo_info['pontos'] = unidade_principal.pontos_siorg
         
         # Criar ou atualizar entrada no organograma
         if codigo_atual not in organograma:
@@ -283,14 +296,9 @@ def processa_organograma():
                 'quantidade': unidade.quantidade
             }
             
-            cargo_key = f"{unidade.tipo_cargo} {unidade.categoria} {unidade.nivel:02d}"
-            if cargo_key in cargos_siorg:
-                cargo_info['valor'] = cargos_siorg[cargo_key]['valor']
-                cargo_info['pontos'] = cargos_siorg[cargo_key]['unitario']
-            else:
-                cargo_info['valor'] = Decimal('0.00')
-                cargo_info['pontos'] = Decimal('0.00')
-                
+            cargo_info['valor'] = unidade.valor_siorg
+            cargo_info['pontos'] = unidade.pontos_siorg
+
             organograma[codigo_atual]['cargos'].append(cargo_info)
         
         # Estabelecer relações hierárquicas
@@ -306,32 +314,19 @@ def estrutura_json_organograma():
     Estrutura os dados das unidades e cargos em um formato JSON hierárquico.
     Retorna uma lista de unidades com seus cargos e valores.
     """
-    from .models import UnidadeCargo, CargoSIORG
-    from decimal import Decimal
-    
-    # Buscar todos os cargos SIORG para referência de valores
-    cargos_siorg = {
-        f"{cargo.cargo}": {
-            'valor': Decimal(cargo.valor.replace('R$ ', '').replace('.', '').replace(',', '.')),
-            'unitario': cargo.unitario
-        }
-        for cargo in CargoSIORG.objects.all()
-    }
+    from .models import UnidadeCargo
     
     # Buscar todas as unidades com grafo válido
-    unidades = UnidadeCargo.objects.exclude(grafo__exact='').exclude(grafo__isnull=True)
+    unidades = UnidadeCargo.objects.exclude(grafo__exact='').exclude(grafo__isnull=True).com_valores_siorg()
     
     # Lista para armazenar todas as unidades processadas
     unidades_processadas = []
     
     # Processar cada unidade
     for unidade in unidades:
-        # Calcular valores do cargo
-        cargo_key = f"{unidade.tipo_cargo} {unidade.categoria} {unidade.nivel:02d}"
-        cargo_siorg = cargos_siorg.get(cargo_key, {'valor': Decimal('0'), 'unitario': Decimal('0')})
-        
-        valor_unitario = cargo_siorg['valor']
-        pontos = cargo_siorg['unitario']
+        # Valores do cargo (junção com CargoSIORG em com_valores_siorg)
+        valor_unitario = unidade.valor_siorg
+        pontos = unidade.pontos_siorg
         
         # Calcular totais
         quantidade = unidade.quantidade or 0
@@ -365,32 +360,19 @@ def estrutura_json_organograma_completa():
     Estrutura os dados das unidades e cargos em um formato JSON hierárquico.
     Retorna TODOS os dados, incluindo unidades sem grafo válido.
     """
-    from .models import UnidadeCargo, CargoSIORG
-    from decimal import Decimal
-    
-    # Buscar todos os cargos SIORG para referência de valores
-    cargos_siorg = {
-        f"{cargo.cargo}": {
-            'valor': Decimal(cargo.valor.replace('R$ ', '').replace('.', '').replace(',', '.')),
-            'unitario': cargo.unitario
-        }
-        for cargo in CargoSIORG.objects.all()
-    }
+    from .models import UnidadeCargo
     
     # Buscar TODAS as unidades (incluindo as sem grafo válido)
-    unidades = UnidadeCargo.objects.all()
+    unidades = UnidadeCargo.objects.com_valores_siorg()
     
     # Lista para armazenar todas as unidades processadas
     unidades_processadas = []
     
     # Processar cada unidade
     for unidade in unidades:
-        # Calcular valores do cargo
-        cargo_key = f"{unidade.tipo_cargo} {unidade.categoria} {unidade.nivel:02d}"
-        cargo_siorg = cargos_siorg.get(cargo_key, {'valor': Decimal('0'), 'unitario': Decimal('0')})
-        
-        valor_unitario = cargo_siorg['valor']
-        pontos = cargo_siorg['unitario']
+        # Valores do cargo (junção com CargoSIORG em com_valores_siorg)
+        valor_unitario = unidade.valor_siorg
+        pontos = unidade.pontos_siorg
         
         # Calcular totais
         quantidade = unidade.quantidade or 0
@@ -428,29 +410,23 @@ def processa_json_organograma(json_data):
     from decimal import Decimal
     import json
     
-    # Carregar dados do SIORG para referência
-    cargos_siorg = {
-        f"{cargo.cargo}": {
-            'valor': Decimal(cargo.valor.replace('R$ ', '').replace('.', '').replace(',', '.')),
-            'unitario': cargo.unitario
-        }
-        for cargo in CargoSIORG.objects.all()
-    }
+    # (tipo, categoria, nível) -> (valor, unitário) do SIORG
+    cargos_siorg = CargoSIORG.objects.tabela()
     
     def calcula_valores_unidade(unidade_data):
         """Calcula os valores totais de uma unidade"""
-        cargo_key = f"{unidade_data.get('tipo_cargo', '')} {unidade_data.get('categoria', '')} {unidade_data.get('nivel', ''):02d}"
-        cargo_info = cargos_siorg.get(cargo_key, {'valor': Decimal('0'), 'unitario': Decimal('0')})
+        cargo_key = (unidade_data.get('tipo_cargo', ''), unidade_data.get('categoria'), unidade_data.get('nivel'))
+        valor, unitario = cargos_siorg.get(cargo_key, (Decimal('0'), Decimal('0')))
         
         quantidade = unidade_data.get('quantidade', 0)
-        valor_total = cargo_info['valor'] * quantidade
-        pontos_total = cargo_info['unitario'] * quantidade
+        valor_total = valor * quantidade
+        pontos_total = unitario * quantidade
         
         return {
             'valor_total': float(valor_total),
             'pontos_total': float(pontos_total),
-            'valor_unitario': float(cargo_info['valor']),
-            'pontos_unitario': float(cargo_info['unitario'])
+            'valor_unitario': float(valor),
+            'pontos_unitario': float(unitario)
         }
     
     def processa_unidade(unidade_data):
@@ -496,7 +472,7 @@ def processa_json_organograma(json_data):
             
         return processa_unidade(dados)
     except Exception as e:
-        print(f"Erro ao processar JSON do organograma: {str(e)}")
+        logger.error("Erro ao processar JSON do organograma: %s", e)
         return None
 
 def _remove_sigla_from_denominacao(denominacao):
@@ -550,19 +526,19 @@ def _prepare_data_for_excel(data_list):
         return processed_list
     
     # Debug: log first few items
-    print(f"DEBUG: _prepare_data_for_excel received {len(data_list)} items")
+    logger.debug("_prepare_data_for_excel received %s items", len(data_list))
     if data_list:
-        print(f"DEBUG: First item keys: {list(data_list[0].keys())}")
-        print(f"DEBUG: First item: {data_list[0]}")
+        logger.debug("First item keys: %s", list(data_list[0].keys()))
+        logger.debug("First item: %s", data_list[0])
     
     # Check if this is complete data (327+ items) or filtered data
     is_complete_data = len(data_list) > 100  # Threshold to determine if it's complete data
     
     if is_complete_data:
-        print(f"DEBUG: Processing COMPLETE DATA ({len(data_list)} items)")
+        logger.debug("Processing COMPLETE DATA (%s items)", len(data_list))
         return _prepare_complete_data_for_excel(data_list)
     else:
-        print(f"DEBUG: Processing FILTERED DATA ({len(data_list)} items)")
+        logger.debug("Processing FILTERED DATA (%s items)", len(data_list))
         return _prepare_filtered_data_for_excel(data_list)
 
 def _prepare_complete_data_for_excel(data_list):
@@ -576,11 +552,11 @@ def _prepare_complete_data_for_excel(data_list):
     has_grafo = any(item.get('grafo', '') for item in data_list)
     has_codigo_unidade = any(item.get('codigo_unidade', '') for item in data_list)
     
-    print(f"DEBUG: Complete data has grafo: {has_grafo}, has codigo_unidade: {has_codigo_unidade}")
+    logger.debug("Complete data has grafo: %s, has codigo_unidade: %s", has_grafo, has_codigo_unidade)
     
     if not has_grafo and not has_codigo_unidade:
         # Fallback: organize by denominacao_unidade and nivel_hierarquico
-        print("DEBUG: Using fallback logic for complete data without grafo/codigo_unidade")
+        logger.debug("Using fallback logic for complete data without grafo/codigo_unidade")
         return _prepare_complete_data_fallback(data_list)
     
     # 1. Group data by major organizational units (first level of grafo)
@@ -595,7 +571,7 @@ def _prepare_complete_data_for_excel(data_list):
                     major_units[major_unit_code] = []
                 major_units[major_unit_code].append(item)
     
-    print(f"DEBUG: Found {len(major_units)} major units for complete data")
+    logger.debug("Found %s major units for complete data", len(major_units))
     
     # 2. Process major units in order
     major_unit_list = sorted(major_units.keys())
@@ -720,7 +696,7 @@ def _prepare_complete_data_fallback(data_list):
                 units[denominacao_unidade] = []
             units[denominacao_unidade].append(item)
     
-    print(f"DEBUG: Fallback - Found {len(units)} units by denominacao_unidade")
+    logger.debug("Fallback - Found %s units by denominacao_unidade", len(units))
     
     # Process units in alphabetical order
     for unit_name in sorted(units.keys()):
@@ -797,19 +773,19 @@ def _prepare_filtered_data_for_excel(data_list):
     Prepare filtered data for Excel export with hierarchical structure
     NOVA LÓGICA: Agrupar cargos idênticos GLOBALMENTE primeiro, depois determinar unidade
     """
-    print(f"DEBUG: Processing FILTERED DATA ({len(data_list)} items)")
+    logger.debug("Processing FILTERED DATA (%s items)", len(data_list))
     
     if not data_list:
         return []
     
     # Debug first item
     first_item = data_list[0]
-    print(f"DEBUG: First item keys: {list(first_item.keys())}")
-    print(f"DEBUG: First item: {first_item}")
+    logger.debug("First item keys: %s", list(first_item.keys()))
+    logger.debug("First item: %s", first_item)
     
     # ETAPA 1: Agrupar cargos idênticos GLOBALMENTE (independente da unidade)
     grouped_globally = _group_identical_cargos(data_list)
-    print(f"DEBUG: Agrupamento global: {len(data_list)} -> {len(grouped_globally)} cargos únicos")
+    logger.debug("Agrupamento global: %s -> %s cargos únicos", len(data_list), len(grouped_globally))
     
     # ETAPA 2: Identificar PAI pelo MAIOR NÍVEL DO CARGO
     main_unit_sigla = None
@@ -823,7 +799,7 @@ def _prepare_filtered_data_for_excel(data_list):
             highest_cargo_level = nivel
             main_unit_sigla = sigla
     
-    print(f"DEBUG: PAI identificado: {main_unit_sigla} (nível do cargo: {highest_cargo_level})")
+    logger.debug("PAI identificado: %s (nível do cargo: %s)", main_unit_sigla, highest_cargo_level)
     
     # ETAPA 3: Para cada cargo agrupado, determinar em qual unidade deve aparecer
     processed_list = []
@@ -891,7 +867,7 @@ def _prepare_filtered_data_for_excel(data_list):
                 else:
                     unit_display_name = denominacao_escolhida.lower()
         
-        print(f"DEBUG: Cargo {grouped_cargo['denominacao']} {grouped_cargo['tipo_cargo']} {grouped_cargo['categoria']}.{grouped_cargo['nivel']} -> Unidade: '{unit_display_name}' (QTD: {grouped_cargo['quantidade']})")
+        logger.debug("Cargo %s %s %s.%s -> Unidade: '%s' (QTD: %s)", grouped_cargo['denominacao'], grouped_cargo['tipo_cargo'], grouped_cargo['categoria'], grouped_cargo['nivel'], unit_display_name, grouped_cargo['quantidade'])
         
         # Adicionar ao grupo da unidade
         if unit_display_name not in unit_groups:
@@ -972,7 +948,7 @@ def _prepare_filtered_data_for_excel(data_list):
                     'cargo_formatado': ''
                 })
     
-    print(f"DEBUG: Resultado final: {len(processed_list)} linhas")
+    logger.debug("Resultado final: %s linhas", len(processed_list))
     return processed_list
 
 def gerar_anexo_simulacao(data_atual, data_nova):
@@ -982,6 +958,8 @@ def gerar_anexo_simulacao(data_atual, data_nova):
     and populates data from row 8.
     """
     import os
+    import openpyxl
+    from openpyxl.styles import Alignment
     
     planilha_ativa = None
     
@@ -990,13 +968,13 @@ def gerar_anexo_simulacao(data_atual, data_nova):
         planilha_ativa = PlanilhaImportada.objects.get(ativo=True)
         # Verify if the file actually exists
         if not os.path.exists(planilha_ativa.arquivo.path):
-            print(f"WARNING: Active planilha file not found: {planilha_ativa.arquivo.path}")
+            logger.warning("Active planilha file not found: %s", planilha_ativa.arquivo.path)
             planilha_ativa = None
     except PlanilhaImportada.DoesNotExist:
-        print("WARNING: No active planilha found in database.")
+        logger.warning("No active planilha found in database.")
         planilha_ativa = None
     except PlanilhaImportada.MultipleObjectsReturned:
-        print("WARNING: Multiple active planilhas found. Using the first one.")
+        logger.warning("Multiple active planilhas found. Using the first one.")
         try:
             planilha_ativa = PlanilhaImportada.objects.filter(ativo=True).first()
         except:
@@ -1004,12 +982,12 @@ def gerar_anexo_simulacao(data_atual, data_nova):
 
     # If no active planilha or file doesn't exist, try to find any available planilha
     if not planilha_ativa:
-        print("INFO: Searching for any available planilha template...")
+        logger.debug("Searching for any available planilha template...")
         available_planilhas = PlanilhaImportada.objects.all().order_by('-data_importacao')
         
         for planilha in available_planilhas:
             if os.path.exists(planilha.arquivo.path):
-                print(f"INFO: Using available planilha: {planilha.nome}")
+                logger.info("Using available planilha: %s", planilha.nome)
                 planilha_ativa = planilha
                 # Set this one as active for future use
                 planilha.ativo = True
@@ -1025,7 +1003,7 @@ def gerar_anexo_simulacao(data_atual, data_nova):
     try:
         # Load the workbook, trying with keep_vba=False first
         workbook = openpyxl.load_workbook(planilha_ativa.arquivo.path, keep_vba=False, data_only=False)
-        print(f"SUCCESS: Loaded template: {planilha_ativa.nome}")
+        logger.info("Loaded template: %s", planilha_ativa.nome)
     except Exception as e:
         raise ValueError(f"Erro ao carregar o template da planilha '{planilha_ativa.nome}': {str(e)}")
 
@@ -1060,24 +1038,16 @@ def gerar_anexo_simulacao(data_atual, data_nova):
     #    Data will be populated starting from row 8.
 
     # Debug: log input data
-    print(f"DEBUG: gerar_anexo_simulacao - data_atual length: {len(data_atual)}")
-    print(f"DEBUG: gerar_anexo_simulacao - data_nova length: {len(data_nova)}")
-    
-    # Debug: log input data
-    print(f"DEBUG: gerar_anexo_simulacao - data_atual length: {len(data_atual)}")
-    print(f"DEBUG: gerar_anexo_simulacao - data_nova length: {len(data_nova)}")
+    logger.debug("gerar_anexo_simulacao - data_atual length: %s", len(data_atual))
+    logger.debug("gerar_anexo_simulacao - data_nova length: %s", len(data_nova))
 
     # 3. Prepare and populate data
     processed_atual = _prepare_data_for_excel(data_atual)
     processed_nova = _prepare_data_for_excel(data_nova)
     
     # Debug: log processed data
-    print(f"DEBUG: gerar_anexo_simulacao - processed_atual length: {len(processed_atual)}")
-    print(f"DEBUG: gerar_anexo_simulacao - processed_nova length: {len(processed_nova)}")
-    
-    # Debug: log processed data
-    print(f"DEBUG: gerar_anexo_simulacao - processed_atual length: {len(processed_atual)}")
-    print(f"DEBUG: gerar_anexo_simulacao - processed_nova length: {len(processed_nova)}")
+    logger.debug("gerar_anexo_simulacao - processed_atual length: %s", len(processed_atual))
+    logger.debug("gerar_anexo_simulacao - processed_nova length: %s", len(processed_nova))
 
     # Define alignments
     align_left = Alignment(horizontal='left', vertical='center')
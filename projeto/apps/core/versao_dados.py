@@ -0,0 +1,83 @@
+"""
+Versão (geração) dos dados do organograma.
+
+Caches derivados de UnidadeCargo/CargoSIORG (catálogo de unidades, ETags,
+tabelas dos relatórios, etc.) guardam a versão com que foram montados e são
+descartados quando ela muda. A versão fica no banco (GeracaoDados, uma linha),
+compartilhada por todos os workers; cada processo guarda o último valor lido
+por VERSAO_DADOS_TTL segundos, então os outros workers enxergam uma mudança em
+no máximo esse tempo. Os sinais em models.py e as importações a incrementam,
+sempre após o commit.
+"""
+
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# Último valor lido do banco neste processo: (versao, expira_em)
+_versao_local = (None, 0.0)
+
+
+def _ttl():
+    return getattr(settings, 'VERSAO_DADOS_TTL', 2)
+
+
+def _ler_do_banco():
+    from .models import GeracaoDados
+
+    versao = GeracaoDados.objects.filter(pk=1).values_list('numero', flat=True).first()
+    if versao is None:
+        # Semente baseada no relógio: ETags emitidos antes de um banco novo
+        # (restauração, reinstalação) não coincidem com a nova versão
+        try:
+            with transaction.atomic():
+                GeracaoDados.objects.create(pk=1, numero=int(time.time()))
+        except IntegrityError:
+            pass  # criada por outro processo
+        versao = GeracaoDados.objects.values_list('numero', flat=True).get(pk=1)
+    return versao
+
+
+def versao_atual():
+    """Retorna a versão atual dos dados (lida do banco no máximo a cada VERSAO_DADOS_TTL s)."""
+    global _versao_local
+    versao, expira_em = _versao_local
+    if versao is None or time.monotonic() >= expira_em:
+        versao = _ler_do_banco()
+        _versao_local = (versao, time.monotonic() + _ttl())
+    return versao
+
+
+async def aversao_atual():
+    """Versão assíncrona de versao_atual(), para views async (ASGI)."""
+    from asgiref.sync import sync_to_async
+
+    versao, expira_em = _versao_local
+    if versao is not None and time.monotonic() < expira_em:
+        return versao
+    return await sync_to_async(versao_atual)()
+
+
+def descartar_versao_local():
+    """Força a próxima chamada de versao_atual() a ler o banco."""
+    global _versao_local
+    _versao_local = (None, 0.0)
+
+
+def _incrementar():
+    from .models import GeracaoDados
+
+    _ler_do_banco()  # garante a linha
+    GeracaoDados.objects.filter(pk=1).update(numero=F('numero') + 1)
+    descartar_versao_local()
+
+
+def nova_versao():
+    """
+    Incrementa a versão dos dados, invalidando os caches derivados em todos os
+    workers. Dentro de uma transação o incremento só acontece após o commit
+    (num rollback nada muda).
+    """
+    transaction.on_commit(_incrementar)
@@ -0,0 +1,120 @@
+"""
+Views do app core, separadas por funcionalidade.
+
+Os módulos são reexportados aqui para que urls.py e demais importações
+(`from apps.core.views import ...`, `views.nome_da_view`) continuem funcionando.
+Bibliotecas pesadas (pandas, openpyxl, reportlab, xlsxwriter) são importadas
+dentro das funções que as usam.
+"""
+
+from .hierarquia import (
+    identificar_tipo_no,
+    contar_funcionarios_no_pai,
+    contar_funcionarios_no_agregador,
+    contar_funcionarios_unidade,
+    contar_gsiste_no_pai,
+    contar_gsisp_no_pai,
+    contar_gsiste_nivel_no_pai,
+    contar_gsiste_unidade,
+    contar_gsisp_unidade,
+    contar_gsiste_nivel_unidade,
+)
+from .autenticacao import (
+    CustomLoginView,
+    register,
+    home,
+    CustomSocialLoginView,
+    perfil,
+    editar_perfil,
+    alterar_senha,
+    index,
+)
+from .organograma import (
+    organograma,
+    api_organograma_dados,
+    organograma_view,
+    organograma_redirect,
+    organograma_data,
+    organograma_page,
+    simulacao_page,
+    simular_troca_cargo,
+    view_organograma,
+    api_organograma,
+    teste_api_organograma,
+    get_unidade_data,
+    api_organograma_detalhes,
+    api_organograma_filhos,
+    organograma_ondemand,
+    atualizar_organograma_json,
+    api_organograma_filter,
+    api_cargos,
+    api_cargos_diretos,
+    comparador,
+)
+from .financeira import (
+    financeira_page,
+    financeira_data,
+    financeira_export,
+    exportar_csv,
+    exportar_xlsx,
+    exportar_pdf,
+    exportar_html,
+    financeira,
+    financeira_data_real,
+    api_financeira_organograma,
+)
+from .simulacoes import (
+    BaixarAnexoSimulacaoView,
+    listar_simulacoes,
+    salvar_simulacao,
+    carregar_simulacao,
+    deletar_simulacao,
+    atualizar_simulacao,
+    listar_simulacoes_gerente,
+    enviar_simulacao_para_analise,
+    avaliar_simulacao,
+    criar_solicitacao_simulacao,
+    listar_usuarios_internos,
+    minhas_solicitacoes_simulacao,
+    aceitar_solicitacao_simulacao,
+    vincular_simulacao_solicitacao,
+    adicionar_cargo,
+    mesclar_simulacoes,
+)
+from .solicitacoes import (
+    enviar_solicitacao_realocacao,
+    enviar_solicitacao_permuta,
+    api_minhas_solicitacoes,
+)
+from .notificacoes import (
+    minhas_notificacoes,
+    aguardar_notificacoes,
+    marcar_notificacao_lida,
+    excluir_notificacao,
+    excluir_todas_notificacoes,
+)
+from .relatorios import (
+    relatorios,
+    calcular_relatorio_gratificacoes,
+    api_relatorio_pontos_gratificacoes,
+    calcular_relatorio_idp,
+    api_relatorio_idp,
+    calcular_relatorio_iee,
+    api_relatorio_iee,
+    api_historico_decretos,
+    exportar_relatorio_pdf,
+    buscar_dados_gratificacoes,
+    buscar_dados_idp,
+    buscar_dados_iee,
+    buscar_dados_decretos,
+    buscar_dados_siglario,
+    montar_contexto_pdf,
+    gerar_pdf_relatorio,
+    obter_nome_completo_unidade,
+    obter_titulo_relatorio,
+    limpar_cache_relatorios,
+)
+from .siglario import (
+    api_siglario,
+    api_unidades_disponiveis,
+)
@@ -0,0 +1,631 @@
+"""
+Views do monitoramento financeiro e suas exportações.
+"""
+
+from django.http import JsonResponse, HttpResponse
+from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+import os
+from django.conf import settings
+import json
+import logging
+import csv
+import io
+from django.template.loader import render_to_string
+from ..financeira_export import dados_financeiros_backup, exportar_csv_simples, exportar_html_simples
+from django.views.decorators.http import require_http_methods
+
+logger = logging.getLogger(__name__)
+
+
+@login_required(login_url="/login_direct/")
+def financeira_page(request):
+    """
+    View que renderiza a página financeira com integração
+    direta com o organograma e simulação.
+    """
+    return render(request, "core/financeira.html")
+
+
+@login_required(login_url="/login_direct/")
+def financeira_data(request):
+    """
+    Retorna dados financeiros em formato JSON reutilizando a mesma
+    lógica empregada pela API de Organograma. Toda a computação é
+    delegada à função `financeira_data_real`, garantindo consistência
+    e eliminando a antiga API simulada.
+    """
+
+    # Delega imediatamente para a implementação baseada no organograma.
+    return financeira_data_real(request)
+
+
+@login_required(login_url="/login_direct/")
+def financeira_export(request):
+    """
+    Exporta dados financeiros em diferentes formatos: PDF, CSV, XLSX, HTML
+    """
+    try:
+        # Processar parâmetros do request
+        formato = request.GET.get('formato', 'html')
+        periodo = request.GET.get('periodo', 'Mês Atual')
+        componente = request.GET.get('componente', 'completo')
+        
+        # Obter dados financeiros
+        # Reutilização da lógica de financeira_data
+        try:
+            response = financeira_data(request)
+            if response.status_code == 200:
+                dados = json.loads(response.content)
+                dados["titulo"] = "Relatório de Pontuação"
+                dados["periodo"] = periodo
+            else:
+                # Usar dados de backup
+                dados = dados_financeiros_backup()
+        except Exception:
+            # Em caso de erro, usar dados de backup
+            dados = dados_financeiros_backup()
+            
+        # Filtrar dados conforme o componente solicitado
+        if componente == 'resumo':
+            dados_filtrados = {
+                "orcamento_total": dados["orcamento_total"],
+                "executado_total": dados["executado_total"],
+                "variacao_periodo": dados["variacao_periodo"],
+                "titulo": "Resumo de Pontuação",
+                "periodo": periodo
+            }
+        elif componente == 'distribuicao':
+            dados_filtrados = {
+                "unidades": dados["unidades"],
+                "titulo": "Distribuição por Unidade",
+                "periodo": periodo
+            }
+        elif componente == 'execucao':
+            dados_filtrados = {
+                "execucao_mensal": dados["execucao_mensal"],
+                "titulo": "Execução Orçamentária",
+                "periodo": periodo
+            }
+        else:  # completo
+            dados_filtrados = dados
+            
+        # Exportar conforme o formato
+        try:
+            if formato == 'csv':
+                return exportar_csv(dados_filtrados, componente)
+            elif formato == 'xlsx':
+                return exportar_xlsx(dados_filtrados, componente)
+            elif formato == 'pdf':
+                return exportar_pdf(dados_filtrados, componente)
+            else:  # html
+                return exportar_html(dados_filtrados, componente)
+        except Exception as e:
+            # Em caso de falha na exportação, usar versões simplificadas de backup
+            logger.error(f"Erro ao exportar dados no formato {formato}: {e}")
+            
+            if formato == 'csv':
+                return exportar_csv_simples(dados_filtrados, componente)
+            elif formato == 'xlsx':
+                # Para XLSX, retornar CSV como fallback
+                return exportar_csv_simples(dados_filtrados, componente)
+            elif formato == 'pdf':
+                # Para PDF, retornar HTML como fallback
+                return exportar_html_simples(dados_filtrados, componente)
+            else:
+                return exportar_html_simples(dados_filtrados, componente)
+            
+    except Exception as e:
+        logger.error(f"Erro ao exportar dados financeiros: {e}")
+        
+        # Retornar página de erro como último recurso
+        response = HttpResponse(
+            f"""
+            <html>
+            <head><title>Erro de Exportação</title></head>
+            <body>
+                <h1>Erro ao exportar dados</h1>
+                <p>Ocorreu um erro ao processar sua solicitação. Por favor, tente novamente mais tarde.</p>
+                <p>Detalhe: {str(e)}</p>
+                <a href="javascript:history.back()">Voltar</a>
+            </body>
+            </html>
+            """,
+            content_type='text/html'
+        )
+        return response
+
+
+def exportar_csv(dados, componente):
+    """Exportar dados para CSV"""
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="financeiro_{componente}.csv"'
+    
+    writer = csv.writer(response)
+    
+    if componente == 'resumo':
+        writer.writerow(['Métrica', 'Valor'])
+        writer.writerow(['Orçamento Total', f'R$ {dados["orcamento_total"]}'])
+        writer.writerow(['Executado Total', f'R$ {dados["executado_total"]}'])
+        writer.writerow(['Variação Período', f'{dados["variacao_periodo"]}%'])
+    elif componente == 'distribuicao':
+        writer.writerow(['Unidade', 'Orçamento', 'Executado', 'Percentual', 'Status'])
+        for unidade in dados["unidades"]:
+            writer.writerow([
+                unidade["nome"],
+                f'R$ {unidade["orcamento"]}',
+                f'R$ {unidade["executado"]}',
+                f'{unidade["percentual"]}%',
+                unidade["status"]
+            ])
+    elif componente == 'execucao':
+        writer.writerow(['Mês', 'Orçado', 'Executado'])
+        for execucao in dados["execucao_mensal"]:
+            writer.writerow([
+                execucao["mes"],
+                f'R$ {execucao["orcado"]}',
+                f'R$ {execucao["executado"]}'
+            ])
+    else:  # completo
+        # Sumário
+        writer.writerow(['RELATÓRIO FINANCEIRO COMPLETO'])
+        writer.writerow(['Período', dados["periodo"]])
+        writer.writerow(['Data Geração', timezone.now().strftime('%d/%m/%Y %H:%M')])
+        writer.writerow([])
+        
+        # Resumo
+        writer.writerow(['RESUMO FINANCEIRO'])
+        writer.writerow(['Orçamento Total', f'R$ {dados["orcamento_total"]}'])
+        writer.writerow(['Executado Total', f'R$ {dados["executado_total"]}'])
+        writer.writerow(['Variação Período', f'{dados["variacao_periodo"]}%'])
+        writer.writerow([])
+        
+        # Distribuição
+        writer.writerow(['DISTRIBUIÇÃO POR UNIDADE'])
+        writer.writerow(['Unidade', 'Orçamento', 'Executado', 'Percentual', 'Status'])
+        for unidade in dados["unidades"]:
+            writer.writerow([
+                unidade["nome"],
+                f'R$ {unidade["orcamento"]}',
+                f'R$ {unidade["executado"]}',
+                f'{unidade["percentual"]}%',
+                unidade["status"]
+            ])
+        writer.writerow([])
+        
+        # Execução
+        writer.writerow(['EXECUÇÃO ORÇAMENTÁRIA'])
+        writer.writerow(['Mês', 'Orçado', 'Executado'])
+        for execucao in dados["execucao_mensal"]:
+            writer.writerow([
+                execucao["mes"],
+                f'R$ {execucao["orcado"]}',
+                f'R$ {execucao["executado"]}'
+            ])
+            
+    return response
+
+
+def exportar_xlsx(dados, componente):
+    """Exportar dados para XLSX"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        # Fallback para CSV se xlsxwriter não estiver disponível
+        response = HttpResponse(content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="erro.txt"'
+        response.write('Biblioteca xlsxwriter não está instalada. Tente exportar como CSV.')
+        return response
+    
+    # Criar arquivo temporário
+    output = io.BytesIO()
+    
+    try:
+        workbook = xlsxwriter.Workbook(output)
+        
+        # Formatos
+        titulo_format = workbook.add_format({
+            'bold': True, 
+            'font_size': 14, 
+            'align': 'center', 
+            'valign': 'vcenter'
+        })
+        header_format = workbook.add_format({
+            'bold': True, 
+            'bg_color': '#D0D0D0', 
+            'border': 1
+        })
+        cell_format = workbook.add_format({'border': 1})
+        money_format = workbook.add_format({
+            'num_format': 'R$ #,##0.00',
+            'border': 1
+        })
+        percent_format = workbook.add_format({
+            'num_format': '0.0%',
+            'border': 1
+        })
+        
+        # Criar planilha baseada no componente
+        if componente == 'resumo':
+            worksheet = workbook.add_worksheet('Resumo Financeiro')
+            worksheet.set_column('A:A', 20)
+            worksheet.set_column('B:B', 15)
+            
+            # Título
+            worksheet.merge_range('A1:B1', f'Resumo Financeiro - {dados["periodo"]}', titulo_format)
+            
+            # Cabeçalhos
+            worksheet.write('A3', 'Métrica', header_format)
+            worksheet.write('B3', 'Valor', header_format)
+            
+            # Dados
+            row = 3
+            worksheet.write(row, 0, 'Orçamento Total', cell_format)
+            worksheet.write(row, 1, float(dados["orcamento_total"]), money_format)
+            row += 1
+            worksheet.write(row, 0, 'Executado Total', cell_format)
+            worksheet.write(row, 1, float(dados["executado_total"]), money_format)
+            row += 1
+            worksheet.write(row, 0, 'Variação Período', cell_format)
+            worksheet.write(row, 1, float(dados["variacao_periodo"]) / 100, percent_format)
+            
+        elif componente == 'distribuicao':
+            worksheet = workbook.add_worksheet('Distribuição por Unidade')
+            worksheet.set_column('A:A', 30)
+            worksheet.set_column('B:D', 15)
+            worksheet.set_column('E:E', 12)
+            
+            # Título
+            worksheet.merge_range('A1:E1', f'Distribuição por Unidade - {dados["periodo"]}', titulo_format)
+            
+            # Cabeçalhos
+            worksheet.write('A3', 'Unidade', header_format)
+            worksheet.write('B3', 'Orçamento', header_format)
+            worksheet.write('C3', 'Executado', header_format)
+            worksheet.write('D3', 'Percentual', header_format)
+            worksheet.write('E3', 'Status', header_format)
+            
+            # Dados
+            row = 3
+            for unidade in dados["unidades"]:
+                worksheet.write(row, 0, unidade["nome"], cell_format)
+                worksheet.write(row, 1, float(unidade["orcamento"]), money_format)
+                worksheet.write(row, 2, float(unidade["executado"]), money_format)
+                worksheet.write(row, 3, float(unidade["percentual"]) / 100, percent_format)
+                worksheet.write(row, 4, unidade["status"], cell_format)
+                row += 1
+                
+        elif componente == 'execucao':
+            worksheet = workbook.add_worksheet('Execução Orçamentária')
+            worksheet.set_column('A:A', 10)
+            worksheet.set_column('B:C', 18)
+            
+            # Título
+            worksheet.merge_range('A1:C1', f'Execução Orçamentária - {dados["periodo"]}', titulo_format)
+            
+            # Cabeçalhos
+            worksheet.write('A3', 'Mês', header_format)
+            worksheet.write('B3', 'Orçado', header_format)
+            worksheet.write('C3', 'Executado', header_format)
+            
+            # Dados
+            row = 3
+            for execucao in dados["execucao_mensal"]:
+                worksheet.write(row, 0, execucao["mes"], cell_format)
+                worksheet.write(row, 1, float(execucao["orcado"]), money_format)
+                worksheet.write(row, 2, float(execucao["executado"]), money_format)
+                row += 1
+                
+        else:  # completo
+            # Planilha de Resumo
+            worksheet = workbook.add_worksheet('Resumo')
+            worksheet.set_column('A:A', 20)
+            worksheet.set_column('B:B', 15)
+            
+            # Título e informações
+            worksheet.merge_range('A1:B1', f'Relatório Financeiro - {dados["periodo"]}', titulo_format)
+            worksheet.write('A2', 'Data Geração:', cell_format)
+            worksheet.write('B2', timezone.now().strftime('%d/%m/%Y %H:%M'), cell_format)
+            
+            # Resumo
+            worksheet.write('A4', 'Métrica', header_format)
+            worksheet.write('B4', 'Valor', header_format)
+            
+            row = 4
+            worksheet.write(row, 0, 'Orçamento Total', cell_format)
+            worksheet.write(row, 1, float(dados["orcamento_total"]), money_format)
+            row += 1
+            worksheet.write(row, 0, 'Executado Total', cell_format)
+            worksheet.write(row, 1, float(dados["executado_total"]), money_format)
+            row += 1
+            worksheet.write(row, 0, 'Variação Período', cell_format)
+            worksheet.write(row, 1, float(dados["variacao_periodo"]) / 100, percent_format)
+            
+            # Planilha de Distribuição
+            worksheet = workbook.add_worksheet('Distribuição')
+            worksheet.set_column('A:A', 30)
+            worksheet.set_column('B:D', 15)
+            worksheet.set_column('E:E', 12)
+            
+            # Título
+            worksheet.merge_range('A1:E1', 'Distribuição por Unidade', titulo_format)
+            
+            # Cabeçalhos
+            worksheet.write('A3', 'Unidade', header_format)
+            worksheet.write('B3', 'Orçamento', header_format)
+            worksheet.write('C3', 'Executado', header_format)
+            worksheet.write('D3', 'Percentual', header_format)
+            worksheet.write('E3', 'Status', header_format)
+            
+            # Dados
+            row = 3
+            for unidade in dados["unidades"]:
+                worksheet.write(row, 0, unidade["nome"], cell_format)
+                worksheet.write(row, 1, float(unidade["orcamento"]), money_format)
+                worksheet.write(row, 2, float(unidade["executado"]), money_format)
+                worksheet.write(row, 3, float(unidade["percentual"]) / 100, percent_format)
+                worksheet.write(row, 4, unidade["status"], cell_format)
+                row += 1
+                
+            # Planilha de Execução
+            worksheet = workbook.add_worksheet('Execução')
+            worksheet.set_column('A:A', 10)
+            worksheet.set_column('B:C', 18)
+            
+            # Título
+            worksheet.merge_range('A1:C1', 'Execução Orçamentária', titulo_format)
+            
+            # Cabeçalhos
+            worksheet.write('A3', 'Mês', header_format)
+            worksheet.write('B3', 'Orçado', header_format)
+            worksheet.write('C3', 'Executado', header_format)
+            
+            # Dados
+            row = 3
+            for execucao in dados["execucao_mensal"]:
+                worksheet.write(row, 0, execucao["mes"], cell_format)
+                worksheet.write(row, 1, float(execucao["orcado"]), money_format)
+                worksheet.write(row, 2, float(execucao["executado"]), money_format)
+                row += 1
+        
+        # Fechar o workbook
+        workbook.close()
+        
+        # Preparar a resposta
+        output.seek(0)
+        response = HttpResponse(output.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        response['Content-Disposition'] = f'attachment; filename="financeiro_{componente}.xlsx"'
+        
+        return response
+    except Exception as e:
+        logger.error(f"Erro ao criar arquivo Excel: {e}")
+        
+        # Retornar mensagem de erro se algo falhar
+        response = HttpResponse(content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="erro.txt"'
+        response.write(f'Erro ao gerar arquivo Excel: {str(e)}')
+        return response
+
+
+def exportar_pdf(dados, componente):
+    """Exportar dados para PDF"""
+    try:
+        # Se weasyprint estiver instalado, usamos para conversão HTML -> PDF
+        from weasyprint import HTML
+        
+        try:
+            # Primeiro geramos o HTML
+            html_content = exportar_html(dados, componente, para_pdf=True).content.decode('utf-8')
+            
+            # Converter HTML para PDF
+            pdf_bytes = HTML(string=html_content).write_pdf()
+            
+            # Retornar como resposta
+            response = HttpResponse(pdf_bytes, content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="financeiro_{componente}.pdf"'
+            return response
+        except Exception as e:
+            logger.error(f"Erro ao gerar PDF: {e}")
+            
+            # Retornar mensagem de erro se algo falhar no processamento
+            response = HttpResponse(content_type='text/plain')
+            response['Content-Disposition'] = f'attachment; filename="erro_pdf.txt"'
+            response.write(f'Erro ao gerar PDF: {str(e)}. Tente exportar como HTML ou CSV.')
+            return response
+    except ImportError:
+        # Fallback: explicar que weasyprint não está instalado
+        response = HttpResponse(content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="erro.txt"'
+        response.write('Biblioteca weasyprint não está instalada. Tente exportar como HTML ou CSV.')
+        return response
+
+
+def exportar_html(dados, componente, para_pdf=False):
+    """Exportar dados para HTML"""
+    context = {
+        'dados': dados,
+        'componente': componente,
+        'data_geracao': timezone.now(),
+        'para_pdf': para_pdf
+    }
+    
+    # Renderizar o template HTML
+    html_string = render_to_string('core/exports/financeira_export.html', context)
+    
+    response = HttpResponse(html_string, content_type='text/html')
+    if not para_pdf:
+        response['Content-Disposition'] = f'inline; filename="financeiro_{componente}.html"'
+    
+    return response
+
+
+@login_required(login_url="/login_direct/")
+def financeira(request):
+    """
+    View para renderizar a página de monitoramento financeiro.
+    """
+    return render(request, 'core/financeira.html')
+
+
+@login_required(login_url="/login_direct/")
+def financeira_data_real(request):
+    """
+    Retorna dados financeiros REAIS do banco de dados em formato JSON.
+    Utiliza os mesmos dados do organograma.
+    """
+    # Obtém o período da requisição
+    periodo = request.GET.get('periodo', 'Mês Atual')
+    
+    try:
+        # Importar a mesma função utilizada pelo organograma
+        from ..utils import estrutura_json_organograma
+        
+        # Obter os dados do organograma, que já contém valores de gastos e pontos
+        unidades_dados = estrutura_json_organograma()
+        
+        if not unidades_dados:
+            raise Exception("Nenhuma unidade encontrada")
+        
+        # Agrupar dados por departamento (código_unidade) e, paralelamente,
+        # acumular os totais globais (incluindo a unidade raiz 308804).
+
+        departamentos = {}
+        orcamento_total = 0.0
+        executado_total = 0.0
+
+        for linha in unidades_dados:
+            cod = str(linha.get('codigo_unidade', ''))
+
+            pontos = float(linha.get('pontos_total', 0))
+            gastos = float(linha.get('gasto_total', 0))
+
+            # Atualiza os totais globais (inclui MPO)
+            orcamento_total += pontos
+            executado_total += gastos
+
+            # Para a lista de unidades queremos EXCLUIR o MPO (308804)
+            if cod == '308804':
+                continue
+
+            if cod not in departamentos:
+                departamentos[cod] = {
+                    'codigo': cod,
+                    'nome': linha.get('denominacao_unidade', 'Sem nome'),
+                    'orcamento': 0.0,
+                    'executado': 0.0
+                }
+
+            departamentos[cod]['orcamento'] += pontos
+            departamentos[cod]['executado'] += gastos
+
+        # Converter em lista e calcular percentuais
+        unidades_financeiras = []
+
+        for dep in departamentos.values():
+            orc = dep['orcamento']
+            exe = dep['executado']
+            pct = (exe / orc * 100) if orc > 0 else 0
+
+            dep['percentual'] = pct
+            dep['status'] = "Crítico" if pct < 50 else ("Atenção" if pct < 80 else "Adequado")
+
+            unidades_financeiras.append(dep)
+
+        # Ordenar lista por Pontos (orcamento) decrescente
+        unidades_financeiras.sort(key=lambda x: x['orcamento'], reverse=True)
+        
+        # Percentual e status gerais
+        percentual = (executado_total / orcamento_total * 100) if orcamento_total > 0 else 0
+        status = "Crítico" if percentual < 50 else ("Atenção" if percentual < 80 else "Adequado")
+        
+        # Simular dados de execução mensal (como não temos dados históricos)
+        from datetime import datetime
+        from dateutil.relativedelta import relativedelta
+        
+        execucao_mensal = []
+        meses = []
+        
+        # Criar array com os últimos 6 meses
+        data_atual = datetime.now()
+        for i in range(5, -1, -1):
+            data_mes = data_atual - relativedelta(months=i)
+            meses.append(data_mes.strftime("%b/%Y"))
+        
+        # Calcular valor médio mensal para distribuição
+        valor_medio_mensal_orcamento = orcamento_total / 6
+        valor_medio_mensal_executado = executado_total / 6
+        
+        # Distribuir valores nos meses (de forma crescente para simular execução)
+        for i, mes in enumerate(meses):
+            fator = (i + 1) / 6  # Fator crescente de 1/6 até 1
+            
+            execucao_mensal.append({
+                "mes": mes,
+                "orcado": valor_medio_mensal_orcamento,
+                "executado": valor_medio_mensal_executado * fator
+            })
+        
+        # Preparação dos dados de resposta
+        dados = {
+            "orcamento_total": orcamento_total,
+            "executado_total": executado_total,
+            "percentual_execucao": percentual,
+            "status": status,
+            "variacao_periodo": 0.0,  # Valor real precisa ser calculado com dados históricos
+            "unidades": unidades_financeiras,
+            "execucao_mensal": execucao_mensal,
+            "periodo": periodo
+        }
+        
+        return JsonResponse(dados)
+        
+    except Exception as e:
+        # Log do erro
+        logger.error("Erro ao processar dados financeiros reais: %s", e)
+        
+        # Em caso de erro, retornar estrutura vazia mas válida
+        dados = {
+            "orcamento_total": 0,
+            "executado_total": 0,
+            "percentual_execucao": 0,
+            "status": "Não disponível",
+            "variacao_periodo": 0,
+            "unidades": [],
+            "execucao_mensal": [],
+            "periodo": periodo,
+            "erro": str(e)  # Incluir mensagem de erro para depuração
+        }
+        
+        return JsonResponse(dados)
+
+
+@require_http_methods(["GET"])
+def api_financeira_organograma(request):
+    """API específica para a tela Financeira que devolve o mesmo JSON do organograma,
+    mas em endpoint independente, evitando interferência entre páginas."""
+    try:
+        # Mesmo arquivo JSON utilizado pela API de organograma
+        json_path = os.path.join(settings.BASE_DIR, 'static', 'data', 'organograma.json')
+
+        if not os.path.exists(json_path):
+            return JsonResponse({
+                'error': 'Arquivo organograma.json não encontrado. Execute uma atualização no Admin primeiro.'
+            }, status=404)
+
+        with open(json_path, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+
+        # Se dados for lista com item único, extrair
+        if isinstance(dados, list) and len(dados) == 1:
+            dados = dados[0]
+
+        # Retorna dados sem modificação
+        return JsonResponse(dados, safe=True)
+
+    except json.JSONDecodeError as e:
+        return JsonResponse({'error': f'Erro ao decodificar o arquivo: {str(e)}'}, status=500)
+    except Exception as e:
+        import traceback
+        traceback_str = traceback.format_exc()
+        return JsonResponse({'error': f'Erro inesperado: {str(e)}', 'stack_trace': traceback_str}, status=500)
@@ -0,0 +1,268 @@
+"""
+Contagem hierárquica de funcionários e gratificações por unidade.
+"""
+
+from ..models import UnidadeCargo
+
+
+# Funções auxiliares para lógica hierárquica de contagem de funcionários
+def identificar_tipo_no(sigla_unidade):
+    """
+    Identifica se um nó é pai (secretaria) ou agregador (superior).
+    """
+    # Buscar o nó na tabela UnidadeCargo
+    no = UnidadeCargo.objects.filter(sigla_unidade=sigla_unidade).first()
+    
+    if not no:
+        return None, None
+    
+    # Verificar se é um nó agregador (tem múltiplos filhos diretos)
+    # Filhos diretos são nós que contêm o código do nó pai no grafo
+    filhos_diretos = UnidadeCargo.objects.filter(
+        grafo__contains=f"-{no.codigo_unidade}-"
+    ).exclude(codigo_unidade=no.codigo_unidade)
+    
+    # Filtrar apenas os filhos diretos únicos (não netos e sem duplicatas)
+    filhos_reais = {}
+    for filho in filhos_diretos:
+        # Verificar se é filho direto (não tem outros códigos entre o pai e o filho)
+        grafo_filho = filho.grafo
+        codigos_grafo = grafo_filho.split('-')
+        
+        # Encontrar a posição do código do pai no grafo
+        try:
+            pos_pai = codigos_grafo.index(str(no.codigo_unidade))
+            # Se o código do filho está logo após o código do pai, é filho direto
+            if pos_pai + 1 < len(codigos_grafo) and codigos_grafo[pos_pai + 1] == str(filho.codigo_unidade):
+                # Usar sigla_unidade como chave para evitar duplicatas
+                filhos_reais[filho.sigla_unidade] = filho
+        except ValueError:
+            continue
+    
+    # Converter para lista
+    filhos_reais_lista = list(filhos_reais.values())
+    
+    # Verificar se é um nó agregador (tem múltiplos filhos diretos)
+    if len(filhos_reais_lista) > 1:
+        return "AGREGADOR", no
+    elif len(filhos_reais_lista) == 1:
+        # Se tem apenas 1 filho, verificar se esse filho tem filhos
+        filho = filhos_reais_lista[0]
+        netos = UnidadeCargo.objects.filter(
+            grafo__contains=f"-{filho.codigo_unidade}-"
+        ).exclude(codigo_unidade=filho.codigo_unidade)
+        
+        if netos.count() > 0:
+            return "AGREGADOR", no
+        else:
+            return "PAI", no
+    else:
+        # Se não tem filhos diretos, é um nó pai
+        return "PAI", no
+
+
+def contar_funcionarios_no_pai(sigla_unidade):
+    """
+    Conta funcionários de um nó pai usando a coluna 'diretoria' ou 'coordenacao'.
+    Tenta primeiro 'diretoria', depois 'coordenacao'.
+    Inclui tratamento especial para casos onde a secretaria contém MPO/SIGLA.
+    """
+    from ..models import RelatorioGratificacoes
+    from django.db.models import Q
+    
+    # Construir filtros robustos que incluem variações MPO/SIGLA
+    diretoria_filter = Q(diretoria=sigla_unidade)
+    coordenacao_filter = Q(coordenacao=sigla_unidade)
+    
+    # Tratamento especial para casos MPO/SIGLA (adiciona busca por secretaria também)
+    if sigla_unidade:
+        # Buscar por variações MPO/SIGLA em qualquer campo relevante
+        mpo_pattern = f"MPO/{sigla_unidade}"
+        diretoria_filter |= Q(diretoria=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(coordenacao=mpo_pattern)
+        coordenacao_filter |= Q(coordenacao=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(diretoria=mpo_pattern)
+    
+    # Contar por diretoria (incluindo todas as variações)
+    count_diretoria = RelatorioGratificacoes.objects.filter(diretoria_filter).count()
+    
+    # Contar por coordenacao (incluindo todas as variações)
+    count_coordenacao = RelatorioGratificacoes.objects.filter(coordenacao_filter).count()
+    
+    # Retornar o maior valor (priorizar diretoria se igual)
+    return max(count_diretoria, count_coordenacao)
+
+
+def contar_funcionarios_no_agregador(sigla_unidade, no_agregador):
+    """
+    Conta funcionários de um nó agregador somando:
+    1. Funcionários próprios (coordenacao/diretoria)
+    2. Funcionários de TODOS os descendentes na árvore hierárquica
+    """
+    # 1. Contar funcionários próprios do nó agregador
+    funcionarios_proprios = contar_funcionarios_no_pai(sigla_unidade)
+    
+    # 2. Encontrar TODOS os descendentes (não apenas filhos diretos)
+    # Buscar todos os nós que têm o código do agregador no seu grafo
+    todos_descendentes = UnidadeCargo.objects.filter(
+        grafo__contains=f"-{no_agregador.codigo_unidade}-"
+    ).exclude(codigo_unidade=no_agregador.codigo_unidade)
+    
+    # 3. Contar funcionários de todos os descendentes (sem duplicatas por sigla)
+    descendentes_unicos = {}
+    for descendente in todos_descendentes:
+        sigla_desc = descendente.sigla_unidade
+        if sigla_desc not in descendentes_unicos:
+            descendentes_unicos[sigla_desc] = descendente
+    
+    # 4. Somar funcionários de todos os descendentes
+    total_descendentes = 0
+    for sigla_desc, descendente in descendentes_unicos.items():
+        # Contar funcionários diretos do descendente (sem recursão para evitar loop)
+        funcionarios_desc = contar_funcionarios_no_pai(sigla_desc)
+        total_descendentes += funcionarios_desc
+    
+    # 5. Somar funcionários próprios + todos os descendentes
+    return funcionarios_proprios + total_descendentes
+
+
+def contar_funcionarios_unidade(sigla_unidade):
+    """
+    Conta funcionários de uma unidade usando a lógica hierárquica.
+    """
+    tipo_no, no = identificar_tipo_no(sigla_unidade)
+    
+    if tipo_no == "PAI":
+        return contar_funcionarios_no_pai(sigla_unidade)
+    elif tipo_no == "AGREGADOR":
+        return contar_funcionarios_no_pai(sigla_unidade)  # Usar apenas funcionários próprios, não somar descendentes
+    else:
+        return 0
+
+
+def contar_gsiste_no_pai(sigla_unidade):
+    """
+    Conta funcionários com GSISTE (qualquer valor exceto GSISP) de um nó pai.
+    GSISTE inclui: G.SPO, GSISTE.CF, G.SISG, G.SIPEC
+    """
+    from ..models import RelatorioGratificacoes
+    from django.db.models import Q
+    
+    # Construir filtros robustos que incluem variações MPO/SIGLA
+    # GSISTE = qualquer valor exceto 'GSISP'
+    diretoria_filter = Q(diretoria=sigla_unidade) & ~Q(gsiste='GSISP') & ~Q(gsiste='')
+    coordenacao_filter = Q(coordenacao=sigla_unidade) & ~Q(gsiste='GSISP') & ~Q(gsiste='')
+    
+    # Tratamento especial para casos MPO/SIGLA (adiciona busca por secretaria também)
+    if sigla_unidade:
+        # Buscar por variações MPO/SIGLA em qualquer campo relevante
+        mpo_pattern = f"MPO/{sigla_unidade}"
+        diretoria_filter |= (Q(diretoria=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(coordenacao=mpo_pattern)) & ~Q(gsiste='GSISP') & ~Q(gsiste='')
+        coordenacao_filter |= (Q(coordenacao=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(diretoria=mpo_pattern)) & ~Q(gsiste='GSISP') & ~Q(gsiste='')
+    
+    # Contar por diretoria (incluindo todas as variações)
+    count_diretoria = RelatorioGratificacoes.objects.filter(diretoria_filter).count()
+    
+    # Contar por coordenacao (incluindo todas as variações)
+    count_coordenacao = RelatorioGratificacoes.objects.filter(coordenacao_filter).count()
+    
+    # Retornar o maior valor (priorizar diretoria se igual)
+    return max(count_diretoria, count_coordenacao)
+
+
+def contar_gsisp_no_pai(sigla_unidade):
+    """
+    Conta funcionários com GSISTE = 'GSISP' de um nó pai usando a mesma lógica de contagem.
+    """
+    from ..models import RelatorioGratificacoes
+    from django.db.models import Q
+    
+    # Construir filtros robustos que incluem variações MPO/SIGLA
+    diretoria_filter = Q(diretoria=sigla_unidade) & Q(gsiste='GSISP')
+    coordenacao_filter = Q(coordenacao=sigla_unidade) & Q(gsiste='GSISP')
+    
+    # Tratamento especial para casos MPO/SIGLA (adiciona busca por secretaria também)
+    if sigla_unidade:
+        # Buscar por variações MPO/SIGLA em qualquer campo relevante
+        mpo_pattern = f"MPO/{sigla_unidade}"
+        diretoria_filter |= (Q(diretoria=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(coordenacao=mpo_pattern)) & Q(gsiste='GSISP')
+        coordenacao_filter |= (Q(coordenacao=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(diretoria=mpo_pattern)) & Q(gsiste='GSISP')
+    
+    # Contar por diretoria (incluindo todas as variações)
+    count_diretoria = RelatorioGratificacoes.objects.filter(diretoria_filter).count()
+    
+    # Contar por coordenacao (incluindo todas as variações)
+    count_coordenacao = RelatorioGratificacoes.objects.filter(coordenacao_filter).count()
+    
+    # Retornar o maior valor (priorizar diretoria se igual)
+    return max(count_diretoria, count_coordenacao)
+
+
+def contar_gsiste_nivel_no_pai(sigla_unidade, nivel_tipo):
+    """
+    Conta funcionários com GSISTE_NIVEL específico (NI ou NS) de um nó pai.
+    nivel_tipo pode ser 'NI' ou 'NS'.
+    """
+    from ..models import RelatorioGratificacoes
+    from django.db.models import Q
+    
+    # Construir filtros robustos que incluem variações MPO/SIGLA
+    diretoria_filter = Q(diretoria=sigla_unidade) & Q(gsiste_nivel=nivel_tipo)
+    coordenacao_filter = Q(coordenacao=sigla_unidade) & Q(gsiste_nivel=nivel_tipo)
+    
+    # Tratamento especial para casos MPO/SIGLA (adiciona busca por secretaria também)
+    if sigla_unidade:
+        # Buscar por variações MPO/SIGLA em qualquer campo relevante
+        mpo_pattern = f"MPO/{sigla_unidade}"
+        diretoria_filter |= (Q(diretoria=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(coordenacao=mpo_pattern)) & Q(gsiste_nivel=nivel_tipo)
+        coordenacao_filter |= (Q(coordenacao=mpo_pattern) | Q(secretaria=mpo_pattern) | Q(diretoria=mpo_pattern)) & Q(gsiste_nivel=nivel_tipo)
+    
+    # Contar por diretoria (incluindo todas as variações)
+    count_diretoria = RelatorioGratificacoes.objects.filter(diretoria_filter).count()
+    
+    # Contar por coordenacao (incluindo todas as variações)
+    count_coordenacao = RelatorioGratificacoes.objects.filter(coordenacao_filter).count()
+    
+    # Retornar o maior valor (priorizar diretoria se igual)
+    return max(count_diretoria, count_coordenacao)
+
+
+def contar_gsiste_unidade(sigla_unidade):
+    """
+    Conta funcionários com GSISTE (qualquer valor exceto GSISP) de uma unidade usando a lógica hierárquica.
+    """
+    tipo_no, no = identificar_tipo_no(sigla_unidade)
+    
+    if tipo_no == "PAI":
+        return contar_gsiste_no_pai(sigla_unidade)
+    elif tipo_no == "AGREGADOR":
+        return contar_gsiste_no_pai(sigla_unidade)  # Usar apenas funcionários próprios, não somar descendentes
+    else:
+        return 0
+
+
+def contar_gsisp_unidade(sigla_unidade):
+    """
+    Conta funcionários com GSISTE = 'GSISP' de uma unidade usando a lógica hierárquica.
+    """
+    tipo_no, no = identificar_tipo_no(sigla_unidade)
+    
+    if tipo_no == "PAI":
+        return contar_gsisp_no_pai(sigla_unidade)
+    elif tipo_no == "AGREGADOR":
+        return contar_gsisp_no_pai(sigla_unidade)  # Usar apenas funcionários próprios, não somar descendentes
+    else:
+        return 0
+
+
+def contar_gsiste_nivel_unidade(sigla_unidade, nivel_tipo):
+    """
+    Conta funcionários com GSISTE_NIVEL específico de uma unidade usando a lógica hierárquica.
+    nivel_tipo pode ser 'NI' ou 'NS'.
+    """
+    tipo_no, no = identificar_tipo_no(sigla_unidade)
+    
+    if tipo_no == "PAI":
+        return contar_gsiste_nivel_no_pai(sigla_unidade, nivel_tipo)
+    elif tipo_no == "AGREGADOR":
+        return contar_gsiste_nivel_no_pai(sigla_unidade, nivel_tipo)  # Usar apenas funcionários próprios, não somar descendentes
+    else:
+        return 0
@@ -0,0 +1,240 @@
+"""
+Views das notificações de simulação.
+"""
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse
+from django.contrib.auth.decorators import login_required
+from ..models import NotificacaoSimulacao
+from django.conf import settings
+import json
+from django.views.decorators.http import require_http_methods
+from django.views.decorators.csrf import csrf_exempt
+
+
+CAMPOS_NOTIFICACAO = ['id', 'tipo', 'titulo', 'mensagem', 'lida', 'criada_em', 'solicitacao_id', 'simulacao_id']
+
+
+def _serializar_notificacoes(notificacoes):
+    """Serializa notificações usando apenas as colunas projetadas (sem acessar as FKs)."""
+    return [{
+        'id': notif.id,
+        'tipo': notif.tipo,
+        'titulo': notif.titulo,
+        'mensagem': notif.mensagem,
+        'lida': notif.lida,
+        'criada_em': notif.criada_em.strftime('%d/%m/%Y %H:%M'),
+        'solicitacao_id': notif.solicitacao_id,
+        'simulacao_id': notif.simulacao_id
+    } for notif in notificacoes]
+
+
+LIMITE_NOTIFICACOES = 20
+
+
+async def _resposta_notificacoes(usuario, contador, since=None):
+    """
+    Monta a resposta de notificações: as últimas 20 ou, com o cursor 'since',
+    as 20 seguintes ao id informado, em ordem crescente de id. 'mais' indica
+    que há outras depois delas: o cliente repete a chamada com o novo cursor
+    até 'mais' ser falso, sem pular nenhuma.
+    """
+    notificacoes = NotificacaoSimulacao.objects.filter(usuario=usuario).only(*CAMPOS_NOTIFICACAO)
+    if since is None:
+        notificacoes = notificacoes.order_by('-criada_em', '-id')
+    else:
+        notificacoes = notificacoes.filter(id__gt=since).order_by('id')
+    pagina = [n async for n in notificacoes[:LIMITE_NOTIFICACOES + 1]]
+    mais = since is not None and len(pagina) > LIMITE_NOTIFICACOES
+    data = _serializar_notificacoes(pagina[:LIMITE_NOTIFICACOES])
+    
+    cursor = max([since or 0] + [n['id'] for n in data])
+    response = JsonResponse({
+        'notificacoes': data,
+        'total': len(data),
+        'nao_lidas': max(contador.nao_lidas, 0),
+        'versao': contador.versao,
+        'cursor': cursor,
+        'mais': mais
+    })
+    response['ETag'] = contador.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _parse_since(request):
+    try:
+        return int(request.GET['since'])
+    except (KeyError, ValueError):
+        return None
+
+
+@login_required
+@require_http_methods(["GET"])
+async def minhas_notificacoes(request):
+    """
+    Lista notificações do usuário.
+    O contador de não lidas vem de ContadorNotificacoes (sem COUNT). Clientes podem
+    enviar If-None-Match com o ETag anterior (304 sem consultar a lista) e
+    ?since=<id> para receber apenas notificações novas.
+    View assíncrona: sob ASGI não ocupa uma thread enquanto espera o banco.
+    """
+    from ..models import ContadorNotificacoes
+    
+    usuario = await request.auser()
+    contador = await ContadorNotificacoes.aobter(usuario.id)
+    if request.headers.get('If-None-Match') == contador.etag:
+        response = HttpResponse(status=304)
+        response['ETag'] = contador.etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    return await _resposta_notificacoes(usuario, contador, since=_parse_since(request))
+
+
+@login_required
+@require_http_methods(["GET"])
+async def aguardar_notificacoes(request):
+    """
+    Long-poll de notificações: segura a requisição até a versão do contador mudar
+    (ou até ?timeout= segundos, máx. NOTIFICACOES_LONG_POLL_MAX) e retorna apenas
+    as notificações com id maior que ?since=. Cada verificação é uma leitura por PK.
+    A espera usa asyncio.sleep: sob ASGI o long-poll não prende um worker.
+    Sob WSGI (NEXO_MODO_SERVIDOR sync/gthread) a espera prenderia o worker ou a
+    thread inteira: a view responde na hora, com Retry-After indicando quando
+    o cliente deve consultar de novo (polling comum).
+    """
+    import asyncio
+    import time
+    from ..models import ContadorNotificacoes
+    
+    since = _parse_since(request)
+    try:
+        versao_cliente = int(request.GET.get('versao', ''))
+    except ValueError:
+        versao_cliente = None
+    timeout_maximo = getattr(settings, 'NOTIFICACOES_LONG_POLL_MAX', 25)
+    try:
+        timeout = min(float(request.GET.get('timeout', timeout_maximo)), timeout_maximo)
+    except ValueError:
+        timeout = timeout_maximo
+    intervalo = getattr(settings, 'NOTIFICACOES_LONG_POLL_INTERVALO', 1.0)
+    sob_asgi = isinstance(request, ASGIRequest)
+    
+    usuario = await request.auser()
+    contador = await ContadorNotificacoes.aobter(usuario.id)
+    if versao_cliente is None:
+        versao_cliente = contador.versao
+    
+    limite = time.monotonic() + (timeout if sob_asgi else 0)
+    while contador.versao == versao_cliente and time.monotonic() < limite:
+        await asyncio.sleep(intervalo)
+        contador = await ContadorNotificacoes.aobter(usuario.id)
+    
+    if contador.versao == versao_cliente:
+        response = HttpResponse(status=304)
+        response['ETag'] = contador.etag
+    else:
+        response = await _resposta_notificacoes(usuario, contador, since=since)
+    if not sob_asgi:
+        response['Retry-After'] = str(max(int(timeout), 1))
+    return response
+
+
+@login_required
+@require_http_methods(["POST"])
+def marcar_notificacao_lida(request):
+    """
+    Marca uma notificação como lida (ou todas, com {"todas": true})
+    """
+    try:
+        data = json.loads(request.body)
+        notificacao_id = data.get('notificacao_id')
+        
+        if data.get('todas'):
+            total = NotificacaoSimulacao.objects.filter(usuario=request.user).marcar_lidas()
+            return JsonResponse({'mensagem': f'{total} notificações marcadas como lidas', 'total_marcadas': total})
+        
+        if not notificacao_id:
+            return JsonResponse({'erro': 'ID da notificação é obrigatório'}, status=400)
+        
+        notificacoes = NotificacaoSimulacao.objects.filter(
+            id=notificacao_id,
+            usuario=request.user
+        )
+        if not notificacoes.marcar_lidas() and not notificacoes.exists():
+            return JsonResponse({'erro': 'Notificação não encontrada'}, status=404)
+        
+        return JsonResponse({'mensagem': 'Notificação marcada como lida'})
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@csrf_exempt
+@require_http_methods(["DELETE", "POST"])
+def excluir_notificacao(request):
+    """
+    Exclui uma notificação específica do usuário
+    """
+    try:
+        # Verificar se há dados no corpo da requisição
+        if hasattr(request, 'body') and request.body:
+            try:
+                data = json.loads(request.body.decode('utf-8'))
+                notificacao_id = data.get('notificacao_id')
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return JsonResponse({'erro': 'Dados JSON inválidos'}, status=400)
+        else:
+            return JsonResponse({'erro': 'Dados não fornecidos'}, status=400)
+        
+        if not notificacao_id:
+            return JsonResponse({'erro': 'ID da notificação é obrigatório'}, status=400)
+        
+        try:
+            notificacao = NotificacaoSimulacao.objects.get(
+                id=notificacao_id,
+                usuario=request.user
+            )
+            notificacao.delete()
+            
+            return JsonResponse({'mensagem': 'Notificação excluída com sucesso'})
+        except NotificacaoSimulacao.DoesNotExist:
+            return JsonResponse({'erro': 'Notificação não encontrada'}, status=404)
+        
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f'Erro ao excluir notificação: {str(e)}')
+        return JsonResponse({'erro': f'Erro interno: {str(e)}'}, status=500)
+
+
+@login_required
+@csrf_exempt
+@require_http_methods(["DELETE", "POST"])
+def excluir_todas_notificacoes(request):
+    """
+    Exclui todas as notificações do usuário
+    """
+    try:
+        # Excluir todas as notificações do usuário com um único DELETE
+        total_notificacoes = NotificacaoSimulacao.objects.filter(
+            usuario=request.user
+        ).excluir()
+        
+        if total_notificacoes == 0:
+            return JsonResponse({'mensagem': 'Nenhuma notificação encontrada para excluir'})
+        
+        return JsonResponse({
+            'mensagem': f'{total_notificacoes} notificações excluídas com sucesso',
+            'total_excluidas': total_notificacoes
+        })
+        
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f'Erro ao excluir todas as notificações: {str(e)}')
+        return JsonResponse({'erro': f'Erro interno: {str(e)}'}, status=500)
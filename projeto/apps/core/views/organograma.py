@@ -0,0 +1,770 @@
+"""
+Views do organograma, comparador e consultas de cargos.
+"""
+
+from django.http import JsonResponse, HttpResponse
+from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from ..models import CargoSIORG
+import os
+from django.conf import settings
+import json
+import logging
+from django.views.decorators.http import require_http_methods
+from ..roteador_banco import ler_da_replica
+from django.views.decorators.csrf import csrf_exempt
+from ..dados_json_update import gerar_organograma_json
+
+logger = logging.getLogger(__name__)
+
+
+@login_required
+def organograma(request):
+    """
+    Renderiza a página do organograma.
+    A página não embute os dados: o script os busca em api_organograma_dados
+    (com ETag), então o HTML é pequeno e independe do tamanho da base.
+    """
+    return render(request, 'core/organograma.html')
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_organograma_dados(request):
+    """
+    Dados do organograma e do comparador (linhas de UnidadeCargo + cargos SIORG).
+    
+    Sem parâmetros devolve a base completa (JSON serializado uma vez por versão
+    dos dados). Modo sob demanda:
+    - ?niveis=N: apenas os N primeiros níveis do grafo;
+    - ?codigo=X&niveis=N: os N níveis abaixo da unidade X.
+    A resposta do modo sob demanda traz em 'expansiveis' as unidades do limite do
+    corte que ainda têm subordinadas. ETag muda a cada alteração dos dados.
+    """
+    from ..indice_organograma import aobter_indice
+    
+    try:
+        indice = await aobter_indice()
+    except Exception as e:
+        logger.error(f"Erro ao carregar dados do organograma: {str(e)}")
+        return JsonResponse({'erro': f'Erro ao carregar dados do organograma: {str(e)}'}, status=500)
+    
+    codigo = request.GET.get('codigo', '').strip() or None
+    niveis = request.GET.get('niveis', '').strip()
+    sob_demanda = bool(codigo or niveis)
+    if sob_demanda:
+        try:
+            niveis = max(int(niveis or 1), 1)
+        except ValueError:
+            return JsonResponse({'erro': 'Parâmetro niveis inválido'}, status=400)
+    
+    # O ETag depende só da versão dos dados; o corte faz parte da URL
+    etag = indice.etag
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    elif sob_demanda:
+        linhas, expansiveis = indice.linhas_ate_nivel(niveis, codigo=codigo)
+        payload = {
+            'core_unidadecargo': linhas,
+            'expansiveis': expansiveis,
+            'versao': indice.versao,
+        }
+        if codigo is None:
+            payload['core_cargosiorg'] = indice.cargos
+        response = JsonResponse(payload)
+    else:
+        response = HttpResponse(await indice.ajson_completo(), content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+    
+
+@login_required
+def organograma_view(request):
+    return render(request, 'core/organograma.html')
+
+
+@require_http_methods(["GET"])
+def organograma_redirect(request):
+    """View para redirecionar da URL original do organograma para a nova visualização"""
+    return render(request, 'organograma_redirect.html')
+
+
+@login_required
+def organograma_data(request):
+    """
+    Endpoint que retorna os dados do organograma em formato JSON.
+    """
+    from ..utils import processa_organograma
+    from ..models import UnidadeCargo
+    
+    try:
+        # Buscar dados do organograma
+        organograma = processa_organograma()
+        
+        # Contar total de unidades
+        total_unidades = len(organograma)
+        
+        # Contar unidades com valores
+        unidades_com_valores = sum(1 for info in organograma.values() if info.get('custo_total', 0) > 0)
+        
+        # Preparar mensagem sobre os dados filtrados
+        mensagem = ""
+        if total_unidades > 0:
+            total_registros = UnidadeCargo.objects.count()
+            registros_filtrados = total_registros - UnidadeCargo.objects.exclude(grafo__exact='').exclude(grafo__isnull=True).count()
+            
+            if registros_filtrados > 0:
+                mensagem = f"{registros_filtrados} registros foram filtrados por não pertencerem à estrutura do ministério."
+        
+        # Retornar os dados em formato JSON
+        return JsonResponse({
+            'status': 'success',
+            'data': organograma,
+            'meta': {
+                'total_unidades': total_unidades,
+                'unidades_com_valores': unidades_com_valores,
+                'mensagem': mensagem
+            }
+        })
+    except Exception as e:
+        # Log do erro para depuração
+        logger.error(f"Erro ao processar dados do organograma: {str(e)}")
+        
+        # Retornar mensagem de erro
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Ocorreu um erro ao processar os dados: {str(e)}'
+        }, status=500)
+
+
+@login_required
+def organograma_page(request):
+    """Renderiza a página do organograma."""
+    return render(request, 'core/organograma.html')
+
+
+@login_required(login_url="/login_direct/")
+def simulacao_page(request):
+    """
+    View que renderiza a página de simulação do organograma
+    onde o usuário pode adicionar nomes e criar conexões manualmente.
+    """
+    import json
+    
+    try:
+        # Tentar ler o arquivo organograma.json para passar ao template
+        import os
+        from django.conf import settings
+        
+        json_path = os.path.join(settings.BASE_DIR, 'static', 'data', 'organograma.json')
+        
+        # Verificar se o arquivo existe
+        if os.path.exists(json_path):
+            with open(json_path, 'r', encoding='utf-8') as f:
+                organograma_data = json.load(f)
+                
+            # Converter para string JSON para passar ao template
+            organograma_data_json = json.dumps(organograma_data)
+        else:
+            # Se o arquivo não existir, usar um objeto vazio
+            organograma_data_json = json.dumps({
+                "core_unidadecargo": []
+            })
+    except Exception as e:
+        # Em caso de erro, usar um objeto vazio
+        logger.error(f"Erro ao carregar dados do organograma para simulacao_page: {str(e)}")
+        
+        organograma_data_json = json.dumps({
+            "core_unidadecargo": []
+        })
+    
+    return render(request, "core/simulacao.html", {
+        'organograma_data': organograma_data_json
+    })
+
+
+def simular_troca_cargo(request):
+    if request.method == 'POST':
+        data = json.loads(request.body)
+        cargo_atual = data.get('cargo_atual')
+        cargo_novo = data.get('cargo_novo')
+        
+        # Buscar valores dos cargos
+        cargo_atual_siorg = CargoSIORG.objects.filter(
+            tipo_cargo=cargo_atual['tipo'], categoria=cargo_atual['categoria'], nivel_cargo=cargo_atual['nivel']
+        ).first()
+        
+        cargo_novo_siorg = CargoSIORG.objects.filter(
+            tipo_cargo=cargo_novo['tipo'], categoria=cargo_novo['categoria'], nivel_cargo=cargo_novo['nivel']
+        ).first()
+        
+        if not cargo_atual_siorg or not cargo_novo_siorg:
+            return JsonResponse({'error': 'Cargo não encontrado'}, status=400)
+        
+        # Calcular diferenças
+        diferenca_valor = (cargo_novo_siorg.valor_decimal - cargo_atual_siorg.valor_decimal) * cargo_atual['quantidade']
+        diferenca_pontos = (cargo_novo_siorg.unitario - cargo_atual_siorg.unitario) * cargo_atual['quantidade']
+        
+        return JsonResponse({
+            'diferenca_valor': str(diferenca_valor),
+            'diferenca_pontos': str(diferenca_pontos),
+            'valor_atual': str(cargo_atual_siorg.valor_decimal * cargo_atual['quantidade']),
+            'valor_novo': str(cargo_novo_siorg.valor_decimal * cargo_atual['quantidade']),
+            'pontos_atual': str(cargo_atual_siorg.unitario * cargo_atual['quantidade']),
+            'pontos_novo': str(cargo_novo_siorg.unitario * cargo_atual['quantidade'])
+        })
+    
+    return JsonResponse({'error': 'Método não permitido'}, status=405)
+
+
+@login_required
+@require_http_methods(["GET"])
+def view_organograma(request):
+    """View para exibir o organograma visual com D3.js"""
+    return render(request, 'organograma.html')
+
+
+@require_http_methods(["GET"])
+def api_organograma(request):
+    """API endpoint para fornecer os dados do organograma diretamente do banco de dados"""
+    try:
+        # Usar o mesmo arquivo JSON que usamos para o template
+        json_path = os.path.join(settings.BASE_DIR, 'static', 'data', 'organograma.json')
+        
+        # Verificar se o arquivo existe
+        if not os.path.exists(json_path):
+            return JsonResponse({
+                'error': 'Arquivo organograma.json não encontrado. Execute uma atualização no Admin primeiro.'
+            }, status=404)
+            
+        # Carregar os dados
+        with open(json_path, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        
+        # Se dados é uma lista com um único item, extrair esse item
+        if isinstance(dados, list) and len(dados) == 1:
+            dados = dados[0]
+            
+        # Retornar os dados sem modificações adicionais
+        return JsonResponse(dados, safe=True)
+        
+    except json.JSONDecodeError as e:
+        logger.error("Erro ao decodificar organograma.json: %s", e)
+        return JsonResponse({
+            'error': f'Erro ao decodificar o arquivo de dados: {str(e)}',
+            'core_unidadecargo': []
+        }, status=500)
+    except Exception as e:
+        import traceback
+        traceback_str = traceback.format_exc()
+        logger.error("Erro em api_organograma: %s\n%s", e, traceback_str)
+        return JsonResponse({
+            'error': f'Erro inesperado: {str(e)}',
+            'stack_trace': traceback_str,
+            'core_unidadecargo': []
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+def teste_api_organograma(request):
+    """API endpoint para fornecer os dados do organograma diretamente do banco de dados (para teste)"""
+    try:
+        # Usar o dados.json para servir ao organograma
+        dados_json_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'dados.json')
+        
+        # Verificar se o arquivo existe
+        if not os.path.exists(dados_json_path):
+            return JsonResponse({
+                'error': 'Arquivo dados.json não encontrado. Execute uma atualização no Admin primeiro.'
+            }, status=404)
+            
+        # Carregar os dados
+        with open(dados_json_path, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        
+        # Verificar formato dos dados
+        dados_validos = False
+        if isinstance(dados, dict) and "unidades" in dados:
+            dados_validos = True
+        elif isinstance(dados, list) and len(dados) > 0:
+            dados_validos = True
+            dados = dados[0] if len(dados) == 1 else dados
+        
+        # Para teste, adicionar informações extras
+        dados_debug = dados if dados_validos else {'error': 'Formato de dados inválido ou vazio'}
+        
+        # Adicionar informações de debug
+        if isinstance(dados_debug, dict):
+            dados_debug['_debug_info'] = {
+                'tipo': type(dados).__name__,
+                'tamanho': len(str(dados)),
+                'chaves': list(dados.keys() if isinstance(dados, dict) else []),
+                'unidades_count': len(dados.get('unidades', []) if isinstance(dados, dict) else []),
+                'path': dados_json_path,
+                'valido': dados_validos
+            }
+        
+        # Retornar os dados brutos para inspeção
+        return HttpResponse(json.dumps(dados_debug, indent=2, ensure_ascii=False), 
+                          content_type='application/json')
+    
+    except json.JSONDecodeError as e:
+        return JsonResponse({
+            'error': f'Erro ao decodificar o arquivo de dados: {str(e)}'
+        }, status=500)
+    except Exception as e:
+        logger.exception("Erro ao carregar organograma")
+        return JsonResponse({
+            'error': f'Erro inesperado: {str(e)}'
+        }, status=500)
+
+
+def get_unidade_data(request, codigo_unidade):
+    from ..indice_organograma import obter_indice
+    
+    # Só unidades com grafo válido estão no índice do organograma
+    indice = obter_indice()
+    no = indice.no(codigo_unidade)
+    if no is None:
+        return JsonResponse({
+            'success': False,
+            'error': 'Unidade não encontrada ou sem estrutura válida'
+        })
+    
+    # Usar a linha com o cargo de maior nível como principal
+    principal = max(indice.cargos_da_unidade(codigo_unidade), key=lambda linha: linha['nivel'] or 0)
+    
+    return JsonResponse({
+        'success': True,
+        'unidade': {
+            'codigo': no['codigo'],
+            'denominacao': no['denominacao'],
+            'tipo_cargo': principal['tipo_cargo'],
+            'categoria': principal['categoria'],
+            'nivel': principal['nivel'],
+            # O grafo é o caminho de códigos da raiz até a unidade ("raiz-...-codigo")
+            'grafo': principal['grafo'].split('-')
+        }
+    })
+
+
+@require_http_methods(["GET"])
+@ler_da_replica
+def api_organograma_detalhes(request, codigo):
+    """
+    API para obter detalhes específicos de uma unidade pelo código.
+    Esta API é usada para carregar detalhes sob demanda no organograma.
+    """
+    from ..indice_organograma import obter_indice
+    
+    try:
+        indice = obter_indice()
+        if indice.no(codigo) is None:
+            return JsonResponse({
+                'error': f'Unidade com código {codigo} não encontrada'
+            }, status=404)
+        
+        # Retornar os detalhes da unidade
+        detalhes = indice.resumo_no(str(codigo))
+        detalhes['cargos'] = indice.cargos_da_unidade(codigo)
+        return JsonResponse(detalhes)
+        
+    except Exception as e:
+        return JsonResponse({
+            'error': f'Erro ao buscar detalhes da unidade: {str(e)}'
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_organograma_filhos(request, codigo):
+    """
+    Subárvore de uma unidade para a expansão sob demanda do organograma.
+    Devolve o nó, seus filhos diretos (até ?depth=k níveis, padrão 1) com os
+    totais da subárvore e a quantidade de filhos de cada um.
+    Use codigo 'raiz' para obter as unidades de primeiro nível.
+    """
+    from ..indice_organograma import aobter_indice
+    
+    try:
+        profundidade = min(max(int(request.GET.get('depth', 1)), 1), 10)
+    except ValueError:
+        return JsonResponse({'erro': 'Parâmetro depth inválido'}, status=400)
+    
+    indice = await aobter_indice()
+    if request.headers.get('If-None-Match') == indice.etag:
+        response = HttpResponse(status=304)
+    elif codigo == 'raiz':
+        response = JsonResponse({
+            'no': None,
+            'filhos': [indice.resumo_no(raiz, profundidade - 1) for raiz in indice.raizes],
+            'versao': indice.versao
+        })
+    elif indice.no(codigo) is None:
+        return JsonResponse({'erro': f'Unidade com código {codigo} não encontrada'}, status=404)
+    else:
+        no = indice.resumo_no(codigo, profundidade)
+        response = JsonResponse({
+            'no': no,
+            'filhos': no.pop('filhos'),
+            'versao': indice.versao
+        })
+    response['ETag'] = indice.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required
+def organograma_ondemand(request):
+    """
+    Visualização do organograma com carregamento sob demanda.
+    Esta versão carrega os dados de forma incremental para evitar
+    travamentos no navegador.
+    """
+    return render(request, 'core/organograma_ondemand.html')
+
+
+@csrf_exempt
+def atualizar_organograma_json(request):
+    """View para forçar atualização do arquivo organograma.json via AJAX"""
+    if request.method == 'POST':
+        try:
+            gerar_organograma_json()
+            return JsonResponse({'success': True, 'message': 'Arquivo organograma.json atualizado com sucesso.'})
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': f'Erro ao atualizar: {str(e)}'}, status=500)
+    return JsonResponse({'success': False, 'message': 'Método não permitido.'}, status=405)
+
+
+@require_http_methods(["GET"])
+def api_organograma_filter(request):
+    """API endpoint para filtrar dados do organograma de forma otimizada preservando estrutura hierárquica"""
+    import json
+    import os
+    from django.conf import settings
+    from django.http import JsonResponse
+    
+    # Obter parâmetros de filtro
+    sigla = request.GET.get('sigla', '').upper()
+    cargo = request.GET.get('cargo', '')
+    nivel = request.GET.get('nivel', '')
+    
+    # Caminho para o JSON original
+    json_path = os.path.join(settings.BASE_DIR, 'static', 'data', 'organograma.json')
+    
+    try:
+        # Carregar dados do JSON
+        with open(json_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+            
+            # Se não há filtros, retornar dados completos
+            if not sigla and not cargo and not nivel:
+                return JsonResponse(data)
+            
+            # Estes serão os códigos de unidades filtradas + todos os seus ancestrais e descendentes
+            codigos_para_incluir = set()
+            
+            # Lista de todas as unidades
+            units = data.get('core_unidadecargo', [])
+            
+            # Primeiro, identificar unidades que atendem aos critérios de filtro
+            filtered_codes = []
+            for unit in units:
+                # Se passa pelos filtros
+                if ((not sigla or (unit.get('sigla', '').upper().find(sigla) >= 0)) and
+                    (not cargo or unit.get('tipo_cargo') == cargo) and
+                    (not nivel or str(unit.get('nivel')) == nivel)):
+                    filtered_codes.append(unit.get('codigo_unidade'))
+                    codigos_para_incluir.add(unit.get('codigo_unidade'))
+            
+            # Para cada código filtrado, adicionar ancestrais e descendentes
+            for unit in units:
+                # Se esta unidade foi filtrada, adicionar ascendentes e descendentes
+                if unit.get('codigo_unidade') in filtered_codes:
+                    grafo = unit.get('grafo', '')
+                    if grafo:
+                        # Adicionar ancestrais (todos os segmentos do grafo são ancestrais)
+                        ancestrais = grafo.split('-')
+                        for ancestral in ancestrais:
+                            codigos_para_incluir.add(ancestral)
+                
+                # Verificar se é descendente de alguma unidade filtrada
+                grafo = unit.get('grafo', '')
+                if grafo:
+                    for filtered_code in filtered_codes:
+                        # Se o grafo contém o código filtrado como um segmento, é descendente
+                        segments = grafo.split('-')
+                        if filtered_code in segments:
+                            codigos_para_incluir.add(unit.get('codigo_unidade'))
+                            break
+            
+            # Criar uma nova lista incluindo apenas unidades da hierarquia filtrada
+            filtered_units = [unit for unit in units if unit.get('codigo_unidade') in codigos_para_incluir]
+            
+            # Substituir dados originais com dados filtrados
+            result = {
+                'core_unidadecargo': filtered_units,
+                'core_cargosiorg': data.get('core_cargosiorg', [])
+            }
+            
+            return JsonResponse(result)
+    except Exception as e:
+        # Log do erro
+        logger.error(f"Erro ao filtrar dados do organograma: {str(e)}")
+        
+        # Retornar dados de fallback em caso de erro
+        return JsonResponse({
+            "core_unidadecargo": [
+                {
+                    "tipo_unidade": "Órgão",
+                    "denominacao_unidade": "Ministério do Planejamento e Orçamento - MPO",
+                    "codigo_unidade": "308804",
+                    "sigla": "MPO",
+                    "tipo_cargo": "MEST",
+                    "denominacao": "Ministro de Estado",
+                    "categoria": 0,
+                    "nivel": 0,
+                    "quantidade": 1,
+                    "grafo": "308804"
+                }
+            ],
+            "core_cargosiorg": []
+        })
+
+
+@require_http_methods(["GET"])
+@ler_da_replica
+def api_cargos(request):
+    """API endpoint para buscar dados de cargos de forma específica (para a tabela)"""
+    from django.http import JsonResponse
+    from ..models import UnidadeCargo
+    
+    # Obter parâmetros de filtro
+    sigla = request.GET.get('sigla', '').upper()
+    tipo_cargo = request.GET.get('tipo_cargo', '')
+    nivel = request.GET.get('nivel', '')
+    
+    try:
+        # Construir a query base
+        query = UnidadeCargo.objects.all()
+        
+        # Aplicar filtros
+        if sigla:
+            query = query.filter(sigla__icontains=sigla)
+        
+        if tipo_cargo:
+            query = query.filter(tipo_cargo=tipo_cargo)
+            
+        if nivel:
+            query = query.filter(nivel=nivel)
+            
+        # Executar a consulta
+        cargos = query.select_related('unidade').order_by('-nivel')
+        
+        # Converter para o formato esperado pelo frontend
+        result = []
+        for cargo in cargos:
+            # Calcular valores derivados
+            pontos = float(cargo.pontos) if cargo.pontos else 0
+            quantidade = int(cargo.quantidade) if cargo.quantidade else 0
+            valor_unitario = float(cargo.valor_unitario) if cargo.valor_unitario else 0
+            
+            # Calcular pontos_total e gasto_total
+            pontos_total = pontos * quantidade
+            gasto_total = pontos * quantidade * valor_unitario
+            
+            result.append({
+                'codigo_unidade': cargo.unidade.codigo if cargo.unidade else '',
+                'sigla': cargo.sigla or '',
+                'tipo_unidade': cargo.tipo_unidade or '',
+                'denominacao_unidade': cargo.denominacao_unidade or '',
+                'tipo_cargo': cargo.tipo_cargo or '',
+                'denominacao': cargo.denominacao or '',
+                'categoria': cargo.categoria,
+                'nivel': cargo.nivel,
+                'quantidade': quantidade,
+                'pontos': pontos,
+                'valor_unitario': valor_unitario,
+                'pontos_total': pontos_total,
+                'gasto_total': gasto_total,
+                'grafo': cargo.grafo or ''
+            })
+            
+        return JsonResponse({'dados': result})
+        
+    except Exception as e:
+        # Log do erro
+        logger.error(f"Erro ao buscar dados de cargos: {str(e)}")
+        
+        # Retornar dados de fallback em caso de erro
+        return JsonResponse({
+            'erro': f'Ocorreu um erro ao buscar os dados: {str(e)}',
+            'dados': []
+        }, status=500)
+
+
+@login_required
+@ler_da_replica
+def api_cargos_diretos(request):
+    """API endpoint para buscar dados de cargos diretamente do banco de dados com paginação"""
+    from django.http import JsonResponse
+    from ..models import UnidadeCargo
+    from django.core.paginator import Paginator
+    # Importações para construir query OR
+    from functools import reduce
+    import operator
+
+    # Configurar logging
+    
+    # Obter parâmetros de filtro e paginação
+    sigla = request.GET.get('sigla', '').upper()
+    tipo_cargo = request.GET.get('tipo_cargo', '')
+    nivel = request.GET.get('nivel', '')
+    
+    # Parâmetros de paginação
+    pagina = int(request.GET.get('pagina', 1))
+    tamanho = int(request.GET.get('tamanho', 20))
+    
+    logger.info(f"API cargos_diretos - Parâmetros: sigla={sigla}, tipo_cargo={tipo_cargo}, nivel={nivel}, pagina={pagina}, tamanho={tamanho}")
+    
+    try:
+        # Consulta base - TODOS os cargos (removendo filtro por usuário para mostrar estado completo)
+        from django.db.models import Q
+        query = UnidadeCargo.objects.all()
+        logger.info(f"Total de registros disponíveis: {query.count()}")
+        
+        # Se houver sigla, aplicar filtro especial
+        if sigla:
+            logger.info(f"Iniciando processamento de filtro por sigla: {sigla}")
+            
+            # Buscamos registros onde a sigla aparece EXATAMENTE (não parcialmente)
+            codigos_associados = UnidadeCargo.objects.filter(
+                Q(sigla_unidade__iexact=sigla) | 
+                Q(sigla__iexact=sigla)
+            ).values_list('codigo_unidade', flat=True).distinct()
+            
+            codigos_lista = list(codigos_associados)
+            logger.info(f"Códigos de unidade associados à sigla '{sigla}': {codigos_lista[:10]} (total: {len(codigos_lista)})")
+            
+            if codigos_lista:
+                # Filtro correto: incluir a própria unidade E TODA a árvore subordinada
+                filtros_hierarquicos = []
+                for code in codigos_lista:
+                    # Incluir a própria unidade
+                    filtros_hierarquicos.append(Q(codigo_unidade=code))
+                    # Incluir TODA a árvore subordinada (qualquer grafo que contenha este código seguido de hífen)
+                    filtros_hierarquicos.append(Q(grafo__contains=f"-{code}-"))
+                    # Incluir subordinadas diretas (grafo começa com o código seguido de hífen)
+                    filtros_hierarquicos.append(Q(grafo__startswith=f"{code}-"))
+                
+                query = query.filter(reduce(operator.or_, filtros_hierarquicos))
+                logger.info(f"Filtrando registros hierárquicos completos para códigos {codigos_lista}. Resultados: {query.count()} registros")
+            else:
+                # Fallback: se não houver códigos associados, usa filtro tradicional EXATO
+                query = query.filter(
+                    Q(sigla_unidade__iexact=sigla) | 
+                    Q(sigla__iexact=sigla)
+                )
+                logger.info(f"Nenhum código associado encontrado. Usando filtro tradicional EXATO: {query.count()} registros")
+        
+        # Aplicar os demais filtros (tipo_cargo, nivel)
+        if tipo_cargo:
+            query = query.filter(tipo_cargo=tipo_cargo)
+            logger.info(f"Após filtro tipo_cargo={tipo_cargo}: {query.count()} registros")
+            
+        if nivel:
+            query = query.filter(nivel=nivel)
+            logger.info(f"Após filtro nivel={nivel}: {query.count()} registros")
+        
+        # Ordenar por sigla e nível
+        query = query.order_by('sigla_unidade', '-nivel')
+        
+        total_registros = query.count()
+        if total_registros == 0:
+            logger.warning(f"Nenhum registro encontrado com os filtros: sigla={sigla}, tipo_cargo={tipo_cargo}, nivel={nivel}")
+            return JsonResponse({
+                'cargos': [],
+                'total_itens': 0,
+                'total_paginas': 1,
+                'pagina_atual': pagina,
+                'itens_por_pagina': tamanho
+            })
+        
+        # Valor e pontos do SIORG vêm da junção tipo/categoria/nível na própria consulta
+        paginator = Paginator(query.com_valores_siorg(), tamanho)
+        page_obj = paginator.get_page(pagina)
+        
+        logger.info(f"Paginação: total_registros={total_registros}, total_paginas={paginator.num_pages}, pagina_atual={pagina}")
+        
+        # Converter resultados mantendo a lógica de cálculo original
+        result = []
+        for cargo in page_obj:
+            quantidade = int(cargo.quantidade) if cargo.quantidade else 0
+            categoria = int(cargo.categoria) if cargo.categoria is not None else 1
+            nivel_cargo = int(cargo.nivel) if cargo.nivel is not None else 0
+            
+            pontos = float(cargo.pontos_siorg)
+            valor_unitario = float(cargo.valor_siorg)
+            
+            if valor_unitario <= 0:
+                valor_unitario = 100.0
+            
+            pontos_total = pontos * quantidade
+            gasto_total = pontos_total * valor_unitario
+            
+            result.append({
+                'id': cargo.id,  # ID do cargo
+                'area': cargo.sigla_unidade or '',
+                'categoria_unidade': cargo.tipo_unidade or '',
+                'sigla_unidade': cargo.sigla_unidade or '',  # Campo explícito para compatibilidade
+                'tipo_unidade': cargo.tipo_unidade or '',    # Campo explícito para compatibilidade
+                'denominacao_unidade': cargo.denominacao_unidade or '',  # Campo para hierarquia
+                'nivel_hierarquico': cargo.nivel_hierarquico or 0,  # Campo para hierarquia
+                'tipo_cargo': cargo.tipo_cargo or '',
+                'denominacao': cargo.denominacao or '',
+                'categoria': categoria,
+                'nivel': nivel_cargo,
+                'quantidade': quantidade,
+                'pontos': pontos,
+                'valor_unitario': valor_unitario,
+                'pontos_total': pontos_total,
+                'gastos_totais': gasto_total,
+                'grafo': cargo.grafo or '',  # Include grafo field for hierarchical ordering
+                'is_manual': cargo.usuario is not None,  # ✅ MARCAR SE É CARGO MANUAL
+                'manual_id': cargo.id if cargo.usuario is not None else None  # ✅ ID PARA REMOÇÃO
+            })
+        
+        logger.info(f"Dados formatados: {len(result)} registros processados")
+        
+        return JsonResponse({
+            'cargos': result,
+            'total_itens': paginator.count,
+            'total_paginas': paginator.num_pages,
+            'pagina_atual': pagina,
+            'itens_por_pagina': tamanho
+        })
+        
+    except Exception as e:
+        logger.error(f"Erro ao buscar dados diretos de cargos: {str(e)}", exc_info=True)
+        return JsonResponse({
+            'erro': f'Ocorreu um erro ao buscar os dados: {str(e)}',
+            'cargos': [],
+            'total_itens': 0,
+            'total_paginas': 1,
+            'pagina_atual': 1,
+            'itens_por_pagina': tamanho
+        }, status=500)
+
+
+@login_required
+def comparador(request):
+    """
+    Renderiza a página do comparador de organogramas.
+    Os dados são carregados pelo script a partir de api_organograma_dados.
+    """
+    return render(request, 'core/comparador.html')
@@ -0,0 +1,960 @@
+"""
+Views dos relatórios (gratificações, IDP, IEE, decretos) e exportação em PDF.
+"""
+
+from django.http import JsonResponse, HttpResponse
+from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from ..models import UnidadeCargo
+from django.conf import settings
+from ..relatorios_pdf import extrair_sigla_unidade, gerar_pdf_com_reportlab
+from django.views.decorators.http import require_http_methods
+from ..roteador_banco import ler_da_replica
+from .hierarquia import contar_funcionarios_unidade, contar_gsisp_unidade, contar_gsiste_nivel_unidade, contar_gsiste_unidade
+
+
+# === VIEWS PARA SISTEMA DE RELATÓRIOS ===
+
+@login_required
+def relatorios(request):
+    """
+    Página principal do sistema de relatórios.
+    Inclui todas as funcionalidades solicitadas.
+    """
+    from ..models import RelatorioGratificacoes, UnidadeCargo
+    from django.db.models import Count, Sum
+    
+    context = {}
+    
+    # Dados para o relatório de pontos e gratificações
+    try:
+        # Estatísticas básicas
+        total_servidores = RelatorioGratificacoes.objects.count()
+        total_unidades = RelatorioGratificacoes.objects.values('unidade_lotacao').distinct().count()
+        total_cargos = RelatorioGratificacoes.objects.values('cargo').distinct().count()
+        
+        # Dados por unidade para cálculo dos índices
+        unidades_data = RelatorioGratificacoes.objects.values(
+            'unidade_lotacao', 'sigla_unidade'
+        ).annotate(
+            total_servidores=Count('id'),
+            cargos_unicos=Count('cargo', distinct=True)
+        ).order_by('-total_servidores')
+        
+        # Dados do organograma para cálculo de pontos
+        pontos_data = UnidadeCargo.objects.values(
+            'denominacao_unidade', 'sigla_unidade'
+        ).annotate(
+            total_pontos=Sum('pontos_total'),
+            total_quantidade=Sum('quantidade')
+        ).filter(total_pontos__gt=0)
+        
+        context.update({
+            'total_servidores': total_servidores,
+            'total_unidades': total_unidades,
+            'total_cargos': total_cargos,
+            'unidades_data': list(unidades_data),
+            'pontos_data': list(pontos_data),
+        })
+        
+    except Exception as e:
+        context['erro_dados'] = f"Erro ao carregar dados: {str(e)}"
+    
+    return render(request, 'core/relatorios.html', context)
+
+
+def _resposta_relatorio_paginada(tabela_final, filtro_unidade, page, per_page):
+    """Pagina a tabela completa de um relatório no formato JSON das APIs de relatório."""
+    total_registros = len(tabela_final)
+    total_pages = (total_registros + per_page - 1) // per_page
+    start_index = (page - 1) * per_page
+    end_index = start_index + per_page
+    dados_paginados = tabela_final[start_index:end_index]
+    
+    return JsonResponse({
+        'status': 'success',
+        'data': dados_paginados,
+        'pagination': {
+            'current_page': page,
+            'per_page': per_page,
+            'total_pages': total_pages,
+            'total_registros': total_registros,
+            'has_next': page < total_pages,
+            'has_previous': page > 1
+        },
+        'filtros': {
+            'unidade': filtro_unidade,
+            'total_registros': total_registros
+        }
+    })
+
+
+def chave_cache_relatorio(prefixo, filtro_unidade, versao):
+    """Chave de cache da tabela completa de um relatório (por filtro e versão dos dados)."""
+    return f"{prefixo}_data_{versao}_{filtro_unidade}"
+
+
+async def _obter_tabela_relatorio(prefixo, calcular, filtro_unidade):
+    """
+    Tabela completa de um relatório para as APIs async: lida do cache sem sair
+    do event loop; se não estiver em cache, o cálculo (ORM + agregações) roda
+    numa thread via sync_to_async.
+    """
+    from asgiref.sync import sync_to_async
+    from ..versao_dados import aversao_atual
+    
+    tabela = await cache.aget(chave_cache_relatorio(prefixo, filtro_unidade, await aversao_atual()))
+    if tabela is None:
+        tabela = await sync_to_async(calcular)(filtro_unidade)
+    return tabela
+
+
+def calcular_relatorio_gratificacoes(filtro_unidade=''):
+    """
+    Calcula a tabela completa do relatório de pontos e gratificações (sem paginação).
+    Resultado em cache por 30 minutos, com a versão dos dados na chave.
+    Usada pela API paginada e diretamente pela exportação em PDF.
+    """
+    from ..versao_dados import versao_atual
+    
+    # Criar chave de cache única baseada nos filtros e na versão dos dados
+    cache_key = chave_cache_relatorio('gratificacoes', filtro_unidade, versao_atual())
+    
+    # Tentar buscar dados do cache primeiro
+    dados_cache = cache.get(cache_key)
+    if dados_cache is not None:
+        return dados_cache
+    
+    # Se não há cache, processar dados completos
+    from django.db.models import Q
+    from functools import reduce
+    import operator
+    
+    # Consulta base
+    query = UnidadeCargo.objects.all()
+    
+    # Aplicar filtro de unidade com busca hierárquica se fornecido
+    if filtro_unidade:
+        # Busca hierárquica: encontrar códigos associados à sigla/unidade
+        sigla_upper = filtro_unidade.upper()
+        codigos_associados = UnidadeCargo.objects.filter(
+            Q(sigla_unidade__iexact=sigla_upper) | 
+            Q(sigla__iexact=sigla_upper) |
+            Q(denominacao_unidade__icontains=filtro_unidade)
+        ).values_list('codigo_unidade', flat=True).distinct()
+        
+        codigos_lista = list(codigos_associados)
+        
+        if codigos_lista:
+            # Filtro hierárquico: incluir unidade E toda árvore subordinada
+            filtros_hierarquicos = []
+            for code in codigos_lista:
+                # Incluir a própria unidade
+                filtros_hierarquicos.append(Q(codigo_unidade=code))
+                # Incluir TODA a árvore subordinada
+                filtros_hierarquicos.append(Q(grafo__contains=f"-{code}-"))
+                # Incluir subordinadas diretas
+                filtros_hierarquicos.append(Q(grafo__startswith=f"{code}-"))
+            
+            query = query.filter(reduce(operator.or_, filtros_hierarquicos))
+        else:
+            # Fallback para busca por nome
+            query = query.filter(
+                Q(denominacao_unidade__icontains=filtro_unidade) |
+                Q(sigla_unidade__icontains=filtro_unidade)
+            )
+    
+    # Pontos do SIORG pela junção tipo/categoria/nível com CargoSIORG
+    query = query.com_valores_siorg()
+    
+    # Agrupar dados por unidade
+    unidades_dados = {}
+    for registro in query:
+        unidade = registro.denominacao_unidade or registro.sigla_unidade or 'Unidade não identificada'
+        quantidade = int(registro.quantidade or 0)
+        
+        # Calcular pontos usando a mesma lógica do Comparador
+        pontos = float(registro.pontos_siorg)
+        
+        pontos_total = pontos * quantidade
+        
+        if unidade in unidades_dados:
+            unidades_dados[unidade]['pontos'] += pontos_total
+        else:
+            # Extrair sigla da unidade para usar nas contagens
+            sigla_unidade = extrair_sigla_unidade(unidade)
+            
+            # Contar GSISTE (qualquer valor exceto GSISP: G.SPO, GSISTE.CF, G.SISG, G.SIPEC)
+            gsiste_count = contar_gsiste_unidade(sigla_unidade)
+            
+            # Contar GSISP (apenas GSISTE = 'GSISP')
+            gsisp_count = contar_gsisp_unidade(sigla_unidade)
+            
+            # Contar GSISTE_NIVEL (NI e NS)
+            ni_count = contar_gsiste_nivel_unidade(sigla_unidade, 'NI')
+            ns_count = contar_gsiste_nivel_unidade(sigla_unidade, 'NS')
+            
+            unidades_dados[unidade] = {
+                'unidade': unidade,
+                'pontos': pontos_total,
+                'gsist': gsiste_count,  # Contagem real de GSISTE (G.SPO, GSISTE.CF, G.SISG, G.SIPEC)
+                'gsisp': gsisp_count,   # Contagem real de GSISP
+                'ns': ns_count,         # Contagem real de GSISTE_NIVEL = 'NS'
+                'ni': ni_count          # Contagem real de GSISTE_NIVEL = 'NI'
+            }
+    
+    # Converter para lista e ordenar
+    tabela_final = list(unidades_dados.values())
+    tabela_final.sort(key=lambda x: x['unidade'])
+    
+    # Arredondar pontos
+    for item in tabela_final:
+        item['pontos'] = round(item['pontos'], 2)
+    
+    # Salvar dados no cache por 30 minutos (1800 segundos)
+    cache.set(cache_key, tabela_final, 1800)
+    return tabela_final
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_relatorio_pontos_gratificacoes(request):
+    """
+    API para dados do relatório de pontos e gratificações.
+    Primeira tabela: Unidade, Pontos totais (sem GSISTE/GSISP por enquanto)
+    """
+    try:
+        # Parâmetros de filtro e paginação
+        filtro_unidade = request.GET.get('unidade', '').strip()
+        page = int(request.GET.get('page', 1))
+        per_page = int(request.GET.get('per_page', 11))
+        
+        tabela_final = await _obter_tabela_relatorio('gratificacoes', calcular_relatorio_gratificacoes, filtro_unidade)
+        return _resposta_relatorio_paginada(tabela_final, filtro_unidade, page, per_page)
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao carregar dados de gratificações: {str(e)}'
+        }, status=500)
+
+
+def calcular_relatorio_idp(filtro_unidade=''):
+    """
+    Calcula a tabela completa do relatório IDP (sem paginação).
+    Resultado em cache por 30 minutos, com a versão dos dados na chave.
+    Usada pela API paginada e diretamente pela exportação em PDF.
+    """
+    from ..versao_dados import versao_atual
+    
+    # Criar chave de cache única baseada nos filtros e na versão dos dados
+    cache_key = chave_cache_relatorio('idp', filtro_unidade, versao_atual())
+    
+    # Tentar buscar dados do cache primeiro
+    dados_cache = cache.get(cache_key)
+    if dados_cache is not None:
+        return dados_cache
+    
+    # Se não há cache, processar dados completos
+    from django.db.models import Q
+    from functools import reduce
+    import operator
+    
+    # Consulta base
+    query = UnidadeCargo.objects.all()
+    
+    # Aplicar filtro de unidade com busca hierárquica se fornecido (IGUAL AO IEE)
+    if filtro_unidade:
+        # Busca hierárquica: encontrar códigos associados à sigla/unidade
+        sigla_upper = filtro_unidade.upper()
+        codigos_associados = UnidadeCargo.objects.filter(
+            Q(sigla_unidade__iexact=sigla_upper) | 
+            Q(sigla__iexact=sigla_upper)
+        ).values_list('codigo_unidade', flat=True).distinct()
+        
+        codigos_lista = list(codigos_associados)
+        
+        if codigos_lista:
+            # Filtro hierárquico: incluir unidade E toda árvore subordinada
+            filtros_hierarquicos = []
+            for code in codigos_lista:
+                # Incluir a própria unidade
+                filtros_hierarquicos.append(Q(codigo_unidade=code))
+                # Incluir TODA a árvore subordinada
+                filtros_hierarquicos.append(Q(grafo__contains=f"-{code}-"))
+                # Incluir subordinadas diretas
+                filtros_hierarquicos.append(Q(grafo__startswith=f"{code}-"))
+            
+            query = query.filter(reduce(operator.or_, filtros_hierarquicos))
+        else:
+            # Fallback para busca por nome
+            query = query.filter(
+                Q(denominacao_unidade__icontains=filtro_unidade) |
+                Q(sigla_unidade__icontains=filtro_unidade)
+            )
+    
+    # Pontos do SIORG pela junção tipo/categoria/nível com CargoSIORG
+    query = query.com_valores_siorg()
+    
+    # Primeiro, calcular pontos por unidade
+    unidades_pontos = {}
+    for registro in query:
+        unidade = registro.denominacao_unidade or registro.sigla_unidade or 'Unidade não identificada'
+        quantidade = int(registro.quantidade or 0)
+        
+        # Calcular pontos usando a mesma lógica do Comparador
+        pontos = float(registro.pontos_siorg)
+        
+        pontos_total = pontos * quantidade
+        
+        if unidade in unidades_pontos:
+            unidades_pontos[unidade]['pontos'] += pontos_total
+        else:
+            unidades_pontos[unidade] = {
+                'pontos': pontos_total,
+                'sigla_unidade': registro.sigla_unidade
+            }
+    
+    # Segundo, criar dados finais com contagem correta de funcionários
+    unidades_dados = {}
+    
+    # Se há filtro, agrupar tudo sob a unidade filtrada
+    if filtro_unidade:
+        # Encontrar a unidade principal do filtro
+        sigla_upper = filtro_unidade.upper()
+        unidade_principal = UnidadeCargo.objects.filter(
+            Q(sigla_unidade__iexact=sigla_upper) | 
+            Q(sigla__iexact=sigla_upper)
+        ).first()
+        
+        if unidade_principal:
+            # CORREÇÃO: Usar APENAS os pontos já calculados corretamente na query filtrada (IGUAL AO IEE)
+            # Calcular total de pontos da query filtrada
+            total_pontos_filtro = 0
+            for registro in query:
+                quantidade = int(registro.quantidade or 0)
+                pontos = float(registro.pontos_siorg)
+                
+                total_pontos_filtro += pontos * quantidade
+            
+            # Usar a lógica hierárquica para contar funcionários da unidade principal (IGUAL AO IEE)
+            colaboradores = contar_funcionarios_unidade(unidade_principal.sigla_unidade)
+            
+            unidades_dados[unidade_principal.denominacao_unidade] = {
+                'unidade': unidade_principal.denominacao_unidade,
+                'pontos': total_pontos_filtro,
+                'colaboradores': colaboradores
+            }
+        else:
+            # Fallback: usar lógica original se não encontrar a unidade principal
+            for unidade, dados_pontos in unidades_pontos.items():
+                sigla_unidade = dados_pontos['sigla_unidade']
+                colaboradores = contar_funcionarios_unidade(sigla_unidade) if sigla_unidade else 0
+                
+                unidades_dados[unidade] = {
+                    'unidade': unidade,
+                    'pontos': dados_pontos['pontos'],
+                    'colaboradores': colaboradores
+                }
+    else:
+        # Sem filtro: usar lógica original (cada unidade separadamente) - IGUAL AO IEE
+        for unidade, dados_pontos in unidades_pontos.items():
+            sigla_unidade = dados_pontos['sigla_unidade']
+            colaboradores = contar_funcionarios_unidade(sigla_unidade) if sigla_unidade else 0
+            
+            unidades_dados[unidade] = {
+                'unidade': unidade,
+                'pontos': dados_pontos['pontos'],
+                'colaboradores': colaboradores
+            }
+    
+    # Converter para lista e calcular índices
+    tabela_final = []
+    for dados in unidades_dados.values():
+        if dados['colaboradores'] > 0 or dados['pontos'] > 0:  # Só incluir unidades com dados
+            # Calcular IDP: Pontos por colaborador
+            if dados['colaboradores'] > 0:
+                dados['idp'] = round(dados['pontos'] / dados['colaboradores'], 2)
+            else:
+                dados['idp'] = dados['pontos']  # Se não há colaboradores, IDP = pontos total
+            
+            dados['pontos'] = round(dados['pontos'], 2)
+            tabela_final.append(dados)
+    
+    # Ordenar por unidade
+    tabela_final.sort(key=lambda x: x['unidade'])
+    
+    # Salvar dados no cache por 30 minutos (1800 segundos)
+    cache.set(cache_key, tabela_final, 1800)
+    return tabela_final
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_relatorio_idp(request):
+    """
+    API específica para relatório IDP.
+    PADRONIZADA COM IEE - usa exatamente a mesma lógica de pontos e colaboradores.
+    """
+    try:
+        # Parâmetros de filtro e paginação  
+        filtro_unidade = request.GET.get('unidade', '').strip()
+        page = int(request.GET.get('page', 1))
+        per_page = int(request.GET.get('per_page', 11))
+        
+        tabela_final = await _obter_tabela_relatorio('idp', calcular_relatorio_idp, filtro_unidade)
+        return _resposta_relatorio_paginada(tabela_final, filtro_unidade, page, per_page)
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao carregar dados IDP: {str(e)}'
+        }, status=500)
+
+
+def calcular_relatorio_iee(filtro_unidade=''):
+    """
+    Calcula a tabela completa do relatório IEE (sem paginação).
+    Resultado em cache por 30 minutos, com a versão dos dados na chave.
+    Usada pela API paginada e diretamente pela exportação em PDF.
+    """
+    from ..versao_dados import versao_atual
+    
+    # Criar chave de cache única baseada nos filtros e na versão dos dados
+    cache_key = chave_cache_relatorio('iee', filtro_unidade, versao_atual())
+    
+    # Tentar buscar dados do cache primeiro
+    dados_cache = cache.get(cache_key)
+    if dados_cache is not None:
+        return dados_cache
+    
+    # Se não há cache, processar dados completos
+    from django.db.models import Q
+    from functools import reduce
+    import operator
+    
+    # Consulta base
+    query = UnidadeCargo.objects.all()
+    
+    # Aplicar filtro de unidade com busca hierárquica se fornecido
+    if filtro_unidade:
+        # Busca hierárquica: encontrar códigos associados à sigla/unidade
+        sigla_upper = filtro_unidade.upper()
+        codigos_associados = UnidadeCargo.objects.filter(
+            Q(sigla_unidade__iexact=sigla_upper) | 
+            Q(sigla__iexact=sigla_upper)
+        ).values_list('codigo_unidade', flat=True).distinct()
+        
+        codigos_lista = list(codigos_associados)
+        
+        if codigos_lista:
+            # CORREÇÃO DO FILTRO: usar a mesma lógica do nosso teste que funciona
+            filtros_hierarquicos = []
+            for code in codigos_lista:
+                # Incluir a própria unidade
+                filtros_hierarquicos.append(Q(codigo_unidade=code))
+                # Incluir subordinadas diretas
+                filtros_hierarquicos.append(Q(grafo__startswith=f"{code}-"))
+                # Incluir descendentes que são filhos (código no final do grafo seguido de -)
+                filtros_hierarquicos.append(Q(grafo__contains=f"-{code}-"))
+            
+            query = query.filter(reduce(operator.or_, filtros_hierarquicos))
+            
+
+        else:
+            # Fallback para busca por nome
+            query = query.filter(
+                Q(denominacao_unidade__icontains=filtro_unidade) |
+                Q(sigla_unidade__icontains=filtro_unidade)
+            )
+    
+    # Pontos do SIORG pela junção tipo/categoria/nível com CargoSIORG
+    query = query.com_valores_siorg()
+    
+    # Primeiro, agrupar dados por unidade para calcular pontos
+    unidades_pontos = {}
+    total_pontos_instituicao = 0
+    
+    for registro in query:
+        unidade = registro.denominacao_unidade or registro.sigla_unidade or 'Unidade não identificada'
+        quantidade = int(registro.quantidade or 0)
+        
+        # Calcular pontos usando a mesma lógica do Comparador
+        pontos = float(registro.pontos_siorg)
+        
+        pontos_total = pontos * quantidade
+        
+        if unidade in unidades_pontos:
+            unidades_pontos[unidade]['pontos'] += pontos_total
+            # Manter referência à sigla da primeira ocorrência
+        else:
+            unidades_pontos[unidade] = {
+                'pontos': pontos_total,
+                'sigla_unidade': registro.sigla_unidade
+            }
+        
+        total_pontos_instituicao += pontos_total
+    
+    # Segundo, criar dados finais com contagem correta de funcionários
+    unidades_dados = {}
+    
+    # Se há filtro, agrupar tudo sob a unidade filtrada
+    if filtro_unidade:
+        # Encontrar a unidade principal do filtro
+        sigla_upper = filtro_unidade.upper()
+        unidade_principal = UnidadeCargo.objects.filter(
+            Q(sigla_unidade__iexact=sigla_upper) | 
+            Q(sigla__iexact=sigla_upper)
+        ).first()
+        
+        if unidade_principal:
+            # CORREÇÃO: Usar APENAS os pontos já calculados corretamente na query filtrada
+            # (não somar novamente, pois a query já foi filtrada)
+            total_pontos_filtro = total_pontos_instituicao  # Este já é o total filtrado
+            
+
+            
+            # Usar a lógica hierárquica para contar funcionários da unidade principal
+            colaboradores = contar_funcionarios_unidade(unidade_principal.sigla_unidade)
+            
+            unidades_dados[unidade_principal.denominacao_unidade] = {
+                'unidade': unidade_principal.denominacao_unidade,
+                'pontos': total_pontos_filtro,
+                'colaboradores': colaboradores
+            }
+        else:
+            # Fallback: usar lógica original se não encontrar a unidade principal
+            for unidade, dados_pontos in unidades_pontos.items():
+                sigla_unidade = dados_pontos['sigla_unidade']
+                colaboradores = contar_funcionarios_unidade(sigla_unidade) if sigla_unidade else 0
+                
+                unidades_dados[unidade] = {
+                    'unidade': unidade,
+                    'pontos': dados_pontos['pontos'],
+                    'colaboradores': colaboradores
+                }
+    else:
+        # Sem filtro: usar lógica original (cada unidade separadamente)
+        for unidade, dados_pontos in unidades_pontos.items():
+            sigla_unidade = dados_pontos['sigla_unidade']
+            colaboradores = contar_funcionarios_unidade(sigla_unidade) if sigla_unidade else 0
+            
+            unidades_dados[unidade] = {
+                'unidade': unidade,
+                'pontos': dados_pontos['pontos'],
+                'colaboradores': colaboradores
+            }
+    
+    # Calcular total de colaboradores da instituição SEMPRE (não depende do filtro)
+    # Contar todos os funcionários válidos da tabela RelatorioGratificacoes
+    from ..models import RelatorioGratificacoes
+    total_colaboradores_instituicao = RelatorioGratificacoes.objects.exclude(
+        coordenacao__isnull=True
+    ).exclude(
+        coordenacao=""
+    ).count()
+    
+    # Calcular total de pontos da instituição SEMPRE (não depende do filtro)
+    # Usar todos os registros, não apenas os filtrados
+    todos_registros = UnidadeCargo.objects.com_valores_siorg()
+    total_pontos_instituicao_real = 0
+    
+    for registro in todos_registros:
+        quantidade = int(registro.quantidade or 0)
+        pontos = float(registro.pontos_siorg)
+        
+        total_pontos_instituicao_real += pontos * quantidade
+    
+    # Calcular a média institucional FIXA (nunca muda)
+    media_institucional = 0
+    if total_colaboradores_instituicao > 0:
+        media_institucional = total_pontos_instituicao_real / total_colaboradores_instituicao
+    
+    # Converter para lista e calcular IEE
+    tabela_final = []
+    for dados in unidades_dados.values():
+        if dados['colaboradores'] > 0 or dados['pontos'] > 0:  # Só incluir unidades com dados
+            # Calcular IEE: (Pontos da Unidade / Colaboradores da Unidade) / (Média Institucional)
+            if dados['colaboradores'] > 0 and media_institucional > 0:
+                densidade_unidade = dados['pontos'] / dados['colaboradores']
+                dados['iee'] = round(densidade_unidade / media_institucional, 2)
+            else:
+                dados['iee'] = 0
+            
+            dados['pontos'] = round(dados['pontos'], 2)
+            tabela_final.append(dados)
+    
+    # Ordenar por unidade
+    tabela_final.sort(key=lambda x: x['unidade'])
+    
+    # Salvar dados no cache por 30 minutos (1800 segundos)
+    cache.set(cache_key, tabela_final, 1800)
+    return tabela_final
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_relatorio_iee(request):
+    """
+    API específica para relatório IEE.
+    Retorna dados de pontos e colaboradores organizados por unidade para cálculo do IEE.
+    """
+    try:
+        # Parâmetros de filtro e paginação
+        filtro_unidade = request.GET.get('unidade', '').strip()
+        page = int(request.GET.get('page', 1))
+        per_page = int(request.GET.get('per_page', 11))
+        
+        tabela_final = await _obter_tabela_relatorio('iee', calcular_relatorio_iee, filtro_unidade)
+        return _resposta_relatorio_paginada(tabela_final, filtro_unidade, page, per_page)
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao carregar dados IEE: {str(e)}'
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+def api_historico_decretos(request):
+    """
+    API para histórico de decretos.
+    """
+    from ..models import Decreto
+    
+    try:
+        decretos_db = Decreto.objects.all().order_by('-data_publicacao')
+        
+        decretos = []
+        for decreto in decretos_db:
+            decretos.append({
+                'id': decreto.id,
+                'numero': decreto.numero,
+                'data': decreto.data_publicacao.strftime('%Y-%m-%d'),
+                'titulo': decreto.titulo,
+                'tipo': decreto.get_tipo_display(),
+                'status': decreto.get_status_display()
+            })
+        
+        # Se não há decretos no banco, usar dados simulados
+        if not decretos:
+            decretos = [
+                {
+                    'id': 1,
+                    'numero': 'Decreto nº 10.185/2019',
+                    'data': '2019-12-20',
+                    'titulo': 'Aprova a Estrutura Regimental e o Quadro Demonstrativo dos Cargos em Comissão e das Funções de Confiança do Ministério da Economia',
+                    'tipo': 'Estrutura Regimental',
+                    'status': 'Vigente'
+                },
+                {
+                    'id': 2,
+                    'numero': 'Decreto nº 9.745/2019',
+                    'data': '2019-04-08',
+                    'titulo': 'Aprova a Estrutura Regimental e o Quadro Demonstrativo dos Cargos em Comissão e das Funções de Confiança do Ministério do Planejamento, Desenvolvimento e Gestão',
+                    'tipo': 'Estrutura Regimental',
+                    'status': 'Revogado'
+                },
+                {
+                    'id': 3,
+                    'numero': 'Decreto nº 11.355/2025',
+                    'data': '2025-07-29',
+                    'titulo': 'Aprova a Estrutura Regimental e o Quadro Demonstrativo dos Cargos em Comissão e das Funções de Confiança do Ministério do Planejamento e Orçamento',
+                    'tipo': 'Estrutura Regimental',
+                    'status': 'Vigente'
+                }
+            ]
+        
+        return JsonResponse({
+            'status': 'success',
+            'decretos': decretos
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao carregar decretos: {str(e)}'
+        }, status=500)
+
+
+# === VIEWS PARA EXPORTAÇÃO DE RELATÓRIOS EM PDF ===
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+def exportar_relatorio_pdf(request, tipo):
+    """
+    View unificada para exportar relatórios em PDF.
+    Tipos suportados: gratificacoes, idp, iee, decretos, siglario
+
+    O PDF fica em cache em disco por (tipo, filtros, versão dos dados): downloads
+    repetidos são servidos direto do arquivo. Relatórios grandes pedidos com
+    Accept: application/json são renderizados em segundo plano; a resposta 202
+    traz o endereço a ser consultado até o arquivo ficar pronto.
+    """
+    from .. import relatorios_pdf
+    from ..versao_dados import versao_atual
+    
+    buscadores = {
+        'gratificacoes': buscar_dados_gratificacoes,
+        'idp': buscar_dados_idp,
+        'iee': buscar_dados_iee,
+        'decretos': buscar_dados_decretos,
+        'siglario': buscar_dados_siglario,
+    }
+    if tipo not in buscadores:
+        return JsonResponse({'erro': 'Tipo de relatório não suportado'}, status=400)
+    
+    try:
+        filtro_unidade = request.GET.get('unidade', '').strip()
+        filtros = {
+            'unidade': filtro_unidade,
+            'filtro': request.GET.get('filtro', '').strip(),
+        }
+        chave = relatorios_pdf.chave_relatorio(tipo, filtros, versao_atual())
+        nome_arquivo = relatorios_pdf.nome_arquivo_pdf(tipo, filtro_unidade)
+        quer_json = 'application/json' in request.headers.get('Accept', '')
+        
+        # PDF já renderizado para estes filtros e esta versão dos dados
+        caminho = relatorios_pdf.obter_pdf_em_cache(chave)
+        if caminho:
+            if quer_json:
+                return JsonResponse({'status': 'pronto', 'download_url': request.path + '?' + request.GET.urlencode()})
+            return relatorios_pdf.resposta_pdf(caminho, nome_arquivo)
+        
+        status_atual = relatorios_pdf.status_renderizacao(chave)
+        if status_atual == 'processando':
+            return JsonResponse({'status': 'processando'}, status=202)
+        
+        dados = buscadores[tipo](request)
+        
+        limite = getattr(settings, 'RELATORIOS_PDF_LIMITE_SINCRONO', 2000)
+        if quer_json and len(dados.get('data', [])) > limite:
+            if status_atual == 'erro':
+                return JsonResponse({'erro': 'Erro ao gerar relatório em segundo plano'}, status=500)
+            context = montar_contexto_pdf(dados, tipo, filtro_unidade)
+            relatorios_pdf.renderizar_em_segundo_plano(chave, tipo, context)
+            return JsonResponse({
+                'status': 'processando',
+                'download_url': request.path + '?' + request.GET.urlencode()
+            }, status=202)
+        
+        return gerar_pdf_relatorio(dados, tipo, filtro_unidade, chave=chave)
+        
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Erro ao exportar relatório {tipo}: {str(e)}")
+        return JsonResponse({'erro': f'Erro ao gerar relatório: {str(e)}'}, status=500)
+
+
+def _dados_relatorio_pdf(tabela, filtro_unidade):
+    """Monta o dicionário de dados usado na exportação a partir da tabela completa."""
+    return {
+        'status': 'success',
+        'data': tabela,
+        'filtros': {'unidade': filtro_unidade},
+        'totais': {'total_registros': len(tabela)}
+    }
+
+
+def buscar_dados_gratificacoes(request):
+    """Busca dados para relatório de gratificações"""
+    filtro_unidade = request.GET.get('unidade', '').strip()
+    return _dados_relatorio_pdf(calcular_relatorio_gratificacoes(filtro_unidade), filtro_unidade)
+
+
+def buscar_dados_idp(request):
+    """Busca dados para relatório de IDP"""
+    filtro_unidade = request.GET.get('unidade', '').strip()
+    return _dados_relatorio_pdf(calcular_relatorio_idp(filtro_unidade), filtro_unidade)
+
+
+def buscar_dados_iee(request):
+    """Busca dados para relatório de IEE"""
+    filtro_unidade = request.GET.get('unidade', '').strip()
+    return _dados_relatorio_pdf(calcular_relatorio_iee(filtro_unidade), filtro_unidade)
+
+
+def buscar_dados_decretos(request):
+    """Busca dados para relatório de decretos"""
+    # Implementar quando a API estiver pronta
+    return {
+        'status': 'success',
+        'data': [],
+        'filtros': {'unidade': request.GET.get('unidade', '')},
+        'totais': {'total_registros': 0}
+    }
+
+
+def buscar_dados_siglario(request):
+    """Busca dados para siglário"""
+    try:
+        from ..catalogo_unidades import obter_catalogo
+        
+        filtro = request.GET.get('filtro', '').strip()
+        
+        # Todas as unidades com sigla no catálogo em memória, como na listagem
+        # do siglário: relatórios acima de RELATORIOS_PDF_LIMITE_SINCRONO linhas
+        # são renderizados em segundo plano
+        _, unidades = obter_catalogo().buscar(filtro, preenchido='sigla')
+        
+        dados = [{
+            'sigla_unidade': unidade.sigla,
+            'denominacao_unidade': unidade.denominacao,
+            'codigo_unidade': unidade.codigo
+        } for unidade in unidades]
+        
+        return {
+            'status': 'success',
+            'data': dados,
+            'filtros': {'filtro': filtro},
+            'totais': {'total_registros': len(dados)}
+        }
+        
+    except Exception as e:
+        return {
+            'status': 'error',
+            'message': str(e),
+            'data': []
+        }
+
+
+def montar_contexto_pdf(dados, tipo, filtro_unidade=''):
+    """Contexto usado na renderização do PDF (título, dados, totais e data de geração)"""
+    from django.utils import timezone
+    
+    # Obter nome completo da unidade se filtro for uma sigla
+    nome_unidade_completo = obter_nome_completo_unidade(filtro_unidade) if filtro_unidade else ''
+    
+    # Configurar timezone do Brasil (Brasília)
+    import pytz
+    fuso_brasilia = pytz.timezone('America/Sao_Paulo')
+    agora_brasilia = timezone.now().astimezone(fuso_brasilia)
+    
+    # Preparar contexto para o template
+    context = {
+        'dados': dados.get('data', []),
+        'tipo': tipo,
+        'filtro_unidade': filtro_unidade,
+        'nome_unidade_completo': nome_unidade_completo,
+        'filtros': dados.get('filtros', {}),
+        'totais': dados.get('totais', {}),
+        'titulo': obter_titulo_relatorio(tipo),
+        'data_geracao': agora_brasilia.strftime('%d/%m/%Y %H:%M')
+    }
+    return context
+
+
+def gerar_pdf_relatorio(dados, tipo, filtro_unidade='', chave=None):
+    """
+    Gera PDF do relatório usando reportlab ou fallback para HTML.
+    Com a chave informada, o PDF gerado fica no cache em disco.
+    """
+    context = montar_contexto_pdf(dados, tipo, filtro_unidade)
+    
+    # Tentar reportlab primeiro (OBRIGATÓRIO para PDF)
+    try:
+        return gerar_pdf_com_reportlab(dados, tipo, filtro_unidade, context, chave=chave)
+    except ImportError as e:
+        # Reportlab não instalado - instruir instalação
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"ReportLab não instalado: {str(e)}")
+        
+        response = HttpResponse(content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="instalar_reportlab.txt"'
+        response.write(f'''ERRO: Biblioteca ReportLab não encontrada!
+
+Para gerar PDFs, execute o comando:
+
+    pip install reportlab
+
+Depois tente exportar novamente.
+
+Erro técnico: {str(e)}
+''')
+        return response
+        
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Erro ao gerar PDF com reportlab: {str(e)}")
+        
+        # Último recurso: arquivo de erro com instruções
+        response = HttpResponse(content_type='text/plain')
+        response['Content-Disposition'] = f'attachment; filename="erro_pdf_{tipo}.txt"'
+        response.write(f'''ERRO ao gerar PDF do relatório {tipo}!
+
+Erro técnico: {str(e)}
+
+Soluções:
+1. Verifique se reportlab está instalado: pip install reportlab
+2. Entre em contato com o suporte técnico
+3. Tente novamente em alguns minutos
+
+Dados do erro:
+- Tipo: {tipo}
+- Filtro: {filtro_unidade}
+- Registros: {len(dados.get('data', []))}
+''')
+        return response
+
+
+def obter_nome_completo_unidade(sigla_filtro):
+    """
+    Busca o nome completo da unidade baseado na sigla do filtro
+    """
+    if not sigla_filtro:
+        return ''
+    
+    try:
+        from ..models import UnidadeCargo
+        from django.db.models import Q
+        
+        # Buscar unidade pela sigla (case insensitive)
+        unidade = UnidadeCargo.objects.filter(
+            Q(sigla_unidade__iexact=sigla_filtro) |
+            Q(sigla__iexact=sigla_filtro)
+        ).first()
+        
+        if unidade and unidade.denominacao_unidade:
+            return unidade.denominacao_unidade
+        
+        # Se não encontrou, retornar a sigla em maiúsculo
+        return sigla_filtro.upper()
+        
+    except Exception:
+        return sigla_filtro.upper()
+
+
+def obter_titulo_relatorio(tipo):
+    """Retorna título do relatório baseado no tipo"""
+    titulos = {
+        'gratificacoes': 'Relatório de Pontos e Gratificações',
+
+        'idp': 'Relatório de Índice de Densidade de Pessoal',
+        'iee': 'Relatório de Índice de Eficiência por Estrutura',
+        'decretos': 'Relatório de Decretos',
+        'siglario': 'Siglário Institucional'
+    }
+    return titulos.get(tipo, f'Relatório {tipo.title()}')
+
+
+def limpar_cache_relatorios():
+    """
+    Limpa o cache de todos os relatórios.
+    Útil para forçar recálculo quando os dados mudam.
+    """
+    # Limpar cache de gratificações
+    cache.delete_pattern("gratificacoes_data_*")
+    # Limpar cache de IDP
+    cache.delete_pattern("idp_data_*")
+    # Limpar cache de IEE
+    cache.delete_pattern("iee_data_*")
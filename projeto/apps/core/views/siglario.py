@@ -0,0 +1,102 @@
+"""
+Views do siglário e da lista de unidades disponíveis.
+"""
+
+from django.http import JsonResponse, HttpResponse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_http_methods
+from ..roteador_banco import ler_da_replica
+
+
+def _parametros_catalogo(request):
+    """Lê os parâmetros de busca/paginação (?q=, ?limit=, ?offset=) do catálogo de unidades."""
+    try:
+        limit = int(request.GET['limit'])
+    except (KeyError, ValueError):
+        limit = None
+    try:
+        offset = int(request.GET.get('offset', 0))
+    except ValueError:
+        offset = 0
+    return request.GET.get('q', '').strip(), limit, offset
+
+
+def _resposta_catalogo(request, catalogo, payload):
+    """Devolve o JSON com o ETag do catálogo (ou 304 se o cliente já tem a versão)."""
+    if request.headers.get('If-None-Match') == catalogo.etag:
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse(payload)
+    response['ETag'] = catalogo.etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_siglario(request):
+    """
+    API para o siglário institucional.
+    Servida pelo catálogo de unidades em memória; aceita ?q= (busca por prefixo,
+    sem acentos), ?limit= e ?offset=.
+    """
+    from ..catalogo_unidades import aobter_catalogo
+    
+    try:
+        catalogo = await aobter_catalogo()
+        consulta, limit, offset = _parametros_catalogo(request)
+        total, unidades = catalogo.buscar(consulta, limit=limit, offset=offset, preenchido='sigla')
+        
+        siglario_data = [{
+            'sigla': unidade.sigla,
+            'denominacao': unidade.denominacao,
+            'categoria': unidade.categoria or 'Não categorizado'
+        } for unidade in unidades]
+        
+        return _resposta_catalogo(request, catalogo, {
+            'status': 'success',
+            'data': siglario_data,
+            'total': total
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao carregar siglário: {str(e)}'
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+@ler_da_replica
+async def api_unidades_disponiveis(request):
+    """
+    API para buscar unidades disponíveis para formulários.
+    Aceita os mesmos parâmetros de busca do siglário.
+    """
+    from ..catalogo_unidades import aobter_catalogo
+    
+    try:
+        catalogo = await aobter_catalogo()
+        consulta, limit, offset = _parametros_catalogo(request)
+        total, unidades = catalogo.buscar(
+            consulta, ordem='denominacao', limit=limit, offset=offset, preenchido='denominacao'
+        )
+        
+        unidades_data = [{
+            'nome': unidade.denominacao,
+            'sigla': unidade.sigla
+        } for unidade in unidades]
+        
+        return _resposta_catalogo(request, catalogo, {
+            'status': 'success',
+            'unidades': unidades_data,
+            'total': total
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao carregar unidades: {str(e)}'
+        }, status=500)
@@ -0,0 +1,1021 @@
+"""
+Views de simulações salvas, fluxo de análise e solicitações de simulação.
+"""
+
+from django.http import JsonResponse, HttpResponse
+from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from ..models import UnidadeCargo, CargoSIORG, SimulacaoSalva, SolicitacaoSimulacao, NotificacaoSimulacao, TIPO_USUARIO_DISPLAY
+from ..utils import gerar_anexo_simulacao
+import json
+import logging
+from django.views.decorators.http import require_http_methods
+from django.db.models import Q
+from django.db import transaction
+from django.views.decorators.csrf import csrf_exempt
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.contrib.auth.models import User
+
+logger = logging.getLogger(__name__)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class BaixarAnexoSimulacaoView(View):
+    def post(self, request, *args, **kwargs):
+        try:
+            data = json.loads(request.body)
+            estrutura_atual = data.get('estrutura_atual', [])
+            estrutura_nova = data.get('estrutura_nova', [])
+
+            if not isinstance(estrutura_atual, list) or not isinstance(estrutura_nova, list):
+                return JsonResponse({'error': 'Invalid data format: estrutura_atual and estrutura_nova must be arrays.'}, status=400)
+
+            # Validate data before processing
+            for i, item in enumerate(estrutura_atual + estrutura_nova):
+                if not isinstance(item, dict):
+                    return JsonResponse({'error': f'Invalid item at position {i}: must be an object.'}, status=400)
+
+            # Debug: log data before processing
+            logger.debug("BaixarAnexoSimulacaoView - estrutura_atual length: %s", len(estrutura_atual))
+            logger.debug("BaixarAnexoSimulacaoView - estrutura_nova length: %s", len(estrutura_nova))
+            if estrutura_atual:
+                logger.debug("BaixarAnexoSimulacaoView - estrutura_atual[0] keys: %s", list(estrutura_atual[0].keys()))
+            if estrutura_nova:
+                logger.debug("BaixarAnexoSimulacaoView - estrutura_nova[0] keys: %s", list(estrutura_nova[0].keys()))
+            
+            # Call the utility function to generate the Excel file
+            excel_stream = gerar_anexo_simulacao(estrutura_atual, estrutura_nova)
+            
+            response = HttpResponse(
+                excel_stream, 
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+            response['Content-Disposition'] = 'attachment; filename="Anexo_Simulacao.xlsx"'
+            return response
+
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON'}, status=400)
+        except FileNotFoundError as e:
+             return JsonResponse({'error': str(e)}, status=404) # e.g., no active template
+        except ValueError as e:
+            # Log the full error for debugging
+            logger.error("ValueError in BaixarAnexoSimulacaoView: %s", e)
+            if "invalid literal for int()" in str(e):
+                return JsonResponse({'error': 'Erro de conversão de dados. Verifique se todos os campos numéricos estão preenchidos corretamente.'}, status=400)
+            return JsonResponse({'error': str(e)}, status=400) # e.g., template sheet missing or multiple active
+        except Exception as e:
+            # Log the exception e for debugging
+            logger.exception("Error in BaixarAnexoSimulacaoView: %s", e)
+            return JsonResponse({'error': f'An unexpected error occurred: {str(e)}'}, status=500)
+
+
+def _serializar_simulacao_listagem(sim, tipo_autor, is_owner=False):
+    """Monta o dicionário de uma simulação para as listagens, sem consultas extras."""
+    autor = sim.usuario
+    return {
+        'id': sim.id,
+        'nome': sim.nome,
+        'descricao': sim.descricao or '',
+        'unidade_base': sim.unidade_base or '',
+        'status': sim.get_status_display(),
+        'status_code': sim.status,
+        'tipo_usuario': TIPO_USUARIO_DISPLAY.get(tipo_autor, 'Usuário Externo'),
+        'usuario': 'Você' if is_owner else (autor.get_full_name() or autor.username),
+        'usuario_email': '' if is_owner else autor.email,
+        'criado_em': sim.criado_em.strftime('%d/%m/%Y %H:%M'),
+        'atualizado_em': sim.atualizado_em.strftime('%d/%m/%Y %H:%M')
+    }
+
+
+@login_required
+@require_http_methods(["GET"])
+def listar_simulacoes(request):
+    """Lista simulações baseado no tipo de usuário"""
+    from ..models import obter_tipo_usuario, obter_tipos_usuarios
+    
+    user = request.user
+    tipo_usuario = obter_tipo_usuario(user)
+    
+    simulacoes = SimulacaoSalva.para_listagem()
+    if tipo_usuario == 'gerente':
+        # Gerentes veem TODAS as simulações do sistema; simulações em análise de
+        # autores não internos são descartadas já no SQL
+        simulacoes = simulacoes.filter(
+            SimulacaoSalva.filtro_visiveis_gerente(user)
+        ).order_by('-atualizado_em')
+    else:
+        # Usuários normais veem apenas suas próprias simulações
+        simulacoes = simulacoes.filter(usuario=user)
+    
+    simulacoes = list(simulacoes)
+    tipos = obter_tipos_usuarios(sim.usuario for sim in simulacoes)
+    
+    data = []
+    for sim in simulacoes:
+        is_owner = sim.usuario_id == user.id
+        tipo_autor = tipos[sim.usuario_id]
+        
+        # Autores sem TipoUsuario só são resolvidos depois da consulta
+        if not is_owner and sim.status == 'enviada_analise' and tipo_autor != 'interno':
+            continue
+        
+        item = _serializar_simulacao_listagem(sim, tipo_autor, is_owner=is_owner)
+        item.update({
+            'is_owner': is_owner,
+            'pode_enviar_analise': is_owner and sim.status in ['rascunho', 'rejeitada', 'rejeitada_editada'] and tipo_autor == 'interno',
+            'pode_avaliar': not is_owner and tipo_usuario == 'gerente' and sim.status in SimulacaoSalva.STATUS_ANALISE,
+        })
+        data.append(item)
+    
+    return JsonResponse({
+        'simulacoes': data,
+        'total': len(data),
+        'limite': None if tipo_usuario == 'gerente' else 5,
+        'user_type': tipo_usuario,
+        'is_gerente': tipo_usuario == 'gerente'
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def salvar_simulacao(request):
+    """Salva uma nova simulação ou atualiza uma existente"""
+    try:
+        data = json.loads(request.body)
+        nome = data.get('nome', '').strip()
+        descricao = data.get('descricao', '').strip()
+        dados_estrutura = data.get('dados_estrutura', [])
+        unidade_base = data.get('unidade_base', '').strip()
+        simulacao_id = data.get('id')  # Para atualização
+        
+        # Validações
+        if not nome:
+            return JsonResponse({'erro': 'Nome da simulação é obrigatório'}, status=400)
+        
+        if not dados_estrutura:
+            return JsonResponse({'erro': 'Dados da estrutura são obrigatórios'}, status=400)
+        
+        # Verificar se é atualização ou criação
+        if simulacao_id:
+            # Atualização
+            try:
+                simulacao = SimulacaoSalva.objects.get(id=simulacao_id, usuario=request.user)
+                simulacao.nome = nome
+                simulacao.descricao = descricao
+                simulacao.dados_estrutura = dados_estrutura
+                simulacao.unidade_base = unidade_base
+                simulacao.save()
+                
+                return JsonResponse({
+                    'mensagem': 'Simulação atualizada com sucesso',
+                    'id': simulacao.id
+                })
+            except SimulacaoSalva.DoesNotExist:
+                return JsonResponse({'erro': 'Simulação não encontrada'}, status=404)
+        else:
+            # Criação
+            # Verificar limite de 5 simulações (não se aplica a gerentes)
+            from ..models import obter_tipo_usuario
+            if obter_tipo_usuario(request.user) != 'gerente':
+                total_simulacoes = SimulacaoSalva.objects.filter(usuario=request.user).count()
+                if total_simulacoes >= 5:
+                    return JsonResponse({
+                        'erro': 'Limite de 5 simulações atingido. Delete uma simulação existente antes de criar uma nova.'
+                    }, status=400)
+            
+            # Verificar se já existe simulação com mesmo nome
+            if SimulacaoSalva.objects.filter(usuario=request.user, nome=nome).exists():
+                return JsonResponse({
+                    'erro': f'Já existe uma simulação com o nome "{nome}"'
+                }, status=400)
+            
+            simulacao = SimulacaoSalva.objects.create(
+                usuario=request.user,
+                nome=nome,
+                descricao=descricao,
+                dados_estrutura=dados_estrutura,
+                unidade_base=unidade_base
+            )
+            
+            return JsonResponse({
+                'mensagem': 'Simulação salva com sucesso',
+                'id': simulacao.id
+            }, status=201)
+            
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+def carregar_simulacao(request, simulacao_id):
+    """Carrega os dados de uma simulação específica"""
+    try:
+        from ..models import obter_tipo_usuario
+        
+        user = request.user
+        tipo_usuario = obter_tipo_usuario(user)
+        
+        # Lógica de permissões baseada no tipo de usuário
+        if tipo_usuario == 'gerente':
+            # Gerentes podem carregar QUALQUER simulação
+            simulacao = SimulacaoSalva.objects.get(id=simulacao_id)
+        else:
+            # Usuários normais só podem carregar simulações próprias
+            simulacao = SimulacaoSalva.objects.get(id=simulacao_id, usuario=user)
+        
+        return JsonResponse({
+            'id': simulacao.id,
+            'nome': simulacao.nome,
+            'descricao': simulacao.descricao or '',
+            'dados_estrutura': simulacao.dados_estrutura,
+            'unidade_base': simulacao.unidade_base or '',
+            'criado_em': simulacao.criado_em.strftime('%d/%m/%Y %H:%M'),
+            'atualizado_em': simulacao.atualizado_em.strftime('%d/%m/%Y %H:%M'),
+            'usuario': simulacao.usuario.get_full_name() or simulacao.usuario.username,
+            'status': simulacao.get_status_display(),
+            'tipo_usuario_autor': simulacao.tipo_usuario_atual
+        })
+    except SimulacaoSalva.DoesNotExist:
+        return JsonResponse({'erro': 'Simulação não encontrada ou sem permissão de acesso'}, status=404)
+
+
+@login_required
+@require_http_methods(["DELETE"])
+def deletar_simulacao(request, simulacao_id):
+    """Deleta uma simulação do usuário"""
+    try:
+        simulacao = SimulacaoSalva.objects.get(id=simulacao_id, usuario=request.user)
+        nome = simulacao.nome
+        simulacao.delete()
+        
+        return JsonResponse({
+            'mensagem': f'Simulação "{nome}" deletada com sucesso'
+        })
+    except SimulacaoSalva.DoesNotExist:
+        return JsonResponse({'erro': 'Simulação não encontrada'}, status=404)
+
+
+@login_required
+@require_http_methods(["PUT", "PATCH"])
+def atualizar_simulacao(request, simulacao_id):
+    """View para atualizar uma simulação existente (auto-save)"""
+    import json
+    from django.http import JsonResponse
+    from django.shortcuts import get_object_or_404
+    from ..models import SimulacaoSalva, obter_tipo_usuario
+    
+    try:
+        # Verificar se usuário tem permissão para editar
+        simulacao = get_object_or_404(SimulacaoSalva, id=simulacao_id)
+        
+        # Verificar permissões
+        if simulacao.usuario != request.user:
+            # Verificar se é gerente e pode editar simulações enviadas para análise
+            user_tipo = obter_tipo_usuario(request.user)
+            if user_tipo != 'gerente' or simulacao.status not in ['enviada_analise', 'rejeitada', 'rejeitada_editada']:
+                return JsonResponse({'success': False, 'message': 'Você não tem permissão para editar esta simulação'}, status=403)
+        
+        # Parse dos dados JSON
+        data = json.loads(request.body)
+        
+        # Validar dados obrigatórios
+        if 'dados_estrutura' not in data:
+            return JsonResponse({'success': False, 'message': 'Dados da estrutura são obrigatórios'}, status=400)
+        
+        # Atualizar campos opcionais se fornecidos
+        if 'nome' in data:
+            simulacao.nome = data['nome']
+        if 'descricao' in data:
+            simulacao.descricao = data['descricao']
+        if 'unidade_base' in data:
+            simulacao.unidade_base = data['unidade_base']
+        
+        # Atualizar dados da estrutura
+        simulacao.dados_estrutura = data['dados_estrutura']
+        
+        # Se simulação foi rejeitada e está sendo editada, marcar como rejeitada_editada
+        if simulacao.status == 'rejeitada':
+            simulacao.status = 'rejeitada_editada'
+        
+        simulacao.save()
+        
+        return JsonResponse({
+            'success': True, 
+            'message': 'Simulação atualizada com sucesso',
+            'simulacao': {
+                'id': simulacao.id,
+                'nome': simulacao.nome,
+                'descricao': simulacao.descricao,
+                'status': simulacao.get_status_display(),
+                'status_code': simulacao.status,
+                'atualizado_em': simulacao.atualizado_em.strftime('%d/%m/%Y %H:%M')
+            }
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'Dados JSON inválidos'}, status=400)
+    except Exception as e:
+        logger.error(f"Erro ao atualizar simulação {simulacao_id}: {str(e)}")
+        return JsonResponse({'success': False, 'message': f'Erro interno: {str(e)}'}, status=500)
+
+
+# === NOVAS VIEWS PARA SISTEMA DE TRÊS NÍVEIS DE USUÁRIOS ===
+
+@login_required
+@require_http_methods(["GET"])
+def listar_simulacoes_gerente(request):
+    """
+    Lista simulações visíveis para gerentes (enviadas para análise por usuários internos)
+    """
+    from ..models import obter_tipo_usuario, obter_tipos_usuarios
+    
+    if obter_tipo_usuario(request.user) != 'gerente':
+        return JsonResponse({'erro': 'Acesso negado'}, status=403)
+    
+    # Buscar simulações enviadas para análise e rejeitadas por usuários internos
+    simulacoes = list(SimulacaoSalva.para_listagem().filter(
+        Q(usuario__tipo_usuario_simulacao__tipo='interno') | Q(usuario__tipo_usuario_simulacao__isnull=True),
+        status__in=SimulacaoSalva.STATUS_ANALISE,
+        visivel_para_gerentes=True
+    ).order_by('-atualizado_em'))
+    tipos = obter_tipos_usuarios(sim.usuario for sim in simulacoes)
+    
+    data = [
+        _serializar_simulacao_listagem(sim, tipos[sim.usuario_id])
+        for sim in simulacoes
+        # Só incluir se o usuário for realmente interno
+        if tipos[sim.usuario_id] == 'interno'
+    ]
+    
+    return JsonResponse({
+        'simulacoes': data,
+        'total': len(data)
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def enviar_simulacao_para_analise(request):
+    """
+    Envia uma simulação para análise (disponível para usuários internos)
+    """
+    try:
+        data = json.loads(request.body)
+        simulacao_id = data.get('simulacao_id')
+        
+        if not simulacao_id:
+            return JsonResponse({'erro': 'ID da simulação é obrigatório'}, status=400)
+        
+        # Verificar se o usuário é interno (tem permissão para enviar para análise)
+        from ..models import obter_tipo_usuario
+        if obter_tipo_usuario(request.user) != 'interno':
+            return JsonResponse({'erro': 'Apenas usuários internos podem enviar simulações para análise'}, status=403)
+        
+        # Buscar a simulação
+        try:
+            simulacao = SimulacaoSalva.objects.get(id=simulacao_id, usuario=request.user)
+        except SimulacaoSalva.DoesNotExist:
+            return JsonResponse({'erro': 'Simulação não encontrada'}, status=404)
+        
+        # Verificar se está em status válido para envio
+        if simulacao.status not in ['rascunho', 'rejeitada', 'rejeitada_editada']:
+            return JsonResponse({'erro': 'Esta simulação já foi enviada para análise ou aprovada'}, status=400)
+        
+        status_anterior = simulacao.status
+        if status_anterior in ['rejeitada', 'rejeitada_editada']:
+            titulo = f'Simulação corrigida para reavaliação: {simulacao.nome}'
+            mensagem = f'{request.user.get_full_name() or request.user.username} corrigiu e reenviou a simulação "{simulacao.nome}" para nova análise.'
+        else:
+            titulo = f'Nova simulação para análise: {simulacao.nome}'
+            mensagem = f'{request.user.get_full_name() or request.user.username} enviou a simulação "{simulacao.nome}" para análise.'
+        
+        with transaction.atomic():
+            # Atualizar status
+            simulacao.status = 'enviada_analise'
+            simulacao.save()
+            
+            # Criar notificações para todos os gerentes de uma vez
+            gerentes_ids = User.objects.filter(
+                tipo_usuario_simulacao__tipo='gerente', tipo_usuario_simulacao__ativo=True
+            ).values_list('id', flat=True)
+            NotificacaoSimulacao.objects.notificar(
+                gerentes_ids,
+                tipo='simulacao_enviada',
+                titulo=titulo,
+                mensagem=mensagem,
+                simulacao=simulacao
+            )
+        
+        if status_anterior in ['rejeitada', 'rejeitada_editada']:
+            mensagem_sucesso = 'Simulação corrigida e reenviada para análise com sucesso'
+        else:
+            mensagem_sucesso = 'Simulação enviada para análise com sucesso'
+        
+        return JsonResponse({
+            'mensagem': mensagem_sucesso,
+            'status': simulacao.get_status_display()
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["POST"])
+def avaliar_simulacao(request):
+    """
+    Permite que gerentes aprovem ou rejeitem simulações
+    """
+    try:
+        from ..models import obter_tipo_usuario
+        if obter_tipo_usuario(request.user) != 'gerente':
+            return JsonResponse({'erro': 'Acesso negado'}, status=403)
+        
+        data = json.loads(request.body)
+        simulacao_id = data.get('simulacao_id')
+        acao = data.get('acao')  # 'aprovar' ou 'rejeitar'
+        observacoes = data.get('observacoes', '')
+        
+        if not all([simulacao_id, acao]):
+            return JsonResponse({'erro': 'ID da simulação e ação são obrigatórios'}, status=400)
+        
+        if acao not in ['aprovar', 'rejeitar']:
+            return JsonResponse({'erro': 'Ação deve ser "aprovar" ou "rejeitar"'}, status=400)
+        
+        # Buscar a simulação (pode estar em análise ou rejeitada para reavaliação)
+        try:
+            simulacao = SimulacaoSalva.objects.get(
+                id=simulacao_id, 
+                status__in=['enviada_analise', 'rejeitada', 'rejeitada_editada'],
+                visivel_para_gerentes=True
+            )
+        except SimulacaoSalva.DoesNotExist:
+            return JsonResponse({'erro': 'Simulação não encontrada ou não disponível para avaliação'}, status=404)
+        
+        # Atualizar status
+        status_anterior = simulacao.status
+        if acao == 'aprovar':
+            simulacao.status = 'aprovada'
+            mensagem_tipo = 'simulacao_aprovada'
+            if status_anterior in ['rejeitada', 'rejeitada_editada']:
+                mensagem_titulo = f'Simulação reavaliada e aprovada: {simulacao.nome}'
+                mensagem_texto = f'Sua simulação "{simulacao.nome}" foi reavaliada e aprovada após as correções.'
+            else:
+                mensagem_titulo = f'Simulação aprovada: {simulacao.nome}'
+                mensagem_texto = f'Sua simulação "{simulacao.nome}" foi aprovada.'
+        else:
+            simulacao.status = 'rejeitada'
+            mensagem_tipo = 'simulacao_rejeitada'
+            mensagem_titulo = f'Simulação rejeitada: {simulacao.nome}'
+            mensagem_texto = f'Sua simulação "{simulacao.nome}" foi rejeitada. Faça as correções necessárias e solicite nova avaliação.'
+        
+        if observacoes:
+            mensagem_texto += f' Observações: {observacoes}'
+        
+        with transaction.atomic():
+            simulacao.save()
+            
+            # Criar notificação para o criador da simulação
+            NotificacaoSimulacao.objects.notificar(
+                [simulacao.usuario_id],
+                tipo=mensagem_tipo,
+                titulo=mensagem_titulo,
+                mensagem=mensagem_texto,
+                simulacao=simulacao
+            )
+        
+        return JsonResponse({
+            'mensagem': f'Simulação {acao}da com sucesso',
+            'status': simulacao.get_status_display()
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["POST"])
+def criar_solicitacao_simulacao(request):
+    """
+    Permite que gerentes criem solicitações de simulação para usuários internos
+    """
+    try:
+        from ..models import obter_tipo_usuario
+        if obter_tipo_usuario(request.user) != 'gerente':
+            return JsonResponse({'erro': 'Apenas gerentes podem criar solicitações'}, status=403)
+        
+        data = json.loads(request.body)
+        usuario_designado_id = data.get('usuario_designado_id')
+        titulo = data.get('titulo', '').strip()
+        descricao = data.get('descricao', '').strip()
+        unidade_base_sugerida = data.get('unidade_base_sugerida', '').strip()
+        prazo_estimado = data.get('prazo_estimado')
+        prioridade = data.get('prioridade', 'normal')
+        
+        # Validações
+        if not all([usuario_designado_id, titulo, descricao]):
+            return JsonResponse({'erro': 'Usuário designado, título e descrição são obrigatórios'}, status=400)
+        
+        # Verificar se o usuário designado existe e é interno
+        try:
+            usuario_designado = User.objects.get(id=usuario_designado_id)
+            if obter_tipo_usuario(usuario_designado) != 'interno':
+                return JsonResponse({'erro': 'Usuário designado deve ser um usuário interno'}, status=400)
+        except User.DoesNotExist:
+            return JsonResponse({'erro': 'Usuário designado não encontrado'}, status=404)
+        
+        # Converter prazo se fornecido
+        prazo_obj = None
+        if prazo_estimado:
+            try:
+                from datetime import datetime
+                prazo_obj = datetime.strptime(prazo_estimado, '%Y-%m-%d').date()
+            except ValueError:
+                return JsonResponse({'erro': 'Formato de data inválido para prazo estimado'}, status=400)
+        
+        with transaction.atomic():
+            # Criar solicitação
+            solicitacao = SolicitacaoSimulacao.objects.create(
+                solicitante=request.user,
+                usuario_designado=usuario_designado,
+                titulo=titulo,
+                descricao=descricao,
+                unidade_base_sugerida=unidade_base_sugerida,
+                prazo_estimado=prazo_obj,
+                prioridade=prioridade
+            )
+            
+            # Criar notificação para o usuário designado
+            NotificacaoSimulacao.objects.notificar(
+                [usuario_designado.id],
+                tipo='nova_solicitacao',
+                titulo=f'Nova solicitação de simulação: {titulo}',
+                mensagem=f'Você recebeu uma nova solicitação de simulação de {request.user.get_full_name() or request.user.username}.',
+                solicitacao=solicitacao
+            )
+        
+        return JsonResponse({
+            'mensagem': 'Solicitação criada com sucesso',
+            'solicitacao_id': solicitacao.id
+        }, status=201)
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+def listar_usuarios_internos(request):
+    """
+    Lista usuários internos disponíveis para receber solicitações
+    """
+    from ..models import obter_tipo_usuario
+    
+    if obter_tipo_usuario(request.user) != 'gerente':
+        return JsonResponse({'erro': 'Acesso negado'}, status=403)
+    
+    # Buscar usuários que são internos baseado no modelo TipoUsuario
+    usuarios_internos = User.objects.filter(
+        tipo_usuario_simulacao__tipo='interno',
+        tipo_usuario_simulacao__ativo=True,
+        is_active=True
+    ).distinct()
+    
+    data = []
+    for usuario in usuarios_internos:
+        nome_completo = usuario.get_full_name()
+        if not nome_completo or nome_completo.strip() == '':
+            nome_completo = usuario.username
+            
+        data.append({
+            'id': usuario.id,
+            'username': usuario.username,
+            'nome_completo': nome_completo,
+            'email': usuario.email or 'Sem email',
+            'grupos': [group.name for group in usuario.groups.all()]
+        })
+    
+    return JsonResponse({
+        'usuarios': data,
+        'total': len(data)
+    })
+
+
+@login_required
+@require_http_methods(["GET"])
+def minhas_solicitacoes_simulacao(request):
+    """
+    Lista solicitações de simulação recebidas pelo usuário
+    """
+    # Buscar solicitações recebidas
+    solicitacoes = SolicitacaoSimulacao.objects.filter(
+        usuario_designado=request.user
+    ).order_by('-criada_em')
+    
+    data = []
+    for sol in solicitacoes:
+        data.append({
+            'id': sol.id,
+            'titulo': sol.titulo,
+            'descricao': sol.descricao,
+            'solicitante': sol.solicitante.get_full_name() or sol.solicitante.username,
+            'solicitante_email': sol.solicitante.email,
+            'unidade_base_sugerida': sol.unidade_base_sugerida or '',
+            'prazo_estimado': sol.prazo_estimado.strftime('%d/%m/%Y') if sol.prazo_estimado else '',
+            'prioridade': sol.get_prioridade_display(),
+            'status': sol.get_status_display(),
+            'criada_em': sol.criada_em.strftime('%d/%m/%Y %H:%M'),
+            'aceita_em': sol.aceita_em.strftime('%d/%m/%Y %H:%M') if sol.aceita_em else '',
+            'simulacao_criada_id': sol.simulacao_criada.id if sol.simulacao_criada else None,
+            'simulacao_criada_nome': sol.simulacao_criada.nome if sol.simulacao_criada else '',
+            'observacoes_usuario': sol.observacoes_usuario or ''
+        })
+    
+    return JsonResponse({
+        'solicitacoes': data,
+        'total': len(data)
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def aceitar_solicitacao_simulacao(request):
+    """
+    Permite que usuários aceitem uma solicitação de simulação
+    """
+    try:
+        data = json.loads(request.body)
+        solicitacao_id = data.get('solicitacao_id')
+        observacoes = data.get('observacoes', '')
+        
+        if not solicitacao_id:
+            return JsonResponse({'erro': 'ID da solicitação é obrigatório'}, status=400)
+        
+        # Buscar a solicitação
+        try:
+            solicitacao = SolicitacaoSimulacao.objects.get(
+                id=solicitacao_id, 
+                usuario_designado=request.user,
+                status='pendente'
+            )
+        except SolicitacaoSimulacao.DoesNotExist:
+            return JsonResponse({'erro': 'Solicitação não encontrada ou já foi processada'}, status=404)
+        
+        # Atualizar solicitação
+        solicitacao.status = 'em_andamento'
+        solicitacao.aceita_em = timezone.now()
+        if observacoes:
+            solicitacao.observacoes_usuario = observacoes
+        with transaction.atomic():
+            solicitacao.save()
+            
+            # Criar notificação para o solicitante
+            NotificacaoSimulacao.objects.notificar(
+                [solicitacao.solicitante_id],
+                tipo='solicitacao_aceita',
+                titulo=f'Solicitação aceita: {solicitacao.titulo}',
+                mensagem=f'{request.user.get_full_name() or request.user.username} aceitou sua solicitação de simulação.',
+                solicitacao=solicitacao
+            )
+        
+        return JsonResponse({
+            'mensagem': 'Solicitação aceita com sucesso',
+            'status': solicitacao.get_status_display()
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@require_http_methods(["POST"])
+def vincular_simulacao_solicitacao(request):
+    """
+    Vincula uma simulação criada a uma solicitação
+    """
+    try:
+        data = json.loads(request.body)
+        solicitacao_id = data.get('solicitacao_id')
+        simulacao_id = data.get('simulacao_id')
+        
+        if not all([solicitacao_id, simulacao_id]):
+            return JsonResponse({'erro': 'ID da solicitação e da simulação são obrigatórios'}, status=400)
+        
+        # Buscar solicitação e simulação
+        try:
+            solicitacao = SolicitacaoSimulacao.objects.get(
+                id=solicitacao_id,
+                usuario_designado=request.user
+            )
+            simulacao = SimulacaoSalva.objects.get(
+                id=simulacao_id,
+                usuario=request.user
+            )
+        except (SolicitacaoSimulacao.DoesNotExist, SimulacaoSalva.DoesNotExist):
+            return JsonResponse({'erro': 'Solicitação ou simulação não encontrada'}, status=404)
+        
+        # Vincular simulação à solicitação
+        solicitacao.simulacao_criada = simulacao
+        solicitacao.status = 'concluida'
+        solicitacao.save()
+        
+        return JsonResponse({
+            'mensagem': 'Simulação vinculada à solicitação com sucesso'
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados inválidos'}, status=400)
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
+
+
+@login_required
+@csrf_exempt
+@require_http_methods(["POST"])
+def adicionar_cargo(request):
+    """
+    Endpoint para adicionar um novo cargo à estrutura.
+    """
+    
+    try:
+        # Obter dados do JSON
+        import json
+        data = json.loads(request.body)
+        
+        # Validar campos obrigatórios
+        required_fields = ['sigla_unidade', 'tipo_cargo', 'denominacao', 'categoria', 'nivel', 'quantidade']
+        for field in required_fields:
+            if field not in data or not data[field]:
+                return JsonResponse({
+                    'success': False,
+                    'error': f'Campo obrigatório ausente: {field}'
+                }, status=400)
+        
+        # Obter dados dos campos
+        sigla_unidade = data['sigla_unidade'].strip()
+        tipo_cargo = data['tipo_cargo'].strip()
+        denominacao = data['denominacao'].strip()
+        categoria = int(data['categoria'])
+        nivel = int(data['nivel'])
+        quantidade = int(data['quantidade'])
+        
+        # Validações específicas
+        if categoria < 1 or categoria > 4:
+            return JsonResponse({
+                'success': False,
+                'error': 'Categoria deve estar entre 1 e 4'
+            }, status=400)
+            
+        if nivel < 1 or nivel > 18:
+            return JsonResponse({
+                'success': False,
+                'error': 'Nível deve estar entre 1 e 18'
+            }, status=400)
+            
+        if quantidade < 1:
+            return JsonResponse({
+                'success': False,
+                'error': 'Quantidade deve ser pelo menos 1'
+            }, status=400)
+        
+        # Buscar uma unidade existente com a mesma sigla para pegar informações base
+        unidade_base = UnidadeCargo.objects.filter(sigla_unidade=sigla_unidade).first()
+        
+        if not unidade_base:
+            return JsonResponse({
+                'success': False,
+                'error': f'Não foi encontrada unidade com sigla: {sigla_unidade}'
+            }, status=400)
+        
+        # Buscar dados do cargo SIORG (mesmo tipo, categoria e nível) para obter pontos e valor
+        cargo_siorg = CargoSIORG.objects.filter(
+            tipo_cargo=tipo_cargo.upper(), categoria=categoria, nivel_cargo=nivel
+        ).first()
+        
+        pontos_unitario = 0
+        valor_unitario = 0
+        if cargo_siorg:
+            pontos_unitario = float(cargo_siorg.unitario)
+            valor_unitario = float(cargo_siorg.valor_decimal)
+        
+        # Calcular valores totais
+        pontos_total = pontos_unitario * quantidade
+        valor_total = valor_unitario * quantidade
+        
+        # Gerar um grafo único para o cargo adicionado manualmente
+        import uuid
+        grafo_unico = f"MANUAL_{sigla_unidade}_{tipo_cargo}_{categoria}_{nivel}_{uuid.uuid4().hex[:8]}"
+        
+        # Criar o novo cargo ASSOCIADO AO USUÁRIO
+        novo_cargo = UnidadeCargo.objects.create(
+            nivel_hierarquico=unidade_base.nivel_hierarquico,
+            tipo_unidade=unidade_base.tipo_unidade,
+            denominacao_unidade=unidade_base.denominacao_unidade,
+            codigo_unidade=unidade_base.codigo_unidade,
+            sigla_unidade=sigla_unidade,
+            categoria_unidade=unidade_base.categoria_unidade,
+            orgao_entidade=unidade_base.orgao_entidade,
+            tipo_cargo=tipo_cargo,
+            denominacao=denominacao,
+            categoria=categoria,
+            nivel=nivel,
+            quantidade=quantidade,
+            sigla=sigla_unidade,
+            grafo=grafo_unico,
+            pontos_total=pontos_total,
+            valor_total=valor_total,
+            usuario=request.user  # ✅ ASSOCIAR AO USUÁRIO ATUAL
+        )
+        
+        logger.info(f"Novo cargo criado: {novo_cargo.denominacao} (ID: {novo_cargo.id}) por usuário {request.user.username}")
+        
+        # Retornar dados do cargo criado
+        return JsonResponse({
+            'success': True,
+            'cargo': {
+                'id': novo_cargo.id,
+                'sigla': novo_cargo.sigla,
+                'tipo_cargo': novo_cargo.tipo_cargo,
+                'denominacao': novo_cargo.denominacao,
+                'categoria': novo_cargo.categoria,
+                'nivel': novo_cargo.nivel,
+                'quantidade': novo_cargo.quantidade,
+                'pontos': pontos_unitario,  # Pontos unitários para o frontend
+                'valor_unitario': valor_unitario,  # Valor unitário para o frontend
+                'pontos_total': novo_cargo.pontos_total,
+                'valor_total': novo_cargo.valor_total,
+                'grafo': novo_cargo.grafo,
+                'is_manual': True,  # ✅ MARCAR COMO CARGO MANUAL
+                'manual_id': novo_cargo.id  # ✅ ID PARA REMOÇÃO
+            },
+            'message': 'Cargo adicionado com sucesso!'
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Dados JSON inválidos'
+        }, status=400)
+        
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'error': f'Erro de validação: {str(e)}'
+        }, status=400)
+        
+    except Exception as e:
+        logger.error(f"Erro ao adicionar cargo: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': 'Erro interno do servidor'
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["POST"])
+def mesclar_simulacoes(request):
+    """
+    API para mesclar múltiplas simulações (disponível apenas para gerentes)
+    """
+    from ..models import obter_tipo_usuario
+    
+    try:
+        # Verificar se o usuário é gerente
+        if obter_tipo_usuario(request.user) != 'gerente':
+            return JsonResponse({'erro': 'Apenas gerentes podem mesclar simulações'}, status=403)
+        
+        data = json.loads(request.body)
+        simulacoes_ids = data.get('simulacoes_ids', [])
+        nome_mesclagem = data.get('nome_mesclagem', '').strip()
+        descricao_mesclagem = data.get('descricao_mesclagem', '').strip()
+        metodo_mesclagem = data.get('metodo_mesclagem', 'somar')  # 'somar', 'substituir', 'media'
+        
+        # Validações
+        if not simulacoes_ids or len(simulacoes_ids) < 2:
+            return JsonResponse({'erro': 'É necessário selecionar pelo menos 2 simulações para mesclar'}, status=400)
+        
+        if not nome_mesclagem:
+            return JsonResponse({'erro': 'Nome da mesclagem é obrigatório'}, status=400)
+        
+        # Buscar as simulações
+        simulacoes = SimulacaoSalva.objects.filter(id__in=simulacoes_ids)
+        
+        if len(simulacoes) != len(simulacoes_ids):
+            return JsonResponse({'erro': 'Uma ou mais simulações não foram encontradas'}, status=404)
+        
+        # Verificar se já existe uma simulação com o mesmo nome para o usuário
+        if SimulacaoSalva.objects.filter(usuario=request.user, nome=nome_mesclagem).exists():
+            return JsonResponse({'erro': f'Já existe uma simulação com o nome "{nome_mesclagem}"'}, status=400)
+        
+        # Mesclar os dados das simulações
+        dados_mesclados = []
+        unidades_bases = set()
+        nomes_simulacoes = []
+        
+        # Coletar dados de todas as simulações
+        for simulacao in simulacoes:
+            nomes_simulacoes.append(simulacao.nome)
+            if simulacao.unidade_base:
+                unidades_bases.add(simulacao.unidade_base)
+            
+            # Adicionar dados da simulação aos dados mesclados
+            for item in simulacao.dados_estrutura:
+                dados_mesclados.append(item.copy())
+        
+        # Aplicar estratégia de mesclagem baseada no método selecionado
+        if metodo_mesclagem == 'somar':
+            # Agrupar por chave única (denominacao + categoria + nivel) e somar quantidades
+            dados_agrupados = {}
+            
+            for item in dados_mesclados:
+                chave = f"{item.get('denominacao', '')}_{item.get('categoria', '')}_{item.get('nivel', '')}"
+                
+                if chave in dados_agrupados:
+                    # Somar quantidades e recalcular pontos
+                    dados_agrupados[chave]['quantidade'] += item.get('quantidade', 0)
+                    dados_agrupados[chave]['pontos'] = dados_agrupados[chave]['quantidade'] * item.get('valor_unitario', 0)
+                else:
+                    dados_agrupados[chave] = item.copy()
+            
+            dados_finais = list(dados_agrupados.values())
+            
+        elif metodo_mesclagem == 'substituir':
+            # A última simulação sobrescreve as anteriores (baseado na ordem dos IDs)
+            dados_finais = simulacoes.last().dados_estrutura.copy()
+            
+        elif metodo_mesclagem == 'media':
+            # Calcular média das quantidades para cargos duplicados
+            dados_agrupados = {}
+            contador_cargos = {}
+            
+            for item in dados_mesclados:
+                chave = f"{item.get('denominacao', '')}_{item.get('categoria', '')}_{item.get('nivel', '')}"
+                
+                if chave in dados_agrupados:
+                    dados_agrupados[chave]['quantidade'] += item.get('quantidade', 0)
+                    contador_cargos[chave] += 1
+                else:
+                    dados_agrupados[chave] = item.copy()
+                    contador_cargos[chave] = 1
+            
+            # Calcular médias
+            for chave, item in dados_agrupados.items():
+                item['quantidade'] = round(item['quantidade'] / contador_cargos[chave])
+                item['pontos'] = item['quantidade'] * item.get('valor_unitario', 0)
+            
+            dados_finais = list(dados_agrupados.values())
+        
+        else:
+            dados_finais = dados_mesclados
+        
+        # Determinar unidade base principal
+        unidade_base_principal = list(unidades_bases)[0] if unidades_bases else ''
+        
+        # Criar descrição automática se não fornecida
+        if not descricao_mesclagem:
+            descricao_mesclagem = f"Mesclagem de {len(simulacoes)} simulações: {', '.join(nomes_simulacoes[:3])}"
+            if len(nomes_simulacoes) > 3:
+                descricao_mesclagem += f" e mais {len(nomes_simulacoes) - 3} simulações"
+            descricao_mesclagem += f". Método: {metodo_mesclagem}."
+        
+        # Criar nova simulação mesclada
+        simulacao_mesclada = SimulacaoSalva.objects.create(
+            usuario=request.user,
+            nome=nome_mesclagem,
+            descricao=descricao_mesclagem,
+            dados_estrutura=dados_finais,
+            unidade_base=unidade_base_principal,
+            status='rascunho'
+        )
+        
+        return JsonResponse({
+            'sucesso': True,
+            'simulacao_mesclada': {
+                'id': simulacao_mesclada.id,
+                'nome': simulacao_mesclada.nome,
+                'descricao': simulacao_mesclada.descricao,
+                'total_registros': len(dados_finais),
+                'unidade_base': unidade_base_principal,
+                'simulacoes_origem': nomes_simulacoes,
+                'metodo_mesclagem': metodo_mesclagem
+            },
+            'mensagem': f'Simulações mescladas com sucesso! {len(dados_finais)} registros na nova simulação.'
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({'erro': 'Dados JSON inválidos'}, status=400)
+    except Exception as e:
+        logger.error(f"Erro ao mesclar simulações: {str(e)}")
+        return JsonResponse({'erro': f'Erro interno: {str(e)}'}, status=500)
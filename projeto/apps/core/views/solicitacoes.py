@@ -0,0 +1,165 @@
+"""
+Views das solicitações de realocação e permuta.
+"""
+
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+import json
+from django.views.decorators.http import require_http_methods
+
+
+@login_required
+@require_http_methods(["POST"])
+def enviar_solicitacao_realocacao(request):
+    """
+    Processa o envio de solicitação de realocação.
+    """
+    from ..models import SolicitacaoRealocacao
+    
+    try:
+        data = json.loads(request.body)
+        
+        # Validar dados obrigatórios
+        campos_obrigatorios = ['nome_servidor', 'matricula', 'unidade_atual', 'unidade_destino', 'justificativa']
+        for campo in campos_obrigatorios:
+            if not data.get(campo):
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f'Campo obrigatório não preenchido: {campo}'
+                }, status=400)
+        
+        # Criar solicitação
+        solicitacao = SolicitacaoRealocacao.objects.create(
+            nome_servidor=data['nome_servidor'],
+            matricula_siape=data['matricula'],
+            unidade_atual=data['unidade_atual'],
+            unidade_destino=data['unidade_destino'],
+            justificativa=data['justificativa'],
+            usuario_solicitante=request.user
+        )
+        
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Solicitação de realocação enviada com sucesso!',
+            'id': solicitacao.id
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Dados inválidos'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao processar solicitação: {str(e)}'
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["POST"])
+def enviar_solicitacao_permuta(request):
+    """
+    Processa o envio de solicitação de permuta.
+    """
+    from ..models import SolicitacaoPermuta
+    
+    try:
+        data = json.loads(request.body)
+        
+        # Validar dados obrigatórios
+        campos_obrigatorios = ['servidor1', 'matricula1', 'servidor2', 'matricula2']
+        for campo in campos_obrigatorios:
+            if not data.get(campo):
+                return JsonResponse({
+                    'status': 'error',
+                    'message': f'Campo obrigatório não preenchido: {campo}'
+                }, status=400)
+        
+        # Buscar unidades dos servidores (simplificado - em produção seria mais complexo)
+        unidade1 = "Unidade a definir"  # Aqui seria feita uma busca real
+        unidade2 = "Unidade a definir"  # Aqui seria feita uma busca real
+        
+        # Criar solicitação
+        solicitacao = SolicitacaoPermuta.objects.create(
+            nome_servidor1=data['servidor1'],
+            matricula_servidor1=data['matricula1'],
+            unidade_servidor1=unidade1,
+            nome_servidor2=data['servidor2'],
+            matricula_servidor2=data['matricula2'],
+            unidade_servidor2=unidade2,
+            observacoes=data.get('observacoes', ''),
+            usuario_solicitante=request.user
+        )
+        
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Solicitação de permuta enviada com sucesso!',
+            'id': solicitacao.id
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Dados inválidos'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Erro ao processar solicitação: {str(e)}'
+        }, status=500)
+
+
+@login_required
+@require_http_methods(["GET"])
+def api_minhas_solicitacoes(request):
+    """
+    API para listar as solicitações do usuário (realocações e permutas).
+    """
+    from ..models import SolicitacaoRealocacao, SolicitacaoPermuta
+    
+    try:
+        # Buscar solicitações de realocação
+        solicitacoes_realocacao = SolicitacaoRealocacao.objects.filter(
+            usuario_solicitante=request.user
+        ).order_by('-data_solicitacao')
+        
+        # Buscar solicitações de permuta
+        solicitacoes_permuta = SolicitacaoPermuta.objects.filter(
+            usuario_solicitante=request.user
+        ).order_by('-data_solicitacao')
+        
+        # Preparar dados
+        realocacoes_data = []
+        for sol in solicitacoes_realocacao:
+            realocacoes_data.append({
+                'id': sol.id,
+                'tipo': 'realocacao',
+                'nome_servidor': sol.nome_servidor,
+                'unidade_atual': sol.unidade_atual,
+                'unidade_destino': sol.unidade_destino,
+                'status': sol.status,
+                'data_solicitacao': sol.data_solicitacao.strftime('%d/%m/%Y %H:%M'),
+                'observacoes': sol.observacoes_analise or ''
+            })
+        
+        permutas_data = []
+        for sol in solicitacoes_permuta:
+            permutas_data.append({
+                'id': sol.id,
+                'tipo': 'permuta',
+                'servidor1': f"{sol.nome_servidor1} ({sol.unidade_servidor1})",
+                'servidor2': f"{sol.nome_servidor2} ({sol.unidade_servidor2})",
+                'status': sol.status,
+                'data_solicitacao': sol.data_solicitacao.strftime('%d/%m/%Y %H:%M'),
+                'observacoes': sol.observacoes_analise or ''
+            })
+        
+        return JsonResponse({
+            'realocacoes': realocacoes_data,
+            'permutas': permutas_data,
+            'total': len(realocacoes_data) + len(permutas_data)
+        })
+        
+    except Exception as e:
+        return JsonResponse({'erro': str(e)}, status=500)
@@ -879,25 +879,25 @@ def simular_troca_cargo(request):
         
         # Buscar valores dos cargos
         cargo_atual_siorg = CargoSIORG.objects.filter(
-            cargo=f"{cargo_atual['tipo']} {cargo_atual['categoria']} {cargo_atual['nivel']:02d}"
+            tipo_cargo=cargo_atual['tipo'], categoria=cargo_atual['categoria'], nivel_cargo=cargo_atual['nivel']
         ).first()
         
         cargo_novo_siorg = CargoSIORG.objects.filter(
-            cargo=f"{cargo_novo['tipo']} {cargo_novo['categoria']} {cargo_novo['nivel']:02d}"
+            tipo_cargo=cargo_novo['tipo'], categoria=cargo_novo['categoria'], nivel_cargo=cargo_novo['nivel']
         ).first()
         
         if not cargo_atual_siorg or not cargo_novo_siorg:
             return JsonResponse({'error': 'Cargo não encontrado'}, status=400)
         
         # Calcular diferenças
-        diferenca_valor = (cargo_novo_siorg.unitario - cargo_atual_siorg.unitario) * cargo_atual['quantidade']
-        diferenca_pontos = (cargo_novo_siorg.valor - cargo_atual_siorg.valor) * cargo_atual['quantidade']
+        diferenca_valor = (cargo_novo_siorg.valor_decimal - cargo_atual_siorg.valor_decimal) * cargo_atual['quantidade']
+        diferenca_pontos = (cargo_novo_siorg.unitario - cargo_atual_siorg.unitario) * cargo_atual['quantidade']
         
         return JsonResponse({
             'diferenca_valor': str(diferenca_valor),
             'diferenca_pontos': str(diferenca_pontos),
-            'valor_atual': str(cargo_atual_siorg.valor * cargo_atual['quantidade']),
-            'valor_novo': str(cargo_novo_siorg.valor * cargo_atual['quantidade']),
+            'valor_atual': str(cargo_atual_siorg.valor_decimal * cargo_atual['quantidade']),
+            'valor_novo': str(cargo_novo_siorg.valor_decimal * cargo_atual['quantidade']),
             'pontos_atual': str(cargo_atual_siorg.unitario * cargo_atual['quantidade']),
             'pontos_novo': str(cargo_novo_siorg.unitario * cargo_atual['quantidade'])
         })
@@ -911,6 +911,8 @@ def api_organograma(request):
     try:
         # Buscar todas as unidades com seus cargos
         unidades = UnidadeCargo.objects.select_related('unidade').exclude(grafo__exact='').exclude(grafo__isnull=True)
+        # (tipo, categoria, nível) -> (valor, unitário) do SIORG, numa consulta só
+        cargos_siorg = CargoSIORG.objects.tabela()
         
         # Primeiro passo: agrupar unidades por grafo completo
         unidades_por_grafo = {}
@@ -942,11 +944,7 @@ def api_organograma(request):
             
             for unidade in grupo_unidades:
                 try:
-                    cargo_siorg = CargoSIORG.objects.get(
-                        cargo=f"{unidade.tipo_cargo} {unidade.categoria} {unidade.nivel:02d}"
-                    )
-                    valor = Decimal(cargo_siorg.valor.replace('R$ ', '').replace('.', '').replace(',', '.'))
-                    pontos = cargo_siorg.unitario
+                    valor, pontos = cargos_siorg[(unidade.tipo_cargo, unidade.categoria, unidade.nivel)]
                     
                     cargo_info = {
                         'tipo': unidade.tipo_cargo,
@@ -960,7 +958,7 @@ def api_organograma(request):
                     valor_total += valor * unidade.quantidade
                     pontos_total += pontos * unidade.quantidade
                     cargos_info.append(cargo_info)
-                except CargoSIORG.DoesNotExist:
+                except KeyError:
                     print(f"Cargo não encontrado: {unidade.tipo_cargo} {unidade.categoria} {unidade.nivel:02d}")
             
             # Armazenar dados da unidade usando a unidade principal (cargo de maior nível)
@@ -0,0 +1,3 @@
+"""
+Benchmarks com estruturas organizacionais sintéticas (ver executar.py).
+"""
@@ -0,0 +1,229 @@
+"""
+Cenários cronometrados dos benchmarks.
+
+Cada cenário é uma função que recebe o Contexto e executa a operação medida.
+`preparar` roda antes de cada repetição, fora da medição (por exemplo, limpar
+o cache para a medição "fria"). `max_queries` é o orçamento de queries por
+repetição: um número ou uma função dos parâmetros da estrutura; o cenário
+falha se o orçamento for ultrapassado.
+"""
+
+import json
+import os
+import shutil
+
+from django.core.cache import cache
+
+CENARIOS = {}
+
+
+class Cenario:
+    def __init__(self, nome, funcao, preparar=None, max_queries=None, repeticoes=None, descricao=''):
+        self.nome = nome
+        self.funcao = funcao
+        self.preparar = preparar
+        self.max_queries = max_queries
+        self.repeticoes = repeticoes
+        self.descricao = descricao
+
+    def orcamento_queries(self, estrutura):
+        if callable(self.max_queries):
+            return self.max_queries(estrutura)
+        return self.max_queries
+
+
+def cenario(nome, preparar=None, max_queries=None, repeticoes=None, descricao=None):
+    """Registra a função como cenário (sem descrição, usa a docstring)."""
+    def registrar(funcao):
+        CENARIOS[nome] = Cenario(
+            nome, funcao, preparar=preparar, max_queries=max_queries,
+            repeticoes=repeticoes, descricao=descricao or (funcao.__doc__ or '').strip()
+        )
+        return funcao
+    return registrar
+
+
+class Contexto:
+    """Estado compartilhado pelos cenários: estrutura, usuário autenticado e diretório de trabalho."""
+
+    def __init__(self, estrutura, diretorio):
+        from django.contrib.auth.models import User
+        from django.test import Client
+        from apps.core.models import TipoUsuario
+
+        self.estrutura = estrutura
+        self.diretorio = diretorio
+        usuario, _ = User.objects.get_or_create(username='benchmark', defaults={'email': 'benchmark@exemplo.gov.br'})
+        # Gerente: mesclar_simulacoes exige esse tipo
+        TipoUsuario.objects.update_or_create(usuario=usuario, defaults={'tipo': 'gerente', 'pode_ver_todas': True})
+        # Recarregado para não levar o TipoUsuario anterior em cache na instância
+        self.usuario = User.objects.get(pk=usuario.pk)
+        self.client = Client()
+        self.client.force_login(self.usuario)
+        self.contador = 0
+
+        # organograma.json (e o marcador de atualização) dentro do diretório dos
+        # benchmarks; api_organograma_filter o lê de BASE_DIR/static/data
+        from apps.core import dados_json_update
+        os.makedirs(os.path.join(diretorio, 'static', 'data'), exist_ok=True)
+        dados_json_update.ORGANOGRAMA_JSON_PATH = os.path.join(diretorio, 'static', 'data', 'organograma.json')
+        dados_json_update.MARCADOR_PENDENTE = dados_json_update.ORGANOGRAMA_JSON_PATH + '.pendente'
+
+    def proximo(self):
+        self.contador += 1
+        return self.contador
+
+    def get(self, url, **extra):
+        resposta = self.client.get(url, **extra)
+        if resposta.status_code != 200:
+            raise AssertionError(f"GET {url}: status {resposta.status_code}")
+        return resposta
+
+    def post_json(self, url, dados):
+        resposta = self.client.post(url, json.dumps(dados), content_type='application/json')
+        if resposta.status_code not in (200, 201):
+            raise AssertionError(f"POST {url}: status {resposta.status_code} {resposta.content[:200]!r}")
+        return resposta
+
+
+def limpar_cache(contexto):
+    cache.clear()
+
+
+def limpar_pdfs(contexto):
+    from django.conf import settings
+    shutil.rmtree(settings.RELATORIOS_PDF_DIR, ignore_errors=True)
+
+
+def _preparar_importacao(contexto):
+    contexto.arquivos_importacao = contexto.estrutura.planilhas_importacao()
+
+
+# Só as diferenças são gravadas, em lotes: o orçamento cobre até uma planilha
+# com todas as linhas alteradas (lotes de ~40 linhas no SQLite) e estoura com
+# uma consulta por linha
+@cenario('importacao_planilhas', preparar=_preparar_importacao, repeticoes=1,
+         max_queries=lambda e: e.linhas // 20 + 50)
+def importacao_planilhas(contexto):
+    """processa_planilhas com as planilhas de hierarquia e estrutura viva (CSV)."""
+    from apps.core.utils import processa_planilhas
+    processa_planilhas(*contexto.arquivos_importacao)
+
+
+@cenario('gerar_organograma_json', max_queries=10)
+def gerar_organograma_json(contexto):
+    """Geração do organograma.json a partir de UnidadeCargo e CargoSIORG."""
+    from apps.core.dados_json_update import gerar_organograma_json
+    gerar_organograma_json()
+
+
+def _relatorio(nome, url, max_queries_frio):
+    def requisitar(contexto):
+        contexto.get(url)
+
+    cenario(f'relatorio_{nome}_frio', preparar=limpar_cache, max_queries=max_queries_frio,
+            descricao=f"GET {url} com o cache vazio.")(requisitar)
+    cenario(f'relatorio_{nome}_quente', max_queries=5,
+            descricao=f"GET {url} com a tabela em cache.")(requisitar)
+
+
+# Orçamentos do cálculo frio no formato atual: contagens em RelatorioGratificacoes
+# por unidade (16 queries por unidade nas gratificações, 4 no IDP e no IEE)
+_relatorio('gratificacoes', '/api/relatorio/pontos-gratificacoes/', lambda e: 16 * len(e.unidades) + 20)
+_relatorio('idp', '/api/relatorio/idp/', lambda e: 4 * len(e.unidades) + 20)
+_relatorio('iee', '/api/relatorio/iee/', lambda e: 4 * len(e.unidades) + 20)
+
+
+def _preparar_filtro(contexto):
+    from apps.core import dados_json_update
+
+    if not os.path.exists(dados_json_update.ORGANOGRAMA_JSON_PATH):
+        dados_json_update.gerar_organograma_json()
+
+
+@cenario('organograma_filter', preparar=_preparar_filtro, max_queries=10)
+def organograma_filter(contexto):
+    """api_organograma_filter por sigla de uma secretaria (sobre o organograma.json sintético)."""
+    from django.test import override_settings
+
+    sigla = contexto.estrutura.unidades[min(1, len(contexto.estrutura.unidades) - 1)].sigla
+    with override_settings(BASE_DIR=contexto.diretorio):
+        contexto.get(f'/api/organograma-filter/?sigla={sigla}')
+
+
+def _itens_subarvore(contexto, limite=100):
+    """Linhas de UnidadeCargo de uma subárvore (como as enviadas pela tela de simulação)."""
+    from django.db.models import Q
+    from apps.core.models import UnidadeCargo
+
+    if not hasattr(contexto, 'itens_subarvore'):
+        unidade = contexto.estrutura.subarvore(limite)
+        campos = ['codigo_unidade', 'sigla_unidade', 'denominacao_unidade', 'tipo_unidade', 'nivel_hierarquico',
+                  'tipo_cargo', 'denominacao', 'categoria', 'nivel', 'quantidade', 'grafo']
+        linhas = UnidadeCargo.objects.filter(
+            Q(grafo=unidade.grafo) | Q(grafo__startswith=f"{unidade.grafo}-")
+        ).values(*campos)[:limite]
+        contexto.itens_subarvore = [dict(linha) for linha in linhas]
+    return contexto.itens_subarvore
+
+
+def _preparar_anexo(contexto):
+    from django.core.files import File
+    from apps.core.models import PlanilhaImportada
+    from .dados_sinteticos import criar_template_anexo
+
+    if not PlanilhaImportada.objects.filter(ativo=True).exists():
+        caminho = os.path.join(contexto.diretorio, 'template_anexo.xlsx')
+        criar_template_anexo(caminho)
+        with open(caminho, 'rb') as arquivo:
+            PlanilhaImportada.objects.create(nome='Template benchmark', arquivo=File(arquivo, name='template_anexo.xlsx'), ativo=True)
+    _itens_subarvore(contexto)
+
+
+@cenario('anexo_simulacao', preparar=_preparar_anexo, max_queries=5)
+def anexo_simulacao(contexto):
+    """gerar_anexo_simulacao com a estrutura atual e uma nova (até 100 linhas cada)."""
+    from apps.core.utils import gerar_anexo_simulacao
+
+    atual = contexto.itens_subarvore
+    nova = [dict(item, quantidade=item['quantidade'] + 1) for item in atual]
+    gerar_anexo_simulacao(atual, nova)
+
+
+def _preparar_mesclagem(contexto):
+    from apps.core.models import SimulacaoSalva
+
+    if not getattr(contexto, 'simulacoes_mesclagem', None):
+        # Banco reutilizado: descarta as simulações e mesclagens de execuções anteriores
+        SimulacaoSalva.objects.filter(usuario=contexto.usuario).delete()
+        itens = _itens_subarvore(contexto)
+        contexto.simulacoes_mesclagem = [
+            SimulacaoSalva.objects.create(
+                usuario=contexto.usuario, nome=f'Benchmark base {i}',
+                dados_estrutura=[dict(item, valor_unitario=1.5, pontos=1.5 * item['quantidade']) for item in itens],
+                unidade_base=itens[0]['sigla_unidade'] if itens else '',
+            ).id
+            for i in range(3)
+        ]
+
+
+@cenario('mesclar_simulacoes', preparar=_preparar_mesclagem, max_queries=15)
+def mesclar_simulacoes(contexto):
+    """POST em mesclar_simulacoes somando três simulações salvas."""
+    contexto.post_json('/api/simulacoes/mesclar/', {
+        'simulacoes_ids': contexto.simulacoes_mesclagem,
+        'nome_mesclagem': f'Mesclagem benchmark {contexto.proximo()}',
+        'metodo_mesclagem': 'somar',
+    })
+
+
+def _preparar_pdf(contexto):
+    limpar_pdfs(contexto)
+    # Só a renderização é medida: a tabela do relatório já está em cache
+    contexto.get('/api/relatorio/pontos-gratificacoes/')
+
+
+@cenario('pdf_gratificacoes', preparar=_preparar_pdf, max_queries=10)
+def pdf_gratificacoes(contexto):
+    """Exportação em PDF do relatório de gratificações (sem PDF em cache)."""
+    contexto.get('/api/relatorio/exportar/gratificacoes/')
@@ -0,0 +1,259 @@
+"""
+Gerador de estruturas organizacionais sintéticas para os benchmarks.
+
+A árvore de unidades é montada em largura (cada unidade com `ramificacao`
+subordinadas, até `profundidade` níveis) e recebe cargos até somar o número
+pedido de linhas de UnidadeCargo. Os servidores de RelatorioGratificacoes são
+distribuídos pelas siglas das unidades (diretoria/coordenação), com GSISTE,
+GSISP e níveis NI/NS, para que os relatórios tenham o que agregar.
+
+A geração é determinística (semente fixa): duas execuções com os mesmos
+parâmetros produzem os mesmos dados e podem ser comparadas.
+"""
+
+import io
+import random
+from collections import deque
+
+# Prefixo da sigla e nome do tipo de unidade por nível hierárquico
+TIPOS_POR_NIVEL = [
+    ('MIN', 'Ministério'),
+    ('SEC', 'Secretaria'),
+    ('DIR', 'Diretoria'),
+    ('CG', 'Coordenação-Geral'),
+    ('COORD', 'Coordenação'),
+    ('DIV', 'Divisão'),
+    ('SERV', 'Serviço'),
+]
+
+TIPOS_CARGO = ['CCE', 'FCE']
+GSISTE = ['G.SPO', 'GSISTE.CF', 'G.SISG', 'G.SIPEC', 'GSISP', '', '', '']
+GSISTE_NIVEL = ['NI', 'NS', '']
+CODIGO_INICIAL = 100000
+
+PERFIS = {
+    # nome: (linhas de UnidadeCargo, servidores, profundidade, ramificacao)
+    'pequeno': (1000, 10000, 5, 4),
+    'medio': (10000, 50000, 6, 5),
+    'ministerio': (100000, 200000, 7, 6),
+}
+
+
+class Unidade:
+    __slots__ = ('codigo', 'sigla', 'denominacao', 'tipo', 'grafo', 'nivel', 'pai')
+
+    def __init__(self, codigo, nivel, pai):
+        prefixo, tipo = TIPOS_POR_NIVEL[min(nivel, len(TIPOS_POR_NIVEL) - 1)]
+        self.codigo = str(codigo)
+        self.sigla = f"{prefixo}{codigo - CODIGO_INICIAL}"
+        self.denominacao = f"{tipo} {codigo - CODIGO_INICIAL} - {self.sigla}"
+        self.tipo = tipo
+        self.nivel = nivel
+        self.pai = pai
+        self.grafo = f"{pai.grafo}-{self.codigo}" if pai else self.codigo
+
+
+class EstruturaSintetica:
+    """
+    Árvore de unidades e linhas de cargos geradas a partir dos parâmetros.
+
+        estrutura = EstruturaSintetica(linhas=10000, profundidade=6, ramificacao=5)
+        estrutura.popular(servidores=50000)
+    """
+
+    def __init__(self, linhas=1000, profundidade=5, ramificacao=4, cargos_por_unidade=4, semente=42):
+        self.linhas = linhas
+        self.profundidade = profundidade
+        self.ramificacao = ramificacao
+        self.semente = semente
+        self.unidades = self._gerar_unidades(max(1, linhas // cargos_por_unidade))
+        self.cargos_por_unidade = -(-linhas // len(self.unidades))
+
+    def _gerar_unidades(self, quantidade):
+        raiz = Unidade(CODIGO_INICIAL, 0, None)
+        unidades = [raiz]
+        fila = deque([raiz])
+        proximo = CODIGO_INICIAL + 1
+        while fila and len(unidades) < quantidade:
+            pai = fila.popleft()
+            if pai.nivel + 1 >= self.profundidade:
+                continue
+            for _ in range(self.ramificacao):
+                if len(unidades) >= quantidade:
+                    break
+                filha = Unidade(proximo, pai.nivel + 1, pai)
+                proximo += 1
+                unidades.append(filha)
+                fila.append(filha)
+        return unidades
+
+    def parametros(self):
+        return {
+            'linhas_unidade_cargo': self.linhas,
+            'unidades': len(self.unidades),
+            'profundidade': self.profundidade,
+            'ramificacao': self.ramificacao,
+            'semente': self.semente,
+        }
+
+    def linhas_cargos(self):
+        """Linhas de UnidadeCargo (dicionários com os campos do modelo)."""
+        aleatorio = random.Random(self.semente)
+        total = 0
+        for unidade in self.unidades:
+            # Chave natural única na unidade (restrição unidade_cargo_chave_natural)
+            chaves = set()
+            for _ in range(self.cargos_por_unidade):
+                if total >= self.linhas:
+                    return
+                for _ in range(50):
+                    tipo_cargo = aleatorio.choice(TIPOS_CARGO)
+                    # Cargos mais altos nas unidades mais altas
+                    nivel_cargo = max(1, 17 - 2 * unidade.nivel - aleatorio.randint(0, 3))
+                    categoria = aleatorio.randint(1, 4)
+                    if (tipo_cargo, categoria, nivel_cargo) not in chaves:
+                        break
+                else:
+                    continue
+                chaves.add((tipo_cargo, categoria, nivel_cargo))
+                yield {
+                    'nivel_hierarquico': unidade.nivel,
+                    'tipo_unidade': unidade.tipo,
+                    'denominacao_unidade': unidade.denominacao,
+                    'codigo_unidade': unidade.codigo,
+                    'sigla_unidade': unidade.sigla,
+                    'categoria_unidade': 'Unidade',
+                    'orgao_entidade': 'Ministério Sintético',
+                    'tipo_cargo': tipo_cargo,
+                    'denominacao': f"{unidade.tipo} {tipo_cargo} {nivel_cargo}",
+                    'complemento_denominacao': '',
+                    'categoria': categoria,
+                    'nivel': nivel_cargo,
+                    'quantidade': aleatorio.randint(1, 3),
+                    'grafo': unidade.grafo,
+                    'sigla': unidade.sigla,
+                }
+                total += 1
+
+    def cargos_siorg(self):
+        """Tabela de valores do SIORG para todas as combinações tipo/categoria/nível."""
+        for tipo in TIPOS_CARGO:
+            for categoria in range(1, 5):
+                for nivel in range(1, 18):
+                    yield {
+                        'cargo': f"{tipo} {categoria} {nivel:02d}",
+                        'nivel': f"{categoria} {nivel:02d}",
+                        'quantidade': 0,
+                        'valor': f"{nivel * 0.37:.2f}",
+                        'unitario': round(nivel * 0.37 + categoria * 0.1, 2),
+                    }
+
+    def _cargos_siorg_preenchidos(self, modelo):
+        """CargoSIORG com os campos numéricos preenchidos, como na importação da tabela."""
+        for linha in self.cargos_siorg():
+            cargo = modelo(**linha)
+            cargo.preencher_campos_numericos()
+            yield cargo
+
+    def servidores(self, quantidade):
+        """Linhas de RelatorioGratificacoes distribuídas pelas unidades."""
+        aleatorio = random.Random(self.semente + 1)
+        for i in range(quantidade):
+            unidade = aleatorio.choice(self.unidades)
+            pai = unidade.pai or unidade
+            yield {
+                'nome_servidor': f"Servidor {i}",
+                'matricula_siape': f"{1000000 + i}",
+                'situacao_funcional': 'ATIVO PERMANENTE',
+                'cargo': 'ANALISTA',
+                'gsiste': aleatorio.choice(GSISTE),
+                'gsiste_nivel': aleatorio.choice(GSISTE_NIVEL),
+                'funcao': '',
+                'unidade_exercicio': unidade.denominacao,
+                'uorg_exercicio': unidade.codigo,
+                'coordenacao': unidade.sigla,
+                'diretoria': pai.sigla,
+                'secretaria': f"MPO/{pai.sigla}",
+            }
+
+    def popular(self, servidores=10000, lote=5000):
+        """Grava UnidadeCargo, CargoSIORG e RelatorioGratificacoes (apaga os anteriores)."""
+        from django.db import transaction
+        from apps.core.importacao import adotar_dados_sem_versao
+        from apps.core.models import CargoSIORG, RelatorioGratificacoes, UnidadeCargo, VersaoDataset
+
+        with transaction.atomic():
+            # Todas as versões importadas: os dados gerados viram a versão 1 de
+            # cada conjunto
+            for modelo in (UnidadeCargo, RelatorioGratificacoes):
+                modelo.todas_versoes.all().delete()
+            CargoSIORG.objects.all().delete()
+            VersaoDataset.objects.all().delete()
+            UnidadeCargo.objects.bulk_create((UnidadeCargo(**linha) for linha in self.linhas_cargos()), batch_size=lote)
+            CargoSIORG.objects.bulk_create(self._cargos_siorg_preenchidos(CargoSIORG))
+            RelatorioGratificacoes.objects.bulk_create(
+                (RelatorioGratificacoes(**linha) for linha in self.servidores(servidores)), batch_size=lote
+            )
+            for conjunto in ('unidades', 'servidores'):
+                adotar_dados_sem_versao(conjunto)
+
+    def planilhas_importacao(self):
+        """
+        Planilhas de hierarquia e de estrutura viva em CSV (arquivos em memória
+        com .name), no formato lido por processa_planilhas.
+        """
+        import csv
+
+        hierarquia = io.StringIO()
+        escritor = csv.writer(hierarquia)
+        escritor.writerow(['Código', 'Unidade Organizacional - Sigla'])
+        # processa_planilhas descarta as três linhas de metadados após o cabeçalho
+        for linha in range(3):
+            escritor.writerow([f'metadado {linha}', ''])
+        for unidade in self.unidades:
+            escritor.writerow([unidade.codigo, ' ' * (5 * unidade.nivel) + unidade.sigla])
+
+        estrutura = io.StringIO()
+        colunas = {
+            'Código Unidade': 'codigo_unidade', 'Tipo Unidade': 'tipo_unidade', 'Sigla Unidade': 'sigla_unidade',
+            'Categoria Unidade': 'categoria_unidade', 'Órgão/Entidade': 'orgao_entidade',
+            'Tipo do Cargo': 'tipo_cargo', 'Denominação': 'denominacao', 'Categoria': 'categoria',
+            'Nível': 'nivel', 'Quantidade': 'quantidade', 'Sigla': 'sigla',
+        }
+        escritor = csv.writer(estrutura)
+        escritor.writerow(colunas)
+        for linha in self.linhas_cargos():
+            escritor.writerow([linha[campo] for campo in colunas.values()])
+
+        arquivos = []
+        for nome, conteudo in (('hierarquia.csv', hierarquia), ('estrutura_viva.csv', estrutura)):
+            arquivo = io.BytesIO(conteudo.getvalue().encode('utf-8'))
+            arquivo.name = nome
+            arquivos.append(arquivo)
+        return arquivos
+
+    def subarvore(self, limite):
+        """Unidade intermediária cuja subárvore tem mais linhas, até `limite`."""
+        por_codigo = {unidade.codigo: unidade for unidade in self.unidades}
+        totais = dict.fromkeys(por_codigo, 0)
+        for linha in self.linhas_cargos():
+            unidade = por_codigo[linha['codigo_unidade']]
+            while unidade is not None:
+                totais[unidade.codigo] += 1
+                unidade = unidade.pai
+        melhor, melhor_total = self.unidades[0], 0
+        for unidade in self.unidades[1:]:
+            if melhor_total < totais[unidade.codigo] <= limite:
+                melhor, melhor_total = unidade, totais[unidade.codigo]
+        return melhor
+
+
+def criar_template_anexo(caminho):
+    """Planilha mínima com a aba usada por gerar_anexo_simulacao."""
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'ComparativoEstruturas'
+    sheet['A7'], sheet['F7'] = 'Estrutura Atual', 'Estrutura Nova'
+    workbook.save(caminho)
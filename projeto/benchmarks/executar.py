@@ -0,0 +1,241 @@
+"""
+Executa os benchmarks e grava os resultados em JSON.
+
+    cd projeto
+    python -m benchmarks.executar --perfil pequeno
+    python -m benchmarks.executar --perfil medio --cenarios relatorio_idp_frio relatorio_idp_quente
+    python -m benchmarks.executar --perfil pequeno --comparar benchmarks/resultados/anterior.json
+
+O banco é um SQLite próprio (benchmarks/settings.py), recriado e populado com a
+estrutura sintética a cada execução (--reutilizar-dados pula a geração quando
+os parâmetros são os mesmos da execução anterior). Cada cenário roda
+--repeticoes vezes após um aquecimento; o JSON traz os tempos, as queries e as
+leituras de cache de cada repetição. Com --comparar, os cenários cuja mediana
+piorou mais que --tolerancia são apontados como regressão.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+DIRETORIO = Path(__file__).resolve().parent
+
+
+def configurar_django():
+    sys.path.insert(0, str(DIRETORIO.parent))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+
+
+def argumentos():
+    from .dados_sinteticos import PERFIS
+
+    parser = argparse.ArgumentParser(description='Benchmarks do Nexo com dados sintéticos (SQLite).')
+    parser.add_argument('--perfil', choices=sorted(PERFIS), default='pequeno',
+                        help='Tamanho da estrutura: ' + ', '.join(
+                            f"{nome}={linhas} linhas/{servidores} servidores" for nome, (linhas, servidores, _, _) in PERFIS.items()))
+    parser.add_argument('--linhas', type=int, help='Linhas de UnidadeCargo (sobrescreve o perfil)')
+    parser.add_argument('--servidores', type=int, help='Linhas de RelatorioGratificacoes (sobrescreve o perfil)')
+    parser.add_argument('--profundidade', type=int, help='Níveis da árvore de unidades')
+    parser.add_argument('--ramificacao', type=int, help='Subordinadas por unidade')
+    parser.add_argument('--cenarios', nargs='+', help='Cenários a executar (padrão: todos)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Repetições medidas por cenário')
+    parser.add_argument('--saida', help='Arquivo JSON de resultados (padrão: benchmarks/resultados/<data>_<perfil>.json)')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='Piora relativa da mediana considerada regressão')
+    parser.add_argument('--reutilizar-dados', action='store_true', help='Não regerar o banco se os parâmetros forem os mesmos')
+    parser.add_argument('--listar', action='store_true', help='Lista os cenários e sai')
+    return parser.parse_args()
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def preparar_banco(estrutura, servidores, reutilizar):
+    """Cria o banco (migrate) e grava a estrutura sintética, a menos que possa ser reutilizada."""
+    from django.conf import settings
+    from django.core.management import call_command
+
+    banco = Path(settings.DATABASES['default']['NAME'])
+    marcador = banco.with_suffix('.json')
+    parametros = dict(estrutura.parametros(), servidores=servidores)
+    if reutilizar and banco.exists() and marcador.exists() and json.loads(marcador.read_text()) == parametros:
+        print(f"Reutilizando {banco}")
+        call_command('migrate', verbosity=0)
+        return
+
+    banco.parent.mkdir(parents=True, exist_ok=True)
+    if banco.exists():
+        banco.unlink()
+    inicio = time.perf_counter()
+    call_command('migrate', verbosity=0)
+    estrutura.popular(servidores=servidores)
+    marcador.write_text(json.dumps(parametros))
+    print(f"Banco gerado em {time.perf_counter() - inicio:.1f} s: {parametros}")
+
+
+def medir(cenario, contexto, repeticoes):
+    """Aquece e executa o cenário; retorna o dicionário de resultados."""
+    from apps.core import desempenho
+
+    repeticoes = cenario.repeticoes or repeticoes
+    orcamento = cenario.orcamento_queries(contexto.estrutura)
+    amostras = []
+    # Aquecimento (imports, caches de processo) fora da medição, exceto nos
+    # cenários de execução única, como a importação
+    for indice in range(repeticoes + (0 if cenario.repeticoes == 1 else 1)):
+        if cenario.preparar:
+            cenario.preparar(contexto)
+        metricas, token = desempenho.iniciar_metricas()
+        inicio = time.perf_counter()
+        try:
+            cenario.funcao(contexto)
+        finally:
+            decorrido = (time.perf_counter() - inicio) * 1000
+            desempenho.encerrar_metricas(token)
+        if indice or cenario.repeticoes == 1:
+            amostras.append({
+                'ms': round(decorrido, 2),
+                'queries': metricas.queries,
+                'db_ms': round(metricas.db_ms, 2),
+                'cache_acertos': metricas.cache_acertos,
+                'cache_falhas': metricas.cache_falhas,
+            })
+
+    tempos = sorted(amostra['ms'] for amostra in amostras)
+    queries = max(amostra['queries'] for amostra in amostras)
+    return {
+        'descricao': cenario.descricao,
+        'repeticoes': len(amostras),
+        'min_ms': tempos[0],
+        'mediana_ms': round(statistics.median(tempos), 2),
+        'max_ms': tempos[-1],
+        'queries': queries,
+        'max_queries': orcamento,
+        'dentro_do_orcamento': orcamento is None or queries <= orcamento,
+        'amostras': amostras,
+    }
+
+
+def comparar(resultados, anterior, tolerancia):
+    """Linhas de comparação com a execução anterior e a lista de regressões."""
+    linhas, regressoes = [], []
+    for nome, atual in resultados.items():
+        antes = anterior.get('cenarios', {}).get(nome)
+        if not antes or 'mediana_ms' not in antes or 'mediana_ms' not in atual:
+            continue
+        razao = atual['mediana_ms'] / antes['mediana_ms'] if antes['mediana_ms'] else float('inf')
+        marca = ''
+        if razao > 1 + tolerancia:
+            marca = '  REGRESSÃO'
+            regressoes.append(nome)
+        elif razao < 1 - tolerancia:
+            marca = '  melhora'
+        linhas.append(
+            f"{nome:<32} {antes['mediana_ms']:>10.1f} {atual['mediana_ms']:>10.1f} {razao:>7.2f}x "
+            f"{antes.get('queries', '-'):>8} {atual['queries']:>8}{marca}"
+        )
+    return linhas, regressoes
+
+
+def main():
+    args = argumentos()
+    configurar_django()
+
+    from django.conf import settings
+    from apps.core import desempenho
+    from .cenarios import CENARIOS, Contexto
+    from .dados_sinteticos import PERFIS, EstruturaSintetica
+
+    if args.listar:
+        for nome, cenario in CENARIOS.items():
+            print(f"{nome:<32} {cenario.descricao}")
+        return 0
+
+    nomes = args.cenarios or list(CENARIOS)
+    desconhecidos = [nome for nome in nomes if nome not in CENARIOS]
+    if desconhecidos:
+        print(f"Cenários desconhecidos: {', '.join(desconhecidos)} (use --listar)", file=sys.stderr)
+        return 2
+
+    linhas, servidores, profundidade, ramificacao = PERFIS[args.perfil]
+    estrutura = EstruturaSintetica(
+        linhas=args.linhas or linhas,
+        profundidade=args.profundidade or profundidade,
+        ramificacao=args.ramificacao or ramificacao,
+    )
+    servidores = args.servidores or servidores
+    preparar_banco(estrutura, servidores, args.reutilizar_dados)
+
+    desempenho.instrumentar()
+    contexto = Contexto(estrutura, settings.BENCHMARK_DIR)
+
+    resultados = {}
+    print(f"\n{'cenário':<32} {'mediana ms':>10} {'min ms':>10} {'queries':>8} {'orçamento':>9}")
+    for nome in nomes:
+        try:
+            resultado = medir(CENARIOS[nome], contexto, args.repeticoes)
+        except Exception as e:
+            resultados[nome] = {'erro': f"{type(e).__name__}: {e}"}
+            print(f"{nome:<32} ERRO {type(e).__name__}: {e}")
+            continue
+        resultados[nome] = resultado
+        orcamento = resultado['max_queries'] if resultado['max_queries'] is not None else '-'
+        aviso = '' if resultado['dentro_do_orcamento'] else '  ACIMA DO ORÇAMENTO'
+        print(f"{nome:<32} {resultado['mediana_ms']:>10.1f} {resultado['min_ms']:>10.1f} "
+              f"{resultado['queries']:>8} {orcamento:>9}{aviso}")
+
+    saida = Path(args.saida) if args.saida else (
+        DIRETORIO / 'resultados' / f"{datetime.now():%Y%m%d-%H%M%S}_{args.perfil}.json"
+    )
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps({
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'perfil': args.perfil,
+        'parametros': dict(estrutura.parametros(), servidores=servidores),
+        'ambiente': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'cenarios': resultados,
+    }, ensure_ascii=False, indent=2))
+    print(f"\nResultados em {saida}")
+
+    falhas = [nome for nome, r in resultados.items() if 'erro' in r or not r['dentro_do_orcamento']]
+    regressoes = []
+    if args.comparar:
+        anterior = json.loads(Path(args.comparar).read_text())
+        if anterior.get('parametros') != dict(estrutura.parametros(), servidores=servidores):
+            print("Aviso: a execução anterior usou outros parâmetros de dados.")
+        linhas_comparacao, regressoes = comparar(resultados, anterior, args.tolerancia)
+        print(f"\nComparação com {args.comparar} (commit {anterior.get('commit')}):")
+        print(f"{'cenário':<32} {'antes ms':>10} {'agora ms':>10} {'razão':>8} {'q antes':>8} {'q agora':>8}")
+        for linha in linhas_comparacao:
+            print(linha)
+
+    if falhas:
+        print(f"\nFalharam (erro ou queries acima do orçamento): {', '.join(falhas)}")
+    if regressoes:
+        print(f"Regressões acima de {args.tolerancia:.0%}: {', '.join(regressoes)}")
+    return 1 if falhas or regressoes else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Configurações usadas pelos benchmarks: as do projeto, com banco SQLite e
+arquivos (media, PDFs, organograma.json) num diretório próprio, para que a
+execução nunca toque o banco nem os arquivos de desenvolvimento.
+"""
+
+import os
+import tempfile
+
+from config.settings import *  # noqa: F401,F403
+
+# Diretório de trabalho dos benchmarks (banco, media e arquivos gerados)
+BENCHMARK_DIR = os.environ.get('NEXO_BENCHMARK_DIR', os.path.join(tempfile.gettempdir(), 'nexo_benchmarks'))
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BENCHMARK_DIR, 'benchmark.sqlite3'),
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'nexo-benchmarks',
+    }
+}
+
+MEDIA_ROOT = os.path.join(BENCHMARK_DIR, 'media')
+# Fora de MEDIA_ROOT, como no projeto: os PDFs em cache não são arquivos públicos
+RELATORIOS_PDF_DIR = os.path.join(BENCHMARK_DIR, 'relatorios_pdf')
+
+ALLOWED_HOSTS = ['*']
+DEBUG = False
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Só avisos e erros: as mensagens de INFO das importações distorceriam os tempos
+LOG_NIVEL = 'WARNING'
+LOGGING['loggers']['apps']['level'] = LOG_NIVEL  # noqa: F405
+LOGGING['handlers']['fila']['arquivo'] = None  # noqa: F405
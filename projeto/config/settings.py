@@ -127,16 +127,44 @@ SESSION_COOKIE_HTTPONLY = True
 CSRF_COOKIE_HTTPONLY = True
 
 MIDDLEWARE = [
+    "apps.core.middleware.DesempenhoMiddleware",  # Só ativo com DESEMPENHO_ATIVO=1
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.core.middleware.TipoUsuarioCacheMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
 ]
 
+# Tempo (em segundos) que o tipo de usuário fica em cache em cada processo
+TIPO_USUARIO_CACHE_TTL = int(os.environ.get('TIPO_USUARIO_CACHE_TTL', '30'))
+
+# Tempo (em segundos) que cada processo reaproveita a versão dos dados lida do
+# banco: atraso máximo para um worker perceber a importação feita por outro
+VERSAO_DADOS_TTL = float(os.environ.get('VERSAO_DADOS_TTL', '2'))
+
+# Orçamento (ms) da importação a frio medida por `manage.py medir_inicializacao`
+TEMPO_INICIALIZACAO_MAXIMO_MS = int(os.environ.get('TEMPO_INICIALIZACAO_MAXIMO_MS', '1500'))
+
+# Instrumentação de desempenho por requisição (DesempenhoMiddleware), desligada por padrão.
+# Métricas em DESEMPENHO_LOG (uma linha JSON por requisição, resumidas por
+# `manage.py resumo_desempenho`); perfis de uma amostra das requisições lentas
+# em DESEMPENHO_PERFIS_DIR
+DESEMPENHO_ATIVO = os.environ.get('DESEMPENHO_ATIVO', '0') == '1'
+DESEMPENHO_LOG = os.environ.get('DESEMPENHO_LOG', os.path.join(BASE_DIR, 'logs', 'desempenho.jsonl'))
+DESEMPENHO_QUERY_LENTA_MS = float(os.environ.get('DESEMPENHO_QUERY_LENTA_MS', '100'))
+DESEMPENHO_PERFIL_AMOSTRAGEM = float(os.environ.get('DESEMPENHO_PERFIL_AMOSTRAGEM', '0'))
+DESEMPENHO_PERFIL_LIMITE_MS = float(os.environ.get('DESEMPENHO_PERFIL_LIMITE_MS', '1000'))
+DESEMPENHO_PERFILADOR = os.environ.get('DESEMPENHO_PERFILADOR', 'cprofile')  # ou 'pyinstrument'
+DESEMPENHO_PERFIS_DIR = os.environ.get('DESEMPENHO_PERFIS_DIR', os.path.join(BASE_DIR, 'logs', 'perfis'))
+
+# Long-poll de notificações: espera máxima e intervalo entre verificações (segundos)
+NOTIFICACOES_LONG_POLL_MAX = int(os.environ.get('NOTIFICACOES_LONG_POLL_MAX', '25'))
+NOTIFICACOES_LONG_POLL_INTERVALO = float(os.environ.get('NOTIFICACOES_LONG_POLL_INTERVALO', '1'))
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -174,7 +202,7 @@ else:
     log_once("DEBUG: Usando configurações de DESENVOLVIMENTO")
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.mysql",
+            "ENGINE": os.environ.get("DB_ENGINE", "django.db.backends.mysql"),
             "NAME": os.environ.get("DB_NAME", "nexo_dev"),
             "USER": os.environ.get("DB_USER", "root"),
             "PASSWORD": os.environ.get("DB_PASSWORD", "1802Edu0#*#"),
@@ -183,6 +211,50 @@ else:
         }
     }
 
+# Conexões persistentes: segundos que cada worker reaproveita a conexão entre
+# requisições (0 fecha ao fim de cada uma). Sob ASGI cada requisição roda numa
+# thread diferente e as conexões persistentes se acumulam: o padrão é 0 e o
+# recomendado é o pool (DB_POOL)
+DB_CONN_MAX_AGE = int(os.environ.get(
+    'DB_CONN_MAX_AGE', '0' if os.environ.get('NEXO_MODO_SERVIDOR') == 'asgi' else '60'
+))
+# Pool de conexões do psycopg 3 (só PostgreSQL, requer psycopg-pool); substitui
+# as conexões persistentes
+DB_POOL = os.environ.get('DB_POOL', '0') == '1'
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '2'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '10'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+
+# Réplica de leitura opcional (DB_REPLICA_HOST ou, com SQLite, DB_REPLICA_NAME):
+# as views de relatórios, organograma e siglário leem dela, o resto usa o
+# primário (ver apps/core/roteador_banco.py). Campos não informados vêm do primário
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ.get('DB_REPLICA_NAME', DATABASES["default"]["NAME"]),
+        "USER": os.environ.get('DB_REPLICA_USER', DATABASES["default"]["USER"]),
+        "PASSWORD": os.environ.get('DB_REPLICA_PASSWORD', DATABASES["default"]["PASSWORD"]),
+        "HOST": os.environ.get('DB_REPLICA_HOST', DATABASES["default"]["HOST"]),
+        "PORT": os.environ.get('DB_REPLICA_PORT', DATABASES["default"]["PORT"]),
+        # Nos testes a réplica é o próprio banco de teste
+        "TEST": {"MIRROR": "default"},
+    }
+    log_once("DEBUG: Réplica de leitura configurada")
+
+for _banco in DATABASES.values():
+    if DB_POOL and _banco["ENGINE"] == 'django.db.backends.postgresql':
+        _banco["CONN_MAX_AGE"] = 0
+        _banco["OPTIONS"] = {
+            **_banco.get("OPTIONS", {}),
+            "pool": {"min_size": DB_POOL_MIN, "max_size": DB_POOL_MAX, "timeout": DB_POOL_TIMEOUT},
+        }
+    else:
+        _banco["CONN_MAX_AGE"] = DB_CONN_MAX_AGE
+        # Testa a conexão reaproveitada antes de usá-la (o banco pode tê-la fechado)
+        _banco["CONN_HEALTH_CHECKS"] = DB_CONN_MAX_AGE != 0
+
+DATABASE_ROUTERS = ["apps.core.roteador_banco.RoteadorReplica"]
+
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
     "allauth.account.auth_backends.AuthenticationBackend",
@@ -224,6 +296,22 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache em disco dos relatórios exportados em PDF e renderização em segundo plano:
+# relatórios com mais linhas que o limite são gerados por um worker (pedidos via JSON).
+# O diretório fica fora de MEDIA_ROOT (servido sem autenticação); com
+# RELATORIOS_PDF_X_ACCEL (location interna do nginx) o download é entregue pelo nginx
+RELATORIOS_PDF_DIR = os.environ.get('RELATORIOS_PDF_DIR', os.path.join(BASE_DIR, 'cache', 'relatorios_pdf'))
+RELATORIOS_PDF_X_ACCEL = os.environ.get('RELATORIOS_PDF_X_ACCEL', '')
+RELATORIOS_PDF_IDADE_MAXIMA = int(os.environ.get('RELATORIOS_PDF_IDADE_MAXIMA', str(7 * 24 * 3600)))
+RELATORIOS_PDF_TAMANHO_MAXIMO_MB = int(os.environ.get('RELATORIOS_PDF_TAMANHO_MAXIMO_MB', '500'))
+# Renderização em segundo plano mais longa que isso é considerada abandonada
+RELATORIOS_PDF_TEMPO_MAXIMO = int(os.environ.get('RELATORIOS_PDF_TEMPO_MAXIMO', '900'))
+RELATORIOS_PDF_LIMITE_SINCRONO = int(os.environ.get('RELATORIOS_PDF_LIMITE_SINCRONO', '2000'))
+RELATORIOS_PDF_WORKERS = int(os.environ.get('RELATORIOS_PDF_WORKERS', '1'))
+# Linhas por bloco de tabela nos PDFs (cada bloco repete o cabeçalho); 0 calcula
+# pela altura da página, para que cada bloco ocupe uma página
+RELATORIOS_PDF_LINHAS_POR_TABELA = int(os.environ.get('RELATORIOS_PDF_LINHAS_POR_TABELA', '0'))
+
 # Configurações do allauth
 ACCOUNT_EMAIL_REQUIRED = True
 ACCOUNT_USERNAME_REQUIRED = False
@@ -259,32 +347,44 @@ SOCIALACCOUNT_FORMS = {}
 # Desativar o processo de signup social para evitar o redirecionamento
 SOCIALACCOUNT_AUTO_SIGNUP = True
 
-# Configurações de logging para produção
-if IS_PRODUCTION:
-    LOGGING = {
-        'version': 1,
-        'disable_existing_loggers': False,
-        'formatters': {
-            'verbose': {
-                'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-                'style': '{',
-            },
+# Configurações de logging
+# Loggers por módulo (logging.getLogger(__name__)) sob "apps". A saída passa por
+# uma fila (apps.core.logs.FilaLogHandler): quem loga não espera o I/O. Em
+# produção os erros também vão para logs/django-errors.log.
+LOG_NIVEL = os.environ.get('LOG_NIVEL', 'INFO')
+LOG_FORMATO = os.environ.get('LOG_FORMATO', 'texto')  # 'texto' ou 'json'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'texto': {
+            'format': '{asctime} {levelname} {name} [{process:d}] {message}',
+            'style': '{',
         },
-        'handlers': {
-            'file': {
-                'level': 'ERROR',
-                'class': 'logging.FileHandler',
-                'filename': os.path.join(BASE_DIR, 'logs/django-errors.log'),
-                'formatter': 'verbose',
-            },
+        'json': {
+            '()': 'apps.core.logs.FormatadorJson',
         },
-        'loggers': {
-            'django': {
-                'handlers': ['file'],
-                'level': 'ERROR',
-                'propagate': True,
-            },
+    },
+    'handlers': {
+        'fila': {
+            '()': 'apps.core.logs.FilaLogHandler',
+            'arquivo': os.path.join(BASE_DIR, 'logs/django-errors.log') if IS_PRODUCTION else None,
+            'formatter': LOG_FORMATO,
         },
-    }
+    },
+    'loggers': {
+        'apps': {
+            'handlers': ['fila'],
+            'level': LOG_NIVEL,
+            'propagate': False,
+        },
+        'django': {
+            'handlers': ['fila'],
+            'level': 'ERROR' if IS_PRODUCTION else 'WARNING',
+            'propagate': True,
+        },
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -50,4 +50,7 @@ urlpatterns = [
     path("favicon.ico", favicon_view, name="favicon"),
     # Incluir URLs do app 'core' - DEVE VIR POR ÚLTIMO
     path("", include("apps.core.urls")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) if settings.DEBUG else []
+]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -5,14 +5,83 @@ Configuração do Gunicorn para ambiente de produção do Nexo
 import multiprocessing
 import os
 
-# Arquivo WSGI específico para produção
-wsgi_app = "config.wsgi:application"
-
-# Número de workers: recomendação (2 x número de núcleos) + 1
-workers = multiprocessing.cpu_count() * 2 + 1
-
-# Tipo de worker (usar sync padrão)
-worker_class = "sync"
+# Perfis de worker, escolhidos por NEXO_MODO_SERVIDOR:
+# - sync: um processo atende uma requisição por vez, (2 x núcleos) + 1 workers
+# - gthread: NEXO_THREADS threads por worker, núcleos + 1 workers (menos memória
+#   por requisição simultânea; bom para exportações e PDFs que esperam I/O)
+# - asgi: workers uvicorn (pacote uvicorn-worker); as views async (notificações/
+#   long-poll, organograma, siglário, relatórios em cache) atendem várias
+#   requisições por worker
+PERFIS_WORKER = {
+    "sync": {
+        "wsgi_app": "config.wsgi:application",
+        "worker_class": "sync",
+        "workers_por_cpu": 2,
+    },
+    "gthread": {
+        "wsgi_app": "config.wsgi:application",
+        "worker_class": "gthread",
+        "workers_por_cpu": 1,
+    },
+    "asgi": {
+        "wsgi_app": "config.asgi:application",
+        "worker_class": "uvicorn_worker.UvicornWorker",
+        "workers_por_cpu": 1,
+    },
+}
+
+modo_servidor = os.environ.get("NEXO_MODO_SERVIDOR", "sync")
+if modo_servidor == "wsgi":
+    modo_servidor = "sync"
+if modo_servidor not in PERFIS_WORKER:
+    raise ValueError(f"NEXO_MODO_SERVIDOR inválido: {modo_servidor} (use {', '.join(PERFIS_WORKER)})")
+perfil = PERFIS_WORKER[modo_servidor]
+
+wsgi_app = perfil["wsgi_app"]
+worker_class = perfil["worker_class"]
+threads = int(os.environ.get("NEXO_THREADS", "4")) if modo_servidor == "gthread" else 1
+
+# Memória medida de um worker aquecido (RSS em MB; `manage.py teste_carga`
+# mostra o valor de cada modo) e fração da RAM disponível reservada aos workers
+MEMORIA_POR_WORKER_MB = int(os.environ.get("NEXO_MEMORIA_WORKER_MB", "200"))
+FRACAO_MEMORIA_WORKERS = float(os.environ.get("NEXO_FRACAO_MEMORIA", "0.75"))
+
+
+def memoria_disponivel_mb():
+    """MemAvailable de /proc/meminfo em MB (None fora do Linux)."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for linha in meminfo:
+                if linha.startswith("MemAvailable:"):
+                    return int(linha.split()[1]) // 1024
+    except OSError:
+        pass
+    return None
+
+
+def calcular_workers():
+    """
+    Workers pelo número de núcleos (conforme o perfil), limitados pela memória:
+    não sobe mais workers do que cabem na fração da RAM disponível.
+    NEXO_WORKERS fixa o valor.
+    """
+    if os.environ.get("NEXO_WORKERS"):
+        return int(os.environ["NEXO_WORKERS"])
+    por_cpu = multiprocessing.cpu_count() * perfil["workers_por_cpu"] + 1
+    memoria = memoria_disponivel_mb()
+    if memoria is None:
+        return por_cpu
+    por_memoria = int(memoria * FRACAO_MEMORIA_WORKERS // MEMORIA_POR_WORKER_MB)
+    return max(1, min(por_cpu, por_memoria))
+
+
+workers = calcular_workers()
+
+# Tarefas em segundo plano (atualizador do organograma.json), por NEXO_TAREFAS:
+# - worker: uma thread por worker, iniciada em post_worker_init (depois do fork)
+# - central: nenhuma nos workers; rodar `manage.py executar_tarefas` à parte
+# - desligado: nenhuma
+tarefas_segundo_plano = os.environ.get("NEXO_TAREFAS", "worker")
 
 # Porta e binding
 bind = "127.0.0.1:8000"
@@ -42,9 +111,8 @@ keepalive = 5
 # PID file
 pidfile = "logs/gunicorn.pid"
 
-# Configurações de workers
+# Conexões simultâneas por worker (gthread e workers assíncronos)
 worker_connections = 1000
-max_requests_jitter = 50
 
 # Preload da aplicação (melhora performance)
 preload_app = True
@@ -85,9 +153,23 @@ def post_fork(server, worker):
     """Executado após fazer fork do worker"""
     server.log.info(f"✅ Worker {worker.pid} iniciado")
 
+def post_worker_init(worker):
+    """
+    Executado no worker depois de carregar a aplicação (com ou sem preload_app).
+    Threads iniciadas no master não sobrevivem ao fork, então as tarefas em
+    segundo plano começam aqui, uma vez por worker.
+    """
+    if tarefas_segundo_plano == "worker":
+        from apps.core.dados_json_update import iniciar_atualizador
+        iniciar_atualizador()
+
 def when_ready(server):
     """Executado quando o servidor está pronto"""
     server.log.info("✅ Nexo está pronto para receber conexões!")
+    server.log.info(
+        f"Perfil {modo_servidor}: {worker_class}, {server.cfg.workers} workers x {server.cfg.threads} threads, "
+        f"tarefas em segundo plano: {tarefas_segundo_plano}"
+    )
 
 def worker_abort(worker):
     """Executado quando um worker é abortado"""
@@ -97,8 +179,7 @@ def worker_abort(worker):
 environment = os.environ.get("DJANGO_ENVIRONMENT", "development")
 
 if environment == "production":
-    # Configurações de produção
-    workers = multiprocessing.cpu_count() * 2 + 1
+    # Configurações de produção (workers calculados pelo perfil acima)
     timeout = 120
     keepalive = 5
     max_requests = 1000
@@ -107,10 +188,10 @@ if environment == "production":
     loglevel = "info"
 else:
     # Configurações de desenvolvimento
-    workers = 2
+    workers = int(os.environ.get("NEXO_WORKERS", "2"))
     timeout = 60
     keepalive = 2
     max_requests = 0  # Sem limite para desenvolvimento
     preload_app = False
     reload = True
-    loglevel = "debug" 
\ No newline at end of file
+    loglevel = "debug" 
@@ -9,23 +9,55 @@ Características:
 - Logs detalhados
 - Verificação de integridade
 - Rotação de backups
+
+Cada fonte é lida uma única vez: o fluxo (dump do banco ou tar) é cortado em
+blocos que são comprimidos, criptografados e gravados em paralelo em todos os
+destinos (local, externo e nuvem), e os backups independentes rodam ao mesmo
+tempo. Blocos repetidos entre backups (arquivos de media que não mudaram, o
+banco SQLite de um dia para o outro) são gravados uma única vez. Detalhes do
+formato em backup_store.py.
+
+Os dados de usuário (media, staticfiles) são incrementais: um manifesto
+(caminho -> tamanho, mtime, SHA-256, backup que contém o arquivo) acompanha
+cada backup, e só os arquivos novos ou alterados desde o anterior entram no
+tar. A cada USERDATA_FULL_EVERY incrementais é feita uma nova base completa.
+
+Restauração e verificação (backup_restore.py):
+- --restore RECEITA DESTINO: banco (arquivo SQLite ou banco PostgreSQL, com
+  pg_restore -j) ou arquivos (base + incrementais da cadeia); com --files,
+  só os arquivos que casam com os padrões, lendo apenas os blocos deles;
+- --verify: confere as cadeias sem extrair; com --deep, todos os blocos em
+  processos paralelos.
 """
 
 import os
 import sys
 import time
-import shutil
 import hashlib
 import logging
 import subprocess
 import datetime
-import gzip
 import tarfile
+import json
 from pathlib import Path
 import traceback
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    from backup_store import (
+        BackupRepository, BackupStoreError, ChunkStore, HashingReader, RECIPE_SUFFIX, load_recipe,
+        read_attachment, resolve_chain, store_lock,
+    )
+    from backup_restore import extract_backup, restore_database, restore_files, verify_backups
+except ImportError:  # importado como scripts.backup
+    from .backup_store import (
+        BackupRepository, BackupStoreError, ChunkStore, HashingReader, RECIPE_SUFFIX, load_recipe,
+        read_attachment, resolve_chain, store_lock,
+    )
+    from .backup_restore import extract_backup, restore_database, restore_files, verify_backups
+
 # Configuração do logger
 logging.basicConfig(
     level=logging.INFO,
@@ -50,10 +82,19 @@ BACKUP_CLOUD_DIR = os.environ.get('BACKUP_CLOUD_DIR', '/mnt/cloud_backup')
 MAX_LOCAL_BACKUPS = int(os.environ.get('MAX_LOCAL_BACKUPS', 7))  # 7 dias
 MAX_EXTERNAL_BACKUPS = int(os.environ.get('MAX_EXTERNAL_BACKUPS', 30))  # 30 dias
 MAX_CLOUD_BACKUPS = int(os.environ.get('MAX_CLOUD_BACKUPS', 60))  # 60 dias
+BACKUP_JOBS = int(os.environ.get('BACKUP_JOBS', 3))  # Backups (banco, configuração, dados) executados ao mesmo tempo
+BACKUP_THREADS = int(os.environ.get('BACKUP_THREADS', 0)) or None  # Threads de compressão/gravação (padrão: núcleos)
+READ_BLOCK = 1024 * 1024
+USERDATA_DIRS = ['media', 'staticfiles']  # Uploads de usuário e arquivos estáticos gerados
+USERDATA_FULL_EVERY = int(os.environ.get('USERDATA_FULL_EVERY', 7))  # Incrementais entre duas bases completas
+RESTORE_JOBS = int(os.environ.get('RESTORE_JOBS', 0)) or None  # Processos do pg_restore e backups aplicados ao mesmo tempo (padrão: núcleos)
+VERIFY_WORKERS = int(os.environ.get('VERIFY_WORKERS', 0)) or None  # Processos da verificação com --deep (padrão: núcleos)
+RESTORE_TMP_DIR = os.environ.get('RESTORE_TMP_DIR') or None  # Onde o dump do PostgreSQL é reconstruído para o pg_restore
 
 # Configurações de criptografia
 ENCRYPTION_KEY = os.environ.get('BACKUP_ENCRYPTION_KEY')
 ENCRYPTION_ENABLED = ENCRYPTION_KEY is not None and ENCRYPTION_KEY != ''
+BACKUP_PASSPHRASE = ENCRYPTION_KEY if ENCRYPTION_ENABLED else None
 
 # Configurações do banco de dados
 DB_TYPE = os.environ.get('DB_ENGINE', 'django.db.backends.sqlite3')
@@ -69,67 +110,76 @@ def ensure_dir(directory):
     logger.info(f"Diretório garantido: {directory}")
 
 def get_timestamp():
-    """Retorna um timestamp formatado para uso em nomes de arquivo."""
-    return datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    """
+    Retorna um timestamp formatado para uso em nomes de arquivo. Inclui os
+    microssegundos: dois backups no mesmo segundo não podem ter o mesmo nome
+    (o incremental apontaria para si mesmo como anterior).
+    """
+    return datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
 
-def calculate_checksum(filename):
-    """Calcula o hash SHA-256 de um arquivo."""
-    sha256_hash = hashlib.sha256()
-    with open(filename, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+def open_repository():
+    """Repositório com o destino local e os destinos externo/nuvem disponíveis."""
+    directories = [BACKUP_DIR]
+    for directory, description in ((BACKUP_EXTERNAL_DIR, 'externo'), (BACKUP_CLOUD_DIR, 'de nuvem')):
+        if os.path.exists(directory):
+            directories.append(directory)
+        else:
+            logger.warning(f"Diretório {description} não encontrado: {directory}. Pulando esse destino.")
+    if not ENCRYPTION_ENABLED:
+        logger.warning("Criptografia não configurada (BACKUP_ENCRYPTION_KEY). Backups sem criptografia.")
+    return BackupRepository(directories, passphrase=BACKUP_PASSPHRASE, threads=BACKUP_THREADS)
 
-def backup_database():
+def copy_stream(source, writer):
+    """Copia um arquivo/pipe para o destino do backup em blocos de READ_BLOCK."""
+    for block in iter(lambda: source.read(READ_BLOCK), b''):
+        writer.write(block)
+
+def backup_database(repository):
     """Realiza o backup do banco de dados."""
-    timestamp = get_timestamp()
-    backup_filename = f"database_{timestamp}.sql.gz"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
+    writer = repository.writer(f"database_{get_timestamp()}", job='database', engine=DB_TYPE)
     
-    logger.info(f"Iniciando backup do banco de dados para {backup_path}")
+    logger.info(f"Iniciando backup do banco de dados ({writer.name})")
     
     try:
         if 'sqlite3' in DB_TYPE:
-            # Para SQLite, fazemos uma cópia direta
+            # Para SQLite, o arquivo do banco é o próprio dump
             db_path = os.path.join(BASE_DIR, DB_NAME)
             with open(db_path, 'rb') as f_in:
-                with gzip.open(backup_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            logger.info(f"Backup do SQLite concluído: {backup_path}")
+                copy_stream(f_in, writer)
+            logger.info(f"Backup do SQLite lido: {db_path}")
         
         elif 'postgresql' in DB_TYPE:
-            # Para PostgreSQL, usamos pg_dump
+            # Para PostgreSQL, pg_dump no formato custom para a saída padrão,
+            # sem compressão própria (os blocos são comprimidos depois e o dump
+            # sem compressão deduplica melhor de um dia para o outro)
             cmd = [
                 'pg_dump',
                 '-h', DB_HOST,
                 '-p', DB_PORT,
                 '-U', DB_USER,
                 '-d', DB_NAME,
-                '--format=c',  # Custom format (comprimido)
-                '-f', backup_path
+                '--format=c',
+                '--compress=0',
             ]
             env = os.environ.copy()
             env['PGPASSWORD'] = DB_PASSWORD
             
-            process = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            process = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            copy_stream(process.stdout, writer)
+            stderr = process.stderr.read().decode(errors='replace')
             
-            if process.returncode != 0:
-                logger.error(f"Erro no pg_dump: {process.stderr}")
-                raise Exception(f"Falha no backup do PostgreSQL: {process.stderr}")
+            if process.wait() != 0:
+                logger.error(f"Erro no pg_dump: {stderr}")
+                raise Exception(f"Falha no backup do PostgreSQL: {stderr}")
             
-            logger.info(f"Backup do PostgreSQL concluído: {backup_path}")
+            logger.info("Dump do PostgreSQL concluído")
         
         else:
             logger.error(f"Tipo de banco de dados não suportado: {DB_TYPE}")
             raise Exception(f"Tipo de banco de dados não suportado: {DB_TYPE}")
         
-        # Verificação de integridade
-        checksum = calculate_checksum(backup_path)
-        checksum_file = f"{backup_path}.sha256"
-        with open(checksum_file, 'w') as f:
-            f.write(checksum)
-        
-        logger.info(f"Verificação de integridade concluída: {checksum}")
+        backup_path = writer.close()
+        logger.info(f"Backup do banco de dados concluído: {backup_path}")
         return backup_path
         
     except Exception as e:
@@ -137,13 +187,11 @@ def backup_database():
         logger.error(traceback.format_exc())
         raise
 
-def backup_config_files():
+def backup_config_files(repository):
     """Realiza o backup dos arquivos de configuração."""
-    timestamp = get_timestamp()
-    backup_filename = f"config_{timestamp}.tar.gz"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
+    writer = repository.writer(f"config_{get_timestamp()}", job='config', content='tar')
     
-    logger.info(f"Iniciando backup dos arquivos de configuração para {backup_path}")
+    logger.info(f"Iniciando backup dos arquivos de configuração ({writer.name})")
     
     try:
         # Arquivos a serem incluídos no backup
@@ -155,7 +203,7 @@ def backup_config_files():
             'gunicorn_config.py'
         ]
         
-        with tarfile.open(backup_path, 'w:gz') as tar:
+        with tarfile.open(fileobj=writer, mode='w|') as tar:
             for file in files_to_backup:
                 file_path = os.path.join(BASE_DIR, file)
                 if os.path.exists(file_path):
@@ -164,12 +212,7 @@ def backup_config_files():
                 else:
                     logger.warning(f"Arquivo não encontrado: {file_path}")
         
-        # Verificação de integridade
-        checksum = calculate_checksum(backup_path)
-        checksum_file = f"{backup_path}.sha256"
-        with open(checksum_file, 'w') as f:
-            f.write(checksum)
-        
+        backup_path = writer.close()
         logger.info(f"Backup de configuração concluído: {backup_path}")
         return backup_path
         
@@ -178,37 +221,131 @@ def backup_config_files():
         logger.error(traceback.format_exc())
         raise
 
-def backup_user_data():
-    """Realiza o backup de dados de usuário e uploads."""
-    timestamp = get_timestamp()
-    backup_filename = f"userdata_{timestamp}.tar.gz"
-    backup_path = os.path.join(BACKUP_DIR, backup_filename)
-    
-    logger.info(f"Iniciando backup de dados de usuário para {backup_path}")
-    
+def file_sha256(file_path):
+    """SHA-256 de um arquivo."""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK), b''):
+            sha256_hash.update(block)
+    return sha256_hash.hexdigest()
+
+def scan_user_data():
+    """Arquivos regulares dos diretórios de dados de usuário ({nome no tar: (caminho, stat)})."""
+    files = {}
+    for dir_name in USERDATA_DIRS:
+        dir_path = os.path.join(BASE_DIR, dir_name)
+        if not os.path.isdir(dir_path):
+            logger.warning(f"Diretório não encontrado: {dir_path}")
+            continue
+        stack = [(dir_path, dir_name)]
+        while stack:
+            current, arc_prefix = stack.pop()
+            try:
+                entries = list(os.scandir(current))
+            except OSError as e:
+                logger.warning(f"Não foi possível ler {current}: {str(e)}")
+                continue
+            for entry in entries:
+                arcname = f"{arc_prefix}/{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, arcname))
+                elif entry.is_file(follow_symlinks=False):
+                    files[arcname] = (entry.path, entry.stat(follow_symlinks=False))
+    # Ordem estável: arquivos que não mudaram geram os mesmos blocos
+    return dict(sorted(files.items()))
+
+def previous_user_data(repository):
+    """
+    Última receita de dados de usuário e o seu manifesto, se o próximo backup
+    puder ser um incremental dela; (None, None) quando é hora de uma nova base.
+    """
+    recipes = repository.stores[0].recipes('userdata_')
+    if not recipes:
+        return None, None
+    latest = recipes[-1]
     try:
-        # Diretórios a serem incluídos no backup
-        dirs_to_backup = [
-            'media',      # Uploads de usuário
-            'staticfiles',  # Arquivos estáticos gerados
-        ]
+        chain = resolve_chain(latest)
+        if len(chain) > USERDATA_FULL_EVERY:
+            logger.info(f"{len(chain) - 1} incrementais desde a última base: gerando nova base completa")
+            return None, None
+        # Cada destino precisa da cadeia inteira para restaurar o incremental
+        names = [os.path.basename(path) for path in chain]
+        for store in repository.stores[1:]:
+            missing = [name for name in names if not os.path.exists(os.path.join(store.directory, name))]
+            if missing:
+                logger.warning(f"Destino {store.directory} sem a cadeia de backups ({missing[0]}): gerando nova base completa")
+                return None, None
+        manifest = read_attachment(repository, latest, 'manifest')
+        if manifest is None:
+            return None, None
+        return load_recipe(latest), json.loads(manifest)
+    except (BackupStoreError, OSError, ValueError) as e:
+        logger.warning(f"Backup anterior de dados de usuário inutilizável ({latest}): {str(e)}. Gerando nova base completa")
+        return None, None
+
+def backup_user_data(repository, force_base=False):
+    """
+    Realiza o backup de dados de usuário e uploads. Só os arquivos novos ou
+    alterados desde o backup anterior entram no tar; o manifesto registra em
+    que backup da cadeia está cada arquivo e a posição dele no tar
+    (restauração seletiva sem ler o tar inteiro).
+    """
+    previous, previous_manifest = (None, None) if force_base else previous_user_data(repository)
+    name = f"userdata_{get_timestamp()}"
+    if previous is None:
+        writer = repository.writer(name, job='userdata', content='tar', kind='full', base=name)
+    else:
+        writer = repository.writer(
+            name, job='userdata', content='tar', kind='incremental', base=previous['base'],
+            parent=previous['name'], parent_sha256=previous['sha256'],
+        )
         
-        with tarfile.open(backup_path, 'w:gz') as tar:
-            for dir_name in dirs_to_backup:
-                dir_path = os.path.join(BASE_DIR, dir_name)
-                if os.path.exists(dir_path) and os.path.isdir(dir_path):
-                    tar.add(dir_path, arcname=dir_name)
-                    logger.info(f"Adicionado ao backup: {dir_name}")
-                else:
-                    logger.warning(f"Diretório não encontrado: {dir_path}")
+    logger.info(f"Iniciando backup {writer.metadata['kind']} de dados de usuário ({writer.name})")
+    
+    try:
+        previous_manifest = previous_manifest or {}
+        manifest = {}
+        changed = []
+        for arcname, (file_path, stat) in scan_user_data().items():
+            entry = previous_manifest.get(arcname)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                manifest[arcname] = entry
+                continue
+            if entry and entry[0] == stat.st_size:
+                # Só o mtime mudou (collectstatic, cópia): confere o conteúdo
+                try:
+                    digest = file_sha256(file_path)
+                except OSError:
+                    digest = None
+                if digest == entry[2]:
+                    manifest[arcname] = [entry[0], stat.st_mtime_ns, digest] + entry[3:]
+                    continue
+            changed.append((arcname, file_path))
         
-        # Verificação de integridade
-        checksum = calculate_checksum(backup_path)
-        checksum_file = f"{backup_path}.sha256"
-        with open(checksum_file, 'w') as f:
-            f.write(checksum)
+        archived = 0
+        with tarfile.open(fileobj=writer, mode='w|') as tar:
+            for arcname, file_path in changed:
+                try:
+                    with open(file_path, 'rb') as f:
+                        tarinfo = tar.gettarinfo(arcname=arcname, fileobj=f)
+                        source = HashingReader(f)
+                        offset = tar.offset
+                        tar.addfile(tarinfo, source)
+                        manifest[arcname] = [
+                            tarinfo.size, os.fstat(f.fileno()).st_mtime_ns, source.sha256.hexdigest(), name, offset,
+                        ]
+                    archived += 1
+                except FileNotFoundError:
+                    logger.warning(f"Arquivo removido durante o backup: {file_path}")
         
-        logger.info(f"Backup de dados de usuário concluído: {backup_path}")
+        deleted = len(set(previous_manifest) - set(manifest))
+        writer.metadata.update(files=len(manifest), archived=archived, deleted=deleted)
+        writer.attach('manifest', json.dumps(manifest, sort_keys=True).encode())
+        backup_path = writer.close()
+        logger.info(
+            f"Backup de dados de usuário concluído: {backup_path} ({archived} arquivos novos ou "
+            f"alterados, {deleted} removidos, {len(manifest)} no total)"
+        )
         return backup_path
         
     except Exception as e:
@@ -216,92 +353,33 @@ def backup_user_data():
         logger.error(traceback.format_exc())
         raise
 
-def encrypt_file(file_path):
-    """Criptografa um arquivo usando GPG."""
-    if not ENCRYPTION_ENABLED:
-        logger.warning("Criptografia não configurada. Pulando etapa de criptografia.")
-        return file_path
-    
-    logger.info(f"Iniciando criptografia de {file_path}")
-    
-    try:
-        output_path = f"{file_path}.gpg"
-        cmd = [
-            'gpg',
-            '--batch',
-            '--yes',
-            '--cipher-algo', 'AES256',
-            '--symmetric',
-            '--passphrase', ENCRYPTION_KEY,
-            '--output', output_path,
-            file_path
-        ]
-        
-        process = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if process.returncode != 0:
-            logger.error(f"Erro na criptografia: {process.stderr}")
-            raise Exception(f"Falha na criptografia: {process.stderr}")
-        
-        # Após a criptografia bem-sucedida, podemos remover o arquivo original
-        os.remove(file_path)
-        os.remove(f"{file_path}.sha256")  # Também remove o arquivo de checksum
-        
-        logger.info(f"Criptografia concluída: {output_path}")
-        return output_path
-        
-    except Exception as e:
-        logger.error(f"Erro na criptografia do arquivo: {str(e)}")
-        logger.error(traceback.format_exc())
-        raise
+def verification_targets(recipe_paths, all_backups=False):
+    """Receitas a verificar: as indicadas, todas do diretório local ou a mais recente de cada tipo."""
+    if recipe_paths:
+        return recipe_paths
+    store = ChunkStore(BACKUP_DIR)
+    if all_backups:
+        return store.recipes()
+    return [recipes[-1] for recipes in (store.recipes(prefix) for prefix in ('database_', 'config_', 'userdata_')) if recipes]
 
-def copy_to_external(file_path):
-    """Copia o backup para armazenamento externo."""
-    if not os.path.exists(BACKUP_EXTERNAL_DIR):
-        logger.warning(f"Diretório externo não encontrado: {BACKUP_EXTERNAL_DIR}. Pulando backup externo.")
-        return
-    
-    filename = os.path.basename(file_path)
-    dest_path = os.path.join(BACKUP_EXTERNAL_DIR, filename)
-    
-    logger.info(f"Copiando backup para armazenamento externo: {dest_path}")
-    
-    try:
-        shutil.copy2(file_path, dest_path)
-        
-        # Se há arquivo de checksum, copie também
-        checksum_file = f"{file_path}.sha256"
-        if os.path.exists(checksum_file):
-            shutil.copy2(checksum_file, f"{dest_path}.sha256")
-        
-        logger.info(f"Backup externo concluído: {dest_path}")
-    except Exception as e:
-        logger.error(f"Erro ao copiar para armazenamento externo: {str(e)}")
-        logger.error(traceback.format_exc())
+def restore_backup(recipe_path, destination, patterns=None):
+    """Restaura um backup de banco de dados ou de arquivos em `destination`."""
+    if load_recipe(recipe_path).get('content') == 'tar':
+        return restore_files(recipe_path, destination, BACKUP_PASSPHRASE, patterns, RESTORE_JOBS)
+    if patterns:
+        raise Exception("--files só se aplica a backups de arquivos")
+    connection = {'host': DB_HOST, 'port': DB_PORT, 'user': DB_USER, 'password': DB_PASSWORD}
+    return restore_database(recipe_path, destination, BACKUP_PASSPHRASE, connection, RESTORE_JOBS, RESTORE_TMP_DIR)
 
-def copy_to_cloud(file_path):
-    """Copia o backup para armazenamento na nuvem."""
-    if not os.path.exists(BACKUP_CLOUD_DIR):
-        logger.warning(f"Diretório de nuvem não encontrado: {BACKUP_CLOUD_DIR}. Pulando backup na nuvem.")
-        return
-    
-    filename = os.path.basename(file_path)
-    dest_path = os.path.join(BACKUP_CLOUD_DIR, filename)
-    
-    logger.info(f"Copiando backup para armazenamento na nuvem: {dest_path}")
-    
+def chain_start(directory, file_name):
+    """Receita base da cadeia de um backup (ele mesmo para bases e formatos antigos)."""
+    if not file_name.endswith(RECIPE_SUFFIX):
+        return file_name
     try:
-        shutil.copy2(file_path, dest_path)
-        
-        # Se há arquivo de checksum, copie também
-        checksum_file = f"{file_path}.sha256"
-        if os.path.exists(checksum_file):
-            shutil.copy2(checksum_file, f"{dest_path}.sha256")
-        
-        logger.info(f"Backup na nuvem concluído: {dest_path}")
-    except Exception as e:
-        logger.error(f"Erro ao copiar para armazenamento na nuvem: {str(e)}")
-        logger.error(traceback.format_exc())
+        recipe = load_recipe(os.path.join(directory, file_name))
+    except (BackupStoreError, OSError, ValueError):
+        return file_name
+    return recipe.get('base', recipe['name']) + RECIPE_SUFFIX
 
 def rotate_backups(directory, max_backups, file_prefix):
     """Remove backups antigos de acordo com a política de retenção."""
@@ -313,15 +391,22 @@ def rotate_backups(directory, max_backups, file_prefix):
     
     try:
         # Lista todos os arquivos de backup com o prefixo especificado
+        # (receitas e arquivos .gz/.gpg do formato anterior)
         files = [f for f in os.listdir(directory) 
-                if f.startswith(file_prefix) and (f.endswith('.gz') or f.endswith('.gpg'))]
+                if f.startswith(file_prefix) and (f.endswith(RECIPE_SUFFIX) or f.endswith('.gz') or f.endswith('.gpg'))]
         
         # Ordena por data (mais antigos primeiro)
-        files.sort()
+        files.sort(key=lambda f: f[len(file_prefix):])
         
-        # Remove os backups excedentes
-        if len(files) > max_backups:
-            for old_file in files[:-max_backups]:
+        # Remove os backups excedentes, mantendo a base e os incrementais
+        # anteriores de que os backups restantes dependem
+        keep_from = max(len(files) - max_backups, 0)
+        if keep_from:
+            base = chain_start(directory, files[keep_from])
+            if base in files and files.index(base) < keep_from:
+                keep_from = files.index(base)
+        if keep_from:
+            for old_file in files[:keep_from]:
                 old_path = os.path.join(directory, old_file)
                 os.remove(old_path)
                 logger.info(f"Backup antigo removido: {old_path}")
@@ -336,6 +421,17 @@ def rotate_backups(directory, max_backups, file_prefix):
         logger.error(f"Erro durante a rotação de backups: {str(e)}")
         logger.error(traceback.format_exc())
 
+def collect_garbage(directory):
+    """Remove os blocos que nenhum backup restante do destino usa."""
+    if not os.path.exists(directory):
+        return
+    try:
+        removed = ChunkStore(directory).collect_garbage()
+        logger.info(f"{removed} blocos sem uso removidos de {directory}")
+    except Exception as e:
+        logger.error(f"Erro ao remover blocos sem uso em {directory}: {str(e)}")
+        logger.error(traceback.format_exc())
+
 def main():
     """Função principal que executa o backup completo."""
     parser = argparse.ArgumentParser(description='Backup do sistema Nexo')
@@ -343,8 +439,47 @@ def main():
     parser.add_argument('--db', action='store_true', help='Executa apenas o backup do banco de dados')
     parser.add_argument('--config', action='store_true', help='Executa apenas o backup de configurações')
     parser.add_argument('--userdata', action='store_true', help='Executa apenas o backup de dados de usuário')
+    parser.add_argument('--base', action='store_true',
+                        help='Força um backup completo dos dados de usuário (nova base da cadeia de incrementais)')
+    parser.add_argument('--extract', nargs=2, metavar=('RECEITA', 'SAIDA'),
+                        help='Reconstrói o dump/tar de um backup (arquivo .backup.json) em SAIDA')
+    parser.add_argument('--restore', nargs=2, metavar=('RECEITA', 'DESTINO'),
+                        help='Restaura um backup: banco (arquivo SQLite ou nome do banco PostgreSQL) '
+                             'ou arquivos em DESTINO (base + incrementais da cadeia)')
+    parser.add_argument('--files', action='append', metavar='PADRAO',
+                        help='Com --restore: só os arquivos que casam com o padrão glob ou diretório '
+                             '(ex.: "media/decretos/*.pdf"); pode ser repetido ou separado por vírgulas')
+    parser.add_argument('--verify', nargs='*', metavar='RECEITA',
+                        help='Confere a cadeia dos backups (padrão: o mais recente de cada tipo) sem extraí-los')
+    parser.add_argument('--all', action='store_true', help='Com --verify: todos os backups do diretório local')
+    parser.add_argument('--deep', action='store_true',
+                        help='Com --verify: descomprime e confere todos os blocos, em processos paralelos')
     args = parser.parse_args()
     
+    if args.verify is not None:
+        targets = verification_targets(args.verify, args.all)
+        if not targets:
+            logger.error(f"Nenhum backup encontrado em {BACKUP_DIR}")
+            return 1
+        return 0 if verify_backups(targets, BACKUP_PASSPHRASE, args.deep, VERIFY_WORKERS) else 1
+    
+    if args.restore:
+        patterns = [pattern for value in args.files or [] for pattern in value.split(',') if pattern]
+        try:
+            restore_backup(*args.restore, patterns=patterns)
+            return 0
+        except Exception as e:
+            logger.error(f"Erro ao restaurar backup: {str(e)}")
+            return 1
+    
+    if args.extract:
+        try:
+            extract_backup(*args.extract, passphrase=BACKUP_PASSPHRASE)
+            return 0
+        except Exception as e:
+            logger.error(f"Erro ao extrair backup: {str(e)}")
+            return 1
+    
     # Se nenhuma opção for especificada, assume backup completo
     do_full = args.full or not (args.db or args.config or args.userdata)
     
@@ -354,36 +489,45 @@ def main():
     # Garantir que diretórios existam
     ensure_dir(BACKUP_DIR)
     
+    jobs = []
+    if do_full or args.db:
+        jobs.append(('database_', backup_database))
+    if do_full or args.config:
+        jobs.append(('config_', backup_config_files))
+    if do_full or args.userdata:
+        jobs.append(('userdata_', lambda repository: backup_user_data(repository, force_base=args.base)))
+    
     try:
-        # Backup do banco de dados
-        if do_full or args.db:
-            db_backup = backup_database()
-            db_backup_enc = encrypt_file(db_backup) if ENCRYPTION_ENABLED else db_backup
-            copy_to_external(db_backup_enc)
-            copy_to_cloud(db_backup_enc)
-            rotate_backups(BACKUP_DIR, MAX_LOCAL_BACKUPS, 'database_')
-            rotate_backups(BACKUP_EXTERNAL_DIR, MAX_EXTERNAL_BACKUPS, 'database_')
-            rotate_backups(BACKUP_CLOUD_DIR, MAX_CLOUD_BACKUPS, 'database_')
-        
-        # Backup de configurações
-        if do_full or args.config:
-            config_backup = backup_config_files()
-            config_backup_enc = encrypt_file(config_backup) if ENCRYPTION_ENABLED else config_backup
-            copy_to_external(config_backup_enc)
-            copy_to_cloud(config_backup_enc)
-            rotate_backups(BACKUP_DIR, MAX_LOCAL_BACKUPS, 'config_')
-            rotate_backups(BACKUP_EXTERNAL_DIR, MAX_EXTERNAL_BACKUPS, 'config_')
-            rotate_backups(BACKUP_CLOUD_DIR, MAX_CLOUD_BACKUPS, 'config_')
+        repository = open_repository()
+        try:
+            # Uma execução por vez em cada destino, do primeiro bloco gravado à
+            # coleta de lixo: a coleta de outra execução removeria os blocos deste
+            # backup antes de a receita ser gravada
+            with store_lock([store.directory for store in repository.stores]):
+                # Backups independentes ao mesmo tempo; a compressão e a gravação
+                # dos blocos usam o pool de threads do repositório
+                with ThreadPoolExecutor(max_workers=BACKUP_JOBS) as executor:
+                    futures = [(prefix, executor.submit(job, repository)) for prefix, job in jobs]
+                failures = []
+                for prefix, future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failures.append(f"{prefix.rstrip('_')}: {e}")
+                
+                # Rotação só depois de todos os backups: os blocos sem uso são
+                # removidos conforme as receitas que restaram em cada destino
+                for prefix, _ in jobs:
+                    rotate_backups(BACKUP_DIR, MAX_LOCAL_BACKUPS, prefix)
+                    rotate_backups(BACKUP_EXTERNAL_DIR, MAX_EXTERNAL_BACKUPS, prefix)
+                    rotate_backups(BACKUP_CLOUD_DIR, MAX_CLOUD_BACKUPS, prefix)
+                for directory in (BACKUP_DIR, BACKUP_EXTERNAL_DIR, BACKUP_CLOUD_DIR):
+                    collect_garbage(directory)
+        finally:
+            repository.close()
         
-        # Backup de dados de usuário
-        if do_full or args.userdata:
-            userdata_backup = backup_user_data()
-            userdata_backup_enc = encrypt_file(userdata_backup) if ENCRYPTION_ENABLED else userdata_backup
-            copy_to_external(userdata_backup_enc)
-            copy_to_cloud(userdata_backup_enc)
-            rotate_backups(BACKUP_DIR, MAX_LOCAL_BACKUPS, 'userdata_')
-            rotate_backups(BACKUP_EXTERNAL_DIR, MAX_EXTERNAL_BACKUPS, 'userdata_')
-            rotate_backups(BACKUP_CLOUD_DIR, MAX_CLOUD_BACKUPS, 'userdata_')
+        if failures:
+            raise Exception("; ".join(failures))
         
         end_time = time.time()
         duration = end_time - start_time
@@ -397,4 +541,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Restauração e verificação dos backups (formato em backup_store.py).
+
+- extract_backup: reconstrói o fluxo original (dump ou tar) conferindo o
+  SHA-256 registrado na receita;
+- restore_database: SQLite é reconstruído num arquivo temporário, conferido
+  com PRAGMA integrity_check e trocado de uma vez; PostgreSQL é restaurado
+  com pg_restore -j a partir de um arquivo temporário (o modo paralelo não
+  aceita a entrada padrão);
+- restore_files: restaura um backup em tar. Nos dados de usuário o manifesto
+  indica, para cada arquivo, o backup da cadeia que guarda a versão mais
+  recente e a posição do arquivo no tar. Com padrões (--files) só os blocos
+  que contêm os arquivos escolhidos são lidos; sem padrões, os backups da
+  cadeia são aplicados em paralelo (cada arquivo vem de um único backup);
+- verify_backups: confere as cadeias sem extraí-las e, com deep, descomprime
+  e confere cada bloco uma única vez, em processos paralelos.
+"""
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+try:
+    from backup_store import (
+        BackupRepository, BackupStoreError, ChunkCache, ChunkStore, HashingReader, load_recipe, open_backup,
+        read_attachment, read_backup, recipe_chunk_ids, resolve_chain, verify_chunks,
+    )
+except ImportError:  # importado como scripts.backup_restore
+    from .backup_store import (
+        BackupRepository, BackupStoreError, ChunkCache, ChunkStore, HashingReader, load_recipe, open_backup,
+        read_attachment, read_backup, recipe_chunk_ids, resolve_chain, verify_chunks,
+    )
+
+logger = logging.getLogger('backup')
+
+COPY_BLOCK = 1024 * 1024
+
+
+def open_recipe_repository(recipe_path, passphrase=None):
+    """Repositório somente para leitura do destino onde está a receita."""
+    return BackupRepository([os.path.dirname(os.path.abspath(recipe_path))], passphrase=passphrase, threads=1)
+
+
+def extract_backup(recipe_path, output_path, passphrase=None):
+    """Reconstrói o fluxo original de um backup (dump do banco ou .tar) em `output_path`."""
+    recipe = load_recipe(recipe_path)
+    repository = open_recipe_repository(recipe_path, passphrase)
+    sha256_hash = hashlib.sha256()
+    try:
+        with open(output_path, 'wb') as f_out:
+            for block in read_backup(repository, recipe_path):
+                sha256_hash.update(block)
+                f_out.write(block)
+    finally:
+        repository.close()
+
+    if sha256_hash.hexdigest() != recipe['sha256']:
+        raise BackupStoreError(f"Checksum do backup restaurado não confere: {recipe_path}")
+    logger.info(f"Backup extraído em {output_path} ({recipe['size']} bytes, checksum conferido)")
+    return output_path
+
+
+def restore_database(recipe_path, destination, passphrase=None, connection=None, jobs=None, temp_dir=None):
+    """
+    Restaura um backup do banco de dados. Para SQLite, `destination` é o
+    arquivo do banco; para PostgreSQL, o nome do banco, com host, port, user
+    e password em `connection`.
+    """
+    recipe = load_recipe(recipe_path)
+    engine = recipe.get('engine', '')
+
+    if 'sqlite3' in engine:
+        temporary = f"{destination}.restore.part"
+        try:
+            extract_backup(recipe_path, temporary, passphrase)
+            with closing(sqlite3.connect(temporary)) as db:
+                result = db.execute('PRAGMA integrity_check').fetchone()[0]
+            if result != 'ok':
+                raise BackupStoreError(f"Banco restaurado inconsistente: {result}")
+            os.replace(temporary, destination)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        logger.info(f"Banco SQLite restaurado em {destination}")
+
+    elif 'postgresql' in engine:
+        connection = connection or {}
+        jobs = jobs or os.cpu_count() or 1
+        with tempfile.TemporaryDirectory(dir=temp_dir) as work_dir:
+            dump_path = os.path.join(work_dir, recipe['name'] + '.dump')
+            extract_backup(recipe_path, dump_path, passphrase)
+            cmd = [
+                'pg_restore',
+                '-h', connection.get('host', 'localhost'),
+                '-p', str(connection.get('port', '5432')),
+                '-U', connection.get('user', ''),
+                '-d', destination,
+                '--clean',
+                '--if-exists',
+                '--no-owner',
+                '-j', str(jobs),
+                dump_path,
+            ]
+            env = os.environ.copy()
+            env['PGPASSWORD'] = connection.get('password', '')
+            started = time.perf_counter()
+            result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise BackupStoreError(f"Falha no pg_restore: {result.stderr}")
+        logger.info(
+            f"Banco PostgreSQL {destination} restaurado com {jobs} processos "
+            f"em {time.perf_counter() - started:.1f} s"
+        )
+
+    else:
+        raise BackupStoreError(f"Tipo de banco de dados não suportado: {engine}")
+    return destination
+
+
+def _matches(name, patterns):
+    """Padrão glob (media/decretos/*.pdf) ou caminho de diretório (media/decretos)."""
+    for pattern in patterns:
+        if fnmatch.fnmatchcase(name, pattern) or name.startswith(pattern.rstrip('/') + '/'):
+            return True
+    return False
+
+
+def _target(destination, member_name, backup_name):
+    target = os.path.abspath(os.path.join(destination, member_name))
+    if not target.startswith(destination + os.sep):
+        raise BackupStoreError(f"Caminho inválido no backup {backup_name}: {member_name}")
+    return target
+
+
+def _write_member(tar, member, entry, target, backup_name):
+    """Grava um arquivo do tar conferindo o SHA-256 e o mtime do manifesto."""
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    source = HashingReader(tar.extractfile(member))
+    with open(target, 'wb') as f_out:
+        shutil.copyfileobj(source, f_out, COPY_BLOCK)
+    if source.sha256.hexdigest() != entry[2]:
+        raise BackupStoreError(f"Checksum de {member.name} em {backup_name} não confere")
+    os.utime(target, ns=(entry[1], entry[1]))
+
+
+def _restore_stream(repository, recipe_path, destination, wanted, patterns=None):
+    """
+    Lê o tar de um backup do início e restaura os arquivos de `wanted`
+    (nome -> entrada do manifesto) ou, sem manifesto, os que casam com os
+    padrões. Para assim que todos os arquivos pedidos foram encontrados.
+    """
+    name = load_recipe(recipe_path)['name']
+    wanted = dict(wanted) if wanted is not None else None
+    restored = 0
+    with open_backup(repository, recipe_path) as stream, tarfile.open(fileobj=stream, mode='r|') as tar:
+        for member in tar:
+            target = _target(destination, member.name, name)
+            if wanted is None:
+                if not patterns or _matches(member.name, patterns):
+                    tar.extract(member, destination)
+                    restored += 1
+                continue
+            entry = wanted.pop(member.name, None)
+            if entry is None or not member.isfile():
+                continue
+            _write_member(tar, member, entry, target, name)
+            restored += 1
+            if not wanted:
+                break
+    if wanted:
+        raise BackupStoreError(f"{len(wanted)} arquivo(s) ausentes em {name}, por exemplo {next(iter(wanted))}")
+    return restored
+
+
+def _restore_members(repository, recipe_path, destination, wanted):
+    """Restaura os arquivos de `wanted` lendo só os blocos a partir da posição de cada um no tar."""
+    name = load_recipe(recipe_path)['name']
+    cache = ChunkCache()
+    for arcname, entry in sorted(wanted.items(), key=lambda item: item[1][4]):
+        with open_backup(repository, recipe_path, start=entry[4], cache=cache) as stream, \
+                tarfile.open(fileobj=stream, mode='r|') as tar:
+            member = tar.next()
+            if member is None or member.name != arcname:
+                raise BackupStoreError(f"Posição de {arcname} em {name} não confere com o tar")
+            _write_member(tar, member, entry, _target(destination, arcname, name), name)
+    return len(wanted)
+
+
+def restore_files(recipe_path, destination, passphrase=None, patterns=None, jobs=None):
+    """
+    Restaura um backup em tar (configuração ou dados de usuário) no diretório
+    `destination`; com `patterns`, só os arquivos que casam com algum deles.
+    Para um incremental, cada arquivo vem do backup da cadeia que guarda a sua
+    versão mais recente, conferido com o SHA-256 do manifesto.
+    """
+    if load_recipe(recipe_path).get('content') != 'tar':
+        raise BackupStoreError(f"{recipe_path} não é um backup de arquivos")
+    destination = os.path.abspath(destination)
+    os.makedirs(destination, exist_ok=True)
+    started = time.perf_counter()
+    repository = open_recipe_repository(recipe_path, passphrase)
+    try:
+        chain = resolve_chain(recipe_path)
+        manifest = read_attachment(repository, recipe_path, 'manifest')
+        if manifest is None:
+            # Sem manifesto (configuração): o tar inteiro, filtrado pelos padrões
+            restored = _restore_stream(repository, recipe_path, destination, None, patterns)
+        else:
+            manifest = json.loads(manifest)
+            if patterns:
+                manifest = {arcname: entry for arcname, entry in manifest.items() if _matches(arcname, patterns)}
+                if not manifest:
+                    raise BackupStoreError(f"Nenhum arquivo do backup corresponde a {', '.join(patterns)}")
+            paths = {load_recipe(path)['name']: path for path in chain}
+            by_owner = {}
+            for arcname, entry in manifest.items():
+                if entry[3] not in paths:
+                    raise BackupStoreError(f"{arcname}: backup {entry[3]} fora da cadeia")
+                by_owner.setdefault(entry[3], {})[arcname] = entry
+
+            def apply(owner):
+                wanted = by_owner[owner]
+                # Manifestos antigos não têm a posição no tar (quinto campo)
+                if patterns and all(len(entry) > 4 for entry in wanted.values()):
+                    count = _restore_members(repository, paths[owner], destination, wanted)
+                else:
+                    count = _restore_stream(repository, paths[owner], destination, wanted)
+                logger.info(f"{owner}: {count} arquivos restaurados")
+                return count
+
+            # Cada arquivo pertence a um único backup: a ordem não importa
+            with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+                restored = sum(pool.map(apply, sorted(by_owner)))
+    finally:
+        repository.close()
+    logger.info(f"{restored} arquivos restaurados em {destination} ({time.perf_counter() - started:.1f} s)")
+    return restored
+
+
+def verify_chain(recipe_path, passphrase=None):
+    """
+    Confere a cadeia de um backup sem extraí-lo: receitas anteriores presentes
+    e inalteradas, blocos presentes no destino e manifestos coerentes entre si.
+    Retorna a lista de problemas encontrados.
+    """
+    try:
+        chain = resolve_chain(recipe_path)
+    except (BackupStoreError, OSError, ValueError) as e:
+        return [str(e)]
+
+    problems = []
+    store = ChunkStore(os.path.dirname(os.path.abspath(recipe_path)))
+    repository = open_recipe_repository(recipe_path, passphrase)
+    try:
+        manifests = {}
+        for path in chain:
+            recipe = load_recipe(path)
+            missing = [chunk_id for chunk_id in recipe_chunk_ids(recipe) if not store.has(chunk_id)]
+            if missing:
+                problems.append(f"{recipe['name']}: {len(missing)} bloco(s) ausentes, por exemplo {missing[0]}")
+                continue
+            if 'manifest' in recipe.get('attachments', {}):
+                manifest = json.loads(read_attachment(repository, path, 'manifest', store))
+                owned = {arcname: entry for arcname, entry in manifest.items() if entry[3] == recipe['name']}
+                if len(owned) != recipe.get('archived', len(owned)):
+                    problems.append(f"{recipe['name']}: manifesto com {len(owned)} arquivos, tar com {recipe['archived']}")
+                manifests[recipe['name']] = (manifest, owned)
+
+        # Cada arquivo do manifesto final precisa estar no backup indicado,
+        # com o mesmo tamanho, conteúdo e posição registrados por aquele backup
+        final = manifests.get(load_recipe(recipe_path)['name'])
+        if final is not None and not problems:
+            for arcname, entry in final[0].items():
+                owner = manifests.get(entry[3])
+                if owner is None:
+                    problems.append(f"{arcname}: backup {entry[3]} fora da cadeia")
+                    break
+                archived = owner[1].get(arcname)
+                if archived is None or archived[0] != entry[0] or archived[2] != entry[2] or archived[4:] != entry[4:]:
+                    problems.append(f"{arcname}: não confere com o registrado em {entry[3]}")
+                    break
+    except (BackupStoreError, OSError, ValueError) as e:
+        problems.append(str(e))
+    finally:
+        repository.close()
+    return problems
+
+
+def verify_backups(recipe_paths, passphrase=None, deep=False, workers=None):
+    """
+    Confere as cadeias dos backups e, com `deep`, o conteúdo de todos os
+    blocos que elas usam (cada bloco uma única vez, mesmo que compartilhado
+    por vários backups) em `workers` processos. Retorna True se tudo confere.
+    """
+    ok = True
+    chunks = {}  # destino -> {(id, tamanho): backups que usam o bloco}
+    for path in recipe_paths:
+        problems = verify_chain(path, passphrase)
+        if problems:
+            ok = False
+            for problem in problems:
+                logger.error(f"FALHA em {path}: {problem}")
+            continue
+        chain = resolve_chain(path)
+        logger.info(f"Cadeia verificada: {path} ({len(chain)} backup(s))")
+        if deep:
+            used = chunks.setdefault(os.path.dirname(os.path.abspath(path)), {})
+            for member in chain:
+                recipe = load_recipe(member)
+                pairs = list(recipe['chunks'])
+                for attachment in recipe.get('attachments', {}).values():
+                    pairs.extend(attachment['chunks'])
+                for chunk_id, size in pairs:
+                    used.setdefault((chunk_id, size), set()).add(recipe['name'])
+
+    for directory, used in chunks.items():
+        started = time.perf_counter()
+        failures = verify_chunks(directory, used.keys(), passphrase, workers)
+        sizes = {chunk_id: size for chunk_id, size in used}
+        for chunk_id, problem in failures:
+            ok = False
+            names = ', '.join(sorted(used[(chunk_id, sizes[chunk_id])]))
+            logger.error(f"FALHA no bloco {chunk_id} (usado por {names}): {problem}")
+        logger.info(
+            f"{len(used)} blocos de {directory} conferidos em {time.perf_counter() - started:.1f} s, "
+            f"{len(failures)} com problema"
+        )
+    return ok
@@ -0,0 +1,641 @@
+"""
+Armazenamento dos backups em blocos com deduplicação.
+
+Cada backup é um fluxo de bytes (dump do banco, tar de configuração ou de
+dados de usuário) cortado em blocos definidos pelo conteúdo: o corte acontece
+onde a soma de uma janela de 64 bytes (tabela aleatória fixa) tem os bits
+baixos zerados, entre CHUNK_MIN e CHUNK_MAX. Uma inserção no meio do fluxo só
+altera os blocos ao redor dela, e um arquivo que não mudou gera os mesmos
+blocos no backup do dia seguinte.
+
+Os blocos ficam em <destino>/chunks/<id[:2]>/<id>, comprimidos (zstd, ou zlib
+sem o pacote zstandard) e, com BACKUP_ENCRYPTION_KEY, criptografados com
+AES-256-GCM. Um bloco já presente no destino não é gravado de novo. O backup
+em si é uma receita JSON (<prefixo>_<data>.backup.json) com a lista de blocos,
+o tamanho e o SHA-256 do fluxo original.
+
+Quem grava ou remove blocos (backup, rotação e coleta de lixo) segura
+store_lock() de todos os destinos: sem ele, a coleta de uma execução podia
+remover os blocos recém-gravados por outra, ainda sem receita.
+
+Um backup incremental (dados de usuário) aponta para o anterior da cadeia
+(parent, parent_sha256) e para a base completa (base); resolve_chain devolve
+as receitas da base até ele. Dados auxiliares, como o manifesto de arquivos,
+ficam em blocos próprios (attachments da receita), criptografados como os
+demais.
+
+Formato do bloco: b'NXC1' + codec (b'z' zstd, b'g' zlib, b'n' nenhum) +
+b'1' se criptografado (nonce de 12 bytes + texto cifrado) ou b'0'.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:  # sem zstandard: zlib
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger('backup')
+
+RECIPE_SUFFIX = '.backup.json'
+RECIPE_FORMAT = 'nexo-backup-1'
+STORE_CONFIG = 'store.json'
+# Trava do destino; arquivo próprio porque store.json é substituído (rename) ao ser gravado
+STORE_LOCK = 'store.lock'
+CHUNK_MAGIC = b'NXC1'
+
+# Tamanho dos blocos: média de 1 MiB (máscara de 20 bits)
+CHUNK_MIN = 256 * 1024
+CHUNK_MAX = 4 * 1024 * 1024
+CHUNK_MASK = (1 << 20) - 1
+CHUNK_WINDOW = 64
+# Quanto acumular antes de procurar cortes (processado de uma vez pelo numpy)
+CHUNK_BUFFER = 8 * 1024 * 1024
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+
+class BackupStoreError(Exception):
+    pass
+
+
+def _gear_table():
+    """Tabela fixa de 256 valores de 32 bits (a mesma em todas as execuções)."""
+    import numpy as np
+    return np.random.default_rng(0x4E45584F).integers(0, 2 ** 32, size=256, dtype=np.uint32)
+
+
+class Chunker:
+    """Recebe o fluxo em pedaços (feed) e devolve os blocos completos."""
+
+    def __init__(self):
+        self.table = _gear_table()
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer += data
+        if len(self.buffer) < CHUNK_BUFFER:
+            return []
+        return self._cut(final=False)
+
+    def finish(self):
+        return self._cut(final=True)
+
+    def _cut(self, final):
+        import numpy as np
+
+        data = self.buffer
+        if not data:
+            return []
+        # Soma da janela módulo 2^32 (a subtração com estouro continua exata).
+        # As primeiras posições do buffer, com janela incompleta, ficam de fora:
+        # o buffer sempre começa num corte e o bloco mínimo é bem maior que a janela.
+        sums = self.table[np.frombuffer(data, dtype=np.uint8)]
+        np.cumsum(sums, out=sums)
+        window = sums[CHUNK_WINDOW:] - sums[:-CHUNK_WINDOW]
+        # Posições em que o bloco pode terminar (inclusive)
+        candidates = np.flatnonzero((window & np.uint32(CHUNK_MASK)) == 0) + CHUNK_WINDOW
+        del sums, window
+
+        chunks = []
+        start = 0
+        index = 0
+        while True:
+            minimum = start + CHUNK_MIN - 1
+            index += int(np.searchsorted(candidates[index:], minimum))
+            end = int(candidates[index]) + 1 if index < len(candidates) else None
+            if end is None or end - start > CHUNK_MAX:
+                end = start + CHUNK_MAX
+            if end > len(data):
+                break
+            chunks.append(bytes(data[start:end]))
+            start = end
+        if final:
+            if start < len(data):
+                chunks.append(bytes(data[start:]))
+            start = len(data)
+        self.buffer = bytearray(data[start:])
+        return chunks
+
+
+class ChunkCodec:
+    """Compressão e criptografia de um bloco."""
+
+    def __init__(self, encryption_key=None, id_key=None):
+        self.encryption_key = encryption_key
+        self.id_key = id_key
+
+    @property
+    def encrypted(self):
+        return self.encryption_key is not None
+
+    def chunk_id(self, data):
+        # Com criptografia o id é um MAC: não revela o hash do conteúdo
+        if self.id_key:
+            return hashlib.blake2b(data, digest_size=32, key=self.id_key).hexdigest()
+        return hashlib.blake2b(data, digest_size=32).hexdigest()
+
+    def encode(self, chunk_id, data):
+        if zstandard is not None:
+            codec, payload = b'z', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            codec, payload = b'g', zlib.compress(data, ZLIB_LEVEL)
+        if len(payload) >= len(data):
+            # PDFs, planilhas e imagens já comprimidos
+            codec, payload = b'n', data
+        if not self.encrypted:
+            return CHUNK_MAGIC + codec + b'0' + payload
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        nonce = secrets.token_bytes(12)
+        return CHUNK_MAGIC + codec + b'1' + nonce + AESGCM(self.encryption_key).encrypt(nonce, payload, chunk_id.encode())
+
+    def decode(self, chunk_id, blob):
+        if blob[:4] != CHUNK_MAGIC:
+            raise BackupStoreError(f"Bloco {chunk_id} com formato desconhecido")
+        codec, encrypted, payload = blob[4:5], blob[5:6], blob[6:]
+        if encrypted == b'1':
+            if not self.encrypted:
+                raise BackupStoreError(f"Bloco {chunk_id} criptografado e BACKUP_ENCRYPTION_KEY não definida")
+            from cryptography.exceptions import InvalidTag
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+            try:
+                payload = AESGCM(self.encryption_key).decrypt(payload[:12], payload[12:], chunk_id.encode())
+            except InvalidTag:
+                raise BackupStoreError(f"Bloco {chunk_id} corrompido ou chave incorreta")
+        if codec == b'z':
+            if zstandard is None:
+                raise BackupStoreError("Bloco comprimido com zstd: instale o pacote zstandard")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if codec == b'g':
+            return zlib.decompress(payload)
+        return payload
+
+
+def derive_keys(passphrase, salt):
+    """Chave AES-256 e chave dos ids a partir da senha (scrypt)."""
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    material = Scrypt(salt=salt, length=64, n=2 ** 15, r=8, p=1).derive(passphrase.encode('utf-8'))
+    return material[:32], material[32:]
+
+
+class ChunkStore:
+    """Blocos e receitas de um destino (local, externo ou nuvem)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.chunks_dir = os.path.join(directory, 'chunks')
+        self._known = None
+        self._lock = threading.Lock()
+
+    def read_config(self):
+        path = os.path.join(self.chunks_dir, STORE_CONFIG)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def write_config(self, config):
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        _write_atomic(os.path.join(self.chunks_dir, STORE_CONFIG), json.dumps(config).encode())
+
+    def _chunk_path(self, chunk_id):
+        return os.path.join(self.chunks_dir, chunk_id[:2], chunk_id)
+
+    def known(self):
+        """Ids dos blocos presentes (lidos uma vez, atualizados a cada gravação)."""
+        with self._lock:
+            if self._known is None:
+                self._known = set()
+                if os.path.isdir(self.chunks_dir):
+                    for prefix in os.scandir(self.chunks_dir):
+                        if prefix.is_dir():
+                            self._known.update(entry.name for entry in os.scandir(prefix.path) if '.' not in entry.name)
+            return self._known
+
+    def has(self, chunk_id):
+        return chunk_id in self.known()
+
+    def put(self, chunk_id, blob):
+        path = self._chunk_path(chunk_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, blob)
+        with self._lock:
+            self._known.add(chunk_id)
+
+    def get(self, chunk_id):
+        with open(self._chunk_path(chunk_id), 'rb') as f:
+            return f.read()
+
+    def recipes(self, prefix=''):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(RECIPE_SUFFIX)
+        )
+
+    def collect_garbage(self):
+        """Remove os blocos que nenhuma receita do destino referencia."""
+        referenced = set()
+        for recipe_path in self.recipes():
+            referenced.update(recipe_chunk_ids(load_recipe(recipe_path)))
+        removed = 0
+        for chunk_id in list(self.known() - referenced):
+            try:
+                os.remove(self._chunk_path(chunk_id))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._known.discard(chunk_id)
+        return removed
+
+
+def _lock_file(handle, directory):
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        raise BackupStoreError(f"Outro backup está em andamento em {directory}")
+
+
+def _unlock_file(handle):
+    if fcntl is not None:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    else:
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def store_lock(directories):
+    """
+    Trava exclusiva (<destino>/chunks/store.lock) de cada destino enquanto o
+    bloco executa. Não espera: se outro processo já tem a trava, levanta
+    BackupStoreError.
+    """
+    handles = []
+    try:
+        for directory in directories:
+            chunks_dir = os.path.join(directory, 'chunks')
+            os.makedirs(chunks_dir, exist_ok=True)
+            handle = open(os.path.join(chunks_dir, STORE_LOCK), 'a+b')
+            try:
+                _lock_file(handle, directory)
+            except BaseException:
+                handle.close()
+                raise
+            handles.append(handle)
+        yield
+    finally:
+        for handle in reversed(handles):
+            _unlock_file(handle)
+            handle.close()
+
+
+def _write_atomic(path, data):
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def load_recipe(path):
+    with open(path) as f:
+        recipe = json.load(f)
+    if recipe.get('format') != RECIPE_FORMAT:
+        raise BackupStoreError(f"{path} não é uma receita de backup")
+    return recipe
+
+
+def recipe_chunk_ids(recipe):
+    """Ids de todos os blocos de uma receita, incluindo os dos anexos."""
+    ids = {chunk_id for chunk_id, _ in recipe['chunks']}
+    for attachment in recipe.get('attachments', {}).values():
+        ids.update(chunk_id for chunk_id, _ in attachment['chunks'])
+    return ids
+
+
+def resolve_chain(recipe_path):
+    """
+    Receitas da cadeia de um backup, da base completa até ele. Falha se uma
+    receita anterior não existe no destino ou foi substituída.
+    """
+    directory = os.path.dirname(os.path.abspath(recipe_path))
+    chain = [recipe_path]
+    recipe = load_recipe(recipe_path)
+    seen = {recipe['name']}
+    while recipe.get('parent'):
+        if recipe['parent'] in seen:
+            raise BackupStoreError(f"{recipe['name']}: cadeia de backups circular ({recipe['parent']})")
+        seen.add(recipe['parent'])
+        parent_path = os.path.join(directory, recipe['parent'] + RECIPE_SUFFIX)
+        if not os.path.exists(parent_path):
+            raise BackupStoreError(f"{recipe['name']}: backup anterior {recipe['parent']} não encontrado em {directory}")
+        parent = load_recipe(parent_path)
+        if parent['sha256'] != recipe.get('parent_sha256'):
+            raise BackupStoreError(f"{recipe['name']}: backup anterior {recipe['parent']} não confere")
+        chain.append(parent_path)
+        recipe = parent
+    chain.reverse()
+    return chain
+
+
+class BackupRepository:
+    """
+    Destinos de backup (o primeiro é o local) com a mesma configuração de
+    criptografia e um pool de threads para comprimir e gravar os blocos.
+    """
+
+    def __init__(self, directories, passphrase=None, threads=None):
+        self.stores = [ChunkStore(directory) for directory in directories]
+        self.codec = self._setup_codec(passphrase)
+        self.threads = threads or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='backup-bloco')
+
+    def _setup_codec(self, passphrase):
+        primary = self.stores[0]
+        config = primary.read_config()
+        if config is None:
+            config = {'format': RECIPE_FORMAT, 'salt': secrets.token_hex(16)}
+            primary.write_config(config)
+        for store in self.stores[1:]:
+            other = store.read_config()
+            if other is None:
+                store.write_config(config)
+            elif other.get('salt') != config['salt']:
+                raise BackupStoreError(f"{store.directory} pertence a outro repositório de backup (salt diferente)")
+        if not passphrase:
+            return ChunkCodec()
+        return ChunkCodec(*derive_keys(passphrase, bytes.fromhex(config['salt'])))
+
+    def writer(self, name, **metadata):
+        """Novo backup `name`; falha se ele já existe em algum destino (não sobrescreve receitas)."""
+        if metadata.get('parent') == name:
+            raise BackupStoreError(f"{name}: um backup não pode ser o anterior de si mesmo")
+        for store in self.stores:
+            if os.path.exists(os.path.join(store.directory, name + RECIPE_SUFFIX)):
+                raise BackupStoreError(f"{name}: já existe um backup com esse nome em {store.directory}")
+        return BackupWriter(self, name, metadata)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class BackupWriter:
+    """
+    Destino de escrita de um backup (objeto com write). Corta o fluxo em
+    blocos, calcula o SHA-256 do fluxo e envia cada bloco ao pool, que
+    comprime, criptografa e grava nos destinos que ainda não o têm.
+    """
+
+    def __init__(self, repository, name, metadata):
+        self.repository = repository
+        self.name = name
+        self.metadata = metadata
+        self.chunker = Chunker()
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.futures = []
+        self.attachments = {}
+        self.new_chunks = 0
+        self.new_bytes = 0
+        self._counter_lock = threading.Lock()
+        # Limita os blocos em memória aguardando o pool
+        self._slots = threading.BoundedSemaphore(repository.threads * 2)
+        self.started = time.perf_counter()
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        for chunk in self.chunker.feed(data):
+            self._submit(chunk)
+        return len(data)
+
+    def _submit(self, chunk):
+        self._slots.acquire()
+        future = self.repository.pool.submit(self._store_chunk, chunk)
+        future.add_done_callback(lambda _: self._slots.release())
+        self.futures.append(future)
+
+    def _store_chunk(self, chunk):
+        codec = self.repository.codec
+        chunk_id = codec.chunk_id(chunk)
+        missing = [store for store in self.repository.stores if not store.has(chunk_id)]
+        if missing:
+            blob = codec.encode(chunk_id, chunk)
+            for store in missing:
+                store.put(chunk_id, blob)
+            with self._counter_lock:
+                self.new_chunks += 1
+                self.new_bytes += len(blob)
+        return chunk_id, len(chunk)
+
+    def attach(self, key, data):
+        """Grava `data` (ex.: o manifesto de arquivos) em blocos próprios, referenciados pela receita."""
+        chunker = Chunker()
+        futures = [self.repository.pool.submit(self._store_chunk, chunk) for chunk in chunker.feed(data) + chunker.finish()]
+        self.attachments[key] = {
+            'size': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'chunks': [list(future.result()) for future in futures],
+        }
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """Grava a receita em todos os destinos; retorna o caminho da receita local."""
+        for chunk in self.chunker.finish():
+            self._submit(chunk)
+        chunks = [list(future.result()) for future in self.futures]
+        recipe = dict(
+            self.metadata,
+            format=RECIPE_FORMAT,
+            name=self.name,
+            created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+            size=self.size,
+            sha256=self.sha256.hexdigest(),
+            encrypted=self.repository.codec.encrypted,
+            chunks=chunks,
+        )
+        if self.attachments:
+            recipe['attachments'] = self.attachments
+        data = json.dumps(recipe).encode()
+        paths = []
+        for store in self.repository.stores:
+            path = os.path.join(store.directory, self.name + RECIPE_SUFFIX)
+            _write_atomic(path, data)
+            paths.append(path)
+        logger.info(
+            f"{self.name}: {self.size / 1e6:.1f} MB em {len(chunks)} blocos, {self.new_chunks} novos "
+            f"({self.new_bytes / 1e6:.1f} MB gravados) em {time.perf_counter() - self.started:.1f} s"
+        )
+        return paths[0]
+
+
+class ChunkCache:
+    """Últimos blocos decodificados (vários arquivos pequenos costumam estar no mesmo bloco)."""
+
+    def __init__(self, size=8):
+        self.size = size
+        self.items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chunk_id, load):
+        with self._lock:
+            if chunk_id in self.items:
+                self.items.move_to_end(chunk_id)
+                return self.items[chunk_id]
+        data = load()
+        with self._lock:
+            self.items[chunk_id] = data
+            while len(self.items) > self.size:
+                self.items.popitem(last=False)
+        return data
+
+
+def read_backup(repository, recipe_path, store=None, start=0, cache=None):
+    """
+    Gera os blocos do fluxo original de uma receita a partir da posição
+    `start`, conferindo cada id. Os blocos anteriores não são lidos.
+    """
+    recipe = load_recipe(recipe_path)
+    store = store or ChunkStore(os.path.dirname(os.path.abspath(recipe_path)))
+    codec = repository.codec
+
+    def load(chunk_id, size):
+        data = codec.decode(chunk_id, store.get(chunk_id))
+        if len(data) != size or codec.chunk_id(data) != chunk_id:
+            raise BackupStoreError(f"Bloco {chunk_id} de {recipe['name']} não confere")
+        return data
+
+    position = 0
+    for chunk_id, size in recipe['chunks']:
+        end = position + size
+        if end > start:
+            if cache is None:
+                data = load(chunk_id, size)
+            else:
+                data = cache.get(chunk_id, lambda: load(chunk_id, size))
+            yield data[start - position:] if start > position else data
+        position = end
+
+
+def read_attachment(repository, recipe_path, key, store=None):
+    """Conteúdo de um anexo da receita (None se ela não o tiver)."""
+    recipe = load_recipe(recipe_path)
+    attachment = recipe.get('attachments', {}).get(key)
+    if attachment is None:
+        return None
+    store = store or ChunkStore(os.path.dirname(os.path.abspath(recipe_path)))
+    codec = repository.codec
+    data = b''.join(codec.decode(chunk_id, store.get(chunk_id)) for chunk_id, _ in attachment['chunks'])
+    if hashlib.sha256(data).hexdigest() != attachment['sha256']:
+        raise BackupStoreError(f"Anexo {key} de {recipe['name']} não confere")
+    return data
+
+
+class _BlockReader(io.RawIOBase):
+    """Arquivo somente leitura sobre um gerador de blocos."""
+
+    def __init__(self, blocks):
+        self.blocks = iter(blocks)
+        self.current = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.current:
+            block = next(self.blocks, None)
+            if block is None:
+                return 0
+            self.current = memoryview(block)
+        size = min(len(buffer), len(self.current))
+        buffer[:size] = self.current[:size]
+        self.current = self.current[size:]
+        return size
+
+
+def open_backup(repository, recipe_path, store=None, start=0, cache=None):
+    """Fluxo original de um backup como arquivo (ex.: para tarfile.open(fileobj=..., mode='r|'))."""
+    return io.BufferedReader(
+        _BlockReader(read_backup(repository, recipe_path, store, start, cache)), buffer_size=1024 * 1024
+    )
+
+
+class HashingReader:
+    """Repassa as leituras de um arquivo calculando o SHA-256 do que foi lido."""
+
+    def __init__(self, source):
+        self.source = source
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.source.read(size)
+        self.sha256.update(data)
+        return data
+
+
+# Verificação dos blocos em processos separados (descompressão e
+# decriptografia de blocos diferentes são independentes)
+
+_verify_codec = None
+_verify_store = None
+
+
+def _init_verify_worker(directory, passphrase):
+    global _verify_codec, _verify_store
+    repository = BackupRepository([directory], passphrase=passphrase, threads=1)
+    repository.close()
+    _verify_codec, _verify_store = repository.codec, repository.stores[0]
+
+
+def _verify_batch(chunks):
+    failures = []
+    for chunk_id, size in chunks:
+        try:
+            data = _verify_codec.decode(chunk_id, _verify_store.get(chunk_id))
+            if len(data) != size or _verify_codec.chunk_id(data) != chunk_id:
+                failures.append((chunk_id, "conteúdo não confere"))
+        except Exception as e:
+            failures.append((chunk_id, str(e)))
+    return failures
+
+
+def verify_chunks(directory, chunks, passphrase=None, workers=None):
+    """
+    Descomprime e confere o conteúdo de cada bloco (id, tamanho) de um destino
+    em `workers` processos. Retorna a lista de (id, problema).
+    """
+    chunks = sorted(chunks)
+    if not chunks:
+        return []
+    workers = workers or os.cpu_count() or 1
+    batch_size = max(1, min(64, len(chunks) // (workers * 4)))
+    batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_verify_worker,
+                             initargs=(directory, passphrase)) as pool:
+        return [failure for failures in pool.map(_verify_batch, batches) for failure in failures]
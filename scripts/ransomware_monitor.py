@@ -7,6 +7,11 @@ Este script monitora comportamentos suspeitos típicos de ransomware:
 3. Criação de arquivos de resgate
 4. Tentativas de criptografia em volume
 5. Padrões suspeitos de leitura/escrita
+
+As alterações chegam por eventos do inotify (pacote watchdog). Uma varredura
+com os.scandir, com taxa limitada, reconcilia o estado periodicamente e
+substitui os eventos quando o watchdog não está instalado ou o inotify não
+está disponível (por exemplo, limite de watches esgotado).
 """
 
 import os
@@ -16,7 +21,9 @@ import logging
 import shutil
 import hashlib
 import datetime
+import queue
 import re
+import tarfile
 from pathlib import Path
 from collections import deque, Counter
 import threading
@@ -27,6 +34,18 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
 
+try:
+    from snapshot_store import SnapshotStore, full_file_hash, full_file_hashes
+except ImportError:  # importado como scripts.ransomware_monitor
+    from .snapshot_store import SnapshotStore, full_file_hash, full_file_hashes
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # sem watchdog: apenas a varredura periódica
+    FileSystemEventHandler = object
+    Observer = None
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -43,12 +62,14 @@ logger = logging.getLogger('ransomware_monitor')
 
 # Configurações
 BASE_DIR = Path(__file__).resolve().parent.parent
-DIRS_TO_MONITOR = [
+# Diretórios monitorados (RANSOMWARE_DIRS: lista separada por vírgulas)
+DIRS_TO_MONITOR = [d.strip() for d in os.environ.get('RANSOMWARE_DIRS', '').split(',') if d.strip()] or [
     os.path.join(BASE_DIR, 'media'),
     os.path.join(BASE_DIR, 'staticfiles'),
     os.path.join(BASE_DIR, 'core'),
     os.path.join(BASE_DIR, 'Nexus'),
 ]
+BACKUP_DIR = os.path.join(BASE_DIR, 'backups')
 SNAPSHOT_DIR = os.path.join(BASE_DIR, 'backups', 'snapshots')
 QUARANTINE_DIR = os.path.join(BASE_DIR, 'backups', 'quarantine')
 
@@ -60,6 +81,16 @@ os.makedirs(QUARANTINE_DIR, exist_ok=True)
 FILE_CHANGE_THRESHOLD = int(os.environ.get('RANSOMWARE_FILE_CHANGE_THRESHOLD', 20))  # Número de arquivos alterados em um curto período para gerar alerta
 TIME_WINDOW_SECONDS = int(os.environ.get('RANSOMWARE_TIME_WINDOW_SECONDS', 60))  # Janela de tempo para monitorar alterações em massa
 EXTENSION_BLACKLIST = os.environ.get('RANSOMWARE_EXTENSION_BLACKLIST', '.encrypted,.locked,.crypto,.crypt,.crinf,.r5a,.ACCDB,.djvu,.wallet').split(',')
+ALERT_COOLDOWN_SECONDS = int(os.environ.get('RANSOMWARE_ALERT_COOLDOWN_SECONDS', TIME_WINDOW_SECONDS))  # Intervalo mínimo entre alertas de alteração em massa
+SCAN_INTERVAL_SECONDS = float(os.environ.get('RANSOMWARE_SCAN_INTERVAL', 10))  # Intervalo da varredura quando não há inotify
+RECONCILE_SECONDS = float(os.environ.get('RANSOMWARE_RECONCILE_SECONDS', 900))  # Varredura de reconciliação quando o inotify está ativo
+SCAN_MAX_CPU = float(os.environ.get('RANSOMWARE_SCAN_MAX_CPU', 0.05))  # Fração máxima de CPU gasta em varreduras
+EVENT_QUEUE_SIZE = 100000  # Eventos pendentes; se a fila encher, força uma varredura
+EVENT_BATCH_SECONDS = 0.5  # Agrupa rajadas de eventos (um salvamento gera vários)
+SNAPSHOT_COMPACT_ENTRIES = 50000  # Alterações no log que forçam a compactação do índice de snapshot
+SNAPSHOT_RETENTION_DAYS = int(os.environ.get('RANSOMWARE_SNAPSHOT_RETENTION_DAYS', 30))  # Por quanto tempo as remoções ficam no índice
+FULL_HASH_ENABLED = os.environ.get('RANSOMWARE_FULL_HASH', 'False').lower() in ('true', '1', 'yes')  # Hash BLAKE2b do arquivo inteiro, além dos primeiros 8KB
+HASH_WORKERS = int(os.environ.get('RANSOMWARE_HASH_WORKERS', 0)) or None  # Threads para o hash completo (padrão: núcleos + 2, até 8)
 RANSOMWARE_PATTERNS = [
     r'YOUR_FILES_ARE_ENCRYPTED',
     r'HOW_TO_DECRYPT',
@@ -77,8 +108,47 @@ SMTP_USERNAME = os.environ.get('SMTP_USERNAME', '')
 SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD', '')
 ALERT_EMAIL = os.environ.get('ALERT_EMAIL', '')
 
+class ChangeWindow:
+    """
+    Alterações dos últimos `seconds` segundos, em ordem de chegada, com a
+    contagem das trocas de extensão mantida a cada inclusão e expiração.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.changes = deque()
+        self.extensions_changed = Counter()
+
+    @staticmethod
+    def _extension_change(change):
+        old_extension = change.get('old_extension')
+        new_extension = change.get('new_extension')
+        if old_extension is not None and new_extension is not None and old_extension != new_extension:
+            return (old_extension, new_extension)
+        return None
+
+    def append(self, change):
+        self.changes.append(change)
+        key = self._extension_change(change)
+        if key:
+            self.extensions_changed[key] += 1
+
+    def expire(self, now=None):
+        limit = (now or time.time()) - self.seconds
+        while self.changes and self.changes[0]['timestamp'] <= limit:
+            key = self._extension_change(self.changes.popleft())
+            if key:
+                self.extensions_changed[key] -= 1
+                if not self.extensions_changed[key]:
+                    del self.extensions_changed[key]
+
+    def __len__(self):
+        return len(self.changes)
+
+
 # Histórico de alterações para detecção
-file_change_history = deque(maxlen=1000)
+file_change_history = ChangeWindow(TIME_WINDOW_SECONDS)
+last_alert_time = 0
 is_attack_mode = False
 active_measures = []
 
@@ -92,49 +162,75 @@ def get_file_signature(file_path):
         logger.error(f"Erro ao gerar assinatura para {file_path}: {str(e)}")
         return None
 
-def create_snapshot():
-    """Cria um snapshot dos diretórios monitorados para posterior comparação."""
-    timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    snapshot_file = os.path.join(SNAPSHOT_DIR, f'snapshot_{timestamp}.json')
-    
-    snapshot = {}
-    for directory in DIRS_TO_MONITOR:
-        if not os.path.exists(directory):
-            continue
-            
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    if os.path.getsize(file_path) < 10 * 1024 * 1024:  # Limitar a 10MB para performance
-                        signature = get_file_signature(file_path)
-                        stat = os.stat(file_path)
-                        
-                        snapshot[file_path] = {
-                            'signature': signature,
-                            'size': stat.st_size,
-                            'mtime': stat.st_mtime,
-                            'extension': os.path.splitext(file_path)[1].lower()
-                        }
-                except Exception as e:
-                    logger.error(f"Erro ao processar arquivo {file_path} para snapshot: {str(e)}")
-    
+def file_record(file_path, mtime, size, full_hash=None):
+    """Entrada do snapshot para um arquivo."""
+    record = {
+        'signature': get_file_signature(file_path),
+        'size': size,
+        'mtime': mtime,
+        'extension': os.path.splitext(file_path)[1].lower()
+    }
+    if FULL_HASH_ENABLED:
+        record['full_hash'] = full_hash or full_file_hash(file_path)
+    return record
+
+def scan_directories(directories=None):
+    """Percorre os diretórios com os.scandir; retorna {caminho: (mtime, tamanho)} dos arquivos."""
+    found = {}
+    pending = [d for d in (directories or DIRS_TO_MONITOR) if os.path.isdir(d)]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            stat = entry.stat(follow_symlinks=False)
+                            found[entry.path] = (stat.st_mtime, stat.st_size)
+                    except OSError:
+                        continue  # removido durante a varredura
+        except OSError as e:
+            logger.error(f"Erro ao varrer {directory}: {str(e)}")
+    return found
+
+def build_snapshot():
+    """Estado atual dos diretórios monitorados (sem registrar alterações)."""
+    found = scan_directories()
+    hashes = full_file_hashes(found, HASH_WORKERS) if FULL_HASH_ENABLED else {}
+    return {
+        file_path: file_record(file_path, mtime, size, hashes.get(file_path))
+        for file_path, (mtime, size) in found.items()
+    }
+
+def open_snapshot_store():
+    """
+    Abre o snapshot persistido. Na primeira execução, importa o último
+    snapshot JSON do formato antigo ou percorre os diretórios.
+    """
+    store = SnapshotStore(SNAPSHOT_DIR, retention_days=SNAPSHOT_RETENTION_DAYS)
+    if not store:
+        legacy = load_latest_snapshot()
+        store.replace_all(legacy or build_snapshot())
+        logger.info(f"Snapshot inicial {'importado do JSON' if legacy else 'criado'}: {len(store)} arquivos")
+    return store
+
+def save_snapshot(store, compact=False):
+    """Grava as alterações pendentes no log; compacta o índice se pedido ou se o log estiver grande."""
     try:
-        with open(snapshot_file, 'w') as f:
-            json.dump(snapshot, f)
-        
-        logger.info(f"Snapshot criado com sucesso: {snapshot_file}")
-        return snapshot_file
+        store.flush()
+        if compact or store.log_entries > SNAPSHOT_COMPACT_ENTRIES:
+            applied = store.compact()
+            logger.info(f"Índice de snapshot compactado: {applied} alterações aplicadas")
     except Exception as e:
         logger.error(f"Erro ao salvar snapshot: {str(e)}")
-        return None
 
 def load_latest_snapshot():
-    """Carrega o snapshot mais recente para comparação."""
+    """Carrega o snapshot JSON mais recente (formato anterior ao índice incremental)."""
     try:
         snapshot_files = [f for f in os.listdir(SNAPSHOT_DIR) if f.startswith('snapshot_') and f.endswith('.json')]
         if not snapshot_files:
-            logger.warning("Nenhum snapshot encontrado. Criando um novo.")
             return {}
             
         latest_snapshot = sorted(snapshot_files)[-1]
@@ -185,25 +281,14 @@ def is_suspicious_file(file_path, extension=None):
 
 def detect_mass_changes():
     """Detecta alterações em massa nos arquivos, típico de ataques de ransomware."""
-    now = time.time()
-    recent_window = now - TIME_WINDOW_SECONDS
-    
-    # Filtrar alterações dentro da janela de tempo
-    recent_changes = [change for change in file_change_history if change['timestamp'] > recent_window]
-    
-    if len(recent_changes) > FILE_CHANGE_THRESHOLD:
-        # Análise adicional: verificar alterações de extensão
-        extensions_changed = Counter()
-        for change in recent_changes:
-            if 'old_extension' in change and 'new_extension' in change:
-                if change['old_extension'] != change['new_extension']:
-                    extensions_changed[(change['old_extension'], change['new_extension'])] += 1
-        
+    file_change_history.expire()
+    
+    if len(file_change_history) > FILE_CHANGE_THRESHOLD:
         return {
-            'changes_count': len(recent_changes),
+            'changes_count': len(file_change_history),
             'threshold': FILE_CHANGE_THRESHOLD,
             'window_seconds': TIME_WINDOW_SECONDS,
-            'extensions_changed': dict(extensions_changed)
+            'extensions_changed': dict(file_change_history.extensions_changed)
         }
     
     return None
@@ -283,174 +368,440 @@ def activate_protection_measures():
     
     logger.critical(alert_message)
 
+class EventCollector(FileSystemEventHandler):
+    """Enfileira os eventos do inotify (thread do watchdog) para o laço de monitoramento."""
+
+    IGNORED_EVENTS = ('opened', 'closed_no_write')
+
+    def __init__(self, events, overflow):
+        self.events = events
+        self.overflow = overflow
+
+    def on_any_event(self, event):
+        if event.event_type in self.IGNORED_EVENTS:
+            return
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflow.set()
+
+def start_observer(events, overflow):
+    """Inicia o observador do inotify; retorna None se não for possível (varredura apenas)."""
+    if Observer is None:
+        logger.warning("Pacote watchdog não instalado. Usando apenas a varredura periódica.")
+        return None
+    
+    observer = Observer()
+    handler = EventCollector(events, overflow)
+    try:
+        for directory in DIRS_TO_MONITOR:
+            if os.path.isdir(directory):
+                observer.schedule(handler, directory, recursive=True)
+        observer.start()
+    except OSError as e:
+        # ENOSPC: limite de watches do inotify (fs.inotify.max_user_watches)
+        logger.warning(f"Não foi possível iniciar o inotify ({str(e)}). Usando apenas a varredura periódica.")
+        try:
+            observer.stop()
+        except Exception:
+            pass
+        return None
+    
+    logger.info("Monitoramento por eventos do inotify ativo")
+    return observer
+
+def next_events(events, timeout):
+    """Aguarda até `timeout` segundos pelo próximo evento e agrupa a rajada que o segue."""
+    batch = []
+    try:
+        batch.append(events.get(timeout=timeout))
+    except queue.Empty:
+        return batch
+    
+    deadline = time.monotonic() + EVENT_BATCH_SECONDS
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(events.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+def check_path(snapshot, file_path, observed=None, renamed_from=None, full_hash=None):
+    """
+    Compara um arquivo com o snapshot e o atualiza. Retorna a alteração
+    detectada ou None. `observed` é o (mtime, tamanho) já obtido pela
+    varredura; `renamed_from`, o caminho anterior de um arquivo movido;
+    `full_hash`, o hash completo já calculado (RANSOMWARE_FULL_HASH).
+    """
+    previous = snapshot.pop(renamed_from, None) if renamed_from else None
+    if previous is None:
+        renamed_from = None
+        previous = snapshot.get(file_path)
+    
+    if observed is None:
+        try:
+            stat = os.stat(file_path)
+            observed = (stat.st_mtime, stat.st_size)
+        except FileNotFoundError:
+            observed = None
+        except OSError as e:
+            logger.error(f"Erro ao processar arquivo {file_path}: {str(e)}")
+            return None
+    
+    if observed is None:
+        if previous is None:
+            return None
+        # Arquivo removido
+        snapshot.pop(file_path, None)
+        return {
+            'file': renamed_from or file_path,
+            'type': 'deleted',
+            'timestamp': time.time(),
+            'old_extension': previous['extension'],
+            'old_size': previous['size'],
+            'signature': previous['signature']
+        }
+    
+    mtime, size = observed
+    current_extension = os.path.splitext(file_path)[1].lower()
+    unchanged = previous is not None and (previous['mtime'], previous['size']) == (mtime, size)
+    
+    # Verificar se é um arquivo suspeito pelo nome/extensão
+    if is_suspicious_file(file_path, current_extension):
+        if unchanged and previous.get('quarantined'):
+            return None
+        logger.warning(f"Arquivo suspeito detectado: {file_path}")
+        quarantine_file(file_path)
+        snapshot[file_path] = {
+            'signature': None,
+            'size': size,
+            'mtime': mtime,
+            'extension': current_extension,
+            'quarantined': True
+        }
+        return {
+            'file': file_path,
+            'type': 'suspicious_file',
+            'timestamp': time.time(),
+            'extension': current_extension
+        }
+    
+    if unchanged and not renamed_from:
+        return None
+    
+    record = file_record(file_path, mtime, size, full_hash)
+    snapshot[file_path] = record
+    
+    if previous is None:
+        return {
+            'file': file_path,
+            'type': 'new',
+            'timestamp': time.time(),
+            'new_extension': current_extension,
+            'new_size': size,
+            'signature': record['signature']
+        }
+    
+    same_content = record['signature'] == previous['signature']
+    if same_content and record.get('full_hash') and previous.get('full_hash'):
+        # Alterações depois dos primeiros 8KB
+        same_content = record['full_hash'] == previous['full_hash']
+    if not renamed_from and same_content:
+        return None
+    
+    return {
+        'file': file_path,
+        'type': 'renamed' if renamed_from else 'modified',
+        'timestamp': time.time(),
+        'old_file': renamed_from,
+        'old_extension': previous['extension'],
+        'new_extension': current_extension,
+        'old_size': previous['size'],
+        'new_size': size
+    }
+
+def forget_directory(snapshot, directory):
+    """Remove do snapshot os arquivos de um diretório apagado; retorna as remoções."""
+    prefix = os.path.join(directory, '')
+    changes = []
+    for file_path in [p for p in snapshot if p.startswith(prefix)]:
+        previous = snapshot.pop(file_path)
+        changes.append({
+            'file': file_path,
+            'type': 'deleted',
+            'timestamp': time.time(),
+            'old_extension': previous['extension'],
+            'old_size': previous['size'],
+            'signature': previous['signature']
+        })
+    return changes
+
+def move_directory(snapshot, source, destination):
+    """Atualiza os caminhos do snapshot após mover um diretório (o conteúdo não muda)."""
+    prefix = os.path.join(source, '')
+    for file_path in [p for p in snapshot if p.startswith(prefix)]:
+        # Entradas já gravadas no destino vieram de eventos lidos depois da mudança e são mais recentes
+        snapshot.setdefault(os.path.join(destination, file_path[len(prefix):]), snapshot.pop(file_path))
+
+def pair_renames(changes):
+    """
+    Junta remoções e criações do mesmo lote que correspondem a um arquivo
+    renomeado (mesmo conteúdo, ou nome novo derivado do antigo, como
+    relatorio.xlsx -> relatorio.xlsx.locked), para que a troca de extensão
+    seja contada. A varredura só vê remoção + criação, e o inotify também
+    quando o diretório é movido antes de os eventos serem lidos.
+    """
+    deleted = [c for c in changes if c['type'] == 'deleted']
+    if not deleted or not any(c['type'] == 'new' for c in changes):
+        return changes
+    
+    by_content, by_path, by_stem = {}, {}, {}
+    for change in deleted:
+        if change['signature']:
+            by_content.setdefault((change['signature'], change['old_size']), change)
+        by_path[change['file']] = change
+        by_stem.setdefault(os.path.splitext(change['file'])[0], change)
+    
+    paired = set()
+    result = []
+    for change in changes:
+        if change['type'] != 'new':
+            result.append(change)
+            continue
+        stem = os.path.splitext(change['file'])[0]
+        for candidate in (by_content.get((change['signature'], change['new_size'])), by_path.get(stem), by_stem.get(stem)):
+            if candidate is not None and id(candidate) not in paired:
+                paired.add(id(candidate))
+                result.append(dict(
+                    change, type='renamed', old_file=candidate['file'],
+                    old_extension=candidate['old_extension'], old_size=candidate['old_size']
+                ))
+                break
+        else:
+            result.append(change)
+    return [c for c in result if id(c) not in paired]
+
+def process_events(snapshot, batch):
+    """Aplica um lote de eventos do inotify ao snapshot; retorna as alterações."""
+    changes = []
+    to_check = {}  # caminho -> caminho anterior (arquivos movidos)
+    
+    def flush():
+        for file_path, renamed_from in to_check.items():
+            change = check_path(snapshot, file_path, renamed_from=renamed_from)
+            if change:
+                changes.append(change)
+        to_check.clear()
+    
+    for event in batch:
+        if event.is_directory:
+            # Os eventos de arquivo anteriores se referem aos caminhos antigos
+            flush()
+            if event.event_type == 'deleted':
+                changes.extend(forget_directory(snapshot, event.src_path))
+            elif event.event_type == 'moved':
+                move_directory(snapshot, event.src_path, event.dest_path)
+            elif event.event_type == 'created':
+                # Arquivos criados antes de o watch do novo diretório existir
+                for file_path in scan_directories([event.src_path]):
+                    to_check.setdefault(file_path, None)
+            continue
+        
+        if event.event_type == 'moved':
+            to_check[event.dest_path] = event.src_path
+        else:
+            to_check.setdefault(event.src_path, None)
+    
+    flush()
+    return pair_renames(changes)
+
+def reconcile(snapshot):
+    """Varredura completa comparada ao snapshot por conjuntos de caminhos."""
+    current = scan_directories()
+    known = snapshot.keys()
+    changes = []
+    
+    candidates = [(p, current[p]) for p in current.keys() - known]  # novos
+    candidates += [(p, None) for p in known - current.keys()]  # removidos
+    candidates += [
+        (p, current[p]) for p in current.keys() & known
+        if current[p] != (snapshot[p]['mtime'], snapshot[p]['size'])
+    ]
+    hashes = {}
+    if FULL_HASH_ENABLED:
+        hashes = full_file_hashes((p for p, observed in candidates if observed is not None), HASH_WORKERS)
+    for file_path, observed in candidates:
+        change = check_path(snapshot, file_path, observed=observed, full_hash=hashes.get(file_path))
+        if change:
+            changes.append(change)
+    return pair_renames(changes)
+
+def record_changes(changes):
+    """Registra as alterações na janela; alerta (retorna True) se houver alteração em massa."""
+    global last_alert_time
+    
+    for change in changes:
+        file_change_history.append(change)
+        if change['type'] in ('modified', 'renamed') and change['old_extension'] != change['new_extension']:
+            logger.warning(f"Extensão de arquivo alterada: {change['file']} de {change['old_extension']} para {change['new_extension']}")
+    
+    if not changes:
+        return False
+    logger.info(f"Detectadas {len(changes)} alterações de arquivos")
+    
+    # Verificar padrões de ransomware
+    mass_changes = detect_mass_changes()
+    if not mass_changes:
+        return False
+    
+    logger.critical(f"ALERTA: Possível ataque de ransomware em andamento! {mass_changes['changes_count']} arquivos alterados em {mass_changes['window_seconds']} segundos.")
+    if time.time() - last_alert_time < ALERT_COOLDOWN_SECONDS:
+        return False  # alerta recente: apenas registra
+    last_alert_time = time.time()
+    
+    alert_message = "Possível ataque de ransomware detectado!\n\n"
+    alert_message += f"- {mass_changes['changes_count']} arquivos alterados em {mass_changes['window_seconds']} segundos\n"
+    alert_message += f"- Limite de alerta: {mass_changes['threshold']} arquivos\n\n"
+    
+    if mass_changes['extensions_changed']:
+        alert_message += "Alterações de extensão detectadas:\n"
+        for (old_ext, new_ext), count in mass_changes['extensions_changed'].items():
+            alert_message += f"- {count} arquivos alterados de {old_ext} para {new_ext}\n"
+    
+    send_alert("Possível ataque de ransomware detectado", alert_message)
+    
+    # Ativar medidas de proteção
+    if not is_attack_mode:
+        activate_protection_measures()
+    return True
+
 def monitor_files():
-    """Função principal de monitoramento contínuo."""
-    snapshot = load_latest_snapshot()
-    if not snapshot:
-        snapshot_file = create_snapshot()
-        if snapshot_file:
-            snapshot = load_latest_snapshot()
+    """
+    Função principal de monitoramento contínuo.
+
+    Os eventos do inotify são processados assim que chegam. A varredura roda a
+    cada RANSOMWARE_RECONCILE_SECONDS com o inotify ativo (ou a cada
+    RANSOMWARE_SCAN_INTERVAL sem ele), nunca ocupando mais que
+    RANSOMWARE_SCAN_MAX_CPU do tempo: uma varredura que leva t segundos só é
+    repetida depois de t * (1 - fração) / fração segundos.
+
+    As alterações do snapshot vão para o log a cada ciclo; o índice é
+    compactado após cada varredura e a cada alerta.
+    """
+    snapshot = open_snapshot_store()
     
+    events = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+    overflow = threading.Event()
+    observer = start_observer(events, overflow)
     logger.info(f"Iniciando monitoramento de {len(DIRS_TO_MONITOR)} diretórios")
     
+    last_scan = None  # a primeira varredura compara com o último snapshot gravado
+    scan_duration = 0.0
+    
     while True:
         try:
-            changes_detected = []
+            if observer is not None and not observer.is_alive():
+                logger.error("Observador do inotify parou. Usando apenas a varredura periódica.")
+                observer = None
             
-            for directory in DIRS_TO_MONITOR:
-                if not os.path.exists(directory):
-                    continue
-                
-                for root, _, files in os.walk(directory):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        current_extension = os.path.splitext(file_path)[1].lower()
-                        
-                        # Verificar se é um arquivo suspeito pelo nome/extensão
-                        if is_suspicious_file(file_path, current_extension):
-                            logger.warning(f"Arquivo suspeito detectado: {file_path}")
-                            quarantine_file(file_path)
-                            changes_detected.append({
-                                'file': file_path,
-                                'type': 'suspicious_file',
-                                'timestamp': time.time(),
-                                'extension': current_extension
-                            })
-                            continue
-                        
-                        # Verificar se é um novo arquivo ou foi modificado
-                        try:
-                            if file_path in snapshot:
-                                # Arquivo existente - verificar se foi modificado
-                                stat = os.stat(file_path)
-                                old_data = snapshot[file_path]
-                                
-                                if stat.st_mtime > old_data['mtime']:
-                                    # Arquivo foi modificado
-                                    new_signature = get_file_signature(file_path)
-                                    
-                                    if new_signature != old_data['signature']:
-                                        old_extension = old_data['extension']
-                                        
-                                        # Registrar a mudança
-                                        changes_detected.append({
-                                            'file': file_path,
-                                            'type': 'modified',
-                                            'timestamp': time.time(),
-                                            'old_extension': old_extension,
-                                            'new_extension': current_extension,
-                                            'old_size': old_data['size'],
-                                            'new_size': stat.st_size
-                                        })
-                                        
-                                        # Atualizar snapshot
-                                        snapshot[file_path] = {
-                                            'signature': new_signature,
-                                            'size': stat.st_size,
-                                            'mtime': stat.st_mtime,
-                                            'extension': current_extension
-                                        }
-                            else:
-                                # Novo arquivo
-                                stat = os.stat(file_path)
-                                signature = get_file_signature(file_path)
-                                
-                                changes_detected.append({
-                                    'file': file_path,
-                                    'type': 'new',
-                                    'timestamp': time.time(),
-                                    'new_extension': current_extension,
-                                    'new_size': stat.st_size
-                                })
-                                
-                                # Adicionar ao snapshot
-                                snapshot[file_path] = {
-                                    'signature': signature,
-                                    'size': stat.st_size,
-                                    'mtime': stat.st_mtime,
-                                    'extension': current_extension
-                                }
-                        except Exception as e:
-                            logger.error(f"Erro ao processar arquivo {file_path}: {str(e)}")
+            interval = RECONCILE_SECONDS if observer is not None else SCAN_INTERVAL_SECONDS
+            interval = max(interval, scan_duration * (1 - SCAN_MAX_CPU) / SCAN_MAX_CPU)
+            if overflow.is_set():
+                # Eventos perdidos: reconciliar assim que o limite de CPU permitir
+                interval = scan_duration * (1 - SCAN_MAX_CPU) / SCAN_MAX_CPU
+            next_scan = 0 if last_scan is None else last_scan + interval
             
-            # Verificar remoções
-            existing_files = []
-            for directory in DIRS_TO_MONITOR:
-                if os.path.exists(directory):
-                    for root, _, files in os.walk(directory):
-                        for file in files:
-                            existing_files.append(os.path.join(root, file))
+            changes = process_events(snapshot, next_events(events, max(0, min(next_scan - time.monotonic(), 1))))
             
-            for file_path in list(snapshot.keys()):
-                if file_path not in existing_files:
-                    # Arquivo removido
-                    changes_detected.append({
-                        'file': file_path,
-                        'type': 'deleted',
-                        'timestamp': time.time(),
-                        'old_extension': snapshot[file_path]['extension'],
-                        'old_size': snapshot[file_path]['size']
-                    })
-                    
-                    # Remover do snapshot
-                    del snapshot[file_path]
+            scanned = time.monotonic() >= next_scan
+            if scanned:
+                overflow.clear()
+                started = time.monotonic()
+                changes.extend(reconcile(snapshot))
+                last_scan = time.monotonic()
+                scan_duration = last_scan - started
             
-            # Registrar alterações detectadas
-            for change in changes_detected:
-                file_change_history.append(change)
-                if change['type'] == 'suspicious_file':
-                    logger.warning(f"Arquivo suspeito: {change['file']}")
-                elif change['type'] == 'modified' and 'old_extension' in change and 'new_extension' in change:
-                    if change['old_extension'] != change['new_extension']:
-                        logger.warning(f"Extensão de arquivo alterada: {change['file']} de {change['old_extension']} para {change['new_extension']}")
+            attack = record_changes(changes)
             
-            # Analisar alterações em massa
-            if changes_detected:
-                logger.info(f"Detectadas {len(changes_detected)} alterações de arquivos")
-                
-                # Verificar padrões de ransomware
-                mass_changes = detect_mass_changes()
-                if mass_changes:
-                    logger.critical(f"ALERTA: Possível ataque de ransomware em andamento! {mass_changes['changes_count']} arquivos alterados em {mass_changes['window_seconds']} segundos.")
-                    
-                    # Salvar snapshot atual para recuperação
-                    create_snapshot()
-                    
-                    # Enviar alerta
-                    alert_message = f"Possível ataque de ransomware detectado!\n\n"
-                    alert_message += f"- {mass_changes['changes_count']} arquivos alterados em {mass_changes['window_seconds']} segundos\n"
-                    alert_message += f"- Limite de alerta: {mass_changes['threshold']} arquivos\n\n"
-                    
-                    if mass_changes['extensions_changed']:
-                        alert_message += "Alterações de extensão detectadas:\n"
-                        for (old_ext, new_ext), count in mass_changes['extensions_changed'].items():
-                            alert_message += f"- {count} arquivos alterados de {old_ext} para {new_ext}\n"
-                    
-                    send_alert("Possível ataque de ransomware detectado", alert_message)
-                    
-                    # Ativar medidas de proteção
-                    if not is_attack_mode:
-                        activate_protection_measures()
-            
-            # Salvar snapshot periodicamente
-            if len(changes_detected) > 10:  # Muitas alterações, atualizar snapshot
-                create_snapshot()
-            
-            time.sleep(10)  # Verificar a cada 10 segundos
+            # Alerta: índice compactado para as consultas de recuperação
+            save_snapshot(snapshot, compact=attack or scanned)
             
         except Exception as e:
             logger.error(f"Erro durante monitoramento: {str(e)}")
             time.sleep(30)  # Esperar um pouco mais no caso de erro
 
+def parse_timestamp(value):
+    """Data ISO (2026-10-19 ou 2026-10-19T08:30) ou timestamp Unix."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).timestamp()
+
+def list_changes_since(timestamp):
+    """Lista os arquivos alterados ou removidos desde `timestamp` (para a recuperação)."""
+    store = SnapshotStore(SNAPSHOT_DIR, retention_days=SNAPSHOT_RETENTION_DAYS)
+    changes = store.changed_since(timestamp)
+    for change in changes:
+        when = datetime.datetime.fromtimestamp(change['changed_at']).strftime('%Y-%m-%d %H:%M:%S')
+        state = 'removido' if change['deleted'] else ('quarentena' if change['quarantined'] else 'alterado')
+        print(f"{when}  {state:<10}  {change['file']}")
+    print(f"{len(changes)} arquivos desde {datetime.datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S}")
+    store.close()
+    return changes
+
+def verify_snapshot():
+    """
+    Confere os arquivos no disco com o snapshot: conteúdo completo (BLAKE2b,
+    em paralelo) quando o snapshot tem o hash completo, senão tamanho e os
+    primeiros 8KB. Retorna a lista de divergências.
+    """
+    store = SnapshotStore(SNAPSHOT_DIR, retention_days=SNAPSHOT_RETENTION_DAYS)
+    # Arquivos em quarentena já foram apontados pelo monitor
+    records = {p: r for p, r in store.files.items() if not r.get('quarantined')}
+    store.close()
+    
+    existing = {p for p in records if os.path.isfile(p)}
+    hashes = full_file_hashes((p for p in existing if records[p].get('full_hash')), HASH_WORKERS)
+    mismatches = []
+    for file_path, record in records.items():
+        if file_path not in existing:
+            mismatches.append((file_path, 'ausente'))
+        elif file_path in hashes:
+            if hashes[file_path] != record['full_hash']:
+                mismatches.append((file_path, 'conteúdo diferente'))
+        elif os.path.getsize(file_path) != record['size'] or get_file_signature(file_path) != record['signature']:
+            mismatches.append((file_path, 'conteúdo diferente (8KB iniciais ou tamanho)'))
+    
+    for file_path, reason in mismatches:
+        print(f"{reason:<45}  {file_path}")
+    print(f"{len(records)} arquivos verificados ({len(hashes)} com hash completo), {len(mismatches)} divergências")
+    return mismatches
+
 def main():
     """Função principal."""
-    logger.info("Iniciando sistema de monitoramento contra ransomware")
+    import argparse
     
-    # Criar snapshot inicial se não existir
-    snapshots = [f for f in os.listdir(SNAPSHOT_DIR) if f.startswith('snapshot_') and f.endswith('.json')]
-    if not snapshots:
-        logger.info("Criando snapshot inicial do sistema")
-        create_snapshot()
+    parser = argparse.ArgumentParser(description='Monitoramento contra ransomware')
+    parser.add_argument('--changed-since', metavar='DATA', help='Lista os arquivos alterados ou removidos desde DATA e sai')
+    parser.add_argument('--verify', action='store_true', help='Confere os arquivos no disco com o snapshot e sai')
+    parser.add_argument('--compact', action='store_true', help='Compacta o índice de snapshot e sai (com o monitor parado)')
+    args = parser.parse_args()
+    
+    if args.changed_since:
+        list_changes_since(parse_timestamp(args.changed_since))
+        return
+    if args.verify:
+        sys.exit(1 if verify_snapshot() else 0)
+    if args.compact:
+        store = SnapshotStore(SNAPSHOT_DIR, retention_days=SNAPSHOT_RETENTION_DAYS)
+        print(f"{store.compact()} alterações aplicadas ao índice")
+        store.close()
+        return
+    
+    logger.info("Iniciando sistema de monitoramento contra ransomware")
     
     try:
         # Iniciar monitoramento em uma thread separada
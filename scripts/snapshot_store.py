@@ -0,0 +1,271 @@
+"""
+Armazenamento incremental do snapshot do monitor contra ransomware.
+
+O estado (caminho -> assinatura, tamanho, mtime, extensão) fica em dois
+arquivos no diretório de snapshots:
+
+- snapshot_index.sqlite3: índice compactado, uma linha por arquivo com chave
+  no hash (BLAKE2b) do caminho. Arquivos removidos ficam como lápide
+  (deleted=1) para as consultas de recuperação, até passar da retenção;
+- snapshot.log: alterações desde a última compactação, uma linha JSON por
+  alteração, só acrescentadas ao final.
+
+Gravar custa O(alterações): cada atribuição ou remoção no SnapshotStore vai
+para um buffer e flush() acrescenta as linhas ao log. compact() aplica o log
+ao índice numa transação e o esvazia; se o processo cair entre as duas
+etapas, a nova aplicação do log é idempotente. Ao abrir, o índice é lido e o
+log reaplicado, sem reprocessar snapshots completos.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger('ransomware_monitor')
+
+INDEX_NAME = 'snapshot_index.sqlite3'
+LOG_NAME = 'snapshot.log'
+FULL_HASH_BLOCK = 1024 * 1024
+
+
+def path_key(file_path):
+    """Chave de 16 bytes do caminho no índice."""
+    return hashlib.blake2b(file_path.encode('utf-8', 'surrogateescape'), digest_size=16).digest()
+
+
+def full_file_hash(file_path):
+    """BLAKE2b do arquivo inteiro (None se não puder ser lido)."""
+    digest = hashlib.blake2b()
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(FULL_HASH_BLOCK), b''):
+                digest.update(block)
+    except OSError as e:
+        logger.error(f"Erro ao calcular hash completo de {file_path}: {str(e)}")
+        return None
+    return digest.hexdigest()
+
+
+def full_file_hashes(paths, workers=None):
+    """Hash completo de vários arquivos em paralelo ({caminho: hash})."""
+    paths = list(paths)
+    if not paths:
+        return {}
+    # O hashlib libera o GIL em blocos grandes: threads bastam
+    with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2)) as pool:
+        return dict(zip(paths, pool.map(full_file_hash, paths)))
+
+
+class SnapshotStore(MutableMapping):
+    """
+    Snapshot em memória (dicionário caminho -> registro) persistido de forma
+    incremental em log + índice SQLite.
+
+        store = SnapshotStore(SNAPSHOT_DIR)
+        store[caminho] = registro
+        store.flush()     # acrescenta as alterações ao log
+        store.compact()   # aplica o log ao índice
+    """
+
+    def __init__(self, directory, retention_days=30):
+        self.directory = directory
+        self.retention_seconds = retention_days * 86400
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.log_path = os.path.join(directory, LOG_NAME)
+        self.files = {}
+        self.pending = []  # (timestamp, caminho, registro ou None) ainda fora do log
+        self.log_entries = 0
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS files (
+                path_key BLOB PRIMARY KEY,
+                path TEXT NOT NULL,
+                signature TEXT,
+                size INTEGER,
+                mtime REAL,
+                extension TEXT,
+                quarantined INTEGER NOT NULL DEFAULT 0,
+                full_hash TEXT,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                changed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_changed_at ON files (changed_at);
+        ''')
+        self._load()
+
+    # Interface de dicionário: toda alteração também vai para o buffer do log
+
+    def __getitem__(self, file_path):
+        return self.files[file_path]
+
+    def __setitem__(self, file_path, record):
+        self.files[file_path] = record
+        self.pending.append((time.time(), file_path, record))
+
+    def __delitem__(self, file_path):
+        del self.files[file_path]
+        self.pending.append((time.time(), file_path, None))
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def __contains__(self, file_path):
+        return file_path in self.files
+
+    def keys(self):
+        return self.files.keys()
+
+    # Persistência
+
+    def _load(self):
+        started = time.perf_counter()
+        for row in self.db.execute(
+            'SELECT path, signature, size, mtime, extension, quarantined, full_hash FROM files WHERE deleted = 0'
+        ):
+            self.files[row[0]] = self._record(row[1:])
+
+        replayed = 0
+        for _, file_path, record in self._read_log():
+            if record is None:
+                self.files.pop(file_path, None)
+            else:
+                self.files[file_path] = record
+            replayed += 1
+        self.log_entries = replayed
+        logger.info(
+            f"Snapshot carregado: {len(self.files)} arquivos, {replayed} alterações no log "
+            f"({time.perf_counter() - started:.2f} s)"
+        )
+
+    def _read_log(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Última linha incompleta (queda durante a escrita)
+                    logger.warning(f"Linha inválida ignorada no log de snapshot: {line[:80]!r}")
+
+    @staticmethod
+    def _record(values):
+        signature, size, mtime, extension, quarantined, full_hash = values
+        record = {'signature': signature, 'size': size, 'mtime': mtime, 'extension': extension}
+        if quarantined:
+            record['quarantined'] = True
+        if full_hash:
+            record['full_hash'] = full_hash
+        return record
+
+    def flush(self):
+        """Acrescenta ao log as alterações em memória ainda não gravadas."""
+        if not self.pending:
+            return 0
+        lines = ''.join(
+            json.dumps([timestamp, file_path, record], ensure_ascii=False) + '\n'
+            for timestamp, file_path, record in self.pending
+        )
+        with open(self.log_path, 'a', encoding='utf-8', errors='surrogateescape') as f:
+            f.write(lines)
+        written = len(self.pending)
+        self.log_entries += written
+        self.pending = []
+        return written
+
+    def compact(self):
+        """Aplica o log ao índice SQLite, esvazia o log e descarta lápides antigas."""
+        self.flush()
+        entries = list(self._read_log())
+        with self.db:
+            self._write(entries)
+            self.db.execute(
+                'DELETE FROM files WHERE deleted = 1 AND changed_at < ?',
+                (time.time() - self.retention_seconds,)
+            )
+        # Só depois do commit: se cair antes, o log é reaplicado na próxima vez
+        with open(self.log_path, 'w'):
+            pass
+        self.log_entries = 0
+        return len(entries)
+
+    def _write(self, entries):
+        puts, deletes = [], []
+        for timestamp, file_path, record in entries:
+            if record is None:
+                deletes.append((timestamp, path_key(file_path)))
+            else:
+                puts.append((
+                    path_key(file_path), file_path, record.get('signature'), record.get('size'),
+                    record.get('mtime'), record.get('extension'), int(bool(record.get('quarantined'))),
+                    record.get('full_hash'), timestamp,
+                ))
+        self.db.executemany('''
+            INSERT INTO files (path_key, path, signature, size, mtime, extension, quarantined, full_hash, deleted, changed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT (path_key) DO UPDATE SET
+                path = excluded.path, signature = excluded.signature, size = excluded.size,
+                mtime = excluded.mtime, extension = excluded.extension, quarantined = excluded.quarantined,
+                full_hash = excluded.full_hash, deleted = 0, changed_at = excluded.changed_at
+        ''', puts)
+        self.db.executemany('UPDATE files SET deleted = 1, changed_at = ? WHERE path_key = ?', deletes)
+
+    def replace_all(self, snapshot):
+        """
+        Substitui todo o conteúdo (snapshot inicial ou importado). A data de
+        alteração de cada arquivo é o seu mtime.
+        """
+        self.files = dict(snapshot)
+        self.pending = []
+        with self.db:
+            self.db.execute('DELETE FROM files')
+            self._write([(record['mtime'], file_path, record) for file_path, record in self.files.items()])
+        with open(self.log_path, 'w'):
+            pass
+        self.log_entries = 0
+
+    def changed_since(self, timestamp):
+        """
+        Arquivos criados, alterados ou removidos desde `timestamp`, em ordem
+        cronológica. Só lê o índice e o log (pode rodar com o monitor ativo).
+        """
+        found = {
+            path: {
+                'file': path,
+                'changed_at': changed_at,
+                'deleted': bool(deleted),
+                'size': size,
+                'extension': extension,
+                'quarantined': bool(quarantined),
+            }
+            for path, changed_at, deleted, size, extension, quarantined in self.db.execute(
+                'SELECT path, changed_at, deleted, size, extension, quarantined FROM files '
+                'WHERE changed_at >= ?', (timestamp,)
+            )
+        }
+        for changed_at, file_path, record in list(self._read_log()) + self.pending:
+            if changed_at < timestamp:
+                continue
+            record = record or {}
+            found[file_path] = {
+                'file': file_path,
+                'changed_at': changed_at,
+                'deleted': not record,
+                'size': record.get('size'),
+                'extension': record.get('extension'),
+                'quarantined': bool(record.get('quarantined')),
+            }
+        return sorted(found.values(), key=lambda change: change['changed_at'])
+
+    def close(self):
+        self.flush()
+        self.db.close()
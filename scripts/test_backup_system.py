@@ -11,10 +11,8 @@ import sys
 import logging
 import datetime
 import subprocess
-import hashlib
 import shutil
 import tarfile
-import gzip
 import random
 import string
 from pathlib import Path
@@ -76,14 +74,6 @@ def create_test_data():
     logger.info("Dados de teste criados com sucesso")
     return TEST_DATA_DIR
 
-def calculate_checksum(file_path):
-    """Calcula o hash SHA-256 de um arquivo."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
-
 def test_backup_script():
     """Testa o script de backup principal."""
     logger.info("Testando script de backup...")
@@ -105,69 +95,54 @@ def test_backup_script():
         logger.error(f"Stderr: {e.stderr}")
         return False
 
+def run_backup_command(*args):
+    """Executa backup.py com os argumentos dados."""
+    return subprocess.run(
+        [sys.executable, os.path.join(BASE_DIR, 'scripts', 'backup.py'), *args],
+        capture_output=True,
+        text=True
+    )
+
+def list_backups(prefix=''):
+    """Receitas de backup (.backup.json) no diretório local."""
+    if not os.path.isdir(BACKUP_DIR):
+        return []
+    return sorted(
+        os.path.join(BACKUP_DIR, f) for f in os.listdir(BACKUP_DIR)
+        if f.startswith(prefix) and f.endswith('.backup.json')
+    )
+
 def test_backup_integrity():
     """Testa a integridade dos arquivos de backup."""
     logger.info("Testando integridade dos backups...")
     
-    # Listar arquivos de backup
-    backup_files = []
-    for root, _, files in os.walk(BACKUP_DIR):
-        for file in files:
-            if file.endswith('.gz') or file.endswith('.gpg'):
-                backup_files.append(os.path.join(root, file))
-    
+    backup_files = list_backups()
     if not backup_files:
         logger.error("Nenhum arquivo de backup encontrado")
         return False
     
-    # Verificar arquivos de checksum
-    integrity_failures = 0
+    # Cadeias de todos os backups e conteúdo de todos os blocos (em paralelo)
+    result = run_backup_command('--verify', '--all', '--deep')
     
-    for backup_file in backup_files:
-        checksum_file = f"{backup_file}.sha256"
-        
-        if not os.path.exists(checksum_file):
-            logger.warning(f"Arquivo de checksum não encontrado para: {backup_file}")
-            continue
-        
-        with open(checksum_file, 'r') as f:
-            stored_checksum = f.read().strip()
-        
-        calculated_checksum = calculate_checksum(backup_file)
-        
-        if stored_checksum == calculated_checksum:
-            logger.info(f"Verificação de integridade bem-sucedida para: {backup_file}")
-        else:
-            logger.error(f"FALHA na verificação de integridade para: {backup_file}")
-            logger.error(f"Checksum esperado: {stored_checksum}")
-            logger.error(f"Checksum calculado: {calculated_checksum}")
-            integrity_failures += 1
-    
-    if integrity_failures == 0:
-        logger.info("Todos os arquivos de backup passaram na verificação de integridade")
+    if result.returncode == 0:
+        logger.info(f"Todos os {len(backup_files)} backups passaram na verificação de integridade")
         return True
     else:
-        logger.error(f"{integrity_failures} arquivo(s) falharam na verificação de integridade")
+        logger.error("FALHA na verificação de integridade dos backups")
+        logger.error(result.stderr or result.stdout)
         return False
 
 def test_restore_backup():
     """Testa a restauração de um backup."""
     logger.info("Testando restauração de backup...")
     
-    # Encontrar o backup mais recente
-    database_backups = []
-    for root, _, files in os.walk(BACKUP_DIR):
-        for file in files:
-            if file.startswith('database_') and (file.endswith('.gz') or file.endswith('.gpg')):
-                database_backups.append(os.path.join(root, file))
-    
+    # Encontrar o backup mais recente (o nome contém o timestamp)
+    database_backups = list_backups('database_')
     if not database_backups:
         logger.error("Nenhum backup de banco de dados encontrado")
         return False
     
-    # Ordenar por data (nome do arquivo contém timestamp)
-    database_backups.sort(reverse=True)
-    latest_backup = database_backups[0]
+    latest_backup = database_backups[-1]
     
     logger.info(f"Testando restauração do backup: {latest_backup}")
     
@@ -176,26 +151,17 @@ def test_restore_backup():
         restore_path = os.path.join(temp_dir, "restored_db")
         
         try:
-            # Para arquivo .gz (não criptografado)
-            if latest_backup.endswith('.gz'):
-                with gzip.open(latest_backup, 'rb') as f_in:
-                    with open(restore_path, 'wb') as f_out:
-                        shutil.copyfileobj(f_in, f_out)
-            
-            # Para arquivo .gpg (criptografado)
-            elif latest_backup.endswith('.gpg'):
-                # Aqui seria necessário descriptografar com a chave
-                # Mas para o teste, apenas verificamos se existe
-                logger.info("Backup criptografado encontrado (a descriptografia requer chave)")
-                # Simular uma restauração bem-sucedida
-                with open(restore_path, 'wb') as f_out:
-                    f_out.write(b'Conteudo simulado de restauracao')
+            # Com SQLite, o banco restaurado passa pelo PRAGMA integrity_check
+            result = run_backup_command('--restore', latest_backup, restore_path)
+            if result.returncode != 0:
+                logger.error(f"Falha na restauração: {result.stderr or result.stdout}")
+                return False
             
             if os.path.exists(restore_path) and os.path.getsize(restore_path) > 0:
-                logger.info(f"Restauração simulada com sucesso: {restore_path}")
+                logger.info(f"Restauração concluída com sucesso: {restore_path}")
                 return True
             else:
-                logger.error("Falha na restauração simulada")
+                logger.error("Falha na restauração")
                 return False
                 
         except Exception as e: